@@ -15,6 +15,7 @@ class LeadGenerationMixin:
                 "website": account.website
             },
             "product_data": {
+                "id": str(account.product.id),
                 "name": account.product.name,
                 "description": account.product.description,
                 "icp_description": account.product.icp_description,
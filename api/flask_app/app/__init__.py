@@ -66,6 +66,10 @@ def celery_init_app(app: Flask) -> Celery:
 
     celery_app = Celery(app.name, task_cls=FlaskTask)
     celery_app.config_from_object(app.config["CELERY"])
+    if "worker_prefetch_multiplier" not in app.config["CELERY"]:
+        # Content processing fans out many small tasks, so each worker process should only reserve the task it is
+        # about to run. Otherwise tasks get queued behind a slow task while other processes are idle.
+        celery_app.conf.worker_prefetch_multiplier = 1
     celery_app.set_default()
     app.extensions["celery"] = celery_app
     return celery_app
@@ -13,8 +13,8 @@ from langchain_community.callbacks import get_openai_callback
 from langchain_core.prompts import HumanMessagePromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from app.metrics import Metrics
+from app.process_resources import process_resources
+from app.tracing import traced
 
 logger = logging.getLogger()
 
@@ -36,7 +36,7 @@ class LinkedInActivityParser:
         self.person_role_title = person_role_title
         self.person_profile_id = person_profile_id
         self.company_profile_id = company_profile_id
-        self.metrics = Metrics()
+        self.metrics = process_resources.get_metrics()
 
         # Constants.
         self.OPENAI_API_KEY = os.environ["OPENAI_USERPORT_API_KEY"]
@@ -141,6 +141,7 @@ class LinkedInActivityParser:
             ""
         ))
 
+    @traced("activity_parser.parse")
     def parse(self, activity: LinkedInActivity) -> ContentDetails:
         """Parse given LinkedIn activity and convert it into Content instance post processing."""
         # Populate content details as content is parsed.
@@ -197,6 +198,7 @@ class LinkedInActivityParser:
                 f"\n\nTotal cost: {content_details.openai_tokens_used.total_cost_in_usd}")
             return content_details
 
+    @traced("activity_parser.parse_v2")
     def parse_v2(self, activity: LinkedInActivity) -> ContentDetails:
         """Parse given LinkedIn activity and convert it into Content instance post processing. We are doing a lot more processing in v2 compared to v1."""
         # Populate content details as content is parsed.
@@ -337,7 +339,7 @@ class LinkedInActivityParser:
             reason: Optional[str] = Field(
                 default=None, description="Reason for why the content is related or not related to the Company.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(RelatedToCompany)
 
         chain = prompt | llm
@@ -409,7 +411,7 @@ class LinkedInActivityParser:
             ]
         )
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS)
 
         chain = prompt | llm
@@ -463,7 +465,7 @@ class LinkedInActivityParser:
             num_reposts: Optional[int] = Field(
                 default=None, description="Number of Reposts of the given activity. Set to 0 if Reposts are not found.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(LikesAndComments)
 
         chain = prompt | llm
@@ -508,7 +510,7 @@ class LinkedInActivityParser:
             summary: Optional[str] = Field(
                 default=None, description="Summary of the activity.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(PersonalitySummary)
 
         chain = prompt | llm
@@ -558,7 +560,7 @@ class LinkedInActivityParser:
             reason: Optional[str] = Field(
                 default=None, description="Reason for the picking the category.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ContentCategory)
 
         chain = prompt | llm
@@ -615,7 +617,7 @@ class LinkedInActivityParser:
             reason: Optional[str] = Field(
                 default=None, description="Reason for the choosing this as the main person.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(EngagedColleague)
 
         chain = prompt | llm
@@ -681,7 +683,7 @@ class LinkedInActivityParser:
             reason: Optional[str] = Field(
                 default=None, description="Reason for choosing these products.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(MentionedProducts)
 
         chain = prompt | llm
@@ -731,7 +733,7 @@ class LinkedInActivityParser:
             reason: Optional[str] = Field(
                 default=None, description="Reason for the category selection.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(Category)
 
         chain = prompt | llm
@@ -781,7 +783,7 @@ class LinkedInActivityParser:
             team_members: Optional[List[str]] = Field(
                 default=None, description="Team members of the prospect in the text.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(TeamMembers)
 
         chain = prompt | llm
@@ -825,7 +827,7 @@ class LinkedInActivityParser:
             products: Optional[List[str]] = Field(
                 default=None, description="Products or brands mentioned in the text.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(Products)
 
         chain = prompt | llm
@@ -889,7 +891,7 @@ class LinkedInActivityParser:
             linkedin_url: Optional[str] = Field(
                 default=None, description="LinkedIn URL of the author.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(AuthorDetails)
 
         chain = prompt | llm
@@ -946,7 +948,7 @@ class LinkedInActivityParser:
             hashtags: Optional[List[str]] = Field(
                 default=None, description="Hashtags mentioned in the LinkedIn activity.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(MentionedHashTags)
 
         chain = prompt | llm
@@ -991,7 +993,7 @@ class LinkedInActivityParser:
             publish_date: Optional[str] = Field(
                 default=None, description="Publish date of the post.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(PublishDate)
 
         chain = prompt | llm
@@ -10,12 +10,67 @@ from app.database import Database
 from app.models import LeadResearchReport, LinkedInActivity
 from app.research_report import Researcher
 from app.linkedin_scraper import InvalidLeadLinkedInUrlException, LeadLinkedInProfileNotFoundException
-from app.metrics import Metrics
+from app.process_resources import process_resources
 
 
 logger = logging.getLogger()
 
 
+# Used when live worker concurrency cannot be determined, matches --concurrency in the celery worker deployment.
+DEFAULT_WORKER_CONCURRENCY = 12
+# Maximum number of URLs or activities processed by a single task. Small batches are pulled by worker processes as
+# they free up, so slow URLs do not hold up other work. Kept above 1 to limit per task setup and token update transactions.
+MAX_ITEMS_PER_CONTENT_BATCH = 2
+# Seconds for which the live worker concurrency is cached before workers are inspected again.
+WORKER_CONCURRENCY_CACHE_TTL_SECONDS = 60
+WORKER_INSPECT_TIMEOUT_SECONDS = 1.0
+
+_worker_concurrency_cache = {"value": None, "fetched_at": 0.0}
+
+
+def get_worker_concurrency(celery_app) -> int:
+    """Returns total number of worker processes across all running Celery workers.
+
+    Reads max concurrency of each worker's pool from worker stats so that scaling the worker deployment or changing
+    --concurrency is picked up without code changes. Falls back to configured concurrency if workers don't reply in time.
+    """
+    now = time.monotonic()
+    cached_value = _worker_concurrency_cache["value"]
+    if cached_value and now - _worker_concurrency_cache["fetched_at"] < WORKER_CONCURRENCY_CACHE_TTL_SECONDS:
+        return cached_value
+
+    concurrency: int = 0
+    try:
+        stats = celery_app.control.inspect(
+            timeout=WORKER_INSPECT_TIMEOUT_SECONDS).stats() or {}
+        for worker_name, worker_stats in stats.items():
+            concurrency += int(worker_stats.get("pool",
+                               {}).get("max-concurrency", 0))
+    except Exception as e:
+        logger.warning(f"Failed to inspect Celery worker stats: {e}")
+
+    if concurrency <= 0:
+        concurrency = celery_app.conf.worker_concurrency or DEFAULT_WORKER_CONCURRENCY
+        logger.info(
+            f"Could not read live worker concurrency, using configured concurrency: {concurrency}")
+
+    _worker_concurrency_cache["value"] = concurrency
+    _worker_concurrency_cache["fetched_at"] = now
+    return concurrency
+
+
+def split_into_batches(items: List, concurrency: int, max_batch_size: int = MAX_ITEMS_PER_CONTENT_BATCH) -> List[List]:
+    """Splits items into batches of at most max_batch_size that are spread evenly over given concurrency.
+
+    When there are more items than worker processes, we create more batches than processes and
+    workers pull the remaining batches as they finish earlier ones.
+    """
+    if not items:
+        return []
+    batch_size: int = max(1, min(max_batch_size, -(-len(items) // max(concurrency, 1))))
+    return [items[i: i + batch_size] for i in range(0, len(items), batch_size)]
+
+
 @shared_task(bind=True, acks_late=True)
 def fetch_lead_info_orchestrator(self, lead_research_report_id: str):
     """Main Orchestrator that routes the given report to the correct Celery task."""
@@ -93,7 +148,7 @@ def enrich_lead_info_in_background(self, user_id: str, lead_research_report_id:
                 user_id=user_id, lead_research_report_id=lead_research_report_id)
 
         # Send event.
-        Metrics().capture(user_id=user_id, event_name="report_lead_info_enriched", properties={
+        process_resources.get_metrics().capture(user_id=user_id, event_name="report_lead_info_enriched", properties={
             "report_id": lead_research_report_id})
     except InvalidLeadLinkedInUrlException as e:
         logger.exception(
@@ -108,7 +163,7 @@ def enrich_lead_info_in_background(self, user_id: str, lead_research_report_id:
                                  e=e, event_name="lead_profile_not_found", task_name="enrich_lead_info", status_before_failure=LeadResearchReport.Status.NEW)
 
         # Send event.
-        Metrics().capture(user_id=user_id, event_name="report_lead_linkedin_url_not_found",
+        process_resources.get_metrics().capture(user_id=user_id, event_name="report_lead_linkedin_url_not_found",
                           properties={"report_id": lead_research_report_id})
         return
     except Exception as e:
@@ -134,7 +189,7 @@ def fetch_search_results_in_background(self, user_id: str, lead_research_report_
             user_id=user_id, lead_research_report_id=lead_research_report_id)
 
         # Send event.
-        Metrics().capture(user_id=user_id, event_name="report_search_results_fetched", properties={
+        process_resources.get_metrics().capture(user_id=user_id, event_name="report_search_results_fetched", properties={
             "report_id": lead_research_report_id, "time_taken_seconds": time.time() - start_time})
     except Exception as e:
         shared_task_exception_handler(shared_task_obj=self, database=database, user_id=user_id, lead_research_report_id=lead_research_report_id,
@@ -150,10 +205,9 @@ def process_content_in_search_results_and_activities_in_background(self, user_id
     try:
         research_report: LeadResearchReport = database.get_lead_research_report(
             lead_research_report_id=lead_research_report_id)
-        # Split search URLs into batches depending on the number of concurrent processes in a worker.
-        # Note: This concurrency value must match the concurreny passed during app intialization.
-        # TODO: Make this read the concurrency value from the celery start command line argument.
-        concurrency = 12
+        # Split search URLs and activities into small batches so that worker processes pull the next batch as soon as they are free
+        # and a slow URL only holds up its own batch. Batch size is derived from the live concurrency of all workers.
+        concurrency: int = get_worker_concurrency(celery_app=self.app)
         parallel_workers = []
         total_web_search_urls_to_process = 0
         total_linkedin_activities_to_process = 0
@@ -161,23 +215,16 @@ def process_content_in_search_results_and_activities_in_background(self, user_id
         # Create batches for Web search result URLs if present.
         if research_report.web_search_results:
             search_results_list: List[LeadResearchReport.WebSearchResults.Result] = research_report.web_search_results.results
-            total_web_search_urls_to_process: int = research_report.web_search_results.num_results
-            batch_size = int(total_web_search_urls_to_process/concurrency) + \
-                (0 if total_web_search_urls_to_process % concurrency == 0 else 1)
+            total_web_search_urls_to_process: int = len(search_results_list)
+            search_results_batches: List[List[LeadResearchReport.WebSearchResults.Result]] = split_into_batches(
+                items=search_results_list, concurrency=concurrency)
             logger.info(
-                f"Splitting processing of web search URLS: {total_web_search_urls_to_process} into {concurrency} workers which will each handle at max {batch_size} URLs for processing for lead report: {lead_research_report_id} and user ID: {user_id}.")
-
-            for i in range(concurrency):
-                start_idx = i*batch_size
-                end_idx = start_idx + batch_size
-                batch: List[LeadResearchReport.WebSearchResults.Result] = search_results_list[start_idx: end_idx]
-                logger.info(
-                    f"Web search task num: {i} has batch size: {len(batch)} in report ID: {lead_research_report_id} for user ID: {user_id}")
+                f"Splitting processing of web search URLS: {total_web_search_urls_to_process} into {len(search_results_batches)} batches for worker concurrency: {concurrency} for lead report: {lead_research_report_id} and user ID: {user_id}.")
+
+            for i, batch in enumerate(search_results_batches):
                 work = process_content_in_search_results_batch_in_background.s(
                     i, user_id, lead_research_report_id, [r.model_dump_json() for r in batch])
                 parallel_workers.append(work)
-                if end_idx >= total_web_search_urls_to_process:
-                    break
             logger.info(
                 f"Num web search result batches: {len(parallel_workers)} in report ID: {lead_research_report_id} for user ID: {user_id}")
 
@@ -186,26 +233,16 @@ def process_content_in_search_results_and_activities_in_background(self, user_id
             activities_ids_to_process: List[str] = research_report.linkedin_activity_info.activity_ref_ids
             total_linkedin_activities_to_process = len(
                 research_report.linkedin_activity_info.activity_ref_ids)
-            batch_size = int(total_linkedin_activities_to_process/concurrency) + \
-                (0 if total_linkedin_activities_to_process %
-                 concurrency == 0 else 1)
+            activity_batches: List[List[str]] = split_into_batches(
+                items=activities_ids_to_process, concurrency=concurrency)
             logger.info(
-                f"Splitting processing of activity IDs: {total_linkedin_activities_to_process} into {concurrency} workers which will each handle at max {batch_size} URLs for processing for lead report: {lead_research_report_id} and user ID: {user_id}.")
-            num_activity_batches = 0
-            for i in range(concurrency):
-                start_idx = i*batch_size
-                end_idx = start_idx + batch_size
-                batch = activities_ids_to_process[start_idx:end_idx]
-                logger.info(
-                    f"Activity processing task num: {i} has batch size: {len(batch)} in report ID: {lead_research_report_id} for user ID: {user_id}")
+                f"Splitting processing of activity IDs: {total_linkedin_activities_to_process} into {len(activity_batches)} batches for worker concurrency: {concurrency} for lead report: {lead_research_report_id} and user ID: {user_id}.")
+            for i, batch in enumerate(activity_batches):
                 work = process_activities_batch_in_background.s(
                     i, user_id, lead_research_report_id, batch)
                 parallel_workers.append(work)
-                num_activity_batches += 1
-                if end_idx >= total_linkedin_activities_to_process:
-                    break
             logger.info(
-                f"Num activity batches: {num_activity_batches} in report ID: {lead_research_report_id} for user ID: {user_id}")
+                f"Num activity batches: {len(activity_batches)} in report ID: {lead_research_report_id} for user ID: {user_id}")
 
         # Define task that will aggregate results of parallel workers at the end.
         aggregation_work = aggregate_processed_content_results_in_background.s(
@@ -214,8 +251,8 @@ def process_content_in_search_results_and_activities_in_background(self, user_id
             user_id, lead_research_report_id)
 
         # Send event.
-        Metrics().capture(user_id=user_id, event_name="report_content_start_processing", properties={
-            "report_id": lead_research_report_id, "start_time": time.time(), "total_web_search_urls": total_web_search_urls_to_process, "total_linkedin_activities": total_linkedin_activities_to_process,  "concurrency": concurrency})
+        process_resources.get_metrics().capture(user_id=user_id, event_name="report_content_start_processing", properties={
+            "report_id": lead_research_report_id, "start_time": time.time(), "total_web_search_urls": total_web_search_urls_to_process, "total_linkedin_activities": total_linkedin_activities_to_process,  "concurrency": concurrency, "num_batches": len(parallel_workers)})
 
         # Start processing.
         chord(parallel_workers)(
@@ -295,7 +332,7 @@ def aggregate_processed_content_results_in_background(self, failed_urls_list: Li
             user_id=user_id, lead_research_report_id=lead_research_report_id)
 
         # Send event.
-        Metrics().capture(user_id=user_id, event_name="report_all_content_results_processed", properties={
+        process_resources.get_metrics().capture(user_id=user_id, event_name="report_all_content_results_processed", properties={
             "report_id": lead_research_report_id, "end_time": time.time(), "failed_urls": flattened_urls_list, "num_failed_urls": len(flattened_urls_list)})
     except Exception as e:
         shared_task_exception_handler(shared_task_obj=self, database=database, user_id=user_id, lead_research_report_id=lead_research_report_id, e=e,
@@ -347,7 +384,7 @@ def aggregate_report_in_background(self, user_id: str, lead_research_report_id:
             user_id=user_id, lead_research_report_id=lead_research_report_id)
 
         # Send event.
-        Metrics().capture(user_id=user_id, event_name="report_details_created", properties={
+        process_resources.get_metrics().capture(user_id=user_id, event_name="report_details_created", properties={
             "report_id": lead_research_report_id})
     except Exception as e:
         shared_task_exception_handler(shared_task_obj=self, database=database, user_id=user_id, lead_research_report_id=lead_research_report_id,
@@ -368,7 +405,7 @@ def choose_template_and_create_emails_in_background(self, user_id: str, lead_res
             f"Completed outreach template Selection and Email creation complete in background for report ID: {lead_research_report_id}")
 
         # Send event.
-        m = Metrics()
+        m = process_resources.get_metrics()
         m.capture(user_id=user_id, event_name="report_personalized_emails_created", properties={
             "report_id": lead_research_report_id})
 
@@ -411,7 +448,7 @@ def _update_status_as_failed(database: Database, user_id: str, lead_research_rep
                                          setFields=setFields)
 
     # Send event.
-    Metrics().capture(user_id=user_id, event_name=event_name, properties={
+    process_resources.get_metrics().capture(user_id=user_id, event_name=event_name, properties={
         "report_id": lead_research_report_id, "status_before_failure": status_before_failure, "task_name": task_name, "error": str(e)})
 
 
@@ -1,8 +1,10 @@
 
 import os
+import json
+import base64
 import logging
 import contextlib
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator, Tuple, Type
 import pymongo
 from collections.abc import Generator
 from pymongo.mongo_client import MongoClient
@@ -17,9 +19,13 @@ from app.models import (
     PersonProfile,
     CompanyProfile,
     ContentDetails,
+    ContentCategoryEnum,
+    CompanyHighlight,
     LinkedInPost,
     LinkedInActivity,
     WebPage,
+    CachedWebPage,
+    WebPageArtifacts,
     LeadResearchReport,
     OutreachEmailTemplate,
     User,
@@ -30,9 +36,19 @@ from typing import List
 logger = logging.getLogger()
 
 
+class InvalidPageTokenException(Exception):
+    pass
+
+
 class Database:
     """Database class wrapping around MongoDB."""
     MONGODB_DB_NAME = "userport_db"
+    # Number of documents fetched from the server per round trip when iterating over cursors.
+    CURSOR_BATCH_SIZE = 200
+    # Maximum number of documents returned in a single page of paginated list methods.
+    MAX_PAGE_SIZE = 500
+    # Sort order used by all list methods, most recently created first.
+    LIST_SORT_ORDER = [('creation_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
 
     def __init__(self) -> None:
         # Create a new client and connect to the server
@@ -69,10 +85,22 @@ class Database:
         """Returns Web Page collection."""
         return self.db['web_pages']
 
+    def get_cached_web_pages_collection(self) -> Collection:
+        """Returns Cached Web Pages collection."""
+        return self.db['cached_web_pages']
+
+    def get_web_page_artifacts_collection(self) -> Collection:
+        """Returns Web Page Artifacts collection."""
+        return self.db['web_page_artifacts']
+
     def get_content_details_collection(self) -> Collection:
         """Returns content details collection."""
         return self.db['content_details']
 
+    def get_company_highlights_collection(self) -> Collection:
+        """Returns Company Highlights index collection."""
+        return self.db['company_highlights']
+
     def get_lead_research_report_collection(self) -> Collection:
         """Returns Lead Research Report collection."""
         return self.db['lead_research_reports']
@@ -175,8 +203,36 @@ class Database:
         collection = self.get_content_details_collection()
         result = collection.insert_one(
             content_details.model_dump(exclude=Database._exclude_id()), session=session)
+
+        # Keep company highlights index up to date as each content is processed.
+        company_highlight: Optional[CompanyHighlight] = Database._to_company_highlight(
+            content_details=content_details, content_details_id=str(result.inserted_id))
+        if company_highlight:
+            self.get_company_highlights_collection().replace_one({"_id": result.inserted_id}, company_highlight.model_dump(
+                by_alias=True, exclude=Database._exclude_id()), upsert=True, session=session)
         return str(result.inserted_id)
 
+    @staticmethod
+    def _to_company_highlight(content_details: ContentDetails, content_details_id: str) -> Optional[CompanyHighlight]:
+        """Returns company highlight index entry for given content details or None if content cannot be a report highlight.
+
+        Must match the filters applied to content when aggregating lead reports.
+        """
+        if not content_details.company_profile_id or not content_details.focus_on_company or content_details.requesting_user_contact != False:
+            return None
+        if not content_details.category or not content_details.publish_date:
+            return None
+        return CompanyHighlight(
+            _id=content_details_id,
+            company_profile_id=content_details.company_profile_id,
+            person_profile_id=content_details.person_profile_id,
+            personal_category=content_details.category in ContentCategoryEnum.get_personal_content_categories(),
+            category=content_details.category,
+            concise_summary=content_details.concise_summary,
+            publish_date=content_details.publish_date,
+            url=content_details.url,
+        )
+
     def insert_lead_research_report(self, lead_research_report: LeadResearchReport, session: Optional[ClientSession] = None) -> str:
         """Inserts Lead Research Report in the database and returns the created Id."""
         if lead_research_report.id:
@@ -263,6 +319,22 @@ class Database:
             return None
         return ContentDetails(**data_dict)
 
+    def get_cached_web_page(self, normalized_url: str) -> Optional[CachedWebPage]:
+        """Returns cached web page for given normalized URL. Returns None if page is not cached."""
+        collection = self.get_cached_web_pages_collection()
+        data_dict = collection.find_one({"_id": normalized_url})
+        if not data_dict:
+            return None
+        return CachedWebPage(**data_dict)
+
+    def get_web_page_artifacts(self, content_hash: str) -> Optional[WebPageArtifacts]:
+        """Returns web page artifacts for given page content hash. Returns None if not found."""
+        collection = self.get_web_page_artifacts_collection()
+        data_dict = collection.find_one({"_id": content_hash})
+        if not data_dict:
+            return None
+        return WebPageArtifacts(**data_dict)
+
     def get_content_details_by_activity_id(self, activity_id: str, projection:  Optional[Dict[str, int]] = None) -> Optional[ContentDetails]:
         """Returns Content details for given activity ID. Returns None if not found."""
         collection = self.get_content_details_collection()
@@ -295,14 +367,56 @@ class Database:
     def list_content_details(self, filter: Dict, projection: Optional[Dict[str, int]] = None) -> List[ContentDetails]:
         """Returns Content Details with given filter. Returns only fields specified in the projection dictionary."""
         collection = self.get_content_details_collection()
-        cursor = collection.find(filter, projection).sort(
-            [('creation_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
-        )
-        content_details_list: List[ContentDetails] = []
-        for content_details_dict in cursor:
-            content_details_list.append(
-                ContentDetails(**content_details_dict))
-        return content_details_list
+        return [ContentDetails(**content_details_dict) for content_details_dict in self._iter_sorted_docs(collection=collection, filter=filter, projection=projection)]
+
+    def iter_content_details(self, filter: Dict, projection: Dict[str, int], batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[ContentDetails]:
+        """Yields Content Details with given filter one at a time, fetching them from the server in batches of given size.
+
+        Projection is required since Content Details documents can be large.
+        """
+        collection = self.get_content_details_collection()
+        for content_details_dict in self._iter_sorted_docs(collection=collection, filter=filter, projection=Database._require_projection(projection), batch_size=batch_size):
+            yield ContentDetails(**content_details_dict)
+
+    def list_company_highlights(self, company_profile_id: str, person_profile_id: Optional[str], publish_cutoff_date: datetime) -> List[CompanyHighlight]:
+        """Returns highlights of given company published after given cutoff date, most recent first.
+
+        Highlights with personal content categories are only returned if they belong to given person.
+        """
+        collection = self.get_company_highlights_collection()
+        cursor = collection.find({
+            "company_profile_id": company_profile_id,
+            "publish_date": {"$gt": publish_cutoff_date},
+            "$or": [{"personal_category": False}, {"person_profile_id": person_profile_id}],
+        }).sort([('publish_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)])
+        highlights: List[CompanyHighlight] = []
+        for highlight_dict in cursor:
+            highlight_dict["_id"] = str(highlight_dict["_id"])
+            highlights.append(CompanyHighlight(**highlight_dict))
+        return highlights
+
+    def has_company_highlights(self, company_profile_id: str) -> bool:
+        """Returns True if the company highlights index has any entry for given company."""
+        return self.get_company_highlights_collection().find_one({"company_profile_id": company_profile_id}, projection={"_id": 1}) is not None
+
+    def rebuild_company_highlights(self, filter: Dict) -> int:
+        """Rebuilds company highlights index entries from Content Details matching given filter and returns number of entries written.
+
+        Used to backfill the index for content processed before it existed, see scripts/rebuild_company_highlights.py.
+        """
+        num_written = 0
+        highlights_collection = self.get_company_highlights_collection()
+        projection = {field: 1 for field in ["company_profile_id", "person_profile_id", "focus_on_company",
+                                             "requesting_user_contact", "category", "concise_summary", "publish_date", "url"]}
+        for content_details in self.iter_content_details(filter=filter, projection=projection):
+            company_highlight: Optional[CompanyHighlight] = Database._to_company_highlight(
+                content_details=content_details, content_details_id=content_details.id)
+            if not company_highlight:
+                continue
+            highlights_collection.replace_one({"_id": ObjectId(content_details.id)}, company_highlight.model_dump(
+                by_alias=True, exclude=Database._exclude_id()), upsert=True)
+            num_written += 1
+        return num_written
 
     def get_lead_research_report(self, lead_research_report_id: str, projection: Optional[Dict[str, int]] = None, session: Optional[ClientSession] = None) -> LeadResearchReport:
         """Returns Lead Research report for given Report ID. Raises error if report is not found in the database."""
@@ -324,41 +438,119 @@ class Database:
         return LeadResearchReport(**data_dict)
 
     def list_lead_research_reports(self, filter: Dict, projection: Optional[Dict[str, int]] = None) -> List[LeadResearchReport]:
-        """Returns Lead Research reports with given filter. Returns only fields specified in the projection dictionary."""
+        """Returns Lead Research reports with given filter. Returns only fields specified in the projection dictionary.
+
+        Use list_lead_research_reports_page or iter_lead_research_reports when the number of reports is unbounded.
+        """
         collection = self.get_lead_research_report_collection()
-        # TODO: Add pagination using skip() as well.
-        cursor = collection.find(filter, projection).sort(
-            [('creation_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
-        )
-        lead_research_reports: List[LeadResearchReport] = []
-        for research_report_dict in cursor:
-            lead_research_reports.append(
-                LeadResearchReport(**research_report_dict))
-        return lead_research_reports
+        return [LeadResearchReport(**research_report_dict) for research_report_dict in self._iter_sorted_docs(collection=collection, filter=filter, projection=projection)]
+
+    def iter_lead_research_reports(self, filter: Dict, projection: Dict[str, int], batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[LeadResearchReport]:
+        """Yields Lead Research reports with given filter one at a time, fetching them from the server in batches of given size.
+
+        Projection is required since Lead Research report documents can be large.
+        """
+        collection = self.get_lead_research_report_collection()
+        for research_report_dict in self._iter_sorted_docs(collection=collection, filter=filter, projection=Database._require_projection(projection), batch_size=batch_size):
+            yield LeadResearchReport(**research_report_dict)
+
+    def list_lead_research_reports_page(self, filter: Dict, projection: Dict[str, int], page_size: int, page_token: Optional[str] = None) -> Tuple[List[LeadResearchReport], Optional[str]]:
+        """Returns a page of Lead Research reports with given filter and the token to fetch the next page, None if this is the last page.
+
+        Pages are in the same order as list_lead_research_reports and use keyset pagination on (creation_date, _id), so
+        reports created while paginating don't shift later pages. Raises InvalidPageTokenException if page token is invalid.
+        """
+        page_size = max(1, min(page_size, Database.MAX_PAGE_SIZE))
+        projection = dict(Database._require_projection(projection))
+        # Needed to create the next page token.
+        projection["creation_date"] = 1
+
+        page_filter: Dict = filter
+        if page_token:
+            page_filter = {"$and": [filter, Database._decode_page_token_filter(page_token=page_token)]}
+
+        collection = self.get_lead_research_report_collection()
+        # Fetch one more than page size to know if there is a next page.
+        docs: List[Dict] = list(collection.find(page_filter, projection).sort(
+            Database.LIST_SORT_ORDER).limit(page_size + 1).batch_size(page_size + 1))
+        next_page_token: Optional[str] = None
+        if len(docs) > page_size:
+            docs = docs[:page_size]
+            next_page_token = Database._encode_page_token(last_doc=docs[-1])
+        return [LeadResearchReport(**research_report_dict) for research_report_dict in docs], next_page_token
 
     def list_raw_lead_research_reports(self, filter: Dict, projection: Optional[Dict[str, int]] = None) -> List[Dict]:
         """Returns a list of python dictionaries of Lead Research reports with given filter. Should only be used for migration use cases."""
         collection = self.get_lead_research_report_collection()
-        # TODO: Add pagination using skip() as well.
-        cursor = collection.find(filter, projection).sort(
-            [('creation_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
-        )
-        results: List[Dict] = []
-        for research_report_dict in cursor:
-            results.append(research_report_dict)
-        return results
+        return list(self._iter_sorted_docs(collection=collection, filter=filter, projection=projection))
+
+    def iter_raw_lead_research_reports(self, filter: Dict, projection: Dict[str, int], batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[Dict]:
+        """Yields python dictionaries of Lead Research reports with given filter one at a time. Should only be used for migration use cases."""
+        collection = self.get_lead_research_report_collection()
+        yield from self._iter_sorted_docs(collection=collection, filter=filter, projection=Database._require_projection(projection), batch_size=batch_size)
 
     def list_linkedin_activities(self, filter: Dict, projection: Optional[Dict[str, int]] = None) -> List[LinkedInActivity]:
         """Returns LinkedIn Activities with given filter. Returns only fields specified in the projection dictionary."""
         collection = self.get_linkedin_activities_collection()
+        return [LinkedInActivity(**activity_dict) for activity_dict in self._iter_sorted_docs(collection=collection, filter=filter, projection=projection)]
+
+    def iter_linkedin_activities(self, filter: Dict, projection: Dict[str, int], batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[LinkedInActivity]:
+        """Yields LinkedIn Activities with given filter one at a time, fetching them from the server in batches of given size.
+
+        Projection is required since activity documents contain the raw activity content.
+        """
+        collection = self.get_linkedin_activities_collection()
+        for activity_dict in self._iter_sorted_docs(collection=collection, filter=filter, projection=Database._require_projection(projection), batch_size=batch_size):
+            yield LinkedInActivity(**activity_dict)
+
+    def _iter_sorted_docs(self, collection: Collection, filter: Dict, projection: Optional[Dict[str, int]], batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[Dict]:
+        """Yields raw documents matching given filter in list sort order, fetched from the server in batches of given size."""
         cursor = collection.find(filter, projection).sort(
-            [('creation_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
-        )
-        linkedin_activities: List[LinkedInActivity] = []
-        for activity_dict in cursor:
-            linkedin_activities.append(
-                LinkedInActivity(**activity_dict))
-        return linkedin_activities
+            Database.LIST_SORT_ORDER).batch_size(batch_size)
+        try:
+            yield from cursor
+        finally:
+            # Release server side cursor if caller stops iterating early.
+            cursor.close()
+
+    @staticmethod
+    def _require_projection(projection: Optional[Dict[str, int]]) -> Dict[str, int]:
+        if not projection:
+            raise ValueError(
+                "Projection is required when iterating over large collections")
+        return projection
+
+    @staticmethod
+    def _encode_page_token(last_doc: Dict) -> str:
+        """Returns opaque page token that points after given document in list sort order."""
+        creation_date: Optional[datetime] = last_doc.get("creation_date")
+        token_dict = {
+            "creation_date": creation_date.isoformat() if creation_date else None,
+            "id": str(last_doc["_id"]),
+        }
+        return base64.urlsafe_b64encode(json.dumps(token_dict).encode("utf-8")).decode("utf-8")
+
+    @staticmethod
+    def _decode_page_token_filter(page_token: str) -> Dict:
+        """Returns filter matching documents after the one given page token points to in list sort order."""
+        try:
+            token_dict = json.loads(base64.urlsafe_b64decode(
+                page_token.encode("utf-8")).decode("utf-8"))
+            last_id = ObjectId(token_dict["id"])
+            creation_date: Optional[datetime] = datetime.fromisoformat(
+                token_dict["creation_date"]) if token_dict["creation_date"] else None
+        except Exception as e:
+            raise InvalidPageTokenException(
+                f"Invalid page token: {page_token}") from e
+
+        if creation_date is None:
+            # Documents without creation date are sorted last.
+            return {"creation_date": None, "_id": {"$lt": last_id}}
+        return {"$or": [
+            {"creation_date": {"$lt": creation_date}},
+            {"creation_date": creation_date, "_id": {"$lt": last_id}},
+            {"creation_date": None},
+        ]}
 
     def get_outreach_email_template(self, outreach_email_template_id: str, projection: Optional[Dict[str, int]] = None) -> OutreachEmailTemplate:
         """Returns Outreach Email Template for given Template ID."""
@@ -418,6 +610,42 @@ class Database:
             raise ValueError(
                 f"Could not update research report with ID: {lead_research_report_id}")
 
+    def upsert_cached_web_page(self, cached_web_page: CachedWebPage):
+        """Inserts or replaces cached web page for its normalized URL."""
+        collection = self.get_cached_web_pages_collection()
+        collection.replace_one({"_id": cached_web_page.id}, cached_web_page.model_dump(
+            by_alias=True), upsert=True)
+
+    def update_cached_web_page(self, normalized_url: str, setFields: Dict[str, str]):
+        """Updates fields of cached web page for given normalized URL."""
+        collection = self.get_cached_web_pages_collection()
+        collection.update_one({"_id": normalized_url}, {"$set": setFields})
+
+    def ensure_page_fetch_cache_ttl_indexes(self, cached_web_page_ttl_seconds: int, web_page_artifacts_ttl_seconds: int):
+        """Creates TTL indexes that delete cached web pages not fetched or revalidated and web page artifacts not created within given durations.
+
+        Existing indexes with a different TTL are updated in place.
+        """
+        for collection, field, ttl_seconds in [
+            (self.get_cached_web_pages_collection(), "fetched_date", cached_web_page_ttl_seconds),
+            (self.get_web_page_artifacts_collection(), "creation_date", web_page_artifacts_ttl_seconds),
+        ]:
+            index_name = f"{field}_ttl"
+            existing_index: Optional[Dict] = collection.index_information().get(index_name)
+            if not existing_index:
+                collection.create_index(field, name=index_name, expireAfterSeconds=ttl_seconds)
+            elif existing_index.get("expireAfterSeconds") != ttl_seconds:
+                self.db.command("collMod", collection.name, index={"name": index_name, "expireAfterSeconds": ttl_seconds})
+
+    def upsert_web_page_artifacts(self, content_hash: str, setFields: Dict[str, str]):
+        """Sets given artifact fields for page content hash, creating the artifacts document if it does not exist.
+
+        Artifacts are computed at different stages of processing so only given fields are updated.
+        """
+        collection = self.get_web_page_artifacts_collection()
+        collection.update_one({"_id": content_hash}, {
+            "$set": setFields, "$setOnInsert": {"creation_date": Utils.create_utc_time_now()}}, upsert=True)
+
     def update_outreach_email_template(self, outreach_email_template_id: str, setFields: Dict[str, str]):
         """Updates fields for given Outreach Email Template ID. Assumes that fields are existing fields in the OutreachEmailTemplate Document model."""
         collection = self.get_outreach_email_template_collection()
@@ -470,12 +698,14 @@ class Database:
         content_ids = []
         linkedin_ids = []
         web_page_ids = []
-        cursor = content_collection.find(find_filter)
+        # Only fetch referenced IDs instead of entire content documents.
+        cursor = content_collection.find(find_filter, {"_id": 1, "linkedin_post_ref_id": 1, "web_page_ref_id": 1}).batch_size(
+            Database.CURSOR_BATCH_SIZE)
         for content_detail in cursor:
             content_ids.append(content_detail['_id'])
-            if content_detail['linkedin_post_ref_id']:
+            if content_detail.get('linkedin_post_ref_id'):
                 linkedin_ids.append(content_detail['linkedin_post_ref_id'])
-            if content_detail['web_page_ref_id']:
+            if content_detail.get('web_page_ref_id'):
                 web_page_ids.append(content_detail['web_page_ref_id'])
 
         print(
@@ -485,18 +715,22 @@ class Database:
             raise ValueError(
                 "Cannot delete content without delete_confirm permission")
 
-        if len(linkedin_ids):
-            self.get_linkedin_posts_collection().delete_many(
-                {'_id': {'$in': [ObjectId(lid) for lid in linkedin_ids]}})
-
-        if len(web_page_ids):
-            self.get_web_pages_collection().delete_many(
-                {'_id': {'$in': [ObjectId(lid) for lid in web_page_ids]}})
-
-        if len(content_ids):
-            content_collection.delete_many({'_id': {'$in': content_ids}})
+        # Delete in batches to keep each delete request bounded in size.
+        self._delete_ids_in_batches(collection=self.get_linkedin_posts_collection(), ids=[
+                                    ObjectId(lid) for lid in linkedin_ids])
+        self._delete_ids_in_batches(collection=self.get_web_pages_collection(), ids=[
+                                    ObjectId(lid) for lid in web_page_ids])
+        self._delete_ids_in_batches(
+            collection=content_collection, ids=content_ids)
+        self._delete_ids_in_batches(
+            collection=self.get_company_highlights_collection(), ids=content_ids)
         print("Deletion complete")
 
+    def _delete_ids_in_batches(self, collection: Collection, ids: List[ObjectId], batch_size: int = 1000):
+        """Deletes documents with given IDs from given collection in batches of given size."""
+        for i in range(0, len(ids), batch_size):
+            collection.delete_many({'_id': {'$in': ids[i: i + batch_size]}})
+
     def migrate_docs(self, collection: Collection, filter: Dict, update: Dict):
         """Internal method to migrate many documents in given collection with given updates.
 
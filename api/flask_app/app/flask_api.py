@@ -5,7 +5,7 @@ from enum import Enum
 from typing import Optional, List
 from functools import wraps
 from pydantic import BaseModel, Field, field_validator
-from app.database import Database
+from app.database import Database, InvalidPageTokenException
 from app.models import LeadResearchReport, OutreachEmailTemplate, User, ContentDetails, OpenAITokenUsage, LinkedInActivity
 from app.linkedin_scraper import LinkedInScraper
 from app.personalization import Personalization
@@ -479,6 +479,8 @@ class ListLeadsResponse(BaseModel):
         ..., description="List of leads.")
     user: User = Field(...,
                        description="User object for curently authenticated user.")
+    next_page_token: Optional[str] = Field(
+        default=None, description="Token to pass as page_token to fetch the next page of leads, None if there are no more leads or pagination was not requested.")
 
     @field_validator('status')
     @classmethod
@@ -491,8 +493,23 @@ class ListLeadsResponse(BaseModel):
 @bp.get('/v1/leads')
 @login_required
 def list_leads():
-    # List all leads created by given user.
-    # TODO: Add limit to the leads response.
+    # List leads created by given user. If page_size query param is passed, returns a single page of leads
+    # along with next_page_token which can be passed as page_token query param to fetch the next page.
+    # Without page_size, all leads are returned.
+    page_size: Optional[int] = None
+    page_token: Optional[str] = None
+    try:
+        if request.args.get("page_size"):
+            page_size = int(request.args.get("page_size"))
+            if page_size <= 0:
+                raise ValueError(f"Page size must be positive, got: {page_size}")
+        page_token = request.args.get("page_token") or None
+    except Exception as e:
+        logger.exception(
+            f"Invalid list leads request: {request} with error: {e}")
+        raise APIException(
+            status_code=400, message="Invalid request to list leads.")
+
     db = Database()
     user_id: str = g.user["uid"]
     start_time = time.time()
@@ -509,15 +526,25 @@ def list_leads():
             "company_headcount": 1,
             "company_industry_categories": 1,
         }
-        lead_research_reports: List[LeadResearchReport] = db.list_lead_research_reports(
-            filter=filter, projection=projection)
+        next_page_token: Optional[str] = None
+        if page_size:
+            lead_research_reports, next_page_token = db.list_lead_research_reports_page(
+                filter=filter, projection=projection, page_size=page_size, page_token=page_token)
+        else:
+            lead_research_reports: List[LeadResearchReport] = list(db.iter_lead_research_reports(
+                filter=filter, projection=projection))
         user = db.get_user(
             user_id=user_id, projection=get_user_state_db_projection())
         response = ListLeadsResponse(
-            status=ResponseStatus.SUCCESS, leads=lead_research_reports, user=user)
+            status=ResponseStatus.SUCCESS, leads=lead_research_reports, user=user, next_page_token=next_page_token)
         logger.info(
             f"Fetched {len(lead_research_reports)} from database for user ID: {user_id}. Time taken was: {time.time() - start_time} seconds")
         return response.model_dump()
+    except InvalidPageTokenException as e:
+        logger.exception(
+            f"Invalid page token in list leads request for user ID: {user_id} with error: {e}")
+        raise APIException(
+            status_code=400, message="Invalid page token.")
     except Exception as e:
         logger.exception(
             f"Failed to list lead research reports for user ID: {user_id} with error: {e}")
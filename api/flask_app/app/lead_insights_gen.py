@@ -8,7 +8,7 @@ from langchain_core.prompts import HumanMessagePromptTemplate
 from typing import List, Optional
 from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain_community.callbacks import get_openai_callback
-from langchain_openai import ChatOpenAI
+from app.process_resources import process_resources
 from app.models import OpenAITokenUsage
 
 logger = logging.getLogger()
@@ -111,7 +111,7 @@ class LeadInsights:
             reason: Optional[str] = Field(
                 default=None, description="Reason for why these are his attributes.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(PersonalityTraits)
 
         chain = prompt | llm
@@ -165,7 +165,7 @@ class LeadInsights:
             interests: Optional[List[Interest]] = Field(
                 default=None, description="Areas of interests of the lead.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(AreasOfInterest)
 
         chain = prompt | llm
@@ -222,7 +222,7 @@ class LeadInsights:
             colleagues: Optional[List[str]] = Field(
                 default=None, description="List of most important colleagues the lead has engaged with.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ImportantColleagues)
 
         chain = prompt | llm
@@ -279,7 +279,7 @@ class LeadInsights:
             products: Optional[List[str]] = Field(
                 default=None, description="List of most important products the lead has engaged with.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ImportantProducts)
 
         chain = prompt | llm
@@ -328,7 +328,7 @@ class LeadInsights:
             description: Optional[str] = Field(
                 default=None, description="Description of areas of interests of the lead.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(AreasOfInterest)
 
         chain = prompt | llm
@@ -13,6 +13,7 @@ from langchain_core.documents import Document
 from langchain_chroma import Chroma
 from app.models import LinkedInPostOld, PersonProfile, CompanyProfile
 from app.utils import Utils
+from app.process_resources import process_resources
 from langchain_openai import OpenAIEmbeddings
 # from pydantic import BaseModel, Field
 # Can't use pydantic base model because cant embed this class in model class inherting from langchain base model.
@@ -104,7 +105,7 @@ class LinkedInScraper:
             }
 
         # Fetch all user agents.
-        self.all_user_agents = Utils.load_all_user_agents()
+        self.all_user_agents = process_resources.get_user_agents()
 
     def index(self, url: str):
         if not self.dev_mode:
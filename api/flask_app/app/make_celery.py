@@ -1,5 +1,7 @@
 import celery.signals
 from app import create_app
+from app.process_resources import process_resources
+from app.tracing import tracing
 
 # This module is needed to initialize Celery worker from command line and access Celery App object.
 
@@ -9,5 +11,35 @@ def config_loggers(*args, **kwags):
     """This signals handler is needed otherwise logs on GKE are displayed as error even for INFO logs."""
 
 
+@celery.signals.worker_process_init.connect
+def init_worker_process(*args, **kwargs):
+    """Create shared user agents, metrics and LLM clients once per worker process instead of once per task."""
+    process_resources.init_worker_process()
+    # Span exporter threads do not survive fork so tracing is set up in each worker process.
+    tracing.setup(service_name="research-worker")
+
+
+@celery.signals.worker_process_shutdown.connect
+def shutdown_worker_process(*args, **kwargs):
+    process_resources.shutdown()
+    tracing.shutdown()
+
+
+@celery.signals.before_task_publish.connect
+def add_trace_context_to_task(headers=None, **kwargs):
+    """Propagate trace context to published tasks so all tasks of a report are in the same trace."""
+    tracing.on_before_task_publish(headers=headers)
+
+
+@celery.signals.task_prerun.connect
+def start_task_span(task_id=None, task=None, args=None, kwargs=None, **kw):
+    tracing.on_task_prerun(task_id=task_id, task=task, args=args, kwargs=kwargs)
+
+
+@celery.signals.task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    tracing.on_task_postrun(task_id=task_id, state=state)
+
+
 flask_app = create_app()
 celery_app = flask_app.extensions["celery"]
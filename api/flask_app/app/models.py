@@ -124,6 +124,48 @@ class WebPage(BaseModel):
         default=None, description="Footer of the page in Markdown formatted text. None if it does not exist.")
 
 
+class CachedWebPage(BaseModel):
+    """Raw HTML of a fetched web page cached by normalized URL and shared across reports and companies."""
+    id: str = Field(alias="_id", description="Normalized URL of the web page.")
+    url: str = Field(..., description="URL the page was fetched from.")
+    content_hash: str = Field(...,
+                              description="SHA-256 hash of the page HTML, key for derived page artifacts.")
+    html: str = Field(..., description="Raw HTML of the page.")
+    etag: Optional[str] = Field(
+        default=None, description="ETag response header, used to revalidate the page once expired.")
+    last_modified: Optional[str] = Field(
+        default=None, description="Last-Modified response header, used to revalidate the page once expired.")
+    fetched_date: Optional[datetime] = Field(
+        default=None, description="Date when page was last fetched or revalidated in UTC timezone.")
+    expiry_date: Optional[datetime] = Field(
+        default=None, description="Date after which page must be revalidated before use in UTC timezone.")
+
+
+class WebPageArtifacts(BaseModel):
+    """Company independent information derived from web page contents, keyed by content hash of the page HTML."""
+    id: str = Field(alias="_id", description="Content hash of the page HTML.")
+    creation_date: Optional[datetime] = Field(
+        default=None, description="Date when artifacts were first created in the database in UTC timezone.")
+    header: Optional[str] = Field(
+        default=None, description="Header of the page in Markdown formatted text. None if no header exists.")
+    body: Optional[str] = Field(
+        default=None, description="Body of the page in Markdown formatted text.")
+    footer: Optional[str] = Field(
+        default=None, description="Footer of the page in Markdown formatted text. None if it does not exist.")
+    body_chunks: Optional[List[Dict[str, Any]]] = Field(
+        default=None, description="Page body split into chunks of chunk_size with chunk_overlap, each with page_content and metadata keys.")
+    chunk_size: Optional[int] = Field(
+        default=None, description="Chunk size used to split body chunks.")
+    chunk_overlap: Optional[int] = Field(
+        default=None, description="Chunk overlap used to split body chunks.")
+    author_and_publish_date_computed: bool = Field(
+        default=False, description="True if author and publish date were computed from page contents, even if they were not found.")
+    author: Optional[str] = Field(
+        default=None, description="Author of the page found in page contents.")
+    publish_date: Optional[datetime] = Field(
+        default=None, description="Publish date of the page found in page contents in UTC timezone.")
+
+
 class LinkedInActivity(BaseModel):
     """Instance representing a single LinkedIn activity and it's raw contents in Markdown format. The processing of this activity is done in a separate flow."""
 
@@ -466,6 +508,30 @@ class ContentDetails(BaseModel):
         use_enum_values = True
 
 
+class CompanyHighlight(BaseModel):
+    """Entry in the per company highlights index, materialized from a Content Details document that can be shown as a highlight in lead reports.
+
+    Entries are written when content is processed so report aggregation only reads this narrow index instead of
+    grouping all content of the company again for every lead.
+    """
+    id: Optional[PyObjectId] = Field(
+        alias="_id", default=None, description="ID of the Content Details document this highlight is created from.")
+    company_profile_id: str = Field(...,
+                                    description="Reference ID to the Company Profile of the content.")
+    person_profile_id: Optional[str] = Field(
+        default=None, description="Reference ID to the Person Profile of the lead the content was found for, if any.")
+    personal_category: bool = Field(
+        default=False, description="True if category is a personal content category, such highlights are only shown in reports of the same lead.")
+    category: ContentCategoryEnum = Field(...,
+                                          description="Category of the content.")
+    concise_summary: Optional[str] = Field(
+        default=None, description="Concise summary of the content.")
+    publish_date: datetime = Field(...,
+                                   description="Date when the content was published in UTC timezone.")
+    url: Optional[str] = Field(
+        default=None, description="URL of the content.")
+
+
 class LeadResearchReport(BaseModel):
     """Research report associated with a lead."""
 
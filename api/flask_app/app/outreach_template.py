@@ -1,7 +1,7 @@
 import os
 import logging
 from typing import List, Optional
-from langchain_openai import ChatOpenAI
+from app.process_resources import process_resources
 from langchain_core.prompts import PromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
 from app.database import Database
@@ -70,7 +70,7 @@ class OutreachTemplateMatcher:
             reason: Optional[str] = Field(
                 default=None, description="Reason for why a given Persona or None was chosen.")
 
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(MatchedPersona)
         chain = prompt | llm
 
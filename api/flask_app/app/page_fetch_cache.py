@@ -0,0 +1,187 @@
+import os
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import pytz
+from app.database import Database
+from app.models import CachedWebPage, WebPageArtifacts
+from app.utils import Utils
+
+logger = logging.getLogger()
+
+
+class PageFetchCache:
+    """Cache of fetched web pages keyed by normalized URL, with company independent page artifacts keyed by content hash.
+
+    The same news pages and blog posts show up in search results for many companies and leads, so
+    the raw HTML is shared across reports and tenants. Cached pages are used as is until their TTL
+    expires, after which they are revalidated with ETag/Last-Modified headers. Artifacts derived only
+    from page contents (page structure, body chunks, author and publish date) are keyed by content
+    hash so they are reused as long as the page does not change.
+
+    MongoDB TTL indexes delete pages that were not fetched or revalidated within CACHED_WEB_PAGE_RETENTION_SECONDS
+    and artifacts created more than WEB_PAGE_ARTIFACTS_RETENTION_SECONDS ago, so neither collection grows without bound.
+
+    Cache errors are logged and never fail page processing.
+    """
+
+    # Query params that only track the visitor and do not change page contents.
+    TRACKING_QUERY_PARAM_PREFIXES = ("utm_",)
+    TRACKING_QUERY_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "_hsenc", "_hsmi"}
+
+    DEFAULT_PORTS = {"http": 80, "https": 443}
+
+    CACHED_WEB_PAGE_RETENTION_SECONDS = 30 * 24 * 60 * 60
+    # Artifacts of a changed page are never read again, while artifacts of unchanged pages are cheaper to keep.
+    WEB_PAGE_ARTIFACTS_RETENTION_SECONDS = 90 * 24 * 60 * 60
+
+    # TTL indexes are created once per process.
+    _ttl_indexes_ensured: bool = False
+
+    def __init__(self, database: Database, ttl_seconds: Optional[int] = None) -> None:
+        self.database = database
+        # Time after which a cached page must be revalidated before use.
+        self.ttl_seconds: int = ttl_seconds if ttl_seconds is not None else int(
+            os.getenv("PAGE_FETCH_CACHE_TTL_SECONDS", 24 * 60 * 60))
+        self._ensure_ttl_indexes()
+
+    def _ensure_ttl_indexes(self):
+        if PageFetchCache._ttl_indexes_ensured:
+            return
+        try:
+            self.database.ensure_page_fetch_cache_ttl_indexes(
+                cached_web_page_ttl_seconds=PageFetchCache.CACHED_WEB_PAGE_RETENTION_SECONDS,
+                web_page_artifacts_ttl_seconds=PageFetchCache.WEB_PAGE_ARTIFACTS_RETENTION_SECONDS)
+            PageFetchCache._ttl_indexes_ensured = True
+        except Exception as e:
+            logger.warning(f"Failed to create page fetch cache TTL indexes with error: {e}")
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Returns normalized URL so that trivially different URLs of the same page share a cache entry.
+
+        Lowercases scheme and host, drops default ports, fragments, tracking query params and trailing slashes
+        and sorts remaining query params.
+        """
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if host.startswith("www."):
+            host = host[len("www."):]
+        netloc = host
+        if parts.port and parts.port != PageFetchCache.DEFAULT_PORTS.get(scheme):
+            netloc = f"{host}:{parts.port}"
+
+        query_params = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                        if key.lower() not in PageFetchCache.TRACKING_QUERY_PARAMS and not key.lower().startswith(PageFetchCache.TRACKING_QUERY_PARAM_PREFIXES)]
+        query = urlencode(sorted(query_params))
+        path = parts.path.rstrip("/")
+        return urlunsplit((scheme, netloc, path, query, ""))
+
+    @staticmethod
+    def compute_content_hash(html: str) -> str:
+        """Returns SHA-256 hex digest of given page HTML."""
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedWebPage]:
+        """Returns cached page for given URL, expired or not. Returns None if page is not cached."""
+        try:
+            cached_web_page: Optional[CachedWebPage] = self.database.get_cached_web_page(
+                normalized_url=PageFetchCache.normalize_url(url))
+        except Exception as e:
+            logger.warning(f"Failed to read page fetch cache for URL: {url} with error: {e}")
+            return None
+        if cached_web_page and cached_web_page.expiry_date:
+            cached_web_page.expiry_date = PageFetchCache._as_utc(cached_web_page.expiry_date)
+        return cached_web_page
+
+    @staticmethod
+    def is_expired(cached_web_page: CachedWebPage) -> bool:
+        """Returns True if given cached page needs to be revalidated before use."""
+        if not cached_web_page.expiry_date:
+            return True
+        return PageFetchCache._as_utc(cached_web_page.expiry_date) <= Utils.create_utc_time_now()
+
+    @staticmethod
+    def get_revalidation_headers(cached_web_page: CachedWebPage) -> Dict[str, str]:
+        """Returns conditional request headers to revalidate given cached page."""
+        headers: Dict[str, str] = {}
+        if cached_web_page.etag:
+            headers["If-None-Match"] = cached_web_page.etag
+        if cached_web_page.last_modified:
+            headers["If-Modified-Since"] = cached_web_page.last_modified
+        return headers
+
+    def store(self, url: str, html: str, content_hash: str, etag: Optional[str], last_modified: Optional[str]):
+        """Stores fetched page HTML for given URL."""
+        now: datetime = Utils.create_utc_time_now()
+        cached_web_page = CachedWebPage(
+            _id=PageFetchCache.normalize_url(url),
+            url=url,
+            content_hash=content_hash,
+            html=html,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_date=now,
+            expiry_date=now + timedelta(seconds=self.ttl_seconds),
+        )
+        try:
+            self.database.upsert_cached_web_page(cached_web_page=cached_web_page)
+        except Exception as e:
+            logger.warning(f"Failed to store page in fetch cache for URL: {url} with error: {e}")
+
+    def mark_revalidated(self, cached_web_page: CachedWebPage):
+        """Extends expiry of given cached page after the server confirmed it has not changed."""
+        now: datetime = Utils.create_utc_time_now()
+        try:
+            self.database.update_cached_web_page(normalized_url=cached_web_page.id, setFields={
+                "fetched_date": now, "expiry_date": now + timedelta(seconds=self.ttl_seconds)})
+        except Exception as e:
+            logger.warning(f"Failed to extend page fetch cache expiry for URL: {cached_web_page.url} with error: {e}")
+
+    def get_artifacts(self, content_hash: str) -> Optional[WebPageArtifacts]:
+        """Returns page artifacts for given content hash. Returns None if not found."""
+        try:
+            artifacts: Optional[WebPageArtifacts] = self.database.get_web_page_artifacts(
+                content_hash=content_hash)
+        except Exception as e:
+            logger.warning(f"Failed to read page artifacts for content hash: {content_hash} with error: {e}")
+            return None
+        if artifacts and artifacts.publish_date:
+            artifacts.publish_date = PageFetchCache._as_utc(artifacts.publish_date)
+        return artifacts
+
+    def store_page_structure(self, content_hash: str, header: Optional[str], body: Optional[str], footer: Optional[str], body_chunks: List[Dict], chunk_size: int, chunk_overlap: int):
+        """Stores page structure artifacts for given content hash."""
+        self._store_artifacts(content_hash=content_hash, setFields={
+            "header": header,
+            "body": body,
+            "footer": footer,
+            "body_chunks": body_chunks,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        })
+
+    def store_author_and_publish_date(self, content_hash: str, author: Optional[str], publish_date: Optional[datetime]):
+        """Stores author and publish date found in page contents for given content hash."""
+        self._store_artifacts(content_hash=content_hash, setFields={
+            "author_and_publish_date_computed": True,
+            "author": author,
+            "publish_date": publish_date,
+        })
+
+    def _store_artifacts(self, content_hash: str, setFields: Dict):
+        try:
+            self.database.upsert_web_page_artifacts(
+                content_hash=content_hash, setFields=setFields)
+        except Exception as e:
+            logger.warning(f"Failed to store page artifacts for content hash: {content_hash} with error: {e}")
+
+    @staticmethod
+    def _as_utc(dt: datetime) -> datetime:
+        # MongoDB returns naive datetimes that are in UTC.
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=pytz.UTC)
+        return dt
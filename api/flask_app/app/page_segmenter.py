@@ -0,0 +1,123 @@
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from langchain_core.pydantic_v1 import BaseModel, Field
+
+
+class PageSegmentOffsets(BaseModel):
+    """Character offsets in the page HTML where header tag and footer tag start."""
+    header_offset: Optional[int] = Field(
+        default=None, description="Offset of first heading tag (h1 preferred, then h2 to h6), None if page has no heading.")
+    footer_offset: Optional[int] = Field(
+        default=None, description="Offset of footer tag, None if page has no footer.")
+    footer_source: Optional[str] = Field(
+        default=None, description="How footer tag was found, one of 'techcrunch', 'footer_tag' or 'footer_attr'.")
+
+
+class _StopSegmentation(Exception):
+    """Raised inside the parser to stop tokenizing once all the needed tags are found."""
+    pass
+
+
+class _SegmentationParser(HTMLParser):
+    """Tokenizes page HTML once and records source offsets of heading and footer candidate tags.
+
+    Uses the same tokenizer as BeautifulSoup's "html.parser" backend so tags inside <script> and
+    <style> contents are ignored in the same way, but never builds a tree or re-serializes the page.
+    """
+
+    TECHCRUNCH_FOOTER_ID = "h-more-techcrunch"
+
+    def __init__(self, html: str, is_techcrunch: bool):
+        super().__init__(convert_charrefs=False)
+        self.is_techcrunch = is_techcrunch
+        self.first_heading_offsets: List[Optional[int]] = [None] * 6
+        self.techcrunch_footer_offset: Optional[int] = None
+        self.footer_tag_offset: Optional[int] = None
+        self.footer_attr_offset: Optional[int] = None
+
+        # HTMLParser reports (line, column) positions, precompute line start offsets to map them to string offsets.
+        self._line_starts: List[int] = [0]
+        index = html.find("\n")
+        while index != -1:
+            self._line_starts.append(index + 1)
+            index = html.find("\n", index + 1)
+
+    def _current_offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def _is_done(self) -> bool:
+        if self.first_heading_offsets[0] is None:
+            # There could still be an h1 further in the page which takes precedence over other headings.
+            return False
+        if self.is_techcrunch:
+            return self.techcrunch_footer_offset is not None
+        return self.footer_tag_offset is not None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        offset: Optional[int] = None
+
+        if len(tag) == 2 and tag[0] == "h" and "1" <= tag[1] <= "6":
+            level = int(tag[1])
+            if self.first_heading_offsets[level - 1] is None:
+                offset = self._current_offset()
+                self.first_heading_offsets[level - 1] = offset
+
+        if self.is_techcrunch and tag == "h3" and self.techcrunch_footer_offset is None:
+            if any(name == "id" and value == self.TECHCRUNCH_FOOTER_ID for name, value in attrs):
+                self.techcrunch_footer_offset = offset if offset is not None else self._current_offset()
+
+        if tag == "footer" and self.footer_tag_offset is None:
+            self.footer_tag_offset = self._current_offset()
+
+        if self.footer_attr_offset is None and self._has_footer_in_class_or_id(attrs):
+            self.footer_attr_offset = offset if offset is not None else self._current_offset()
+
+        if self._is_done():
+            raise _StopSegmentation()
+
+    @staticmethod
+    def _has_footer_in_class_or_id(attrs: List[Tuple[str, Optional[str]]]) -> bool:
+        # Class takes precedence over id when both are present, matching the earlier BeautifulSoup based lookup.
+        class_value: Optional[str] = None
+        id_value: Optional[str] = None
+        has_class = False
+        for name, value in attrs:
+            if name == "class" and not has_class:
+                has_class = True
+                class_value = value or ""
+            elif name == "id" and id_value is None:
+                id_value = value or ""
+        if has_class:
+            return "footer" in " ".join(class_value.split())
+        if id_value is not None:
+            return "footer" in id_value
+        return False
+
+
+def find_page_segment_offsets(html: str, is_techcrunch: bool = False) -> PageSegmentOffsets:
+    """Finds header and footer tag offsets in given page HTML in a single pass over the document.
+
+    Header is the first h1 tag, falling back to the first h2, h3 and so on. Footer is the
+    "More Techcrunch" heading for Techcrunch pages, else the first <footer> tag, else the first
+    tag whose class (or id when there is no class) contains "footer".
+    """
+    parser = _SegmentationParser(html=html, is_techcrunch=is_techcrunch)
+    try:
+        parser.feed(html)
+        parser.close()
+    except _StopSegmentation:
+        pass
+
+    header_offset: Optional[int] = next(
+        (offset for offset in parser.first_heading_offsets if offset is not None), None)
+
+    footer_offset: Optional[int] = None
+    footer_source: Optional[str] = None
+    candidates = [("techcrunch", parser.techcrunch_footer_offset), ("footer_tag", parser.footer_tag_offset), ("footer_attr", parser.footer_attr_offset)]
+    for source, offset in candidates:
+        if offset is not None:
+            footer_offset, footer_source = offset, source
+            break
+
+    return PageSegmentOffsets(header_offset=header_offset, footer_offset=footer_offset, footer_source=footer_source)
@@ -7,7 +7,8 @@ from app.database import Database
 from app.models import LeadResearchReport, ContentCategoryEnum, OpenAITokenUsage
 from app.utils import Utils
 from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain_openai import ChatOpenAI
+from app.process_resources import process_resources
+from app.tracing import traced
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import SystemMessage
 from langchain_core.prompts import HumanMessagePromptTemplate
@@ -92,6 +93,7 @@ class Personalization:
             "Saleem, scale hiring after Uber's Series D?\n"
         ))
 
+    @traced("personalization.generate_personalized_emails")
     def generate_personalized_emails(self, email_template: Optional[LeadResearchReport.ChosenOutreachEmailTemplate], lead_research_report: LeadResearchReport) -> List[LeadResearchReport.PersonalizedEmail]:
         """Generates personalized emails for given outreach email template message (can be None, that's allowed) for given lead and returns the list."""
         all_highlights: List[LeadResearchReport.ReportDetail.Highlight] = lead_research_report.get_all_highlights()
@@ -128,6 +130,7 @@ class Personalization:
 
         return generated_personalized_emails
 
+    @traced("personalization.create_personalized_email")
     def create_personalized_email(self, highlight: LeadResearchReport.ReportDetail.Highlight, email_template: Optional[LeadResearchReport.ChosenOutreachEmailTemplate], lead_research_report: LeadResearchReport) -> LeadResearchReport.PersonalizedEmail:
         """Creates a personalized email for given highlight and email template for given report."""
         creation_date = Utils.create_utc_time_now()
@@ -202,7 +205,7 @@ class Personalization:
         # The output type is wrong leading to a KeyError which seems to fail repeatedly even on retries.
         # Strangely this is not a problem on the mini model upon multiple testing.
         # TODO: Monitor and change back in future with a workaround if we need more accuracy.
-        llm = ChatOpenAI(temperature=1.3, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=1.3, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(EmailOpener)
 
         chain = prompt | llm
@@ -266,7 +269,7 @@ class Personalization:
             subject_line: Optional[str] = Field(
                 default=None, description="Subject Line of the email.")
 
-        llm = ChatOpenAI(temperature=1.3, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
+        llm = process_resources.get_chat_openai(temperature=1.3, model_name=self.OPENAI_GPT_4O_MINI_MODEL,
                          api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(EmailSubjectLine)
 
         chain = prompt | llm
@@ -278,6 +281,7 @@ class Personalization:
         })
         return result.subject_line
 
+    @traced("personalization.get_best_highlights")
     def get_best_highlights(self, all_highlights: List[LeadResearchReport.ReportDetail.Highlight], k: int = 3) -> List[LeadResearchReport.ReportDetail.Highlight]:
         """Selectes up to k highlights that will provide best outreach messages and returns them.
 
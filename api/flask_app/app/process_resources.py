@@ -0,0 +1,104 @@
+import os
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from langchain_openai import ChatOpenAI
+from app.utils import Utils
+from app.metrics import Metrics
+from app.tracing import LLMTracingCallbackHandler
+
+logger = logging.getLogger()
+
+
+class ProcessResources:
+    """Registry of resources that are expensive to create and are shared by all tasks within a process.
+
+    The research pipeline creates one WebPageScraper per URL and many LLM chains per scraper, so loading
+    the user agents file, creating a PostHog client and creating OpenAI HTTP clients every time adds up.
+    Resources are created lazily on first use and reused afterwards. They are dropped in forked child
+    processes (Celery prefork workers) since clients with background threads and open connections do not
+    survive a fork, and are initialized again once per worker process via init_worker_process().
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._user_agents: Optional[List[str]] = None
+        self._metrics: Optional[Metrics] = None
+        self._chat_models: Dict[Tuple[str, float, Optional[float], str], ChatOpenAI] = {}
+
+    def get_user_agents(self) -> List[str]:
+        """Returns all user agents, loaded from file once per process."""
+        if self._user_agents is None:
+            with self._lock:
+                if self._user_agents is None:
+                    self._user_agents = Utils.load_all_user_agents()
+        return self._user_agents
+
+    def get_metrics(self) -> Metrics:
+        """Returns the Metrics client shared within this process."""
+        if self._metrics is None:
+            with self._lock:
+                if self._metrics is None:
+                    self._metrics = Metrics()
+        return self._metrics
+
+    def get_chat_openai(self, model_name: str, api_key: str, temperature: float = 0, timeout: Optional[float] = None) -> ChatOpenAI:
+        """Returns ChatOpenAI model for given configuration, shared within this process.
+
+        ChatOpenAI is stateless between calls so the same instance (and its pooled HTTP connections)
+        can be used by all chains and threads. Structured output wrappers are cheap to create per call.
+        Every call made through the model is traced with its token usage and cost.
+        """
+        key = (model_name, float(temperature), timeout, api_key)
+        llm: Optional[ChatOpenAI] = self._chat_models.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._chat_models.get(key)
+                if llm is None:
+                    llm = ChatOpenAI(temperature=temperature, model_name=model_name,
+                                     api_key=api_key, timeout=timeout, callbacks=[LLMTracingCallbackHandler()])
+                    self._chat_models[key] = llm
+        return llm
+
+    def init_worker_process(self):
+        """Initialize resources once for a worker process so the first task does not pay the setup cost."""
+        start_time = time.perf_counter()
+        self.reset_clients()
+        self.get_user_agents()
+        self.get_metrics()
+        api_key: Optional[str] = os.getenv("OPENAI_USERPORT_API_KEY")
+        if api_key:
+            for model_env_name in ["OPENAI_GPT_4O_MODEL", "OPENAI_GPT_4O_MINI_MODEL"]:
+                if os.getenv(model_env_name):
+                    self.get_chat_openai(
+                        model_name=os.environ[model_env_name], api_key=api_key, temperature=0, timeout=20)
+        logger.info(
+            f"Initialized process resources in pid: {os.getpid()} in {time.perf_counter() - start_time:.3f} seconds")
+
+    def shutdown(self):
+        """Flush pending events before the process exits."""
+        if self._metrics is not None:
+            try:
+                self._metrics.posthog.flush()
+            except Exception as e:
+                logger.warning(f"Failed to flush metrics on shutdown: {e}")
+
+    def reset(self):
+        """Drop all resources so they are created again on next use."""
+        self.reset_clients()
+        self._user_agents = None
+
+    def reset_clients(self):
+        """Drop clients holding connections or background threads, plain data like user agents is kept."""
+        # Lock may have been held by another thread at the time of fork, so create a new one.
+        self._lock = threading.Lock()
+        self._metrics = None
+        self._chat_models = {}
+
+
+process_resources = ProcessResources()
+
+# Resources created in the parent process must not be shared with forked children.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=process_resources.reset_clients)
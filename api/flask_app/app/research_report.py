@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, List, Set
+from typing import Optional, List, Set, Dict
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from app.utils import Utils
@@ -20,7 +20,9 @@ from app.activity_parser import LinkedInActivityParser
 from app.lead_insights_gen import LeadInsights
 from app.outreach_template import OutreachTemplateMatcher
 from app.personalization import Personalization
-from app.metrics import Metrics
+from app.process_resources import process_resources
+from app.page_fetch_cache import PageFetchCache
+from app.tracing import traced, set_span_attributes, REPORT_ID_ATTRIBUTE, URL_ATTRIBUTE
 from app.models import (
     ContentDetails,
     ContentCategoryEnum,
@@ -31,6 +33,7 @@ from app.models import (
     PersonProfile,
     CompanyProfile,
     LinkedInActivity,
+    CompanyHighlight,
     content_category_to_human_readable_str
 )
 
@@ -49,8 +52,10 @@ class Researcher:
         self.outreach_template_matcher = OutreachTemplateMatcher(
             database=database)
         self.personalization = Personalization(database=database)
-        self.metrics = Metrics()
+        self.metrics = process_resources.get_metrics()
+        self.page_cache = PageFetchCache(database=database)
 
+    @traced("research.enrich_lead_info")
     def enrich_lead_info(self, lead_research_report_id: str) -> str:
         """Enriches lead report with information such as name, their company, role etc."""
         research_report: LeadResearchReport = self.database.get_lead_research_report(
@@ -110,6 +115,7 @@ class Researcher:
         self.database.update_lead_research_report(
             lead_research_report_id=lead_research_report_id, setFields=setFields)
 
+    @traced("research.fetch_search_results")
     def fetch_search_results(self, lead_research_report_id: str):
         """Fetch and store search results for given lead."""
         research_report: LeadResearchReport = self.database.get_lead_research_report(
@@ -132,9 +138,17 @@ class Researcher:
             existing_urls=existing_urls,
             query_configs=self._get_query_configs(origin=origin),
         )
+        def store_partial_results(partial_results: List[LeadResearchReport.WebSearchResults.Result]):
+            """Stream results into the report as queries complete."""
+            all_results = partial_results + (existing_web_search_results.results if existing_web_search_results else [])
+            partial_web_search_results = LeadResearchReport.WebSearchResults(
+                num_results=len(all_results), results=all_results)
+            self.database.update_lead_research_report(
+                lead_research_report_id=lead_research_report_id, setFields={"web_search_results": partial_web_search_results.model_dump()})
+
         # Get search results and update them in the database.
         web_search_results: LeadResearchReport.WebSearchResults = self.search_engine_workflow.get_search_results(
-            search_request=search_request)
+            search_request=search_request, on_results=store_partial_results)
 
         # Merge new results with existing results if any.
         if existing_web_search_results and existing_web_search_results.results:
@@ -304,8 +318,11 @@ class Researcher:
             # ),
         ]
 
+    @traced("research.process_content_in_search_urls")
     def process_content_in_search_urls(self, lead_research_report_id: str, search_results_batch: List[LeadResearchReport.WebSearchResults.Result], task_num: int) -> List[str]:
         """Process URLs stored in given search results batch in a research report and return URLs that failed to process."""
+        set_span_attributes({REPORT_ID_ATTRIBUTE: lead_research_report_id,
+                            "task_num": task_num, "num_urls": len(search_results_batch)})
         research_report: LeadResearchReport = self.database.get_lead_research_report(
             lead_research_report_id=lead_research_report_id)
 
@@ -408,8 +425,10 @@ class Researcher:
         # Return non retryable URLs in addition to failed URLs.
         return final_failed_urls + list(non_retryable_error_urls)
 
+    @traced("research.process_content")
     def process_content(self, search_result: LeadResearchReport.WebSearchResults.Result, research_report: LeadResearchReport) -> Optional[OpenAITokenUsage]:
         """Fetch content from given URL, process it and store it in the database. Returns OpenAI tokens used in the process."""
+        set_span_attributes({REPORT_ID_ATTRIBUTE: research_report.id, URL_ATTRIBUTE: search_result.url})
         # If this URL has already been indexed for this company, skip processing again.
         # TODO: In the future, also add a freshness check so that we don't keep relying on this content forever since it might be stale.
         if self.database.get_content_details_by_url(url=search_result.url, company_profile_id=research_report.company_profile_id):
@@ -423,7 +442,7 @@ class Researcher:
 
         # Fetch page and then process content.
         page_scraper = WebPageScraper(
-            url=search_result.url, title=search_result.title, snippet=search_result.snippet)
+            url=search_result.url, title=search_result.title, snippet=search_result.snippet, page_cache=self.page_cache)
 
         doc = page_scraper.fetch_page()
 
@@ -516,6 +535,7 @@ class Researcher:
 
         return openai_tokens_used
 
+    @traced("research.process_linkedin_activities")
     def process_linkedin_activities(self, lead_research_report_id: str, activity_ids: List[str], task_num: int):
         """Process content in given batch of LinkedIn Activities in given lead research report and writes the result to the database."""
         lead_research_report: LeadResearchReport = self.database.get_lead_research_report(
@@ -575,8 +595,11 @@ class Researcher:
             self.update_content_parsing_tokens_in_db(
                 lead_research_report_id=lead_research_report_id, total_openai_tokens_used=total_openai_tokens_used)
 
+    @traced("research.process_linkedin_activity")
     def process_linkedin_activity(self, activity_parser: LinkedInActivityParser, activity: LinkedInActivity, lead_research_report_id: str, research_request_type: Optional[LeadResearchReport.ResearchRequestType]) -> Optional[OpenAITokenUsage]:
         """Process content in given LinkedIn Activity and write to the database. Returns Tokens used in processing or None if activity is already processed."""
+        set_span_attributes({REPORT_ID_ATTRIBUTE: lead_research_report_id,
+                            "activity_id": activity.id, URL_ATTRIBUTE: activity.activity_url})
         # If activity is already processed, skip. We don't need to search by Company name since activity ID is already unique per lead.
         if self.database.get_content_details_by_activity_id(activity_id=activity.id, projection={"_id": 1}):
             logger.info(
@@ -616,6 +639,7 @@ class Researcher:
             self.database.update_lead_research_report(lead_research_report_id=lead_research_report_id, setFields={
                                                       "content_parsing_total_tokens_used": content_parsing_total_tokens_used.model_dump()}, session=session)
 
+    @traced("research.aggregate")
     def aggregate(self, lead_research_report_id: str):
         """Aggregate Details of research report for given Person and Company and updates them in the database.
 
@@ -629,6 +653,128 @@ class Researcher:
         # Only filter documents from recent months. We use 15 since LinkedIn posts are configured to be at max 15 months old.
         report_publish_cutoff_date = time_now - relativedelta(months=15)
 
+        # Company highlights index is empty for companies whose content was processed before it existed and that
+        # have not been backfilled yet (see scripts/rebuild_company_highlights.py), read their Content Details instead.
+        if self.database.has_company_highlights(company_profile_id=research_report.company_profile_id):
+            report_details: List[LeadResearchReport.ReportDetail] = self._get_report_details_from_highlights(
+                research_report=research_report, report_publish_cutoff_date=report_publish_cutoff_date)
+        else:
+            report_details: List[LeadResearchReport.ReportDetail] = self._get_report_details_from_content_details(
+                research_report=research_report, report_publish_cutoff_date=report_publish_cutoff_date)
+
+        # Generate lead insights from LinkedIn Activity (linkedin_activity_ref_id not None).
+        # We want to fetch product area and team member insights from given person's profile.
+        # and given company profile ID.
+        stage_match_person_and_company_activity_feed = {
+            "$match": {
+                "$and": [
+                    {"company_profile_id": research_report.company_profile_id},
+                    {"person_profile_id": research_report.person_profile_id},
+                    {"linkedin_activity_ref_id": {"$ne": None}},
+                    {"focus_on_company": True},
+                    {"publish_date": {"$gt": report_publish_cutoff_date}},
+                    {"category": {"$ne": None}},
+                    {"requesting_user_contact": False},
+                ]
+            }
+        }
+
+        # Project only ID, team members and product association fields.
+        stage_project_members_and_products = {
+            "$project": {
+                "_id": 1,
+                "mentioned_team_members": 1,
+                "product_associations": 1,
+            }
+        }
+
+        # Unwind (unnest) team members and product associations from the documents and
+        # sort them by count in a faceted stage. This allow two sub pipelines to run in
+        # parallel and output respective array of results.
+        # Reference: https://www.mongodb.com/docs/manual/reference/operator/aggregation/facet/.
+        stage_count_members_and_products = {
+            "$facet": {
+                "mentioned_team_members": [
+                    {"$unwind": "$mentioned_team_members"},
+                    # Skip instances where lead is mentioned as their own team member. This is because of LLM hallucination.
+                    {"$match": {"mentioned_team_members": {
+                        "$ne": research_report.person_name}}},
+                    {"$sortByCount": "$mentioned_team_members"},
+                    {"$project": {"_id": 0, "name": "$_id", "count": 1}}
+                ],
+                "potential_product_associations": [
+                    {"$unwind": "$product_associations"},
+                    {"$sortByCount": "$product_associations"},
+                    {"$project": {"_id": 0, "name": "$_id", "count": 1}}
+                ]
+            }
+
+        }
+
+        pipeline = [
+            stage_match_person_and_company_activity_feed,
+            stage_project_members_and_products,
+            stage_count_members_and_products
+        ]
+
+        results = self.database.get_content_details_collection().aggregate(pipeline=pipeline)
+        insights: Optional[LeadResearchReport.Insights] = None
+        for res in results:
+            insights = LeadResearchReport.Insights(**res)
+            # We expect only a single document from the output of our pipeline, so ok to break.
+            break
+
+        setFields = {
+            "status": LeadResearchReport.Status.RECENT_NEWS_AGGREGATION_COMPLETE,
+            "status_before_failure": None,
+            "report_creation_date_readable_str": Utils.to_human_readable_date_str(time_now),
+            "report_publish_cutoff_date": report_publish_cutoff_date,
+            "report_publish_cutoff_date_readable_str": Utils.to_human_readable_date_str(report_publish_cutoff_date),
+            "details": [detail.model_dump() for detail in report_details],
+            "insights": insights.model_dump(),
+        }
+        self.database.update_lead_research_report(
+            lead_research_report_id=lead_research_report_id, setFields=setFields)
+
+        logger.info(f"Done with aggregating report: {lead_research_report_id}")
+
+    def _get_report_details_from_highlights(self, research_report: LeadResearchReport, report_publish_cutoff_date: datetime) -> List[LeadResearchReport.ReportDetail]:
+        """Returns report details of given report grouped by category from the company highlights index."""
+        # Read highlights of given company after given publish date from the company highlights index. We don't match by person
+        # as well since we want each person (lead) to have information about entire company in the
+        # report as well. Highlights with personal content categories are only included if they are from given lead's content.
+        company_highlights: List[CompanyHighlight] = self.database.list_company_highlights(
+            company_profile_id=research_report.company_profile_id, person_profile_id=research_report.person_profile_id, publish_cutoff_date=report_publish_cutoff_date)
+
+        # We group the highlights by category.
+        report_details_by_category: Dict[str, LeadResearchReport.ReportDetail] = {}
+        for company_highlight in company_highlights:
+            category: ContentCategoryEnum = company_highlight.category
+            if category not in report_details_by_category:
+                report_details_by_category[category] = LeadResearchReport.ReportDetail(
+                    category=category,
+                    # Update category human readable string manually.
+                    category_readable_str=content_category_to_human_readable_str(
+                        category=category),
+                    highlights=[]
+                )
+            report_details_by_category[category].highlights.append(LeadResearchReport.ReportDetail.Highlight(
+                id=company_highlight.id,
+                url=company_highlight.url,
+                publish_date=company_highlight.publish_date,
+                # Convert to 02 August, 2024 format.
+                publish_date_readable_str=company_highlight.publish_date.strftime(
+                    "%d %B, %Y"),
+                concise_summary=company_highlight.concise_summary,
+                category=category,
+                # Update category human readable string manually.
+                category_readable_str=content_category_to_human_readable_str(
+                    category=category),
+            ))
+        return list(report_details_by_category.values())
+
+    def _get_report_details_from_content_details(self, research_report: LeadResearchReport, report_publish_cutoff_date: datetime) -> List[LeadResearchReport.ReportDetail]:
+        """Returns report details of given report grouped by category by aggregating Content Details of the company."""
         # Match documents from given company after given publish date. We don't match by person
         # as well since we want each person (lead) to have information about entire company in the
         # report as well.
@@ -729,83 +875,9 @@ class Researcher:
                 category=rep_detail.category)
 
             report_details.append(rep_detail)
+        return report_details
 
-        # Generate lead insights from LinkedIn Activity (linkedin_activity_ref_id not None).
-        # We want to fetch product area and team member insights from given person's profile.
-        # and given company profile ID.
-        stage_match_person_and_company_activity_feed = {
-            "$match": {
-                "$and": [
-                    {"company_profile_id": research_report.company_profile_id},
-                    {"person_profile_id": research_report.person_profile_id},
-                    {"linkedin_activity_ref_id": {"$ne": None}},
-                    {"focus_on_company": True},
-                    {"publish_date": {"$gt": report_publish_cutoff_date}},
-                    {"category": {"$ne": None}},
-                    {"requesting_user_contact": False},
-                ]
-            }
-        }
-
-        # Project only ID, team members and product association fields.
-        stage_project_members_and_products = {
-            "$project": {
-                "_id": 1,
-                "mentioned_team_members": 1,
-                "product_associations": 1,
-            }
-        }
-
-        # Unwind (unnest) team members and product associations from the documents and
-        # sort them by count in a faceted stage. This allow two sub pipelines to run in
-        # parallel and output respective array of results.
-        # Reference: https://www.mongodb.com/docs/manual/reference/operator/aggregation/facet/.
-        stage_count_members_and_products = {
-            "$facet": {
-                "mentioned_team_members": [
-                    {"$unwind": "$mentioned_team_members"},
-                    # Skip instances where lead is mentioned as their own team member. This is because of LLM hallucination.
-                    {"$match": {"mentioned_team_members": {
-                        "$ne": research_report.person_name}}},
-                    {"$sortByCount": "$mentioned_team_members"},
-                    {"$project": {"_id": 0, "name": "$_id", "count": 1}}
-                ],
-                "potential_product_associations": [
-                    {"$unwind": "$product_associations"},
-                    {"$sortByCount": "$product_associations"},
-                    {"$project": {"_id": 0, "name": "$_id", "count": 1}}
-                ]
-            }
-
-        }
-
-        pipeline = [
-            stage_match_person_and_company_activity_feed,
-            stage_project_members_and_products,
-            stage_count_members_and_products
-        ]
-
-        results = self.database.get_content_details_collection().aggregate(pipeline=pipeline)
-        insights: Optional[LeadResearchReport.Insights] = None
-        for res in results:
-            insights = LeadResearchReport.Insights(**res)
-            # We expect only a single document from the output of our pipeline, so ok to break.
-            break
-
-        setFields = {
-            "status": LeadResearchReport.Status.RECENT_NEWS_AGGREGATION_COMPLETE,
-            "status_before_failure": None,
-            "report_creation_date_readable_str": Utils.to_human_readable_date_str(time_now),
-            "report_publish_cutoff_date": report_publish_cutoff_date,
-            "report_publish_cutoff_date_readable_str": Utils.to_human_readable_date_str(report_publish_cutoff_date),
-            "details": [detail.model_dump() for detail in report_details],
-            "insights": insights.model_dump(),
-        }
-        self.database.update_lead_research_report(
-            lead_research_report_id=lead_research_report_id, setFields=setFields)
-
-        logger.info(f"Done with aggregating report: {lead_research_report_id}")
-
+    @traced("research.aggregate_only_linkedin_activities")
     def aggregate_only_linkedin_activities(self, lead_research_report_id: str):
         """Agggregate content from LinkedIn activities for given lead."""
         # We want to fetch all content for given lead and for given company within given cutoff date.
@@ -911,6 +983,7 @@ class Researcher:
         logger.info(
             f"Done with aggregating linkedin activities report: {lead_research_report_id}")
 
+    @traced("research.choose_template_and_create_emails")
     def choose_template_and_create_emails(self, lead_research_report_id: str):
         """Chooses Email template for the lead automatically based on their persona using LLM.
 
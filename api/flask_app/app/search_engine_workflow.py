@@ -1,8 +1,11 @@
 import logging
 import os
+import threading
+import time
 import requests
 import tldextract
-from typing import List, Set, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Set, Optional, Tuple
 from enum import Enum
 from app.linkedin_scraper import LinkedInScraper
 from googlesearch import search
@@ -91,11 +94,44 @@ class GoogleCustomSearchResponse(BaseModel):
         default=None, description="List of search result Items.It is None when there are no search results returned from the query.")
 
 
+class ApiCallRateLimiter:
+    """Thread safe limiter that bounds concurrent calls to an API and spaces out their start times."""
+
+    def __init__(self, max_concurrent_calls: int, min_interval_seconds: float) -> None:
+        self.min_interval_seconds = min_interval_seconds
+        self._semaphore = threading.BoundedSemaphore(max_concurrent_calls)
+        self._lock = threading.Lock()
+        self._next_start_time: float = 0.0
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_start_time - now
+            self._next_start_time = max(now, self._next_start_time) + self.min_interval_seconds
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._semaphore.release()
+        return False
+
+
 class SearchEngineWorkflow:
     """Searches the web using search engine for content related to given person and their current company."""
 
     GOOGLE_CUSTOM_SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
 
+    # Max number of search queries executing at the same time across all methods.
+    MAX_CONCURRENT_QUERIES = 6
+
+    # Rate limits per search method, shared across all workflows in the process.
+    RATE_LIMITERS: Dict[SearchRequest.QueryConfig.Method, ApiCallRateLimiter] = {
+        SearchRequest.QueryConfig.Method.GOOGLE_CUSTOM_SEARCH_API: ApiCallRateLimiter(max_concurrent_calls=5, min_interval_seconds=0.2),
+        SearchRequest.QueryConfig.Method.UNOFFICIAL_GOOGLE_SEARCH_LIBRARY: ApiCallRateLimiter(max_concurrent_calls=3, min_interval_seconds=1.0),
+    }
+
     def __init__(self) -> None:
         self.blocklist_domains = set(
             ["crunchbase.com", "youtube.com", "twitter.com", "x.com", "facebook.com", "quora.com",
@@ -108,16 +144,22 @@ class SearchEngineWorkflow:
         # Currently only set in Prod env to save costs.
         self.SERP_PROXY_URL = os.getenv("BRIGHT_DATA_SERP_PROXY_URL")
 
-    def get_search_results(self, search_request: SearchRequest) -> LeadResearchReport.WebSearchResults:
-        """Returns search results as a dictionary mapping each search query to a list of URLs for the given request."""
+    def get_search_results(self, search_request: SearchRequest, on_results: Optional[Callable[[List[LeadResearchReport.WebSearchResults.Result]], None]] = None) -> LeadResearchReport.WebSearchResults:
+        """Returns search results as a dictionary mapping each search query to a list of URLs for the given request.
+
+        Queries run concurrently (rate limited per search method). Results are still deduplicated in query config order,
+        so the output is the same as running the queries one after another. If on_results is provided, it is called with
+        all the results collected so far each time the next query in config order completes.
+        """
         person_name: str = search_request.person_name
         company_name: str = search_request.company_name
         person_role_title: str = search_request.person_role_title
 
-        already_fetched_urls: Set[str] = set(search_request.existing_urls)
-        # Fetch search results.
-        results: List[LeadResearchReport.WebSearchResults.Result] = []
-        for config in search_request.query_configs:
+        existing_urls: Set[str] = set(search_request.existing_urls)
+
+        # Each job is (config index, search query, num results, method) in config order.
+        jobs: List[Tuple[int, str, int, SearchRequest.QueryConfig.Method]] = []
+        for config_index, config in enumerate(search_request.query_configs):
             # Construct search query.
             search_query: str = ""
             if config.prefix_format == SearchRequest.QueryConfig.PrefixFormat.COMPANY_ROLE_LEAD_POSSESSION:
@@ -126,22 +168,55 @@ class SearchEngineWorkflow:
                 search_query += f"{company_name} Company "
 
             search_query += config.suffix_query
-            num_results: int = config.num_results_per_method
-
             for search_method in config.methods:
-                if search_method == SearchRequest.QueryConfig.Method.GOOGLE_CUSTOM_SEARCH_API:
-                    results.extend(self.api_search(
-                        search_query=search_query, num_results=num_results, skip_urls=already_fetched_urls))
-                else:
-                    results.extend(self.get_unofficial_google_search_results(
-                        search_query=search_query, num_results=num_results, skip_urls=already_fetched_urls))
+                jobs.append((config_index, search_query, config.num_results_per_method, search_method))
 
-            already_fetched_urls = already_fetched_urls.union(
-                set([r.url for r in results]))
+        # Fetch search results.
+        results: List[LeadResearchReport.WebSearchResults.Result] = []
+        already_fetched_urls: Set[str] = set(existing_urls)
+        job_results: Dict[int, List[LeadResearchReport.WebSearchResults.Result]] = {}
+        next_job_index: int = 0
+
+        def merge_completed_jobs():
+            """Merge results of completed jobs in config order, skipping URLs fetched by earlier configs."""
+            nonlocal next_job_index, already_fetched_urls
+            merged_any = False
+            while next_job_index in job_results:
+                config_index = jobs[next_job_index][0]
+                results.extend([r for r in job_results.pop(next_job_index) if r.url not in already_fetched_urls])
+                next_job_index += 1
+                merged_any = True
+                if next_job_index == len(jobs) or jobs[next_job_index][0] != config_index:
+                    # Config complete, later configs should skip its URLs.
+                    already_fetched_urls = already_fetched_urls.union(set([r.url for r in results]))
+            if merged_any and on_results:
+                on_results(list(results))
+
+        with ThreadPoolExecutor(max_workers=SearchEngineWorkflow.MAX_CONCURRENT_QUERIES, thread_name_prefix="search-query") as executor:
+            future_to_job_index = {
+                executor.submit(self._run_search_method, search_method, search_query, num_results, existing_urls): job_index
+                for job_index, (_, search_query, num_results, search_method) in enumerate(jobs)
+            }
+            try:
+                for future in as_completed(future_to_job_index):
+                    job_results[future_to_job_index[future]] = future.result()
+                    merge_completed_jobs()
+            except Exception:
+                # Don't start queries that are still pending once one has failed.
+                for future in future_to_job_index:
+                    future.cancel()
+                raise
 
         num_results: int = len(results)
         return LeadResearchReport.WebSearchResults(num_results=num_results, results=results)
 
+    def _run_search_method(self, search_method: SearchRequest.QueryConfig.Method, search_query: str, num_results: int, skip_urls: Set[str]) -> List[LeadResearchReport.WebSearchResults.Result]:
+        """Runs given search query using given search method under that method's rate limit."""
+        with SearchEngineWorkflow.RATE_LIMITERS[search_method]:
+            if search_method == SearchRequest.QueryConfig.Method.GOOGLE_CUSTOM_SEARCH_API:
+                return self.api_search(search_query=search_query, num_results=num_results, skip_urls=skip_urls)
+            return self.get_unofficial_google_search_results(search_query=search_query, num_results=num_results, skip_urls=skip_urls)
+
     def api_search(self, search_query: str, num_results: int, skip_urls: Set[str]) -> List[LeadResearchReport.WebSearchResults.Result]:
         """
         Returns a list of Web Search Result URLs for given search query.
@@ -0,0 +1,251 @@
+import os
+import time
+import logging
+import functools
+import threading
+import inspect
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from uuid import UUID
+from opentelemetry import trace, context as otel_context
+from opentelemetry.propagate import inject, extract
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider, ReadableSpan
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import Span, Status, StatusCode
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger()
+
+TRACER_NAME = "userport.research"
+
+# Span attribute names shared by spans and the trace summary script.
+REPORT_ID_ATTRIBUTE = "report.id"
+URL_ATTRIBUTE = "url"
+QUEUE_WAIT_ATTRIBUTE = "celery.queue_wait_seconds"
+LLM_MODEL_ATTRIBUTE = "llm.model"
+LLM_PROMPT_TOKENS_ATTRIBUTE = "llm.prompt_tokens"
+LLM_COMPLETION_TOKENS_ATTRIBUTE = "llm.completion_tokens"
+LLM_TOTAL_TOKENS_ATTRIBUTE = "llm.total_tokens"
+LLM_COST_ATTRIBUTE = "llm.cost_usd"
+
+# Celery message header with the time at which the task was published, used to compute queue wait.
+ENQUEUED_AT_HEADER = "userport_enqueued_at"
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a local file, one JSON object per line."""
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = [span.to_json(indent=None) + "\n" for span in spans]
+        try:
+            with self._lock, open(self.file_path, "a") as f:
+                f.writelines(lines)
+        except Exception as e:
+            logger.warning(f"Failed to export {len(lines)} spans to file: {self.file_path} with error: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Tracing:
+    """Tracing of report pipeline stages using OpenTelemetry.
+
+    Spans are created for Celery tasks, pipeline stages and every LLM call, and are linked across
+    tasks by propagating trace context in Celery message headers, so that one report is one trace.
+    Task spans record time spent waiting in the queue and LLM spans record tokens and cost, which
+    gives critical path latency, queue wait and cost per report from the exported traces.
+
+    Exporter is selected by TRACING_EXPORTER env variable: "otlp" exports to the collector configured
+    by the standard OTEL_EXPORTER_OTLP_* env variables, "file" appends spans as JSON lines to
+    TRACING_FILE_PATH. Tracing is disabled by default, in which case all spans are no-ops.
+    """
+
+    EXPORTER_OTLP = "otlp"
+    EXPORTER_FILE = "file"
+    DEFAULT_FILE_PATH = "traces.jsonl"
+
+    def __init__(self) -> None:
+        self._provider: Optional[TracerProvider] = None
+        # Spans of Celery tasks running in this process keyed by task ID, along with the context token to detach.
+        self._task_spans: Dict[str, Tuple[Span, object]] = {}
+
+    def setup(self, service_name: str):
+        """Configure exporter for this process. Should be called once per process after fork."""
+        if self._provider is not None:
+            return
+        exporter_name: str = os.getenv("TRACING_EXPORTER", "").lower()
+        if exporter_name == Tracing.EXPORTER_OTLP:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            exporter: SpanExporter = OTLPSpanExporter()
+        elif exporter_name == Tracing.EXPORTER_FILE:
+            exporter = JsonLinesSpanExporter(file_path=os.getenv("TRACING_FILE_PATH", Tracing.DEFAULT_FILE_PATH))
+        else:
+            return
+
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        self._provider = provider
+        logger.info(f"Tracing enabled with exporter: {exporter_name} in pid: {os.getpid()}")
+
+    def shutdown(self):
+        """Flush pending spans before the process exits."""
+        if self._provider is not None:
+            try:
+                self._provider.shutdown()
+            except Exception as e:
+                logger.warning(f"Failed to flush spans on shutdown: {e}")
+
+    @staticmethod
+    def get_tracer() -> trace.Tracer:
+        return trace.get_tracer(TRACER_NAME)
+
+    def on_before_task_publish(self, headers: Optional[Dict]):
+        """Adds current trace context and publish time to headers of Celery task being published."""
+        if headers is None:
+            return
+        inject(headers)
+        headers[ENQUEUED_AT_HEADER] = time.time()
+
+    def on_task_prerun(self, task_id: str, task, args: Sequence, kwargs: Dict):
+        """Starts span of Celery task as child of the span that published it."""
+        parent_context = extract(task.request, getter=_CeleryRequestGetter())
+        span: Span = Tracing.get_tracer().start_span(
+            name=f"celery.task/{task.name}", context=parent_context)
+        span.set_attribute("celery.task_id", task_id)
+        enqueued_at = getattr(task.request, ENQUEUED_AT_HEADER, None)
+        if enqueued_at is not None:
+            span.set_attribute(QUEUE_WAIT_ATTRIBUTE, max(0.0, time.time() - float(enqueued_at)))
+        report_id: Optional[str] = Tracing._get_report_id(task=task, args=args, kwargs=kwargs)
+        if report_id:
+            span.set_attribute(REPORT_ID_ATTRIBUTE, report_id)
+        token = otel_context.attach(trace.set_span_in_context(span, parent_context))
+        self._task_spans[task_id] = (span, token)
+
+    def on_task_postrun(self, task_id: str, state: Optional[str]):
+        """Ends span of given Celery task."""
+        span_and_token = self._task_spans.pop(task_id, None)
+        if not span_and_token:
+            return
+        span, token = span_and_token
+        span.set_attribute("celery.state", state or "")
+        if state == "FAILURE":
+            span.set_status(Status(StatusCode.ERROR))
+        span.end()
+        otel_context.detach(token)
+
+    @staticmethod
+    def _get_report_id(task, args: Sequence, kwargs: Dict) -> Optional[str]:
+        if kwargs and kwargs.get("lead_research_report_id"):
+            return kwargs["lead_research_report_id"]
+        try:
+            bound_args = inspect.signature(task.run).bind_partial(*(args or []), **(kwargs or {}))
+        except Exception:
+            return None
+        return bound_args.arguments.get("lead_research_report_id")
+
+
+class _CeleryRequestGetter:
+    """Reads trace context from Celery task request, custom message headers are set as request attributes."""
+
+    def get(self, carrier, key: str):
+        value = getattr(carrier, key, None)
+        if value is None:
+            return None
+        return value if isinstance(value, list) else [value]
+
+    def keys(self, carrier):
+        return []
+
+
+class LLMTracingCallbackHandler(BaseCallbackHandler):
+    """Creates a span for every LLM call with model, token usage and cost in USD.
+
+    Added to every shared ChatOpenAI model so that LLM cost is attributed to the stage span that made the call.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any):
+        self._start_span(serialized=serialized, run_id=run_id)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs: Any):
+        self._start_span(serialized=serialized, run_id=run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            span: Optional[Span] = self._spans.pop(run_id, None)
+        if not span:
+            return
+        llm_output: Dict = response.llm_output or {}
+        token_usage: Dict = llm_output.get("token_usage") or {}
+        model_name: str = llm_output.get("model_name", "")
+        prompt_tokens: int = token_usage.get("prompt_tokens", 0)
+        completion_tokens: int = token_usage.get("completion_tokens", 0)
+        span.set_attribute(LLM_MODEL_ATTRIBUTE, model_name)
+        span.set_attribute(LLM_PROMPT_TOKENS_ATTRIBUTE, prompt_tokens)
+        span.set_attribute(LLM_COMPLETION_TOKENS_ATTRIBUTE, completion_tokens)
+        span.set_attribute(LLM_TOTAL_TOKENS_ATTRIBUTE, token_usage.get("total_tokens", prompt_tokens + completion_tokens))
+        cost_in_usd: Optional[float] = LLMTracingCallbackHandler._get_cost_in_usd(
+            model_name=model_name, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        if cost_in_usd is not None:
+            span.set_attribute(LLM_COST_ATTRIBUTE, cost_in_usd)
+        span.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            span: Optional[Span] = self._spans.pop(run_id, None)
+        if not span:
+            return
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
+
+    def _start_span(self, serialized: Dict[str, Any], run_id: UUID):
+        # Span uses current context as parent, LangChain runs callbacks of sync calls in the calling context.
+        name: str = (serialized or {}).get("name") or "llm"
+        span: Span = Tracing.get_tracer().start_span(name=f"llm/{name}")
+        with self._lock:
+            self._spans[run_id] = span
+
+    @staticmethod
+    def _get_cost_in_usd(model_name: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        from langchain_community.callbacks.openai_info import get_openai_token_cost_for_model, standardize_model_name
+        try:
+            model_name = standardize_model_name(model_name)
+            return get_openai_token_cost_for_model(model_name, prompt_tokens) + get_openai_token_cost_for_model(model_name, completion_tokens, is_completion=True)
+        except ValueError:
+            # Unknown model, tokens are still recorded.
+            return None
+
+
+def traced(span_name: str) -> Callable:
+    """Decorator that runs the decorated function in a span with given name."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Tracing.get_tracer().start_as_current_span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_span_attributes(attributes: Dict[str, Any]):
+    """Sets given attributes on the current span, None values are skipped."""
+    span: Span = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            span.set_attribute(key, value)
+
+
+tracing = Tracing()
@@ -2,7 +2,7 @@ import os
 import logging
 import random
 import requests
-from bs4 import BeautifulSoup, Tag
+from enum import Enum
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from langchain_core.prompts import PromptTemplate
@@ -11,14 +11,17 @@ from markdownify import markdownify
 from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain_community.callbacks import get_openai_callback
 from app.utils import Utils
-from app.models import ContentTypeEnum, ContentCategoryEnum, OpenAITokenUsage, ContentDetails
+from app.models import ContentTypeEnum, ContentCategoryEnum, OpenAITokenUsage, ContentDetails, CachedWebPage, WebPageArtifacts
 from app.linkedin_scraper import LinkedInScraper, LinkedInPostDetails
-from app.metrics import Metrics
+from app.process_resources import process_resources
+from app.page_fetch_cache import PageFetchCache
+from app.page_segmenter import PageSegmentOffsets, find_page_segment_offsets
+from app.tracing import traced, set_span_attributes, URL_ATTRIBUTE
 
 logger = logging.getLogger()
 
@@ -191,6 +194,16 @@ class ContentFinalSummary(BaseModel):
         default=[], description="Key organizations extracted from page content.")
 
 
+class SummaryMode(str, Enum):
+    """Algorithm used to summarize page body chunks.
+
+    REFINE: Summarize chunks one after another, passing the summary so far as context to each step.
+    MAP_REDUCE: Summarize chunks concurrently and independently, then merge the results in page order.
+    """
+    REFINE = "refine"
+    MAP_REDUCE = "map_reduce"
+
+
 class ContentAuthorAndPublishDate(BaseModel):
     """Content author and publish date."""
     author: Optional[str] = Field(
@@ -254,7 +267,7 @@ class WebPageScraper:
     CONTENT_TYPE_GENERAL_PAGE = "content_type_general_page"
     CONTENT_TYPE_LINKEDIN_POST = "content_type_linkedin_post"
 
-    def __init__(self, url: str, title: Optional[str] = None, snippet: Optional[str] = None,  chunk_size: int = 4096, chunk_overlap: int = 200, dev_mode: bool = False) -> None:
+    def __init__(self, url: str, title: Optional[str] = None, snippet: Optional[str] = None,  chunk_size: int = 4096, chunk_overlap: int = 200, dev_mode: bool = False, page_cache: Optional[PageFetchCache] = None) -> None:
         self.url = url
         self.page_title: Optional[str] = title
         self.page_snippet: Optional[str] = snippet
@@ -285,10 +298,17 @@ class WebPageScraper:
         # Maximum number of chunks allowed in a page body of chunk size 4096.
         self.PAGE_MAX_CHUNKS = 15
 
+        # Default summarization mode for page body, can be overridden per call.
+        self.SUMMARY_MODE = SummaryMode(os.getenv("WEB_PAGE_SUMMARY_MODE", SummaryMode.REFINE.value))
+        # Max number of concurrent LLM calls when summarizing chunks in map reduce mode.
+        self.MAP_REDUCE_MAX_CONCURRENCY = 5
+
         self.dev_mode = dev_mode
-        self.all_user_agents = Utils.load_all_user_agents()
+        # Optional cache of fetched pages and company independent page artifacts shared across reports.
+        self.page_cache: Optional[PageFetchCache] = page_cache
+        self.all_user_agents = process_resources.get_user_agents()
 
-        self.metrics = Metrics()
+        self.metrics = process_resources.get_metrics()
 
         if dev_mode:
             self.db = Chroma(persist_directory=WebPageScraper.CHROMA_DB_PATH,
@@ -321,17 +341,21 @@ class WebPageScraper:
             self.page_structure = self.create_page_structure_in_db(
                 page_structure=page_structure)
 
-    def fetch_page_content_info(self, doc: Document, company_name: str, person_name: str) -> PageContentInfo:
-        """Scrapes web page and returns content from it for given company and person names."""
+    def fetch_page_content_info(self, doc: Document, company_name: str, person_name: str, summary_mode: Optional[SummaryMode] = None) -> PageContentInfo:
+        """Scrapes web page and returns content from it for given company and person names.
+
+        summary_mode selects the page body summarization algorithm, defaults to SUMMARY_MODE.
+        """
         if self.dev_mode:
             raise ValueError("Cannot fetch content in dev mode")
 
         if self.is_valid_linkedin_post(url=self.url):
             return self.fetch_content_info_from_linkedin_post(company_name=company_name, person_name=person_name, doc=doc)
 
-        return self.fetch_content_info_from_general_page(company_name=company_name, person_name=person_name)
+        return self.fetch_content_info_from_general_page(company_name=company_name, person_name=person_name, summary_mode=summary_mode)
 
-    def fetch_content_info_from_general_page(self, company_name: str, person_name: str) -> PageContentInfo:
+    @traced("web_page_scraper.fetch_content_info_from_general_page")
+    def fetch_content_info_from_general_page(self, company_name: str, person_name: str, summary_mode: Optional[SummaryMode] = None) -> PageContentInfo:
         """Fetches content information from General web page (not a LinkedIn post)."""
         logger.info(f"Fetching content from general page for URL: {self.url}")
         cur_cost_in_usd: float = 0
@@ -345,7 +369,14 @@ class WebPageScraper:
             logger.info(
                 f"Publish date from Snippet cost: {cb.total_cost - cur_cost_in_usd} for URL: {self.url}")
 
-            if not publish_date:
+            artifacts: Optional[WebPageArtifacts] = self._get_page_artifacts()
+            if not publish_date and artifacts and artifacts.author_and_publish_date_computed:
+                # Author and publish date only depend on page contents, reuse them from an earlier processing of the same page.
+                logger.info(
+                    f"Using cached author and publish date for content hash: {self.content_hash} for URL: {self.url}")
+                author = artifacts.author
+                publish_date = artifacts.publish_date
+            elif not publish_date:
                 # Need high accuray so GPT-4O model.
                 author_and_publish_date: ContentAuthorAndPublishDate = self.fetch_author_and_date(
                     page_structure=page_structure)
@@ -368,6 +399,10 @@ class WebPageScraper:
                     logger.info(
                         f"LLM could not find publish date in the fetch_author_and_publish_date method in URL: {self.url}")
 
+                if self.page_cache and getattr(self, "content_hash", None):
+                    self.page_cache.store_author_and_publish_date(
+                        content_hash=self.content_hash, author=author, publish_date=publish_date)
+
             # If document is older than 1 year from todays date, skip it since it may be too old for relevance.
             publish_cutoff_date = Utils.create_utc_time_now() - relativedelta(months=12)
             if publish_date == None or publish_date < publish_cutoff_date:
@@ -408,7 +443,7 @@ class WebPageScraper:
                 )
 
             final_summary: ContentFinalSummary = self.fetch_content_final_summary(
-                page_body_chunks=page_structure.body_chunks)
+                page_body_chunks=page_structure.body_chunks, mode=summary_mode)
 
             logger.info(
                 f"Detailed summary cost: {cb.total_cost - cur_cost_in_usd} for URL: {self.url}")
@@ -511,6 +546,7 @@ class WebPageScraper:
                 openai_usage=tokens_used
             )
 
+    @traced("web_page_scraper.fetch_content_info_from_linkedin_post")
     def fetch_content_info_from_linkedin_post(self, company_name: str, person_name: str, doc: Document) -> PageContentInfo:
         """Fetches content information from LinkedIn post web page."""
         logger.info(f"Fetching content from LinkedIn post: {self.url}")
@@ -652,6 +688,7 @@ class WebPageScraper:
                 openai_usage=tokens_used
             )
 
+    @traced("web_page_scraper.fetch_post_final_summary")
     def fetch_post_final_summary(self, post_details: LinkedInPostDetails) -> ContentFinalSummary:
         """Fetches final summary of LinkedIn post."""
         if self.dev_mode:
@@ -723,7 +760,7 @@ class WebPageScraper:
             post_template = post_template + repost_template
 
         # Max retries = 2 which is already built in per https://python.langchain.com/v0.2/api_reference/openai/chat_models/langchain_openai.chat_models.base.ChatOpenAI.html#langchain_openai.chat_models.base.ChatOpenAI.max_retries.
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(
             PostSummary)
         prompt = PromptTemplate.from_template(post_template)
         chain = prompt | llm
@@ -738,8 +775,9 @@ class WebPageScraper:
 
         return ContentFinalSummary(detailed_summary=result.detailed_summary, key_persons=result.key_persons, key_organizations=result.key_organizations)
 
-    def fetch_content_final_summary(self, page_body_chunks: List[Document]) -> ContentFinalSummary:
-        """Returns final summary of content from page body using an iterative algorithm."""
+    @traced("web_page_scraper.fetch_content_final_summary")
+    def fetch_content_final_summary(self, page_body_chunks: List[Document], mode: Optional[SummaryMode] = None) -> ContentFinalSummary:
+        """Returns final summary of content from page body using given summarization mode (defaults to SUMMARY_MODE)."""
         if self.dev_mode:
             detailed_summary: Optional[str] = self.get_detailed_summary_from_db(
             )
@@ -748,6 +786,30 @@ class WebPageScraper:
                 logger.info(f"\nSummary: {detailed_summary}\n")
                 return ContentFinalSummary(detailed_summary=detailed_summary, key_persons=[], key_organizations=[])
 
+        mode = mode or self.SUMMARY_MODE
+        if mode == SummaryMode.MAP_REDUCE:
+            final_summary = self._fetch_map_reduce_summary(
+                page_body_chunks=page_body_chunks)
+        else:
+            final_summary = self._fetch_refine_summary(
+                page_body_chunks=page_body_chunks)
+
+        logger.info(
+            f"Detailed Summary using mode: {mode.value} for URL: {self.url} of content (length: {len(final_summary.detailed_summary)}): {final_summary.detailed_summary[:100]}...\n")
+        logger.info(
+            f"Key persons for URL: {self.url} (length: {len(final_summary.key_persons)}): {final_summary.key_persons[:3]}...\n")
+        logger.info(
+            f"Key organizations for URL: {self.url} (length: {len(final_summary.key_organizations)}): {final_summary.key_organizations[:3]}...\n")
+
+        if self.dev_mode:
+            # Write summary to database.
+            self.create_detailed_summary_in_db(
+                summary=final_summary.detailed_summary)
+
+        return final_summary
+
+    def _fetch_refine_summary(self, page_body_chunks: List[Document]) -> ContentFinalSummary:
+        """Summarizes page body chunks sequentially, each step using the summary so far as context."""
         # Do not change this prompt before testing, results may get worse.
         summary_prompt_template = (
             "You are a smart web page analyzer.\n"
@@ -761,7 +823,7 @@ class WebPageScraper:
             "New Passage:\n"
             "{new_passage}\n"
         )
-        llm = ChatOpenAI(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(
             ContentConciseSummary)
         prompt = PromptTemplate.from_template(summary_prompt_template)
         detailed_summary: str = ""
@@ -777,19 +839,48 @@ class WebPageScraper:
             key_persons += result.key_persons
             key_organizations += result.key_organizations
 
-        logger.info(
-            f"Detailed Summary for URL: {self.url} of content (length: {len(detailed_summary)}): {detailed_summary[:100]}...\n")
-        logger.info(
-            f"Key persons for URL: {self.url} (length: {len(key_persons)}): {key_persons[:3]}...\n")
-        logger.info(
-            f"Key organizations for URL: {self.url} (length: {len(key_organizations)}): {key_organizations[:3]}...\n")
+        return ContentFinalSummary(detailed_summary=detailed_summary, key_persons=key_persons, key_organizations=key_organizations)
 
-        if self.dev_mode:
-            # Write summary to database.
-            self.create_detailed_summary_in_db(summary=detailed_summary)
+    def _fetch_map_reduce_summary(self, page_body_chunks: List[Document]) -> ContentFinalSummary:
+        """Summarizes page body chunks concurrently and merges the chunk summaries in page order.
+
+        Chunks are summarized independently so there are no back to back LLM calls and prompts don't grow
+        with each chunk. Key persons and organizations are collected per chunk and deduplicated.
+        """
+        # Do not change this prompt before testing, results may get worse.
+        summary_prompt_template = (
+            "You are a smart web page analyzer.\n"
+            "The 'Passage' section below is part {part_number} of {num_parts} from a web page.\n"
+            "Write a concise summary of the 'Passage' section.\n"
+            "Make sure to highlight key numbers, quotes, announcements, persons and organizations in the summary.\n"
+            "\n"
+            "Passage:\n"
+            "{new_passage}\n"
+        )
+        llm = process_resources.get_chat_openai(temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(
+            ContentConciseSummary)
+        prompt = PromptTemplate.from_template(summary_prompt_template)
+        chain = prompt | llm
+
+        # Map: summarize each chunk concurrently. Results are returned in the same order as inputs.
+        inputs = [{"part_number": i + 1, "num_parts": len(page_body_chunks), "new_passage": chunk.page_content}
+                  for i, chunk in enumerate(page_body_chunks)]
+        results: List[ContentConciseSummary] = chain.batch(
+            inputs, config={"max_concurrency": self.MAP_REDUCE_MAX_CONCURRENCY})
+
+        # Reduce: merge chunk summaries in page order.
+        detailed_summary: str = ""
+        key_persons: List[str] = []
+        key_organizations: List[str] = []
+        for result in results:
+            detailed_summary = f"{detailed_summary}\n\n{result.concise_summary}"
+            key_persons += [p for p in result.key_persons if p not in key_persons]
+            key_organizations += [
+                o for o in result.key_organizations if o not in key_organizations]
 
         return ContentFinalSummary(detailed_summary=detailed_summary, key_persons=key_persons, key_organizations=key_organizations)
 
+    @traced("web_page_scraper.fetch_concise_summary")
     def fetch_concise_summary(self, detailed_summary: str) -> str:
         """Returns concise summary from given detailed summary."""
         prompt_template = (
@@ -799,7 +890,7 @@ class WebPageScraper:
             "{text}"
         )
         prompt = PromptTemplate.from_template(prompt_template)
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS)
         chain = prompt | llm
 
@@ -861,6 +952,7 @@ class WebPageScraper:
             f"Got Publish date: {dt} succesfully for Snippet: {self.page_snippet} for URL: {self.url}")
         return dt
 
+    @traced("web_page_scraper.fetch_author_and_date")
     def fetch_author_and_date(self, page_structure: PageStructure) -> ContentAuthorAndPublishDate:
         """Fetches content details like author and publish date from the web page.
 
@@ -878,7 +970,7 @@ class WebPageScraper:
         for attempt_num in range(2):
             # We want to use latest GPT model because it is likely more accurate than older ones like 3.5 Turbo.
             temperature: float = 0 if attempt_num == 0 else 0.5
-            llm = ChatOpenAI(
+            llm = process_resources.get_chat_openai(
                 temperature=temperature, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS)
             prompt = PromptTemplate.from_template(prompt_template)
 
@@ -908,6 +1000,7 @@ class WebPageScraper:
             return content_details
         return ContentAuthorAndPublishDate(author=None, publish_date=None)
 
+    @traced("web_page_scraper.fetch_content_type")
     def fetch_content_type(self, page_body_chunks: List[Document]) -> ContentType:
         """Fetches content type (podcast, interview, article, blog post etc.) using Page body."""
         # Do not change this prompt before testing, results may get worse.
@@ -931,7 +1024,7 @@ class WebPageScraper:
         # TODO: Use better way to break entire text into compressed text while maintaing structure and use that as input instead.
         content: str = "".join(
             [doc.page_content for doc in page_body_chunks])
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ContentType)
         prompt = PromptTemplate.from_template(prompt_template)
         chain = prompt | llm
@@ -945,6 +1038,7 @@ class WebPageScraper:
         logger.info(f"Content type for URL: {self.url} is: {result}")
         return result
 
+    @traced("web_page_scraper.fetch_content_category")
     def fetch_content_category(self, company_name: str, person_name: str, detailed_summary: str) -> ContentCategory:
         """Returns the category of the content using company name, person name and detailed summary."""
         # TODO: Update method so that when person name is optional, then we can skip some questions in the prompt.
@@ -958,7 +1052,7 @@ class WebPageScraper:
             "Context: {context}\n"
         )
         prompt = PromptTemplate.from_template(prompt_template)
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ContentCategory)
         chain = prompt | llm
 
@@ -1056,7 +1150,7 @@ class WebPageScraper:
             "{text}"
         )
         prompt = PromptTemplate.from_template(prompt_template)
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ContentAuthorAndPublishDate)
         chain = prompt | llm
         return chain.invoke(text)
@@ -1077,7 +1171,7 @@ class WebPageScraper:
             ""
         )
         prompt = PromptTemplate.from_template(prompt_template)
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(ContentDate)
         chain = prompt | llm
         result: ContentDate = chain.invoke(parsed_date)
@@ -1088,6 +1182,7 @@ class WebPageScraper:
         year: int = result.year if result.year else datetime.now().year
         return Utils.create_utc_datetime(day=day, month=month, year=year)
 
+    @traced("web_page_scraper.is_page_requesting_user_contact")
     def is_page_requesting_user_contact(self, page_structure: PageStructure) -> bool:
         """Checks whether the page is asking for user contact in exchange for disclosing talk or whitepaper or case study.
 
@@ -1105,7 +1200,7 @@ class WebPageScraper:
                 ..., description="Set to true if asking for user contact information and false otherwise.")
 
         # We want to use latest GPT model because it is likely more accurate than older ones like 3.5 Turbo.
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(IsRequestingUserContact)
         prompt = PromptTemplate.from_template(prompt_template)
         page_text = page_structure.body_chunks[0].page_content
@@ -1118,6 +1213,7 @@ class WebPageScraper:
             f"Is page requesting user contact for URL: {self.url} is: {result}")
         return result.is_requesting_user_contact
 
+    @traced("web_page_scraper.is_page_related_to_company")
     def is_page_related_to_company(self, company_name: str, detailed_summary: str) -> bool:
         """Returns whether the page's summary is focus is related to company name or not."""
 
@@ -1134,7 +1230,7 @@ class WebPageScraper:
                 ..., description="Reason for why the text is talking about or not talking about the Company.")
 
          # We want to use latest GPT model because it is likely more accurate than older ones like 3.5 Turbo.
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(FocusOnCompany)
         prompt = PromptTemplate.from_template(prompt_template)
         chain = prompt | llm
@@ -1145,6 +1241,7 @@ class WebPageScraper:
             f"Is Page related to company for URL: {self.url} is: {result}")
         return result.about_company
 
+    @traced("web_page_scraper.is_person_mentioned_in_text")
     def is_person_mentioned_in_text(self, person_name: str, detailed_summary: str) -> tuple[bool, str]:
         """Returns whether the page's summary is focused about person along with reason."""
         prompt_template = (
@@ -1160,7 +1257,7 @@ class WebPageScraper:
                 default=None, description="Reason for whether the person is mentioned or not.")
 
          # Using light model for now since it seems like an easy reasoning task.
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=0, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(PersonMentionedInText)
         prompt = PromptTemplate.from_template(prompt_template)
         chain = prompt | llm
@@ -1170,16 +1267,40 @@ class WebPageScraper:
             f"Is Person mentioned in the text result: {result} for URL: {self.url}")
         return (result.person_mentioned, result.reason)
 
+    @traced("web_page_scraper.fetch_page")
     def fetch_page(self) -> Document:
-        """Fetches HTML page and returns it as a Langchain Document with Markdown text content."""
+        """Fetches HTML page and returns it as a Langchain Document with Markdown text content.
+
+        Only LinkedIn posts are parsed from the full page Markdown. General pages are segmented from the
+        stored HTML by get_page_structure, so the full page Markdown conversion is skipped for them and the
+        returned Document has empty content. The full page Markdown is still available from page_md.
+        """
+        set_span_attributes({URL_ATTRIBUTE: self.url})
+        cached_web_page: Optional[CachedWebPage] = self.page_cache.get(
+            url=self.url) if self.page_cache else None
+        if cached_web_page and not PageFetchCache.is_expired(cached_web_page):
+            logger.info(f"Page fetch cache hit for URL: {self.url}")
+            set_span_attributes({"page_cache.result": "hit"})
+            return self._set_page_html(html=cached_web_page.html, content_hash=cached_web_page.content_hash)
+
         try:
             headers = {"User-Agent": random.choice(self.all_user_agents)}
+            if cached_web_page:
+                # Only download the page again if it changed since it was cached.
+                headers.update(
+                    PageFetchCache.get_revalidation_headers(cached_web_page))
             response = requests.get(
                 url=self.url, headers=headers, proxies=self.HTTP_REQUEST_PROXIES, timeout=self.HTTP_REQUEST_TIMEOUT_SECONDS)
         except Exception as e:
             raise ValueError(
                 f"HTTP error when fetching url: {self.url}, details: {e}")
 
+        if response.status_code == 304 and cached_web_page:
+            logger.info(f"Page fetch cache revalidated for URL: {self.url}")
+            set_span_attributes({"page_cache.result": "revalidated"})
+            self.page_cache.mark_revalidated(cached_web_page)
+            return self._set_page_html(html=cached_web_page.html, content_hash=cached_web_page.content_hash)
+
         if response.status_code != 200:
             if response.status_code == 403:
                 raise ValueError(
@@ -1192,20 +1313,48 @@ class WebPageScraper:
                 f"Invalid response content type: {response.headers} for URL: {self.url} when fetching page.")
 
         logger.info(f"HTTP page fetch success for URL: {self.url}")
+        set_span_attributes({"page_cache.result": "miss", "http.response_size_bytes": len(response.content)})
 
         response_size_bytes = len(response.content)
         if response_size_bytes > self.HTTP_RESPONSE_MAX_RESPONSE_SIZE_BYTES:
             raise PageTooLargeException(
                 f"Page is too large with response size: {response_size_bytes}, expected max size: {self.HTTP_RESPONSE_MAX_RESPONSE_SIZE_BYTES} for URL: {self.url}")
 
-        # Heading style argument is passed in to ensure we get '#' formatted headings.
-        md = markdownify(response.text, heading_style="ATX")
+        content_hash: str = PageFetchCache.compute_content_hash(response.text)
+        if self.page_cache:
+            self.page_cache.store(url=self.url, html=response.text, content_hash=content_hash,
+                                  etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+
+        return self._set_page_html(html=response.text, content_hash=content_hash)
 
-        # Store page HTML and markdown to extract header, page body and footer related information later.
-        self.page_html: str = response.text
-        self.page_md: str = md
+    def _set_page_html(self, html: str, content_hash: str) -> Document:
+        """Stores fetched page HTML and returns Document as described in fetch_page."""
+        # Store page HTML to extract header, page body and footer related information later.
+        self.page_html: str = html
+        self.content_hash: Optional[str] = content_hash
+        self._page_md: Optional[str] = None
+        self._page_artifacts: Optional[WebPageArtifacts] = None
 
-        return Document(page_content=md)
+        if not self.is_valid_linkedin_post(url=self.url):
+            return Document(page_content="")
+        return Document(page_content=self.page_md)
+
+    def _get_page_artifacts(self) -> Optional[WebPageArtifacts]:
+        """Returns cached company independent artifacts of fetched page contents, None if not cached."""
+        if not self.page_cache or not getattr(self, "content_hash", None):
+            return None
+        if getattr(self, "_page_artifacts", None) is None:
+            self._page_artifacts = self.page_cache.get_artifacts(
+                content_hash=self.content_hash)
+        return self._page_artifacts
+
+    @property
+    def page_md(self) -> str:
+        """Markdown of the full fetched page, converted on first access."""
+        if getattr(self, "_page_md", None) is None:
+            # Heading style argument is passed in to ensure we get '#' formatted headings.
+            self._page_md = markdownify(self.page_html, heading_style="ATX")
+        return self._page_md
 
     def split_into_chunks(self, doc: Document) -> List[Document]:
         """Split document into chunks using character splitter of given maximum chunk size and overlap."""
@@ -1224,13 +1373,26 @@ class WebPageScraper:
             f"Created: {len(chunks)} chunks when splitting URL: {self.url} using chunk size: {self.chunk_size}")
         return chunks
 
+    @traced("web_page_scraper.get_page_structure")
     def get_page_structure(self) -> PageStructure:
         """Splits given web page document into header, body, footer and body chunk contents and returns it."""
+        artifacts: Optional[WebPageArtifacts] = self._get_page_artifacts()
+        if artifacts and artifacts.body_chunks and artifacts.chunk_size == self.chunk_size and artifacts.chunk_overlap == self.chunk_overlap:
+            logger.info(
+                f"Using cached page structure for content hash: {self.content_hash} for URL: {self.url}")
+            body_chunks: List[Document] = [Document(**chunk) for chunk in artifacts.body_chunks]
+            return PageStructure(header=artifacts.header, body=artifacts.body, footer=artifacts.footer, body_chunks=body_chunks)
+
         page_header, page_body, page_footer = self.get_header_page_body_and_footer_text_from_html()
 
         # Split page body into chunks.
         body_chunks: List[Document] = self.split_into_chunks(
             doc=Document(page_content=page_body))
+
+        if self.page_cache and getattr(self, "content_hash", None):
+            self.page_cache.store_page_structure(content_hash=self.content_hash, header=page_header, body=page_body, footer=page_footer,
+                                                 body_chunks=[{"page_content": chunk.page_content, "metadata": chunk.metadata} for chunk in body_chunks],
+                                                 chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
         return PageStructure(header=page_header, body=page_body, footer=page_footer, body_chunks=body_chunks)
 
     def get_header_page_body_and_footer_text_from_html(self) -> List[str]:
@@ -1238,96 +1400,45 @@ class WebPageScraper:
 
         If footer is not found, will return only header and body.
         """
-        soup = BeautifulSoup(self.page_html, "html.parser")
         MARKDOWN_HEADING_STYLE = "ATX"
 
-        # Compute header tag first.
-        header_tag: Tag = None
-        for level in range(1, 7):
-            header_tag = soup.find(f"h{level}")
-            if header_tag:
-                break
+        # Single pass over the HTML to find where the header and footer tags start.
+        offsets: PageSegmentOffsets = find_page_segment_offsets(
+            html=self.page_html, is_techcrunch="techcrunch" in self.url)
 
-        if not header_tag:
+        if offsets.header_offset is None:
             raise HeadingTagNotFoundInPageException(
                 f"Error could not find heading tag in page HTML: {self.url}")
 
-        # Now compute footer.
-        footer_tag: Tag = None
-        if "techcrunch" in self.url:
+        if "techcrunch" in self.url and offsets.footer_source != "techcrunch":
             # Custom logic for Techcrunch since it has unrelated news along with main article in the body (and not footer).
             # <h3 id=h-more-techcrunch>More Techcrunch</h3>
-            footer_tag = soup.find("h3", id="h-more-techcrunch")
-            if not footer_tag:
-                logger.error(
-                    f"Techcrunch heading Tag attribute did not work for URL: {self.url}!")
-
-        if not footer_tag:
-            # Find tag named "footer".
-            footer_tag = soup.find("footer")
-
-        if not footer_tag:
-            # Find tag with attributes class and id that have "footer" string in them.
+            logger.error(
+                f"Techcrunch heading Tag attribute did not work for URL: {self.url}!")
+        if offsets.footer_source == "footer_attr":
             logger.info(
-                f"Footer tag does not exist, trying other attrs for url: {self.url}")
-
-            def has_footer_in_class_or_id(tag):
-                if tag.has_attr("class"):
-                    joined_str = " ".join(tag.attrs["class"])
-                    return "footer" in joined_str
-                if tag.has_attr("id"):
-                    return "footer" in tag.attrs["id"]
-                return False
-
-            footer_tag = soup.find(has_footer_in_class_or_id)
-
-        def get_tag_position(cur_tag: Tag, soup,  magic_words: str) -> int:
-            # Find position of header or footer tag in the string using a hack.
-            # Reference: https://stackoverflow.com/questions/48230684/extract-original-string-position-from-beautifulsoup-element.
-            # WARNING: This will muatate soup object so be careful with the magic words.
-            # cur_tag.insert(0, magic_words)
-            cur_tag.insert_before(magic_words)
-            index = str(soup).find(magic_words)
-            if index == -1:
-                raise ValueError(
-                    f"Magic words: {magic_words} didn't work to find tag in {self.url}")
-            return index
+                f"Footer tag does not exist, found footer using class or id attrs for url: {self.url}")
 
-        header_magic_words = "Userport Header Magic Words"
-        header_index: int = get_tag_position(
-            cur_tag=header_tag, soup=soup, magic_words=header_magic_words)
+        header_index: int = offsets.header_offset
+        header_md = markdownify(
+            self.page_html[:header_index], heading_style=MARKDOWN_HEADING_STYLE)
 
-        if not footer_tag:
+        if offsets.footer_offset is None:
             logger.warning(
                 f"Footer not found in page HTML of url: {self.url}")
-            header_md = markdownify(
-                str(soup)[:header_index], heading_style=MARKDOWN_HEADING_STYLE)
             page_body_md = markdownify(
-                str(soup)[header_index + len(header_magic_words):], heading_style=MARKDOWN_HEADING_STYLE)
+                self.page_html[header_index:], heading_style=MARKDOWN_HEADING_STYLE)
             return [header_md, page_body_md, None]
 
-        footer_magic_words = "Userport Footer Magic Words"
-        footer_index: int = get_tag_position(
-            cur_tag=footer_tag, soup=soup, magic_words=footer_magic_words)
-
-        header_body_md = markdownify(
-            str(soup)[:header_index], heading_style=MARKDOWN_HEADING_STYLE)
+        footer_index: int = offsets.footer_offset
         page_body_md = markdownify(
-            str(soup)[header_index + len(header_magic_words):footer_index], heading_style=MARKDOWN_HEADING_STYLE)
+            self.page_html[header_index:footer_index], heading_style=MARKDOWN_HEADING_STYLE)
         footer_md = markdownify(
-            str(soup)[footer_index+len(footer_magic_words):], heading_style=MARKDOWN_HEADING_STYLE)
-
-        # Uncomment for debugging.
-        # print("HEADER BODY MD: ", header_body_md[-500:])
-        # print("\n\n------------------------------\n\n")
-        # print("BODY md START: ", page_body_md[:500])
-        # print("\n\n------------------------------\n\n")
-        # print("BODY md END: ", page_body_md[-1000:])
-        # print("\n\n------------------------------\n\n")
-        # print("FOOTER START: ", footer_md[:500])
+            self.page_html[footer_index:], heading_style=MARKDOWN_HEADING_STYLE)
+
         logger.info(
             f"Found Header, Body and Footer successfully from HTML for URL: {self.url}")
-        return [header_body_md, page_body_md, footer_md]
+        return [header_md, page_body_md, footer_md]
 
     def get_linkedin_post_structure(self, doc: Document) -> PageStructure:
         """Splits web page representing a linkedin post into header, body and footer elements."""
@@ -1387,7 +1498,7 @@ class WebPageScraper:
         )
         prompt = PromptTemplate.from_template(prompt_template)
         # TODO: Iterate to see how well footer extraction works and then finally decide the right mdoel.
-        llm = ChatOpenAI(
+        llm = process_resources.get_chat_openai(
             temperature=openai_temperature, model_name=self.OPENAI_GPT_4O_MINI_MODEL, api_key=self.OPENAI_API_KEY, timeout=self.OPENAI_REQUEST_TIMEOUT_SECONDS).with_structured_output(PageFooterResult)
         chain = prompt | llm
 
@@ -1738,7 +1849,7 @@ if __name__ == "__main__":
     graph = WebPageScraper(url=url, title=None,
                            snippet=snippet, dev_mode=False)
     doc = graph.fetch_page()
-    print(doc.page_content)
+    print(graph.page_md)
     # graph.split_into_chunks(doc=doc)
     # content_info: PageContentInfo = graph.fetch_page_content_info(
     #     doc=doc, company_name=company_name, person_name=person_name)
@@ -0,0 +1,39 @@
+"""
+Backfills the company highlights index from Content Details processed before the index existed.
+
+Reports read highlights of a company from the index once it has any entry for the company, and aggregate
+Content Details of the company otherwise. Run this once when deploying the index, from the flask_app directory:
+    python -m scripts.rebuild_company_highlights [--months 15] [--company-profile-id <id>]
+
+Entries are upserted by Content Details ID, so running it again is safe.
+"""
+import argparse
+
+from dateutil.relativedelta import relativedelta
+from dotenv import load_dotenv
+
+from app.database import Database
+from app.utils import Utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the company highlights index from Content Details.")
+    parser.add_argument("--months", type=int, default=15,
+                        help="Only index content published in these recent months, reports never show older content.")
+    parser.add_argument("--company-profile-id", default=None,
+                        help="Only index content of given company.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    load_dotenv(".env.dev")
+
+    content_filter = {"publish_date": {"$gt": Utils.create_utc_time_now() - relativedelta(months=args.months)}}
+    if args.company_profile_id:
+        content_filter["company_profile_id"] = args.company_profile_id
+
+    num_written = Database().rebuild_company_highlights(filter=content_filter)
+    print(f"Company highlights written: {num_written}")
+
+
+if __name__ == "__main__":
+    main()
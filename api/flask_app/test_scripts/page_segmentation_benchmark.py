@@ -0,0 +1,145 @@
+"""
+Benchmarks web page header, body and footer segmentation over a corpus of saved pages.
+
+Run from the flask_app directory with a directory of saved HTML pages:
+    python -m test_scripts.page_segmentation_benchmark <pages_dir> [--repeat 3] [--output results.json]
+
+Each page file is named <anything>.html and may have a sibling <anything>.url file with the page URL.
+For every page we time the earlier BeautifulSoup implementation (full page Markdown in fetch_page plus
+magic word lookups that re-serialize the document) against the single pass segmenter used by
+WebPageScraper, and check that both produce the same header, body and footer Markdown.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify
+
+from app.web_page_scraper import WebPageScraper, HeadingTagNotFoundInPageException
+
+MARKDOWN_HEADING_STYLE = "ATX"
+
+
+def legacy_segment(page_html: str, url: str) -> List[Optional[str]]:
+    """Earlier implementation of WebPageScraper.get_header_page_body_and_footer_text_from_html including the full page Markdown from fetch_page."""
+    markdownify(page_html, heading_style=MARKDOWN_HEADING_STYLE)
+
+    soup = BeautifulSoup(page_html, "html.parser")
+    header_tag = None
+    for level in range(1, 7):
+        header_tag = soup.find(f"h{level}")
+        if header_tag:
+            break
+    if not header_tag:
+        raise HeadingTagNotFoundInPageException(url)
+
+    footer_tag = None
+    if "techcrunch" in url:
+        footer_tag = soup.find("h3", id="h-more-techcrunch")
+    if not footer_tag:
+        footer_tag = soup.find("footer")
+    if not footer_tag:
+        def has_footer_in_class_or_id(tag):
+            if tag.has_attr("class"):
+                return "footer" in " ".join(tag.attrs["class"])
+            if tag.has_attr("id"):
+                return "footer" in tag.attrs["id"]
+            return False
+        footer_tag = soup.find(has_footer_in_class_or_id)
+
+    def get_tag_position(cur_tag, magic_words: str) -> int:
+        cur_tag.insert_before(magic_words)
+        return str(soup).find(magic_words)
+
+    header_magic_words = "Userport Header Magic Words"
+    header_index = get_tag_position(header_tag, header_magic_words)
+    if not footer_tag:
+        return [markdownify(str(soup)[:header_index], heading_style=MARKDOWN_HEADING_STYLE),
+                markdownify(str(soup)[header_index + len(header_magic_words):], heading_style=MARKDOWN_HEADING_STYLE),
+                None]
+
+    footer_magic_words = "Userport Footer Magic Words"
+    footer_index = get_tag_position(footer_tag, footer_magic_words)
+    return [markdownify(str(soup)[:header_index], heading_style=MARKDOWN_HEADING_STYLE),
+            markdownify(str(soup)[header_index + len(header_magic_words):footer_index], heading_style=MARKDOWN_HEADING_STYLE),
+            markdownify(str(soup)[footer_index + len(footer_magic_words):], heading_style=MARKDOWN_HEADING_STYLE)]
+
+
+def normalize(md: Optional[str]) -> Optional[str]:
+    # Slicing re-serialized vs original HTML can differ in whitespace and entity escaping.
+    return " ".join(md.split()) if md is not None else None
+
+
+def time_call(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def benchmark_page(html_path: Path, repeat: int) -> Dict:
+    url_path = html_path.with_suffix(".url")
+    url = url_path.read_text().strip() if url_path.exists() else f"file://{html_path.name}"
+    page_html = html_path.read_text(encoding="utf-8", errors="ignore")
+
+    scraper = WebPageScraper(url=url)
+    scraper.page_html = page_html
+
+    legacy, legacy_seconds = time_call(lambda: legacy_segment(page_html=page_html, url=url), repeat)
+    current, current_seconds = time_call(scraper.get_header_page_body_and_footer_text_from_html, repeat)
+
+    return {
+        "page": html_path.name,
+        "url": url,
+        "size_bytes": len(page_html.encode("utf-8")),
+        "legacy_seconds": round(legacy_seconds, 4),
+        "single_pass_seconds": round(current_seconds, 4),
+        "speedup": round(legacy_seconds / current_seconds, 2) if current_seconds else None,
+        "header_matches": normalize(legacy[0]) == normalize(current[0]),
+        "body_matches": normalize(legacy[1]) == normalize(current[1]),
+        "footer_matches": normalize(legacy[2]) == normalize(current[2]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages_dir", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    results = []
+    for html_path in sorted(args.pages_dir.glob("*.html")):
+        try:
+            result = benchmark_page(html_path, repeat=args.repeat)
+        except HeadingTagNotFoundInPageException:
+            print(f"Skipping {html_path.name}: no heading tag")
+            continue
+        results.append(result)
+        print(f"{result['page'][:40]:40} {result['size_bytes'] / 1024:8.1f}KB "
+              f"legacy={result['legacy_seconds']:7.3f}s single_pass={result['single_pass_seconds']:7.3f}s "
+              f"speedup={result['speedup']}x match={result['header_matches'] and result['body_matches'] and result['footer_matches']}")
+
+    if not results:
+        print("No pages benchmarked.")
+        return
+
+    total_legacy = sum(r["legacy_seconds"] for r in results)
+    total_current = sum(r["single_pass_seconds"] for r in results)
+    mismatches = [r["page"] for r in results if not (r["header_matches"] and r["body_matches"] and r["footer_matches"])]
+    print(f"Pages: {len(results)}, legacy total: {total_legacy:.3f}s, single pass total: {total_current:.3f}s, "
+          f"speedup: {total_legacy / total_current:.2f}x")
+    print(f"Pages with different output: {mismatches or 'none'}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
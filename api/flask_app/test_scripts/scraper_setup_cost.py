@@ -0,0 +1,75 @@
+"""
+Measures per URL setup cost of the research pipeline with and without process wide shared resources.
+
+Run from the flask_app directory:
+    python -m test_scripts.scraper_setup_cost [--urls 50] [--llm-calls-per-url 8]
+
+"Per URL" setup is what the pipeline does for every search result before making any network call:
+create a WebPageScraper (user agents and metrics client) and create the LLM clients used by the
+scraper methods. The "fresh" numbers create everything per URL like before, the "shared" numbers
+use the process resources registry.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, List
+
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+from app.metrics import Metrics
+from app.process_resources import process_resources
+from app.utils import Utils
+from app.web_page_scraper import WebPageScraper
+
+
+def fresh_setup(llm_calls_per_url: int):
+    Utils.load_all_user_agents()
+    Metrics()
+    for _ in range(llm_calls_per_url):
+        ChatOpenAI(temperature=0, model_name=os.environ["OPENAI_GPT_4O_MINI_MODEL"],
+                   api_key=os.environ["OPENAI_USERPORT_API_KEY"], timeout=20)
+
+
+def shared_setup(llm_calls_per_url: int):
+    WebPageScraper(url="https://example.com")
+    for _ in range(llm_calls_per_url):
+        process_resources.get_chat_openai(model_name=os.environ["OPENAI_GPT_4O_MINI_MODEL"],
+                                          api_key=os.environ["OPENAI_USERPORT_API_KEY"], temperature=0, timeout=20)
+
+
+def measure(setup: Callable[[int], None], num_urls: int, llm_calls_per_url: int) -> List[float]:
+    durations = []
+    for _ in range(num_urls):
+        start = time.perf_counter()
+        setup(llm_calls_per_url)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(name: str, durations: List[float]):
+    print(f"{name:7} mean: {statistics.mean(durations) * 1000:8.2f}ms, median: {statistics.median(durations) * 1000:8.2f}ms, "
+          f"max: {max(durations) * 1000:8.2f}ms, total: {sum(durations):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=50)
+    parser.add_argument("--llm-calls-per-url", type=int, default=8)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    report("fresh", measure(fresh_setup, args.urls, args.llm_calls_per_url))
+
+    start = time.perf_counter()
+    process_resources.init_worker_process()
+    print(f"one time process init: {(time.perf_counter() - start) * 1000:.2f}ms")
+    report("shared", measure(shared_setup, args.urls, args.llm_calls_per_url))
+
+    process_resources.shutdown()
+
+
+if __name__ == "__main__":
+    main()
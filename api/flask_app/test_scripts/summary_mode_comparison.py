@@ -0,0 +1,139 @@
+"""
+Compares quality and latency of page summarization modes (refine vs map reduce) over stored web pages.
+
+Run from the flask_app directory with a directory of saved HTML pages:
+    python -m test_scripts.summary_mode_comparison <pages_dir> [--output results.json]
+
+Each page file is named <anything>.html and may have a sibling <anything>.url file with the page URL.
+For every page, both modes are run on the same body chunks and we record latency, OpenAI cost,
+summary length and key entity overlap. A GPT-4O judge then scores each summary's coverage of the page.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from langchain_community.callbacks import get_openai_callback
+from langchain_core.documents import Document
+from langchain_core.prompts import PromptTemplate
+from langchain_core.pydantic_v1 import BaseModel, Field
+from langchain_openai import ChatOpenAI
+
+from app.web_page_scraper import WebPageScraper, SummaryMode, ContentFinalSummary
+
+
+class SummaryScores(BaseModel):
+    """Scores of two summaries of the same page."""
+    summary_a_score: int = Field(...,
+                                 description="Score from 1 to 10 for how completely and accurately Summary A covers the page.")
+    summary_b_score: int = Field(...,
+                                 description="Score from 1 to 10 for how completely and accurately Summary B covers the page.")
+    reason: str = Field(..., description="Reason for the scores.")
+
+
+def judge_summaries(page_body: str, summary_a: str, summary_b: str) -> SummaryScores:
+    """Ask GPT-4O to score both summaries against the page body."""
+    prompt_template = (
+        "You are evaluating two summaries of the same web page.\n"
+        "Score each summary from 1 to 10 on how completely and accurately it captures the key numbers, quotes, announcements, persons and organizations in the page.\n"
+        "\n"
+        "Page:\n"
+        "{page_body}\n"
+        "\n"
+        "Summary A:\n"
+        "{summary_a}\n"
+        "\n"
+        "Summary B:\n"
+        "{summary_b}\n"
+    )
+    llm = ChatOpenAI(temperature=0, model_name=os.environ["OPENAI_GPT_4O_MODEL"],
+                     api_key=os.environ["OPENAI_USERPORT_API_KEY"]).with_structured_output(SummaryScores)
+    chain = PromptTemplate.from_template(prompt_template) | llm
+    return chain.invoke({"page_body": page_body, "summary_a": summary_a, "summary_b": summary_b})
+
+
+def jaccard(a: List[str], b: List[str]) -> float:
+    set_a, set_b = set(x.lower() for x in a), set(x.lower() for x in b)
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def summarize(scraper: WebPageScraper, body_chunks: List[Document], mode: SummaryMode) -> Dict:
+    with get_openai_callback() as cb:
+        start = time.perf_counter()
+        summary: ContentFinalSummary = scraper.fetch_content_final_summary(
+            page_body_chunks=body_chunks, mode=mode)
+        latency = time.perf_counter() - start
+    return {"summary": summary, "latency_seconds": latency, "cost_in_usd": cb.total_cost, "total_tokens": cb.total_tokens}
+
+
+def compare_page(html_path: Path) -> Dict:
+    url_path = html_path.with_suffix(".url")
+    url = url_path.read_text().strip() if url_path.exists() else f"file://{html_path.name}"
+
+    scraper = WebPageScraper(url=url)
+    scraper.page_html = html_path.read_text(encoding="utf-8")
+    page_structure = scraper.get_page_structure()
+
+    refine = summarize(scraper, page_structure.body_chunks, SummaryMode.REFINE)
+    map_reduce = summarize(scraper, page_structure.body_chunks, SummaryMode.MAP_REDUCE)
+    scores = judge_summaries(page_body=page_structure.body, summary_a=refine["summary"].detailed_summary,
+                             summary_b=map_reduce["summary"].detailed_summary)
+
+    result = {"page": html_path.name, "url": url, "num_chunks": len(page_structure.body_chunks)}
+    for name, mode_result, score in [("refine", refine, scores.summary_a_score), ("map_reduce", map_reduce, scores.summary_b_score)]:
+        result[name] = {
+            "latency_seconds": round(mode_result["latency_seconds"], 2),
+            "cost_in_usd": mode_result["cost_in_usd"],
+            "total_tokens": mode_result["total_tokens"],
+            "summary_length": len(mode_result["summary"].detailed_summary),
+            "quality_score": score,
+        }
+    result["key_persons_overlap"] = jaccard(
+        refine["summary"].key_persons, map_reduce["summary"].key_persons)
+    result["key_organizations_overlap"] = jaccard(
+        refine["summary"].key_organizations, map_reduce["summary"].key_organizations)
+    result["judge_reason"] = scores.reason
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages_dir", type=Path)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    results = []
+    for html_path in sorted(args.pages_dir.glob("*.html")):
+        try:
+            result = compare_page(html_path)
+        except Exception as e:
+            print(f"Skipping {html_path.name}: {e}")
+            continue
+        results.append(result)
+        print(f"{result['page'][:40]:40} chunks={result['num_chunks']:2} "
+              f"refine={result['refine']['latency_seconds']:6.2f}s/{result['refine']['quality_score']:2} "
+              f"map_reduce={result['map_reduce']['latency_seconds']:6.2f}s/{result['map_reduce']['quality_score']:2}")
+
+    if not results:
+        print("No pages compared.")
+        return
+
+    for mode in ["refine", "map_reduce"]:
+        avg_latency = sum(r[mode]["latency_seconds"] for r in results) / len(results)
+        avg_cost = sum(r[mode]["cost_in_usd"] for r in results) / len(results)
+        avg_score = sum(r[mode]["quality_score"] for r in results) / len(results)
+        print(f"{mode}: avg latency {avg_latency:.2f}s, avg cost ${avg_cost:.4f}, avg quality {avg_score:.2f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
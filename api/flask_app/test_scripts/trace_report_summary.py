@@ -0,0 +1,109 @@
+"""
+Summarizes latency, queue wait and LLM cost per report from spans exported by the file trace exporter.
+
+Run workers with TRACING_EXPORTER=file (and optionally TRACING_FILE_PATH) and then, from the flask_app directory:
+    python -m test_scripts.trace_report_summary traces.jsonl [--report-id <id>] [--top-stages 10]
+
+For every trace (one per report) this prints wall clock time, the critical path (starting from the root span,
+repeatedly follow the child span that finished last), total time spent by tasks waiting in the Celery queue and
+LLM cost grouped by the pipeline stage that made the calls.
+"""
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.tracing import REPORT_ID_ATTRIBUTE, QUEUE_WAIT_ATTRIBUTE, LLM_COST_ATTRIBUTE, LLM_TOTAL_TOKENS_ATTRIBUTE
+
+
+def parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def load_spans(path: str) -> Dict[str, List[Dict]]:
+    """Returns spans in given file grouped by trace ID."""
+    traces: Dict[str, List[Dict]] = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            span = json.loads(line)
+            span["start"] = parse_time(span["start_time"])
+            span["end"] = parse_time(span["end_time"])
+            span["span_id"] = span["context"]["span_id"]
+            traces[span["context"]["trace_id"]].append(span)
+    return traces
+
+
+def get_stage_name(span: Dict, spans_by_id: Dict[str, Dict]) -> str:
+    """Returns name of the closest ancestor span that is not an LLM call."""
+    parent: Optional[Dict] = spans_by_id.get(span.get("parent_id"))
+    while parent and parent["name"].startswith("llm/"):
+        parent = spans_by_id.get(parent.get("parent_id"))
+    return parent["name"] if parent else "(no stage)"
+
+
+def critical_path(root: Dict, children: Dict[str, List[Dict]]) -> List[Dict]:
+    path = [root]
+    while children.get(path[-1]["span_id"]):
+        path.append(max(children[path[-1]["span_id"]], key=lambda s: s["end"]))
+    return path
+
+
+def summarize_trace(spans: List[Dict], top_stages: int):
+    spans_by_id: Dict[str, Dict] = {span["span_id"]: span for span in spans}
+    children: Dict[str, List[Dict]] = defaultdict(list)
+    roots: List[Dict] = []
+    for span in spans:
+        if span.get("parent_id") in spans_by_id:
+            children[span["parent_id"]].append(span)
+        else:
+            roots.append(span)
+
+    report_ids = {span["attributes"].get(REPORT_ID_ATTRIBUTE) for span in spans} - {None}
+    start = min(span["start"] for span in spans)
+    end = max(span["end"] for span in spans)
+    total_queue_wait = sum(span["attributes"].get(QUEUE_WAIT_ATTRIBUTE, 0) for span in spans)
+    total_cost = sum(span["attributes"].get(LLM_COST_ATTRIBUTE, 0) for span in spans)
+    total_tokens = sum(span["attributes"].get(LLM_TOTAL_TOKENS_ATTRIBUTE, 0) for span in spans)
+
+    print(f"Report: {', '.join(sorted(report_ids)) or 'unknown'}, spans: {len(spans)}, wall time: {end - start:.2f}s, "
+          f"queue wait (all tasks): {total_queue_wait:.2f}s, LLM cost: ${total_cost:.4f}, LLM tokens: {total_tokens}")
+
+    root = max(roots, key=lambda s: s["end"])
+    print("  Critical path:")
+    for span in critical_path(root=root, children=children):
+        queue_wait = span["attributes"].get(QUEUE_WAIT_ATTRIBUTE)
+        queue_wait_str = f" (queue wait {queue_wait:.2f}s)" if queue_wait is not None else ""
+        print(f"    {span['start'] - start:8.2f}s +{span['end'] - span['start']:7.2f}s  {span['name']}{queue_wait_str}")
+
+    cost_by_stage: Dict[str, float] = defaultdict(float)
+    calls_by_stage: Dict[str, int] = defaultdict(int)
+    for span in spans:
+        if span["name"].startswith("llm/"):
+            stage: str = get_stage_name(span=span, spans_by_id=spans_by_id)
+            cost_by_stage[stage] += span["attributes"].get(LLM_COST_ATTRIBUTE, 0)
+            calls_by_stage[stage] += 1
+    if cost_by_stage:
+        print("  LLM cost by stage:")
+        for stage, cost in sorted(cost_by_stage.items(), key=lambda item: item[1], reverse=True)[:top_stages]:
+            print(f"    ${cost:9.4f} {calls_by_stage[stage]:5} calls  {stage}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traces_file")
+    parser.add_argument("--report-id", default=None)
+    parser.add_argument("--top-stages", type=int, default=10)
+    args = parser.parse_args()
+
+    traces = load_spans(args.traces_file)
+    for spans in traces.values():
+        if args.report_id and not any(span["attributes"].get(REPORT_ID_ATTRIBUTE) == args.report_id for span in spans):
+            continue
+        summarize_trace(spans=spans, top_stages=args.top_stages)
+
+
+if __name__ == "__main__":
+    main()
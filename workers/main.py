@@ -11,6 +11,7 @@ from api.routes import router
 from services.custom_column_validator import CustomColumnValidator
 from services.django_callback_service import CallbackService
 from utils.async_utils import shutdown_thread_pools
+from utils.http_client_registry import http_client_registry
 from utils.loguru_setup import logger, setup_context_preserving_task_factory, set_trace_context
 
 search_validator = None
@@ -48,6 +49,7 @@ async def lifespan(fastapi_app: FastAPI):
     finally:
         logger.info("Lifespan: Application is shutting down")
         await shutdown_thread_pools()
+        await http_client_registry.close_all()
 
         callback_service = getattr(fastapi_app.state, 'callback_service', None)
         if callback_service:
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for LinkedIn activity page parsing on saved HTML fixtures.
+
+Usage:
+    python scripts/benchmark_activity_parser.py <fixtures_dir> [--runs N]
+
+Every *.html file in the fixtures directory is parsed with both the stdlib
+"html.parser" backend and the configured backend (lxml when installed).
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.activity_parser as activity_parser
+from models.lead_activities import LinkedInActivity
+from utils.activity_parser import LinkedInActivityParser
+
+PERSON_LINKEDIN_URL = "https://www.linkedin.com/in/benchmark"
+
+
+def time_backend(backend: str, page_html: str, runs: int) -> tuple[float, int]:
+    """Return the best parse time in seconds and the number of activities found."""
+    activity_parser.HTML_PARSER_BACKEND = backend
+    best = float("inf")
+    num_activities = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        activities = LinkedInActivityParser.get_activities(
+            person_linkedin_url=PERSON_LINKEDIN_URL,
+            page_html=page_html,
+            activity_type=LinkedInActivity.Type.POST
+        )
+        best = min(best, time.perf_counter() - start)
+        num_activities = len(activities)
+    return best, num_activities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures_dir", type=Path)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = sorted(args.fixtures_dir.glob("*.html"))
+    if not fixtures:
+        sys.exit(f"No *.html fixtures found in {args.fixtures_dir}")
+
+    configured_backend = activity_parser.HTML_PARSER_BACKEND
+    backends = ["html.parser"] if configured_backend == "html.parser" else ["html.parser", configured_backend]
+
+    print(f"{'fixture':40} {'size_kb':>8} " + " ".join(f"{b + '_ms':>14}" for b in backends) + " activities")
+    for fixture in fixtures:
+        page_html = fixture.read_text(encoding="utf-8")
+        results = [time_backend(backend, page_html, args.runs) for backend in backends]
+        counts = {count for _, count in results}
+        timings = " ".join(f"{seconds * 1000:14.1f}" for seconds, _ in results)
+        print(f"{fixture.name[:40]:40} {len(page_html) / 1024:8.0f} {timings} {'/'.join(str(c) for c in sorted(counts))}")
+
+    activity_parser.HTML_PARSER_BACKEND = configured_backend
+
+
+if __name__ == "__main__":
+    main()
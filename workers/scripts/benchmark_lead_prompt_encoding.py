@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Compare prompt size and evaluation results of lead prompt formats on saved leads.
+
+Usage:
+    python scripts/benchmark_lead_prompt_encoding.py <leads.json> <product_data.json>
+        [--stage pre_evaluation|lead_evaluation] [--batch-size N] [--evaluate]
+
+leads.json is a JSON list of Apollo leads (pre_evaluation stage) or enriched leads (lead_evaluation
+stage). product_data.json has the product description, persona_role_titles and additional_lead_signals.
+
+Prompts are built for every format in utils.prompt_encoding.PROMPT_FORMATS and tokens per lead are
+reported (with tiktoken when installed, otherwise estimated). With --evaluate every prompt is also
+sent to the model used by the task, and persona and score of every lead are compared against the
+results of the pretty printed JSON format.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.leads import ApolloLead, EnrichedLead
+from services.ai.ai_service import AIServiceFactory
+from services.ai.ai_service_base import ThinkingBudget
+from tasks.generate_leads_apollo import ApolloConfig, ApolloLeadsTask
+from utils.prompt_encoding import JSON_FORMAT, PROMPT_FORMATS, estimate_tokens
+
+
+def get_token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        print("tiktoken is not installed, token counts are estimated")
+        return estimate_tokens
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def build_prompt(stage: str, batch: List[Dict[str, Any]], product_data: Dict[str, Any], prompt_format: str) -> str:
+    """Returns system and user prompt of given batch as a single prompt."""
+    if stage == "pre_evaluation":
+        system_prompt, user_prompt = ApolloLeadsTask._build_pre_evaluation_prompt(
+            batch=[ApolloLead(**lead) for lead in batch], product_data=product_data, prompt_format=prompt_format)
+    else:
+        enriched_leads = [EnrichedLead(**lead) for lead in batch]
+        lead_profiles = [lead.model_dump(include=lead.get_lead_evaluation_serialization_fields()) for lead in enriched_leads]
+        system_prompt, user_prompt = ApolloLeadsTask._build_lead_evaluation_prompt(
+            lead_profiles=lead_profiles, product_data=product_data, prompt_format=prompt_format)
+    return f"{system_prompt}\n\n{user_prompt}"
+
+
+def build_prompts(stage: str, leads: List[Dict[str, Any]], product_data: Dict[str, Any], batch_size: int, prompt_format: str) -> List[str]:
+    return [build_prompt(stage, leads[i:i + batch_size], product_data, prompt_format) for i in range(0, len(leads), batch_size)]
+
+
+async def evaluate(stage: str, prompts: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Returns persona and score of every evaluated lead keyed by lead ID."""
+    model = AIServiceFactory().create_service(
+        "gemini", model_name='gemini-2.5-flash-preview-04-17', thinking_budget=ThinkingBudget.LOW,
+        default_temperature=ApolloConfig.default_temperature)
+    operation_tag = "pre_evaluate_apollo_leads" if stage == "pre_evaluation" else "lead_evaluation"
+    responses = await asyncio.gather(*[
+        model.generate_content(prompt, is_json=True, operation_tag=operation_tag, temperature=ApolloConfig.pre_eval_temperature)
+        for prompt in prompts
+    ])
+    results = {}
+    for response in responses:
+        for lead in (response or {}).get('evaluated_leads', []):
+            if stage == "pre_evaluation":
+                results[lead.get('lead_id')] = {'persona': lead.get('initial_persona_estimate'), 'score': lead.get('initial_score')}
+            else:
+                results[lead.get('id')] = {'persona': lead.get('persona_match'), 'score': lead.get('fit_score')}
+    return results
+
+
+def print_agreement(prompt_format: str, results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]):
+    common_ids = [lead_id for lead_id in baseline if lead_id in results]
+    if not common_ids:
+        print(f"{prompt_format:14} no leads evaluated in both formats")
+        return
+    same_persona = sum(1 for lead_id in common_ids if results[lead_id]['persona'] == baseline[lead_id]['persona'])
+    score_diffs = [abs((results[lead_id]['score'] or 0) - (baseline[lead_id]['score'] or 0)) for lead_id in common_ids]
+    print(f"{prompt_format:14} evaluated: {len(results):4} persona agreement: {same_persona / len(common_ids):6.1%} "
+          f"mean score diff: {sum(score_diffs) / len(score_diffs):6.2f} max score diff: {max(score_diffs):6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("leads_file")
+    parser.add_argument("product_data_file")
+    parser.add_argument("--stage", choices=["pre_evaluation", "lead_evaluation"], default="pre_evaluation")
+    parser.add_argument("--batch-size", type=int, default=ApolloConfig.ai_batch_size)
+    parser.add_argument("--evaluate", action="store_true", help="Send prompts to the model and compare results")
+    args = parser.parse_args()
+
+    with open(args.leads_file) as f:
+        leads: List[Dict[str, Any]] = json.load(f)
+    with open(args.product_data_file) as f:
+        product_data: Dict[str, Any] = json.load(f)
+    if not leads:
+        sys.exit(f"No leads found in {args.leads_file}")
+
+    count_tokens = get_token_counter()
+    prompts_by_format = {
+        prompt_format: build_prompts(args.stage, leads, product_data, args.batch_size, prompt_format)
+        for prompt_format in PROMPT_FORMATS
+    }
+
+    print(f"{'format':14} {'batches':>8} {'prompt_tokens':>14} {'vs json':>8} {'lead_tokens/lead':>17}")
+    json_tokens = sum(count_tokens(prompt) for prompt in prompts_by_format[JSON_FORMAT])
+    for prompt_format, prompts in prompts_by_format.items():
+        total_tokens = sum(count_tokens(prompt) for prompt in prompts)
+        # Instructions, product and personas are repeated in every batch, the rest are tokens of the leads.
+        lead_tokens = total_tokens - len(prompts) * count_tokens(build_prompt(args.stage, [], product_data, prompt_format))
+        print(f"{prompt_format:14} {len(prompts):8} {total_tokens:14} {total_tokens / json_tokens:8.1%} "
+              f"{lead_tokens / len(leads):17.1f}")
+
+    if not args.evaluate:
+        return
+
+    results_by_format = {
+        prompt_format: asyncio.run(evaluate(args.stage, prompts))
+        for prompt_format, prompts in prompts_by_format.items()
+    }
+    for prompt_format, results in results_by_format.items():
+        print_agreement(prompt_format, results, results_by_format[JSON_FORMAT])
+
+
+if __name__ == "__main__":
+    main()
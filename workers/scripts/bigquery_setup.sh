@@ -22,9 +22,14 @@ bq mk --dataset \
     "$GOOGLE_CLOUD_PROJECT:$DATASET_ID"
 
 # Create account_data table
+# Rows are append-only partial updates merged on read, so the table is clustered by account_id
+# to make reading all rows of an account a single clustered lookup.
 bq mk \
     --table \
     --schema './schemas/account_data_schema.json' \
+    --time_partitioning_field fetched_at \
+    --time_partitioning_type DAY \
+    --clustering_fields account_id \
     "$GOOGLE_CLOUD_PROJECT:$DATASET_ID.account_data"
 
 # Create enrichment_raw_data table
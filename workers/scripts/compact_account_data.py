@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Compact append-only account_data rows into one merged row per account.
+
+Usage:
+    python scripts/compact_account_data.py [--min-rows N] [--limit N] [--account-id ID]
+
+Meant to run periodically (e.g. daily). Accounts with at least --min-rows rows older than
+BigQueryService.COMPACTION_MIN_ROW_AGE_HOURS are compacted, one transaction per account.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bigquery_service import BigQueryService
+
+
+async def compact(min_rows: int, limit: int, account_id: str = None) -> None:
+    bq_service = BigQueryService()
+    account_ids = [account_id] if account_id else await bq_service.get_account_ids_to_compact(min_rows=min_rows, limit=limit)
+    print(f"Compacting {len(account_ids)} accounts")
+
+    total_rows = 0
+    for current_account_id in account_ids:
+        try:
+            total_rows += await bq_service.compact_account_data(current_account_id)
+        except Exception as e:
+            print(f"Failed to compact account {current_account_id}: {e}")
+
+    print(f"Replaced {total_rows} rows of {len(account_ids)} accounts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--account-id", default=None)
+    args = parser.parse_args()
+
+    asyncio.run(compact(min_rows=args.min_rows, limit=args.limit, account_id=args.account_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Migrate an existing account_data table to be partitioned by fetched_at and clustered by account_id.
+
+Usage:
+    python scripts/migrate_account_data_partitioning.py [--swap]
+
+BigQuery applies partitioning and clustering only when a table is created, so tables created before
+scripts/bigquery_setup.sh set them up are rebuilt:
+
+1. Without --swap, account_data_partitioned is created with the current schema, partitioning and
+   clustering, and rows of account_data not copied yet are copied into it. Safe to run while workers
+   are writing, and again to copy rows written since.
+2. With --swap, remaining rows are copied, account_data is dropped and replaced by a copy of
+   account_data_partitioned (copy jobs keep partitioning and clustering), which is then dropped.
+   Workers must not write account_data during this step (e.g. scale them to zero), rows they stream
+   in between the last copy and the drop are lost.
+
+Tables that are already partitioned are left as is.
+"""
+
+import argparse
+import os
+import sys
+
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bigquery_service import BigQueryService
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemas', 'account_data_schema.json')
+PARTITION_FIELD = 'fetched_at'
+CLUSTERING_FIELDS = ['account_id']
+
+
+def is_partitioned(table: bigquery.Table) -> bool:
+    return (table.time_partitioning is not None and table.time_partitioning.field == PARTITION_FIELD
+            and table.clustering_fields == CLUSTERING_FIELDS)
+
+
+def create_partitioned_table(client: bigquery.Client, table_id: str) -> None:
+    """Create given table with the account_data schema, partitioning and clustering if it doesn't exist."""
+    table = bigquery.Table(table_id, schema=client.schema_from_json(SCHEMA_PATH))
+    table.time_partitioning = bigquery.TimePartitioning(type_=bigquery.TimePartitioningType.DAY, field=PARTITION_FIELD)
+    table.clustering_fields = CLUSTERING_FIELDS
+    client.create_table(table, exists_ok=True)
+
+
+def copy_rows(client: bigquery.Client, source_table_id: str, table_id: str) -> int:
+    """Copy rows of source table not copied yet, by record_id, and return number of copied rows.
+
+    Columns the source table predates are left empty.
+    """
+    source_columns = {field.name for field in client.get_table(source_table_id).schema}
+    columns = [field.name for field in client.get_table(table_id).schema if field.name in source_columns]
+    query_job = client.query(f"""
+    INSERT INTO `{table_id}` ({", ".join(columns)})
+    SELECT {", ".join(f"s.{column}" for column in columns)}
+    FROM `{source_table_id}` AS s
+    WHERE NOT EXISTS (SELECT 1 FROM `{table_id}` AS t WHERE t.record_id = s.record_id)
+    """)
+    query_job.result()
+    return query_job.num_dml_affected_rows or 0
+
+
+def migrate(swap: bool) -> None:
+    bq_service = BigQueryService()
+    client = bq_service.client
+    table_id = f"{bq_service.project}.{bq_service.dataset}.{BigQueryService.ACCOUNT_DATA_TABLE}"
+    staging_table_id = f"{table_id}_partitioned"
+
+    try:
+        table = client.get_table(table_id)
+    except NotFound:
+        print(f"{table_id} does not exist, create it with scripts/bigquery_setup.sh")
+        return
+    if is_partitioned(table):
+        print(f"{table_id} is already partitioned by {PARTITION_FIELD} and clustered by {', '.join(CLUSTERING_FIELDS)}")
+        return
+
+    create_partitioned_table(client, staging_table_id)
+    print(f"Copied {copy_rows(client, table_id, staging_table_id)} rows to {staging_table_id}")
+    if not swap:
+        print("Run again with --swap while workers are not writing account_data to replace the table")
+        return
+
+    client.delete_table(table_id)
+    client.copy_table(staging_table_id, table_id).result()
+    client.delete_table(staging_table_id)
+    print(f"Replaced {table_id} with partitioned and clustered {staging_table_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--swap", action="store_true",
+                        help="Replace account_data with the partitioned copy, workers must not be writing")
+    args = parser.parse_args()
+
+    migrate(swap=args.swap)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Migrate AI prompt and API request caches to their partitioned tables.
+
+Usage:
+    python scripts/migrate_cache_tables.py [--drop-legacy]
+
+Cache tables are partitioned by day of created_at and clustered by cache_key, and BigQuery drops
+partitions older than the retention window instead of DML deletes. Services read and write
+ai_prompt_cache_v2 and api_request_cache_v2, this copies unexpired entries of the unpartitioned
+ai_prompt_cache and api_request_cache tables into them.
+
+Run it before deploying services that use the partitioned tables, then again after the deploy with
+--drop-legacy to copy entries cached in the legacy tables in between and drop them. Entries already
+copied are skipped.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.ai_cache_service import AICacheService
+from services.ai.api_cache_service import APICacheService
+from services.bigquery_service import BigQueryService
+
+
+async def migrate(drop_legacy: bool) -> None:
+    bq_service = BigQueryService()
+    api_cache_service = APICacheService(bq_service=bq_service)
+    cache_services = [
+        AICacheService(client=bq_service.client, project_id=bq_service.project, dataset=bq_service.dataset),
+        api_cache_service,
+    ]
+
+    try:
+        for cache_service in cache_services:
+            await cache_service.ensure_cache_table()
+            copied_rows = await cache_service.migrate_legacy_table(drop_legacy=drop_legacy)
+            if copied_rows is None:
+                print(f"{cache_service.LEGACY_TABLE_NAME}: no legacy table")
+            else:
+                print(f"{cache_service.LEGACY_TABLE_NAME}: copied {copied_rows} rows to {cache_service.table_name}"
+                      f"{', dropped legacy table' if drop_legacy else ''}")
+    finally:
+        await api_cache_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop legacy tables after copying their entries")
+    args = parser.parse_args()
+
+    asyncio.run(migrate(drop_legacy=args.drop_legacy))
+
+
+if __name__ == "__main__":
+    main()
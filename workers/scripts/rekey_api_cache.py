@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Re-key api_request_cache rows with the current cache key normalizers.
+
+Usage:
+    python scripts/rekey_api_cache.py [--apply]
+
+Cache keys ignore credentials and canonicalize params and URLs per integration (see
+services/ai/api_cache_keys.py). Rows cached with older keys are only hit again after re-keying.
+Without --apply, only prints how many distinct keys every host has before and after re-keying.
+With --apply, rows are updated in place and credentials stored with them are dropped.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.api_cache_service import APICacheService
+from services.bigquery_service import BigQueryService
+
+
+async def rekey(apply: bool) -> None:
+    cache_service = APICacheService(bq_service=BigQueryService())
+    counts = await cache_service.rekey_cache(dry_run=not apply)
+
+    print(f"{'host':40} {'old_keys':>9} {'new_keys':>9} {'merged':>7}")
+    for host, host_counts in sorted(counts.items()):
+        old_keys, new_keys = host_counts["old_keys"], host_counts["new_keys"]
+        print(f"{host:40} {old_keys:9} {new_keys:9} {1 - new_keys / old_keys:7.1%}")
+    print("Re-keyed rows" if apply else "Dry run, pass --apply to re-key rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="Update rows instead of only reporting")
+    args = parser.parse_args()
+
+    asyncio.run(rekey(apply=args.apply))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional, List, Union
 
 from google.cloud import bigquery
 
+from services.ai.cache_tables import copy_legacy_cache_table, create_partitioned_cache_table, set_partition_expiration
 from utils.async_utils import to_thread
 from utils.token_usage import TokenUsage
 from utils.loguru_setup import logger
@@ -12,14 +13,24 @@ from json_repair import repair_json
 
 
 class AICacheService:
-    """Service for caching AI prompts and responses."""
+    """
+    Service for caching AI prompts and responses.
+
+    The cache table is partitioned by day of creation and partitions older than RETENTION_DAYS are
+    dropped by BigQuery, so lookups only scan partitions within the retention window.
+    """
+
+    # Replaces the unpartitioned cache table, see migrate_legacy_table.
+    LEGACY_TABLE_NAME = "ai_prompt_cache"
+    RETENTION_DAYS = 30
 
     def __init__(self, client: bigquery.Client, project_id: str, dataset: str):
         """Initialize the AI cache service."""
         self.client = client
         self.project_id = project_id
         self.dataset = dataset
-        self.table_name = "ai_prompt_cache"
+        self.table_name = "ai_prompt_cache_v2"
+        self.retention_days = self.RETENTION_DAYS
 
     # This will be called when a task is created to ensure that the cache table always exists
     @to_thread
@@ -44,13 +55,8 @@ class AICacheService:
             bigquery.SchemaField("tenant_id", "STRING"),
         ]
 
-        table_id = f"{self.project_id}.{self.dataset}.{self.table_name}"
-        try:
-            self.client.get_table(table_id)
-        except Exception:
-            table = bigquery.Table(table_id, schema=schema)
-            table = self.client.create_table(table)
-            logger.info(f"Created table {table_id}")
+        create_partitioned_cache_table(
+            self.client, f"{self.project_id}.{self.dataset}.{self.table_name}", schema, self.retention_days)
 
     def _generate_cache_key(
             self,
@@ -102,6 +108,7 @@ class AICacheService:
         AND (temperature IS NULL OR temperature = @temperature)
         AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP())
         AND (tenant_id IS NULL OR tenant_id = @tenant_id)
+        AND created_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {self.retention_days} DAY)
         ORDER BY created_at DESC
         LIMIT 1
         """
@@ -278,26 +285,22 @@ class AICacheService:
         table = self.client.get_table(f"{self.project_id}.{self.dataset}.{self.table_name}")
         return self.client.insert_rows_json(table, [row])
 
-    async def clear_expired_cache(self, days: int = 30) -> int:
-        """Clear expired cache entries and entries older than specified days."""
-        query = f"""
-        DELETE FROM `{self.project_id}.{self.dataset}.{self.table_name}`
-        WHERE expires_at < CURRENT_TIMESTAMP()
-        OR created_at < TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days DAY)
-        """
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("days", "INTEGER", days)
-            ]
-        )
-
-        # Execute delete query in a separate thread
-        return await self._execute_delete_query(query, job_config)
+    @to_thread
+    def set_retention_days(self, days: int) -> None:
+        """Drop cache entries older than given days, by expiring partitions of the cache table."""
+        set_partition_expiration(self.client, f"{self.project_id}.{self.dataset}.{self.table_name}", days)
+        self.retention_days = days
 
     @to_thread
-    def _execute_delete_query(self, query: str, job_config: bigquery.QueryJobConfig) -> int:
-        """Execute a delete query in a separate thread and return affected rows"""
-        query_job = self.client.query(query, job_config=job_config)
-        query_job.result()
-        return query_job.num_dml_affected_rows
\ No newline at end of file
+    def migrate_legacy_table(self, drop_legacy: bool = False) -> Optional[int]:
+        """
+        Copy unexpired entries of the unpartitioned legacy cache table into the partitioned one.
+        Returns number of copied entries, None if the legacy table doesn't exist.
+        """
+        return copy_legacy_cache_table(
+            self.client,
+            f"{self.project_id}.{self.dataset}.{self.LEGACY_TABLE_NAME}",
+            f"{self.project_id}.{self.dataset}.{self.table_name}",
+            self.retention_days,
+            drop_legacy=drop_legacy
+        )
@@ -1,15 +1,19 @@
+import asyncio
 import enum
 import hashlib
 import json
+import os
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional, Union, Tuple
+from typing import Dict, Any, Optional, Union, Tuple, List, Callable, Awaitable
 
 from google.cloud import bigquery
 
 from utils.token_usage import TokenUsage
 from utils.loguru_setup import logger
 from services.ai.ai_cache_service import AICacheService
+from services.ai.batch_inference import BatchInferenceProvider, BatchRequest, BatchStatus, LocalFileBatchProvider
 from json_repair import loads as repair_loads
 
 
@@ -60,6 +64,7 @@ class AIService(ABC):
         self.model = model_name  # Model name to be used by the service
         self.default_temperature = default_temperature  # Default temperature
         self.thinking_budget = thinking_budget  # Thinking budget parameter
+        self.batch_provider: Optional[BatchInferenceProvider] = None  # Overrides provider batch endpoint, e.g. in tests
 
     # ===============================
     # Core Content Generation Methods
@@ -85,12 +90,22 @@ class AIService(ABC):
             temperature: Optional[float] = None,
             thinking_budget: Optional[ThinkingBudget] = None,
             system_prompt: Optional[str] = None,
-            user_prompt: Optional[str] = None
+            user_prompt: Optional[str] = None,
+            cache_scope: Optional[str] = None
     ) -> Tuple[Union[Dict[str, Any], str], TokenUsage]:
         """Generate content from prompt without using cache.
 
         If system_prompt and user_prompt are provided, the prompt parameter is ignored and 
         the LLM-specific implementation should handle formatting these appropriately for the model.
+        If cache_scope is provided, the system_prompt is a static prefix that the implementation
+        may cache with the provider and reuse across calls of the same scope.
+        """
+        pass
+
+    async def invalidate_prompt_cache(self, cache_scope: str) -> None:
+        """Drop provider side caches of prompt prefixes of given scope, e.g. after the product was edited.
+
+        Providers without explicit prompt caching have nothing to invalidate.
         """
         pass
 
@@ -103,7 +118,8 @@ class AIService(ABC):
             temperature: Optional[float] = None,
             thinking_budget: Optional[ThinkingBudget] = None,
             system_prompt: Optional[str] = None,
-            user_prompt: Optional[str] = None
+            user_prompt: Optional[str] = None,
+            cache_scope: Optional[str] = None
     ) -> Union[Dict[str, Any], str]:
         """Generate content from prompt, using cache if available.
 
@@ -112,6 +128,10 @@ class AIService(ABC):
         2. Structured mode: Pass separate system_prompt and user_prompt parameters
 
         If both methods are used, structured mode takes precedence.
+
+        In structured mode, cache_scope (e.g. tenant and product) marks the system_prompt as a static
+        prefix shared by calls of that scope, which is cached with the provider where supported so
+        that only the user_prompt is sent in full on every call.
         """
         # Use provided temperature or fall back to default
         used_temperature = temperature if temperature is not None else self.default_temperature
@@ -156,7 +176,8 @@ class AIService(ABC):
                 temperature=used_temperature,
                 thinking_budget=thinking_budget,
                 system_prompt=system_prompt,
-                user_prompt=user_prompt
+                user_prompt=user_prompt,
+                cache_scope=cache_scope
             )
         except ValueError as ve:
             logger.error(f"Got empty response while generating content: {ve}")
@@ -181,6 +202,132 @@ class AIService(ABC):
 
         return response
 
+    # ===============================
+    # Offline Batch Generation
+    # ===============================
+
+    BATCH_POLL_INTERVAL_SECONDS = 30
+    # Stop waiting well before the Cloud Tasks dispatch deadline (30 minutes), so that requests without
+    # results can still be generated online within it.
+    BATCH_TIMEOUT_SECONDS = 5 * 60
+    # Time given to a cancelled batch to stop, after which its output has the requests that completed.
+    BATCH_CANCEL_TIMEOUT_SECONDS = 60
+
+    def _get_batch_provider(self) -> Optional[BatchInferenceProvider]:
+        """Batch endpoint of this provider, None if it has none.
+
+        AI_BATCH_PROVIDER=local selects the file based stand-in, writing batches to AI_BATCH_LOCAL_DIR.
+        """
+        if self.batch_provider:
+            return self.batch_provider
+        if os.getenv('AI_BATCH_PROVIDER', '').lower() == 'local':
+            return LocalFileBatchProvider(directory=os.getenv('AI_BATCH_LOCAL_DIR', 'ai_batches'))
+        return None
+
+    def _build_batch_request_body(self, request: BatchRequest) -> Dict[str, Any]:
+        """Provider request body of given batch request, overridden by providers with a batch endpoint."""
+        return {
+            'model': self.model,
+            'prompt': request.prompt,
+            'system_prompt': request.system_prompt,
+            'user_prompt': request.user_prompt,
+            'is_json': request.is_json,
+            'temperature': request.temperature if request.temperature is not None else self.default_temperature
+        }
+
+    async def generate_content_batch(
+            self,
+            requests: List[BatchRequest],
+            poll_interval_seconds: Optional[float] = None,
+            timeout_seconds: Optional[float] = None,
+            batch_id: Optional[str] = None,
+            on_submitted: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Union[Dict[str, Any], str]]:
+        """Generate content for given requests through the provider's offline batch endpoint.
+
+        Batch endpoints cost less and do not count against online rate limits, but results can take
+        minutes to hours, so this is only meant for jobs that do not need interactive latency.
+        Waits for the batch to complete, polling every poll_interval_seconds, for up to timeout_seconds.
+
+        A batch that does not complete in time is cancelled, and responses of its requests that completed
+        are still returned since they are billed.
+
+        on_submitted is called with the ID of the submitted batch, so that callers can persist it and pass
+        it as batch_id when they are retried, to collect the same batch instead of submitting the requests again.
+
+        Returns responses keyed by custom_id, parsed as JSON for JSON requests. Requests without a
+        response (failed, or not completed in time, or the provider has no batch endpoint)
+        are missing from the result and callers should generate them with generate_content.
+        """
+        if not requests:
+            return {}
+        custom_ids = [request.custom_id for request in requests]
+        if len(set(custom_ids)) != len(custom_ids):
+            raise ValueError("custom_id of batch requests must be unique")
+
+        provider: Optional[BatchInferenceProvider] = self._get_batch_provider()
+        if not provider:
+            logger.info(f"No batch endpoint for provider: {self.provider_name}, {len(requests)} requests need online generation")
+            return {}
+
+        poll_interval_seconds = poll_interval_seconds if poll_interval_seconds is not None else self.BATCH_POLL_INTERVAL_SECONDS
+        timeout_seconds = timeout_seconds if timeout_seconds is not None else self.BATCH_TIMEOUT_SECONDS
+
+        if batch_id:
+            logger.info(f"Resuming batch: {batch_id} with {len(requests)} requests of provider: {self.provider_name}")
+        else:
+            batch_id = await provider.submit([
+                {'custom_id': request.custom_id, 'body': self._build_batch_request_body(request)}
+                for request in requests
+            ])
+            logger.info(f"Submitted batch: {batch_id} with {len(requests)} requests to provider: {self.provider_name}")
+            if on_submitted:
+                try:
+                    await on_submitted(batch_id)
+                except Exception as e:
+                    logger.warning(f"Failed to persist submitted batch: {batch_id}: {e}")
+
+        deadline = time.monotonic() + timeout_seconds
+        status = await provider.get_status(batch_id)
+        while status == BatchStatus.IN_PROGRESS and time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval_seconds)
+            status = await provider.get_status(batch_id)
+
+        if status == BatchStatus.IN_PROGRESS:
+            logger.warning(f"Batch: {batch_id} did not complete within {timeout_seconds}s, cancelling it")
+            status = await self._cancel_batch(provider, batch_id, poll_interval_seconds)
+        if status != BatchStatus.COMPLETED:
+            logger.warning(f"Batch: {batch_id} ended with status: {status}, collecting responses of completed requests")
+
+        try:
+            response_texts: Dict[str, str] = await provider.get_results(batch_id)
+        except Exception as e:
+            logger.error(f"Failed to get results of batch: {batch_id}: {e}")
+            return {}
+        is_json_by_id = {request.custom_id: request.is_json for request in requests}
+        results: Dict[str, Union[Dict[str, Any], str]] = {}
+        for custom_id, text in response_texts.items():
+            if custom_id not in is_json_by_id:
+                continue
+            results[custom_id] = self._extract_json_from_text(text) if is_json_by_id[custom_id] else text
+        logger.info(f"Batch: {batch_id} ended with {len(results)} of {len(requests)} responses")
+        return results
+
+    async def _cancel_batch(self, provider: BatchInferenceProvider, batch_id: str, poll_interval_seconds: float) -> str:
+        """Cancel given batch and wait up to BATCH_CANCEL_TIMEOUT_SECONDS for it to stop, returns its last status."""
+        try:
+            await provider.cancel(batch_id)
+        except Exception as e:
+            logger.warning(f"Failed to cancel batch: {batch_id}: {e}")
+            return BatchStatus.IN_PROGRESS
+
+        deadline = time.monotonic() + self.BATCH_CANCEL_TIMEOUT_SECONDS
+        status = await provider.get_status(batch_id)
+        while status == BatchStatus.IN_PROGRESS and time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval_seconds)
+            status = await provider.get_status(batch_id)
+        return status
+
     # ===============================
     # Search-based Content Generation
     # ===============================
@@ -465,6 +612,7 @@ class AIService(ABC):
             AND provider = @provider
             AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP())
             AND (tenant_id IS NULL OR tenant_id = @tenant_id)
+            AND created_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {self.cache_service.retention_days} DAY)
             ORDER BY created_at DESC
             LIMIT 1
             """
@@ -0,0 +1,147 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from utils.url_utils import UrlUtils
+
+
+def url_matches_hosts(url: str, hosts: List[str]) -> bool:
+    """Returns true if host of given URL is one of given hosts or their subdomains."""
+    host = (urlsplit(url).hostname or '').lower()
+    return any(host == h or host.endswith(f".{h}") for h in hosts)
+
+
+class CacheKeyNormalizer:
+    """
+    Canonical form of an API request for the request cache.
+
+    Requests that get the same upstream response must get the same cache key, so credentials are
+    removed and parameters and URLs are canonicalized. Subclasses handle the quirks of one integration
+    and are matched by host of the request URL.
+    """
+
+    # Hosts handled by this normalizer, matched against the request host and its parent domains.
+    HOSTS: List[str] = []
+    # Lower case names of headers and params carrying credentials, never part of the key and never stored.
+    AUTH_HEADERS = {'authorization', 'api-key', 'x-api-key', 'x-rapidapi-key'}
+    AUTH_PARAMS = {'key', 'api_key', 'apikey'}
+    # Headers that do not change the response.
+    IGNORED_HEADERS = {'content-type', 'accept', 'user-agent'}
+    # Params whose list values are sets, e.g. search filters, so their order does not change the response.
+    UNORDERED_LIST_PARAMS: set = set()
+
+    def matches(self, url: str) -> bool:
+        return url_matches_hosts(url, self.HOSTS)
+
+    def normalize_url(self, url: str) -> str:
+        """Lower case scheme and host, without trailing slash or fragment and with sorted query params."""
+        parts = urlsplit(url.strip())
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+    def normalize_param(self, name: str, value: Any) -> Any:
+        """Canonical value of given param, overridden for params with known quirks."""
+        if isinstance(value, (list, tuple)):
+            values = [self.normalize_param(name, v) for v in value]
+            if name in self.UNORDERED_LIST_PARAMS:
+                values = sorted(values, key=str)
+            return values
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    def redact_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Params without credentials, as stored in the cache table."""
+        return {name: value for name, value in params.items() if name.lower() not in self.AUTH_PARAMS}
+
+    def redact_headers(self, headers: Dict[str, Any]) -> Dict[str, Any]:
+        """Headers without credentials, as stored in the cache table."""
+        return {name: value for name, value in headers.items() if name.lower() not in self.AUTH_HEADERS}
+
+    def normalize(self, url: str, params: Dict[str, Any], headers: Dict[str, Any]) -> Dict[str, Any]:
+        """Canonical request data the cache key is computed from."""
+        return {
+            'url': self.normalize_url(url),
+            'params': {
+                name: self.normalize_param(name, value)
+                for name, value in self.redact_params(params).items()
+            },
+            'headers': {
+                name.lower(): str(value).strip()
+                for name, value in self.redact_headers(headers).items()
+                if name.lower() not in self.IGNORED_HEADERS
+            }
+        }
+
+
+class ApolloCacheKeyNormalizer(CacheKeyNormalizer):
+    """Apollo search filters are sets and domains are case insensitive."""
+    HOSTS = ['apollo.io']
+    UNORDERED_LIST_PARAMS = {'person_seniorities[]', 'organization_ids[]', 'person_titles[]', 'q_organization_domains_list[]'}
+
+    def normalize_param(self, name: str, value: Any) -> Any:
+        if name == 'q_organization_domains' and isinstance(value, str):
+            return value.strip().lower()
+        return super().normalize_param(name, value)
+
+
+class ProxyCurlCacheKeyNormalizer(CacheKeyNormalizer):
+    """ProxyCurl lookups by LinkedIn URL, which has many equivalent forms."""
+    HOSTS = ['nubela.co']
+
+    def normalize_param(self, name: str, value: Any) -> Any:
+        if name == 'url' and isinstance(value, str):
+            return UrlUtils.normalize_lead_linkedin_url(value) or self.normalize_url(value)
+        return super().normalize_param(name, value)
+
+
+class BuiltWithCacheKeyNormalizer(CacheKeyNormalizer):
+    """BuiltWith passes its API key as the KEY param, and looked up domains are case insensitive."""
+    HOSTS = ['builtwith.com']
+
+    def normalize_param(self, name: str, value: Any) -> Any:
+        if name == 'LOOKUP' and isinstance(value, str):
+            return value.strip().lower()
+        return super().normalize_param(name, value)
+
+
+class RapidAPICacheKeyNormalizer(CacheKeyNormalizer):
+    """RapidAPI LinkedIn lookups by username, which is case insensitive."""
+    HOSTS = ['rapidapi.com']
+
+    def normalize_param(self, name: str, value: Any) -> Any:
+        if name == 'username' and isinstance(value, str):
+            return value.strip().strip('/').lower()
+        return super().normalize_param(name, value)
+
+
+DEFAULT_CACHE_KEY_NORMALIZER = CacheKeyNormalizer()
+
+CACHE_KEY_NORMALIZERS: List[CacheKeyNormalizer] = [
+    ApolloCacheKeyNormalizer(),
+    ProxyCurlCacheKeyNormalizer(),
+    BuiltWithCacheKeyNormalizer(),
+    RapidAPICacheKeyNormalizer(),
+]
+
+
+def register_cache_key_normalizer(normalizer: CacheKeyNormalizer) -> None:
+    """Register normalizer of a new integration, it takes precedence over the ones registered before."""
+    CACHE_KEY_NORMALIZERS.insert(0, normalizer)
+
+
+def get_cache_key_normalizer(url: str, normalizers: Optional[List[CacheKeyNormalizer]] = None) -> CacheKeyNormalizer:
+    """Returns normalizer of the integration of given URL."""
+    for normalizer in (normalizers if normalizers is not None else CACHE_KEY_NORMALIZERS):
+        if normalizer.matches(url):
+            return normalizer
+    return DEFAULT_CACHE_KEY_NORMALIZER
+
+
+def generate_cache_key(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, Any]],
+                       normalizers: Optional[List[CacheKeyNormalizer]] = None) -> str:
+    """SHA-256 cache key of the canonical form of given request."""
+    normalizer = get_cache_key_normalizer(url, normalizers)
+    cache_data = normalizer.normalize(url, params or {}, headers or {})
+    return hashlib.sha256(json.dumps(cache_data, sort_keys=True, default=str).encode()).hexdigest()
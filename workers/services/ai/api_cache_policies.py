@@ -0,0 +1,73 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Set, Tuple
+
+from services.ai.api_cache_keys import url_matches_hosts
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How responses of one integration are cached by cached_request, on top of the caller's ttl_hours.
+
+    Responses younger than ttl_hours are fresh. Older responses are served for stale_ttl_hours more
+    while a background request refreshes them. Not found and empty responses are cached for
+    negative_ttl_hours only, so that they are not requested on every job but are checked again soon.
+    """
+    hosts: List[str] = field(default_factory=list)
+    stale_ttl_hours: int = 0
+    negative_ttl_hours: int = 0
+    negative_statuses: Set[int] = field(default_factory=lambda: {404})
+    # Successful responses where all of these fields are empty are cached as negative responses.
+    empty_response_fields: Tuple[str, ...] = ()
+
+    def matches(self, url: str) -> bool:
+        return url_matches_hosts(url, self.hosts)
+
+    def is_negative(self, response_data: Any, status_code: int) -> bool:
+        """Returns true if given response is a not found or empty response."""
+        if status_code in self.negative_statuses:
+            return True
+        if status_code >= 400 or not self.empty_response_fields:
+            return False
+        if not response_data:
+            return True
+        return isinstance(response_data, dict) and not any(response_data.get(f) for f in self.empty_response_fields)
+
+    def is_cacheable(self, response_data: Any, status_code: int) -> bool:
+        """Successful responses are cached, negative ones only if the policy has a negative TTL."""
+        if self.is_negative(response_data, status_code):
+            return self.negative_ttl_hours > 0
+        return status_code < 400
+
+    def get_ttl_hours(self, response_data: Any, status_code: int, ttl_hours: Optional[int]) -> Optional[int]:
+        """Hours until given response expires and is not served anymore, None if it never expires."""
+        if self.is_negative(response_data, status_code):
+            return self.negative_ttl_hours
+        if ttl_hours is None:
+            return None
+        return ttl_hours + self.stale_ttl_hours
+
+
+# Policies of all integrations, responses of other hosts are cached for ttl_hours only.
+DEFAULT_CACHE_POLICY = CachePolicy()
+
+CACHE_POLICIES: List[CachePolicy] = [
+    # Search results of a company change slowly, pages past the last one are empty.
+    CachePolicy(hosts=['apollo.io'], stale_ttl_hours=24 * 7, negative_ttl_hours=24,
+                empty_response_fields=('people', 'contacts', 'organizations', 'accounts')),
+    # Missing LinkedIn profiles are returned as 404.
+    CachePolicy(hosts=['nubela.co'], stale_ttl_hours=24 * 7, negative_ttl_hours=24 * 3),
+    # Domains without technology data have no results.
+    CachePolicy(hosts=['builtwith.com'], stale_ttl_hours=24 * 7, negative_ttl_hours=24 * 3,
+                empty_response_fields=('Results',)),
+    # LinkedIn activities change daily.
+    CachePolicy(hosts=['rapidapi.com'], stale_ttl_hours=24, negative_ttl_hours=24),
+]
+
+
+def get_cache_policy(url: str) -> CachePolicy:
+    """Returns cache policy of the integration of given URL."""
+    for policy in CACHE_POLICIES:
+        if policy.matches(url):
+            return policy
+    return DEFAULT_CACHE_POLICY
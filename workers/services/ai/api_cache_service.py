@@ -1,11 +1,15 @@
-import hashlib
+import asyncio
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, Tuple, List
+from urllib.parse import urlsplit
 
 import httpx
 from google.cloud import bigquery
 
+from services.ai.api_cache_policies import CachePolicy, get_cache_policy
+from services.ai.api_cache_keys import CacheKeyNormalizer, generate_cache_key, get_cache_key_normalizer
+from services.ai.cache_tables import copy_legacy_cache_table, create_partitioned_cache_table, set_partition_expiration
 from services.bigquery_service import BigQueryService
 from utils.connection_pool import ConnectionPool
 from utils.async_utils import to_thread
@@ -15,13 +19,24 @@ from utils.loguru_setup import logger
 
 
 class APICacheService:
-    """Service for caching external API requests and responses."""
+    """
+    Service for caching external API requests and responses.
+
+    The cache table is partitioned by day of creation and partitions older than RETENTION_DAYS are
+    dropped by BigQuery, so lookups only scan partitions within the retention window.
+    """
+
+    # Replaces the unpartitioned cache table, see migrate_legacy_table.
+    LEGACY_TABLE_NAME = "api_request_cache"
+    # Longest TTL of cached integrations (30 days) plus their stale window, see api_cache_policies.
+    RETENTION_DAYS = 40
 
     def __init__(self, bq_client: Optional[bigquery.Client] = None, 
                  bq_service: Optional[BigQueryService] = None, 
                  project_id: Optional[str] = None, 
                  dataset: Optional[str] = None,
-                 connection_pool: Optional[ConnectionPool] = None):
+                 connection_pool: Optional[ConnectionPool] = None,
+                 key_normalizers: Optional[List[CacheKeyNormalizer]] = None):
         """
         Initialize the cache service.
 
@@ -31,6 +46,7 @@ class APICacheService:
             project_id: GCP project ID (alternative to bq_service)
             dataset: BigQuery dataset name (alternative to bq_service)
             connection_pool: Optional connection pool to use for HTTP requests
+            key_normalizers: Optional cache key normalizers per integration, defaults to api_cache_keys.CACHE_KEY_NORMALIZERS
         """
         if bq_service is not None:
             # Initialize from BigQueryService
@@ -45,7 +61,10 @@ class APICacheService:
         else:
             raise ValueError("Either bq_service or (bq_client, project_id, dataset) must be provided")
             
-        self.table_name = "api_request_cache"
+        self.table_name = "api_request_cache_v2"
+        self.retention_days = self.RETENTION_DAYS
+        self.key_normalizers = key_normalizers
+        self._table_ensured = False
 
         # Use provided connection pool or create a new one
         self.connection_pool = connection_pool or ConnectionPool(
@@ -73,33 +92,13 @@ class APICacheService:
             bigquery.SchemaField("tenant_id", "STRING"),
         ]
 
-        table_id = f"{self.project_id}.{self.dataset}.{self.table_name}"
-
-        try:
-            self.client.get_table(table_id)
-        except Exception:
-            table = bigquery.Table(table_id, schema=schema)
-            table = self.client.create_table(table)
-            logger.info(f"Created table {table_id}")
+        create_partitioned_cache_table(
+            self.client, f"{self.project_id}.{self.dataset}.{self.table_name}", schema, self.retention_days)
+        self._table_ensured = True
 
     def _generate_cache_key(self, url: str, params: Dict[str, Any], headers: Dict[str, Any]) -> str:
-        """Generate a unique cache key for the request."""
-        # Remove authentication headers from cache key generation
-        cache_headers = headers.copy()
-        cache_headers.pop('Authorization', None)
-        cache_headers.pop('api-key', None)
-        cache_headers.pop('x-api-key', None)
-
-        # Create a string combining all relevant request data
-        cache_data = {
-            'url': url,
-            'params': params,
-            'headers': cache_headers
-        }
-
-        # Generate SHA-256 hash
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        return hashlib.sha256(cache_str.encode()).hexdigest()
+        """Generate a cache key for the request, shared by all requests that get the same upstream response."""
+        return generate_cache_key(url, params, headers, self.key_normalizers)
 
     async def get_cached_response(
             self,
@@ -128,11 +127,12 @@ class APICacheService:
         cache_key = self._generate_cache_key(url, params, headers)
 
         query = f"""
-        SELECT response_data, response_status
+        SELECT response_data, response_status, created_at
         FROM `{self.project_id}.{self.dataset}.{self.table_name}`
         WHERE cache_key = @cache_key
         AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP())
         AND (tenant_id IS NULL OR tenant_id = @tenant_id)
+        AND created_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {self.retention_days} DAY)
         ORDER BY created_at DESC
         LIMIT 1
         """
@@ -150,7 +150,8 @@ class APICacheService:
         if results:
             return {
                 "data": results[0].response_data,
-                "status_code": results[0].response_status
+                "status_code": results[0].response_status,
+                "created_at": results[0].created_at
             }
 
         return None
@@ -189,6 +190,8 @@ class APICacheService:
 
         cache_key = self._generate_cache_key(url, params, headers)
         expires_at = None
+        # Credentials are not stored with the request.
+        normalizer = get_cache_key_normalizer(url, self.key_normalizers)
 
         if ttl_hours is not None:
             expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
@@ -197,8 +200,8 @@ class APICacheService:
             "cache_key": cache_key,
             "request_method": method,
             "request_url": url,
-            "request_params": json.dumps(params),
-            "request_headers": json.dumps(headers),
+            "request_params": json.dumps(normalizer.redact_params(params)),
+            "request_headers": json.dumps(normalizer.redact_headers(headers)),
             "response_data": json.dumps(response_data),
             "response_status": status_code,
             "created_at": datetime.utcnow().isoformat(),
@@ -206,6 +209,9 @@ class APICacheService:
             "tenant_id": tenant_id
         }
 
+        if not self._table_ensured:
+            await self.ensure_cache_table()
+
         # Insert row in a separate thread
         errors = await self._insert_row(row)
 
@@ -219,30 +225,113 @@ class APICacheService:
         table = self.client.get_table(f"{self.project_id}.{self.dataset}.{self.table_name}")
         return self.client.insert_rows_json(table, [row])
 
-    async def clear_expired_cache(self, days: int = 30) -> int:
+    async def rekey_cache(self, dry_run: bool = True) -> Dict[str, Dict[str, int]]:
         """
-        Clear expired cache entries and entries older than specified days.
+        Recompute cache keys of stored rows with the current key normalizers and drop stored credentials.
 
-        Args:
-            days: Age in days for cache cleanup
+        Rows of equivalent requests end up with the same key, so they are hit by every variant of the request.
+        Rows still in the streaming buffer (inserted in the last 90 minutes) can't be updated and are skipped,
+        run again later to re-key them.
 
-        Returns:
-            Number of entries cleared
-        """
-        query = f"""
-        DELETE FROM `{self.project_id}.{self.dataset}.{self.table_name}`
-        WHERE expires_at < CURRENT_TIMESTAMP()
-        OR created_at < TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days DAY)
+        Returns number of distinct old and new keys per host.
         """
+        table_id = f"{self.project_id}.{self.dataset}.{self.table_name}"
+        rows = await self._execute_query(f"""
+        SELECT DISTINCT cache_key, request_url, TO_JSON_STRING(request_params) AS request_params,
+               TO_JSON_STRING(request_headers) AS request_headers
+        FROM `{table_id}`
+        WHERE created_at < TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 90 MINUTE)
+        """, bigquery.QueryJobConfig())
+
+        mapping: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        stats: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            params = self._parse_stored_json(row.request_params)
+            headers = self._parse_stored_json(row.request_headers)
+            normalizer = get_cache_key_normalizer(row.request_url, self.key_normalizers)
+            new_key = self._generate_cache_key(row.request_url, params, headers)
+            mapping.setdefault((row.cache_key, row.request_url), {
+                "old_key": row.cache_key,
+                "request_url": row.request_url,
+                "new_key": new_key,
+                "request_params": json.dumps(normalizer.redact_params(params)),
+                "request_headers": json.dumps(normalizer.redact_headers(headers)),
+            })
+            host_stats = stats.setdefault(urlsplit(row.request_url).hostname or "", {"old_keys": set(), "new_keys": set()})
+            host_stats["old_keys"].add(row.cache_key)
+            host_stats["new_keys"].add(new_key)
+
+        counts = {
+            host: {"old_keys": len(host_stats["old_keys"]), "new_keys": len(host_stats["new_keys"])}
+            for host, host_stats in stats.items()
+        }
+        if dry_run or not mapping:
+            return counts
 
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("days", "INTEGER", days)
-            ]
+        mapping_table_id = f"{table_id}_rekey"
+        await self._load_rows(mapping_table_id, list(mapping.values()))
+        try:
+            # Same DML path as deletes, returns number of updated rows.
+            await self._execute_delete_query(f"""
+            UPDATE `{table_id}` AS t
+            SET cache_key = m.new_key,
+                request_params = PARSE_JSON(m.request_params),
+                request_headers = PARSE_JSON(m.request_headers)
+            FROM `{mapping_table_id}` AS m
+            WHERE t.cache_key = m.old_key AND t.request_url = m.request_url
+            AND t.created_at < TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 90 MINUTE)
+            """, bigquery.QueryJobConfig())
+        finally:
+            await self._drop_table(mapping_table_id)
+        return counts
+
+    @staticmethod
+    def _parse_stored_json(value: Optional[str]) -> Dict[str, Any]:
+        """Parse JSON column of a stored row, values written as JSON strings are parsed twice."""
+        parsed = json.loads(value) if value else {}
+        if isinstance(parsed, str):
+            parsed = json.loads(parsed)
+        return parsed or {}
+
+    @to_thread
+    def _load_rows(self, table_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Load rows into a new table in a separate thread, replacing its content"""
+        job_config = bigquery.LoadJobConfig(
+            schema=[
+                bigquery.SchemaField("old_key", "STRING"),
+                bigquery.SchemaField("request_url", "STRING"),
+                bigquery.SchemaField("new_key", "STRING"),
+                bigquery.SchemaField("request_params", "STRING"),
+                bigquery.SchemaField("request_headers", "STRING"),
+            ],
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE
         )
+        self.client.load_table_from_json(rows, table_id, job_config=job_config).result()
 
-        # Execute delete query in a separate thread
-        return await self._execute_delete_query(query, job_config)
+    @to_thread
+    def _drop_table(self, table_id: str) -> None:
+        """Drop given table in a separate thread"""
+        self.client.delete_table(table_id, not_found_ok=True)
+
+    @to_thread
+    def set_retention_days(self, days: int) -> None:
+        """Drop cache entries older than given days, by expiring partitions of the cache table."""
+        set_partition_expiration(self.client, f"{self.project_id}.{self.dataset}.{self.table_name}", days)
+        self.retention_days = days
+
+    @to_thread
+    def migrate_legacy_table(self, drop_legacy: bool = False) -> Optional[int]:
+        """
+        Copy unexpired entries of the unpartitioned legacy cache table into the partitioned one.
+        Returns number of copied entries, None if the legacy table doesn't exist.
+        """
+        return copy_legacy_cache_table(
+            self.client,
+            f"{self.project_id}.{self.dataset}.{self.LEGACY_TABLE_NAME}",
+            f"{self.project_id}.{self.dataset}.{self.table_name}",
+            self.retention_days,
+            drop_legacy=drop_legacy
+        )
 
     @to_thread
     def _execute_delete_query(self, query: str, job_config: bigquery.QueryJobConfig) -> int:
@@ -252,6 +341,10 @@ class APICacheService:
         return query_job.num_dml_affected_rows
 
 
+# Background refreshes of stale cache entries by cache key, so that an entry is refreshed once at a time.
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+
+
 async def cached_request(
         cache_service: APICacheService,
         url: str,
@@ -265,6 +358,10 @@ async def cached_request(
     """
     Utility function to make a cached API request asynchronously.
 
+    Responses are cached according to the cache policy of the integration (see api_cache_policies):
+    responses older than ttl_hours are still returned during the policy's stale window while a
+    background request refreshes them, and not found or empty responses are cached for a short time.
+
     Args:
         cache_service: APICacheService instance
         url: Request URL
@@ -272,12 +369,13 @@ async def cached_request(
         params: Request parameters
         headers: Request headers
         tenant_id: Optional tenant ID
-        ttl_hours: Cache TTL in hours
+        ttl_hours: Hours a response is fresh, None for never expiring
         force_refresh: Force a new request ignoring cache
 
     Returns:
         Tuple of (response_data, status_code)
     """
+    policy = get_cache_policy(url)
     if not force_refresh:
         cached = await cache_service.get_cached_response(
             url=url,
@@ -288,6 +386,7 @@ async def cached_request(
         )
 
         if cached:
+            is_stale = _is_stale(cached.get("created_at"), ttl_hours)
             logger.info(
                 "Cache hit for request",
                 extra={
@@ -295,8 +394,11 @@ async def cached_request(
                     "method": method,
                     "tenant_id": tenant_id,
                     "status_code": cached["status_code"],
+                    "stale": is_stale,
                 }
             )
+            if is_stale:
+                _refresh_in_background(cache_service, policy, url, method, params, headers, tenant_id, ttl_hours)
             return cached["data"], cached["status_code"]
 
     logger.info(
@@ -309,15 +411,65 @@ async def cached_request(
             "force_refresh": force_refresh
         }
     )
+    return await _request_and_cache(cache_service, policy, url, method, params, headers, tenant_id, ttl_hours)
+
 
+def _is_stale(created_at: Optional[datetime], ttl_hours: Optional[int]) -> bool:
+    """Returns true if a cached response created at given time is older than ttl_hours."""
+    if created_at is None or ttl_hours is None:
+        return False
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at + timedelta(hours=ttl_hours) < datetime.now(timezone.utc)
+
+
+def _refresh_in_background(
+        cache_service: APICacheService,
+        policy: CachePolicy,
+        url: str,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, Any]],
+        tenant_id: Optional[str],
+        ttl_hours: Optional[int]
+) -> None:
+    """Refresh a stale cache entry without making the caller wait, unless it is already being refreshed."""
+    cache_key = cache_service._generate_cache_key(url, params or {}, headers or {})
+    if cache_key in _refresh_tasks:
+        return
+
+    async def refresh():
+        try:
+            await _request_and_cache(cache_service, policy, url, method, params, headers, tenant_id, ttl_hours)
+        except Exception as e:
+            # The stale entry is served until it expires.
+            logger.warning(f"Background refresh of cached request to {url} failed: {str(e)}")
+        finally:
+            _refresh_tasks.pop(cache_key, None)
+
+    _refresh_tasks[cache_key] = asyncio.create_task(refresh())
+
+
+async def _request_and_cache(
+        cache_service: APICacheService,
+        policy: CachePolicy,
+        url: str,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, Any]],
+        tenant_id: Optional[str],
+        ttl_hours: Optional[int]
+) -> Tuple[Dict[str, Any], int]:
+    """Make the API request and cache its response according to given policy."""
     # Make the actual API request asynchronously using the connection pool
     try:
-        async with cache_service.connection_pool.acquire_connection() as client:
+        async with cache_service.connection_pool.acquire_connection(url) as client:
             response = await client.request(
                 method=method,
                 url=url,
                 params=params,
                 headers=headers,
+                timeout=cache_service.connection_pool.timeout,
             )
 
             response_data = response.json() if response.content else {}
@@ -343,8 +495,8 @@ async def cached_request(
                     extra=log_extra
                 )
 
-            # Cache successful responses
-            if response.status_code < 400:
+            # Cache successful responses, and not found or empty ones for a short time
+            if policy.is_cacheable(response_data, response.status_code):
                 await cache_service.cache_response(
                     url=url,
                     response_data=response_data,
@@ -353,10 +505,10 @@ async def cached_request(
                     params=params,
                     headers=headers,
                     tenant_id=tenant_id,
-                    ttl_hours=ttl_hours
+                    ttl_hours=policy.get_ttl_hours(response_data, response.status_code, ttl_hours)
                 )
 
             return response_data, response.status_code
     except Exception as e:
         logger.error(f"Error making request to {url}: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,172 @@
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.async_utils import to_thread
+from utils.loguru_setup import logger
+
+
+@dataclass
+class BatchRequest:
+    """A single prompt of an offline batch, identified by custom_id in the results."""
+    custom_id: str
+    prompt: Optional[str] = None
+    system_prompt: Optional[str] = None
+    user_prompt: Optional[str] = None
+    is_json: bool = True
+    temperature: Optional[float] = None
+    operation_tag: str = "default"
+
+
+class BatchStatus:
+    """Provider independent status of a batch job."""
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BatchInferenceProvider(ABC):
+    """
+    Submits JSONL batches of requests to a provider's batch endpoint and downloads their results.
+
+    Every JSONL line has a custom_id and a provider specific request body. Results map custom_id
+    to the text of the response, requests that failed are missing from the results.
+    """
+
+    @abstractmethod
+    async def submit(self, lines: List[Dict[str, Any]]) -> str:
+        """Submit given request lines and return ID of the batch job."""
+        pass
+
+    @abstractmethod
+    async def get_status(self, batch_id: str) -> str:
+        """Returns one of BatchStatus values."""
+        pass
+
+    @abstractmethod
+    async def get_results(self, batch_id: str) -> Dict[str, str]:
+        """Returns response text keyed by custom_id of requests of given batch that completed.
+
+        Also called for batches that were cancelled, failed or expired, which can have completed part of their requests.
+        """
+        pass
+
+    async def cancel(self, batch_id: str) -> None:
+        """Cancel given batch job, used when we stop waiting for it."""
+        pass
+
+
+class OpenAIBatchProvider(BatchInferenceProvider):
+    """OpenAI Batch API for chat completions, results are available within the completion window."""
+
+    ENDPOINT = "/v1/chat/completions"
+    COMPLETION_WINDOW = "24h"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def submit(self, lines: List[Dict[str, Any]]) -> str:
+        jsonl = "\n".join(json.dumps({
+            "custom_id": line["custom_id"],
+            "method": "POST",
+            "url": self.ENDPOINT,
+            "body": line["body"]
+        }) for line in lines)
+        input_file = await self.client.files.create(file=("requests.jsonl", jsonl.encode("utf-8")), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.ENDPOINT,
+            completion_window=self.COMPLETION_WINDOW
+        )
+        return batch.id
+
+    async def get_status(self, batch_id: str) -> str:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            return BatchStatus.COMPLETED
+        if batch.status in ("failed", "expired", "cancelled"):
+            return BatchStatus.FAILED
+        return BatchStatus.IN_PROGRESS
+
+    async def get_results(self, batch_id: str) -> Dict[str, str]:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.error_file_id:
+            errors = await self.client.files.content(batch.error_file_id)
+            logger.warning(f"Batch {batch_id} has {len([line for line in errors.text.splitlines() if line.strip()])} failed requests")
+        if not batch.output_file_id:
+            return {}
+        output = await self.client.files.content(batch.output_file_id)
+        results: Dict[str, str] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                logger.warning(f"Batch request {item.get('custom_id')} failed: {item.get('error') or response.get('status_code')}")
+                continue
+            choices = (response.get("body") or {}).get("choices") or []
+            if choices:
+                results[item["custom_id"]] = choices[0]["message"]["content"]
+        return results
+
+    async def cancel(self, batch_id: str) -> None:
+        await self.client.batches.cancel(batch_id)
+
+
+class LocalFileBatchProvider(BatchInferenceProvider):
+    """
+    File based stand-in for a provider batch endpoint, for tests and local runs.
+
+    Requests of a batch are written to <directory>/<batch_id>/input.jsonl and the batch completes once
+    <directory>/<batch_id>/output.jsonl exists, with one {"custom_id", "content"} object per line. If a
+    responder is given, it is called with every request body and the output is written on submit.
+    Cancelled batches fail once <directory>/<batch_id>/cancelled exists.
+    """
+
+    INPUT_FILE = "input.jsonl"
+    OUTPUT_FILE = "output.jsonl"
+    CANCELLED_FILE = "cancelled"
+
+    def __init__(self, directory: str, responder: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None):
+        self.directory = directory
+        self.responder = responder
+
+    async def submit(self, lines: List[Dict[str, Any]]) -> str:
+        batch_id = f"local-batch-{uuid.uuid4()}"
+        await self._write_lines(os.path.join(self.directory, batch_id, self.INPUT_FILE), lines)
+        if self.responder:
+            outputs = [{"custom_id": line["custom_id"], "content": self.responder(line["body"])} for line in lines]
+            await self._write_lines(os.path.join(self.directory, batch_id, self.OUTPUT_FILE), outputs)
+        return batch_id
+
+    async def get_status(self, batch_id: str) -> str:
+        if os.path.exists(os.path.join(self.directory, batch_id, self.OUTPUT_FILE)):
+            return BatchStatus.COMPLETED
+        if os.path.exists(os.path.join(self.directory, batch_id, self.CANCELLED_FILE)):
+            return BatchStatus.FAILED
+        return BatchStatus.IN_PROGRESS
+
+    async def get_results(self, batch_id: str) -> Dict[str, str]:
+        path = os.path.join(self.directory, batch_id, self.OUTPUT_FILE)
+        if not os.path.exists(path):
+            return {}
+        lines = await self._read_lines(path)
+        return {line["custom_id"]: line["content"] for line in lines if line.get("content") is not None}
+
+    async def cancel(self, batch_id: str) -> None:
+        await self._write_lines(os.path.join(self.directory, batch_id, self.CANCELLED_FILE), [])
+
+    @to_thread
+    def _write_lines(self, path: str, lines: List[Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.writelines(json.dumps(line) + "\n" for line in lines)
+
+    @to_thread
+    def _read_lines(self, path: str) -> List[Dict[str, Any]]:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
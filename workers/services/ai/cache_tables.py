@@ -0,0 +1,87 @@
+from typing import List, Optional
+
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+from utils.loguru_setup import logger
+
+# Cache tables are partitioned by day of creation, so that lookups only scan recent partitions and old
+# partitions are dropped by BigQuery instead of DML deletes, and clustered by the looked up key.
+CACHE_PARTITION_FIELD = "created_at"
+CACHE_CLUSTERING_FIELDS = ["cache_key"]
+
+
+def _expiration_ms(days: int) -> int:
+    return days * 24 * 60 * 60 * 1000
+
+
+def create_partitioned_cache_table(
+        client: bigquery.Client,
+        table_id: str,
+        schema: List[bigquery.SchemaField],
+        retention_days: int
+) -> None:
+    """Create given cache table partitioned by creation day and clustered by cache key if it doesn't exist."""
+    try:
+        client.get_table(table_id)
+        return
+    except NotFound:
+        pass
+
+    table = bigquery.Table(table_id, schema=schema)
+    table.time_partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field=CACHE_PARTITION_FIELD,
+        expiration_ms=_expiration_ms(retention_days)
+    )
+    table.clustering_fields = CACHE_CLUSTERING_FIELDS
+    client.create_table(table, exists_ok=True)
+    logger.info(f"Created table {table_id} with partitions expiring after {retention_days} days")
+
+
+def set_partition_expiration(client: bigquery.Client, table_id: str, retention_days: int) -> None:
+    """Set expiration of partitions of given cache table, a metadata change that doesn't scan the table."""
+    table = client.get_table(table_id)
+    table.time_partitioning.expiration_ms = _expiration_ms(retention_days)
+    client.update_table(table, ["time_partitioning"])
+
+
+def copy_legacy_cache_table(
+        client: bigquery.Client,
+        legacy_table_id: str,
+        table_id: str,
+        retention_days: int,
+        drop_legacy: bool = False
+) -> Optional[int]:
+    """
+    Copy unexpired rows of an unpartitioned legacy cache table into its partitioned replacement.
+
+    Rows already copied are skipped, so the copy can run before services switch to the partitioned table
+    and again after, to pick up rows they cached in the legacy table in between.
+    Returns number of copied rows, None if there is no legacy table.
+    """
+    try:
+        client.get_table(legacy_table_id)
+    except NotFound:
+        return None
+
+    columns = [field.name for field in client.get_table(table_id).schema]
+    query_job = client.query(f"""
+    INSERT INTO `{table_id}` ({", ".join(columns)})
+    SELECT {", ".join(f"l.{column}" for column in columns)}
+    FROM `{legacy_table_id}` AS l
+    WHERE (l.expires_at IS NULL OR l.expires_at > CURRENT_TIMESTAMP())
+    AND l.{CACHE_PARTITION_FIELD} > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {retention_days} DAY)
+    AND NOT EXISTS (
+        SELECT 1 FROM `{table_id}` AS t
+        WHERE t.cache_key = l.cache_key AND t.{CACHE_PARTITION_FIELD} = l.{CACHE_PARTITION_FIELD}
+    )
+    """)
+    query_job.result()
+    copied_rows = query_job.num_dml_affected_rows or 0
+    logger.info(f"Copied {copied_rows} rows from {legacy_table_id} to {table_id}")
+
+    if drop_legacy:
+        client.delete_table(legacy_table_id, not_found_ok=True)
+        logger.info(f"Dropped legacy cache table {legacy_table_id}")
+    return copied_rows
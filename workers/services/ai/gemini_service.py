@@ -13,6 +13,7 @@ from utils.token_usage import TokenUsage
 from utils.loguru_setup import logger
 from services.ai.ai_cache_service import AICacheService
 from services.ai.ai_service_base import AIService, ThinkingBudget
+from services.ai.prompt_prefix_cache import PromptPrefixCache
 
 # Retry configurations
 GEMINI_RETRY_CONFIG = RetryConfig(
@@ -33,6 +34,12 @@ GEMINI_RETRY_CONFIG = RetryConfig(
 class GeminiService(AIService):
     """Gemini implementation of AI service."""
 
+    # Cached system prompts shared by all instances in the process, keyed by cache scope, model and operation.
+    _prefix_cache = PromptPrefixCache()
+    PREFIX_CACHE_TTL_SECONDS = 60 * 60
+    # Gemini does not cache prompts below this size, so smaller prefixes are always sent in full.
+    MIN_PREFIX_CACHE_TOKENS = 1024
+
     def __init__(
             self,
             model_name: Optional[str] = None,
@@ -75,6 +82,14 @@ class GeminiService(AIService):
                 isinstance(error, GoogleAPIResourceExhausted)
         )
 
+    @staticmethod
+    def _is_cached_content_unavailable(error: Exception) -> bool:
+        """Check if error indicates the cached content of a request was deleted or has expired."""
+        if getattr(error, 'code', None) == 404:
+            return True
+        error_str = str(error).lower()
+        return 'cache' in error_str and ('not found' in error_str or 'expired' in error_str)
+
     # ===============================
     # Core Content Generation Methods
     # ===============================
@@ -88,7 +103,8 @@ class GeminiService(AIService):
             temperature: Optional[float] = None,
             thinking_budget: Optional[ThinkingBudget] = None,
             system_prompt: Optional[str] = None,
-            user_prompt: Optional[str] = None
+            user_prompt: Optional[str] = None,
+            cache_scope: Optional[str] = None
     ) -> Tuple[Union[Dict[str, Any], str], TokenUsage]:
         """Generate content using Gemini without using cache.
 
@@ -97,6 +113,10 @@ class GeminiService(AIService):
         2. Structured mode: Pass separate system_prompt and user_prompt parameters
 
         If both methods are used, structured mode takes precedence.
+
+        With cache_scope in structured mode, the system prompt is stored as Gemini cached content and
+        only the user prompt is sent. If the cached content cannot be created or used, the combined
+        prompt is sent instead.
         """
         try:
             # Create config for the API call
@@ -130,12 +150,21 @@ class GeminiService(AIService):
             if is_json:
                 config_params['response_mime_type'] = 'application/json'
 
+            cached_content: Optional[str] = None
+            if cache_scope and system_prompt:
+                cached_content = await self._get_cached_system_prompt(
+                    cache_scope=cache_scope, operation_tag=operation_tag, system_prompt=system_prompt)
+
             response = None
             max_attempts = 3
             # Try multiple times before falling back
             for i in range(max_attempts):
                 try:
-                    response = await self._generate_content_in_thread(final_prompt, config_params, thinking_budget)
+                    if cached_content:
+                        response = await self._generate_content_in_thread(
+                            user_prompt or "", {**config_params, 'cached_content': cached_content}, thinking_budget)
+                    else:
+                        response = await self._generate_content_in_thread(final_prompt, config_params, thinking_budget)
                     if response and hasattr(response, 'text') and response.text is not None:
                         # Success with primary model
                         break
@@ -143,6 +172,10 @@ class GeminiService(AIService):
                 except Exception as e:
                     logger.warning(f"Error in generate_content_in_thread (attempt {i+1}): {e}")
                     response = None
+                    if cached_content and self._is_cached_content_unavailable(e):
+                        # Cached content has expired or was deleted, send the full prompt from now on.
+                        await self._prefix_cache.invalidate(cache_scope, delete=self._delete_cached_content, handle=cached_content)
+                        cached_content = None
 
                     # If it's a fallback-worthy error on the last attempt, try fallback
                     if i == (max_attempts - 1) and (self._should_fallback(e) or not response):
@@ -169,6 +202,10 @@ class GeminiService(AIService):
 
             response_text = response.text
             logger.debug(f"Gemini response: {response}")
+            if cached_content:
+                usage_metadata = getattr(response, 'usage_metadata', None)
+                logger.debug(f"Gemini cached prompt tokens: {getattr(usage_metadata, 'cached_content_token_count', None)}, "
+                             f"operation: {operation_tag}")
 
             # Estimate token usage based on character count
             try:
@@ -207,6 +244,39 @@ class GeminiService(AIService):
             token_usage = self._create_token_usage(0, 0, operation_tag)
             return {} if is_json else "", token_usage
 
+    async def invalidate_prompt_cache(self, cache_scope: str) -> None:
+        """Delete cached system prompts of given scope, e.g. after the product was edited."""
+        await self._prefix_cache.invalidate(cache_scope, delete=self._delete_cached_content)
+
+    async def _get_cached_system_prompt(self, cache_scope: str, operation_tag: str, system_prompt: str) -> Optional[str]:
+        """Returns name of Gemini cached content with given system prompt, or None if it is too small or cannot be cached."""
+        if len(system_prompt) // self.avg_chars_per_token < self.MIN_PREFIX_CACHE_TOKENS:
+            return None
+        return await self._prefix_cache.get_handle(
+            key=(cache_scope, self.model, operation_tag),
+            prefix=system_prompt,
+            ttl_seconds=self.PREFIX_CACHE_TTL_SECONDS,
+            create=self._create_cached_content,
+            delete=self._delete_cached_content
+        )
+
+    @to_thread
+    def _create_cached_content(self, system_prompt: str) -> Optional[str]:
+        """Store given system prompt as Gemini cached content and return its name."""
+        cached_content = self.client.caches.create(
+            model=self.model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_prompt,
+                ttl=f"{self.PREFIX_CACHE_TTL_SECONDS}s"
+            )
+        )
+        logger.debug(f"Created Gemini cached content: {cached_content.name} for model: {self.model}")
+        return cached_content.name
+
+    @to_thread
+    def _delete_cached_content(self, name: str) -> None:
+        self.client.caches.delete(name=name)
+
     # ===============================
     # Search-based Content Generation
     # ===============================
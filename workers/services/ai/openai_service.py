@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 from typing import Dict, Any, Optional, Union, Tuple, List
@@ -10,6 +11,7 @@ from utils.token_usage import TokenUsage
 from utils.loguru_setup import logger
 from services.ai.ai_cache_service import AICacheService
 from services.ai.ai_service_base import AIService, ThinkingBudget
+from services.ai.batch_inference import BatchInferenceProvider, BatchRequest, OpenAIBatchProvider
 
 # Retry configurations
 OPENAI_RETRY_CONFIG = RetryConfig(
@@ -76,7 +78,8 @@ class OpenAIService(AIService):
             temperature: Optional[float] = None,
             thinking_budget: Optional[ThinkingBudget] = None,
             system_prompt: Optional[str] = None,
-            user_prompt: Optional[str] = None
+            user_prompt: Optional[str] = None,
+            cache_scope: Optional[str] = None
     ) -> Tuple[Union[Dict[str, Any], str], TokenUsage]:
         """Generate content using OpenAI without using cache.
         
@@ -85,37 +88,13 @@ class OpenAIService(AIService):
         2. Structured mode: Pass separate system_prompt and user_prompt parameters
         
         If both methods are used, structured mode takes precedence.
+
+        OpenAI caches long prompt prefixes automatically. The system prompt always comes first, and
+        with cache_scope a prompt_cache_key is sent so that calls of the same scope are routed to the
+        same cache.
         """
         try:
-            # Determine which mode to use based on parameters
-            if system_prompt is not None or user_prompt is not None:
-                # Structured mode - build messages from system and user prompts
-                messages = []
-                
-                # Add system message if provided or if we need JSON
-                if system_prompt is not None:
-                    messages.append({"role": "system", "content": system_prompt})
-                elif is_json:
-                    messages.append({
-                        "role": "system",
-                        "content": "You are a helpful assistant that responds only in valid JSON format."
-                    })
-                
-                # Add user message if provided
-                if user_prompt is not None:
-                    messages.append({"role": "user", "content": user_prompt})
-            else:
-                # Legacy mode - use the prompt parameter
-                messages = [
-                    {"role": "user", "content": prompt}
-                ]
-
-                # Add system message for JSON responses
-                if is_json:
-                    messages.insert(0, {
-                        "role": "system",
-                        "content": "You are a helpful assistant that responds only in valid JSON format."
-                    })
+            messages = self._build_messages(prompt=prompt, is_json=is_json, system_prompt=system_prompt, user_prompt=user_prompt)
 
             # Configure response format for JSON if needed
             response_format = {"type": "json_object"} if is_json else None
@@ -123,13 +102,21 @@ class OpenAIService(AIService):
             # Use provided temperature or default
             used_temperature = temperature if temperature is not None else self.default_temperature
 
+            # Not a named parameter in this version of the client, so it is sent in the request body.
+            extra_body = {"prompt_cache_key": self._get_prompt_cache_key(cache_scope, operation_tag)} if cache_scope else None
+
             response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 response_format=response_format,
-                temperature=used_temperature
+                temperature=used_temperature,
+                extra_body=extra_body
             )
             logger.debug(f"OpenAI response: {response}")
+            if cache_scope and response.usage:
+                prompt_tokens_details = getattr(response.usage, "prompt_tokens_details", None)
+                logger.debug(f"OpenAI cached prompt tokens: {getattr(prompt_tokens_details, 'cached_tokens', None)}, "
+                             f"operation: {operation_tag}")
 
             if not response.choices:
                 logger.warning("Empty response from OpenAI")
@@ -166,6 +153,69 @@ class OpenAIService(AIService):
             token_usage = self._create_token_usage(0, 0, operation_tag)
             return {} if is_json else "", token_usage
 
+    @staticmethod
+    def _build_messages(
+            prompt: Optional[str],
+            is_json: bool,
+            system_prompt: Optional[str] = None,
+            user_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Chat messages of given prompt, structured mode takes precedence over the legacy prompt."""
+        # Determine which mode to use based on parameters
+        if system_prompt is not None or user_prompt is not None:
+            # Structured mode - build messages from system and user prompts
+            messages = []
+
+            # Add system message if provided or if we need JSON
+            if system_prompt is not None:
+                messages.append({"role": "system", "content": system_prompt})
+            elif is_json:
+                messages.append({
+                    "role": "system",
+                    "content": "You are a helpful assistant that responds only in valid JSON format."
+                })
+
+            # Add user message if provided
+            if user_prompt is not None:
+                messages.append({"role": "user", "content": user_prompt})
+        else:
+            # Legacy mode - use the prompt parameter
+            messages = [
+                {"role": "user", "content": prompt}
+            ]
+
+            # Add system message for JSON responses
+            if is_json:
+                messages.insert(0, {
+                    "role": "system",
+                    "content": "You are a helpful assistant that responds only in valid JSON format."
+                })
+        return messages
+
+    # ===============================
+    # Offline Batch Generation
+    # ===============================
+
+    def _get_batch_provider(self) -> Optional[BatchInferenceProvider]:
+        """OpenAI Batch API, unless the local stand-in is selected."""
+        return super()._get_batch_provider() or OpenAIBatchProvider(self.client)
+
+    def _build_batch_request_body(self, request: BatchRequest) -> Dict[str, Any]:
+        """Chat completion request body, same as sent by _generate_content_without_cache."""
+        body = {
+            "model": self.model,
+            "messages": self._build_messages(
+                prompt=request.prompt, is_json=request.is_json, system_prompt=request.system_prompt, user_prompt=request.user_prompt),
+            "temperature": request.temperature if request.temperature is not None else self.default_temperature
+        }
+        if request.is_json:
+            body["response_format"] = {"type": "json_object"}
+        return body
+
+    def _get_prompt_cache_key(self, cache_scope: str, operation_tag: str) -> str:
+        """Stable key of given cache scope and operation, hashed since scopes contain tenant IDs."""
+        return hashlib.sha256(f"{cache_scope}:{self.model}:{operation_tag}".encode()).hexdigest()[:32]
+
     # ===============================
     # Search-based Content Generation
     # ===============================
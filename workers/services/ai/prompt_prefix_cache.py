@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.loguru_setup import logger
+
+# Key of a cached prefix: cache scope (e.g. tenant and product), model and operation tag.
+PrefixCacheKey = Tuple[str, str, str]
+
+
+@dataclass
+class PrefixCacheEntry:
+    """Provider handle of a cached prompt prefix."""
+    prefix_hash: str
+    # None when the provider could not cache the prefix, so that we do not retry on every call.
+    handle: Optional[str]
+    expires_at: float
+
+
+class PromptPrefixCache:
+    """
+    Tracks provider side caches of static prompt prefixes (instructions, product description and personas).
+
+    Handles are reused by every call with the same key and prefix until they expire. When the prefix of
+    a key changes, e.g. after the product description was edited, the old handle is deleted with the
+    provider and replaced. Concurrent calls for the same key wait for a single cache to be created.
+    """
+
+    # Handles are refreshed this many seconds before the provider expires them, so in-flight calls can use them.
+    EXPIRY_MARGIN_SECONDS = 60
+
+    def __init__(self):
+        self._entries: Dict[PrefixCacheKey, PrefixCacheEntry] = {}
+        self._locks: Dict[PrefixCacheKey, asyncio.Lock] = {}
+
+    async def get_handle(
+            self,
+            key: PrefixCacheKey,
+            prefix: str,
+            ttl_seconds: int,
+            create: Callable[[str], Awaitable[Optional[str]]],
+            delete: Callable[[str], Awaitable[None]]
+    ) -> Optional[str]:
+        """Returns handle of given prefix for given key, creating it with the provider if needed."""
+        prefix_hash = hashlib.sha256(prefix.encode()).hexdigest()
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = self._entries.get(key)
+            if entry and entry.prefix_hash == prefix_hash and entry.expires_at > time.time():
+                return entry.handle
+
+            if entry and entry.handle and entry.prefix_hash != prefix_hash:
+                logger.debug(f"Prompt prefix changed for scope: {key[0]}, operation: {key[2]}, deleting cached prefix")
+                await self._delete_quietly(entry.handle, delete)
+
+            handle: Optional[str] = None
+            try:
+                handle = await create(prefix)
+            except Exception as e:
+                logger.warning(f"Failed to cache prompt prefix for scope: {key[0]}, operation: {key[2]}: {e}")
+
+            self._entries[key] = PrefixCacheEntry(
+                prefix_hash=prefix_hash,
+                handle=handle,
+                expires_at=time.time() + max(ttl_seconds - self.EXPIRY_MARGIN_SECONDS, 0)
+            )
+            return handle
+
+    async def invalidate(self, cache_scope: str, delete: Callable[[str], Awaitable[None]], handle: Optional[str] = None):
+        """Drop cached prefixes of given scope, or only given handle if provided, and delete them with the provider."""
+        for key, entry in list(self._entries.items()):
+            if key[0] != cache_scope or (handle is not None and entry.handle != handle):
+                continue
+            self._entries.pop(key, None)
+            if entry.handle:
+                await self._delete_quietly(entry.handle, delete)
+
+    @staticmethod
+    async def _delete_quietly(handle: str, delete: Callable[[str], Awaitable[None]]):
+        try:
+            await delete(handle)
+        except Exception as e:
+            # Provider expires the cache on its own.
+            logger.debug(f"Failed to delete cached prompt prefix: {handle}: {e}")
@@ -1,8 +1,11 @@
+import asyncio
 import json
 import os
+import threading
+import time
 import uuid
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 
 from google.cloud import bigquery
 from google.oauth2 import service_account
@@ -14,38 +17,158 @@ from utils.loguru_setup import logger
 
 
 
+class BigQueryRowWriter:
+    """
+    Write buffer of a single caller, e.g. one job, created with BigQueryService.row_writer().
+
+    Rows are inserted together once the buffer of a table reaches MAX_BUFFERED_ROWS rows, MAX_BUFFERED_BYTES
+    bytes or is older than MAX_BUFFER_AGE_SECONDS of the service. Used as an async context manager, remaining
+    rows are written when the block exits without an error.
+    """
+
+    def __init__(self, bq_service: 'BigQueryService'):
+        self._bq_service = bq_service
+        # Rows waiting to be written per table, with the time the oldest row was buffered.
+        self._row_buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._buffer_bytes: Dict[str, int] = {}
+        self._buffer_started_at: Dict[str, float] = {}
+        self._flush_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> 'BigQueryRowWriter':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
+
+    async def add(self, table_name: str, row: Dict[str, Any]) -> None:
+        """Add a row to the buffer of given table, writing the buffer if it is full or too old."""
+        rows = self._row_buffers.setdefault(table_name, [])
+        if not rows:
+            self._buffer_started_at[table_name] = time.monotonic()
+        rows.append(row)
+        self._buffer_bytes[table_name] = self._buffer_bytes.get(table_name, 0) + len(json.dumps(row, default=str))
+
+        if (len(rows) >= self._bq_service.MAX_BUFFERED_ROWS
+                or self._buffer_bytes[table_name] >= self._bq_service.MAX_BUFFERED_BYTES
+                or time.monotonic() - self._buffer_started_at[table_name] >= self._bq_service.MAX_BUFFER_AGE_SECONDS):
+            await self.flush(table_name)
+
+    async def flush(self, table_name: Optional[str] = None) -> None:
+        """
+        Write buffered rows of given table, or of all tables if no table is given.
+
+        Rows are removed from the buffer only once their insert succeeded, so rows of a failed insert
+        and the ones after it are written by the next flush.
+
+        Raises:
+            Exception: If the insert fails or BigQuery rejects any of the rows.
+        """
+        async with self._flush_lock:
+            table_names = [table_name] if table_name else list(self._row_buffers.keys())
+            for name in table_names:
+                rows = self._row_buffers.get(name)
+                if not rows:
+                    continue
+                num_written = 0
+                try:
+                    for chunk in self._bq_service._split_rows_for_insert(rows):
+                        # BigQuery inserts none of the rows of a request if any row is invalid.
+                        chunk_errors = await self._bq_service._insert_rows(name, chunk)
+                        if chunk_errors:
+                            error_messages = '; '.join(str(error) for error in chunk_errors)
+                            raise Exception(f"BigQuery insert errors: {error_messages}")
+                        num_written += len(chunk)
+                finally:
+                    del rows[:num_written]
+                    if rows:
+                        self._buffer_bytes[name] = sum(len(json.dumps(row, default=str)) for row in rows)
+                    else:
+                        self._row_buffers.pop(name, None)
+                        self._buffer_bytes.pop(name, None)
+                        self._buffer_started_at.pop(name, None)
+                logger.debug(f"Flushed {num_written} buffered rows to {name}")
+
+
 class BigQueryService:
     """Service class for handling BigQuery operations for account enrichment data."""
 
+    # Streaming insert limits recommended by BigQuery are 500 rows and 10MB per request.
+    MAX_BUFFERED_ROWS = 500
+    MAX_BUFFERED_BYTES = 5 * 1024 * 1024
+    # Buffered rows older than this are flushed on the next buffered write.
+    MAX_BUFFER_AGE_SECONDS = 5.0
+
+    # Clients and table references are shared by all service instances in the process.
+    _clients: Dict[Tuple[Optional[str], Optional[str]], bigquery.Client] = {}
+    _table_refs: Dict[str, bigquery.TableReference] = {}
+    _clients_lock = threading.Lock()
+
     def __init__(self):
         """Initialize BigQuery client and configuration."""
-        service_account_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
         self.project = os.getenv('GOOGLE_CLOUD_PROJECT')
+        self.client = self._get_shared_client(os.getenv('GOOGLE_APPLICATION_CREDENTIALS'), self.project)
+        self.dataset = os.getenv('BIGQUERY_DATASET', 'userport_enrichment')
 
-        if service_account_path and os.path.exists(service_account_path) and self.project:
-            # Initialize credentials from service account file
-            credentials = service_account.Credentials.from_service_account_file(
-                service_account_path,
-                scopes=["https://www.googleapis.com/auth/cloud-platform"]
-            )
-
-            # Initialize BigQuery client with explicit credentials
-            self.client = bigquery.Client(
-                credentials=credentials,
-                project=self.project,
-                location='US'
-            )
-        else:
-            self.client = bigquery.Client(project=self.project,
-                                          location='US')
+    @classmethod
+    def _get_shared_client(cls, service_account_path: Optional[str], project: Optional[str]) -> bigquery.Client:
+        """Get BigQuery client for given credentials and project, created once per process."""
+        key = (service_account_path, project)
+        with cls._clients_lock:
+            client = cls._clients.get(key)
+            if client is not None:
+                return client
+
+            if service_account_path and os.path.exists(service_account_path) and project:
+                # Initialize credentials from service account file
+                credentials = service_account.Credentials.from_service_account_file(
+                    service_account_path,
+                    scopes=["https://www.googleapis.com/auth/cloud-platform"]
+                )
+
+                # Initialize BigQuery client with explicit credentials
+                client = bigquery.Client(
+                    credentials=credentials,
+                    project=project,
+                    location='US'
+                )
+            else:
+                client = bigquery.Client(project=project,
+                                         location='US')
 
-        self.dataset = os.getenv('BIGQUERY_DATASET', 'userport_enrichment')
+            cls._clients[key] = client
+            return client
 
     def _get_table_ref(self, table_name: str) -> str:
         """Get fully qualified table reference."""
         return f"{self.project}.{self.dataset}.{table_name}"
 
+    def _get_table_reference(self, table_name: str) -> bigquery.TableReference:
+        """
+        Get cached reference to given table.
+
+        Streaming inserts of JSON rows only need the table path, so the table metadata
+        is not fetched before every insert.
+        """
+        table_id = self._get_table_ref(table_name)
+        table_reference = self._table_refs.get(table_id)
+        if table_reference is None:
+            table_reference = bigquery.TableReference.from_string(table_id)
+            self._table_refs[table_id] = table_reference
+        return table_reference
+
     # Account Data Operations
+    #
+    # account_data is append-only: every write appends a partial row with only the fields that were
+    # found, and the current state of an account is merged from all its rows on read. The table is
+    # partitioned by fetched_at and clustered by account_id (see scripts/bigquery_setup.sh, tables created
+    # before are rebuilt by scripts/migrate_account_data_partitioning.py), so a read is a single clustered lookup. Old rows are periodically compacted into one row per account.
+    ACCOUNT_DATA_TABLE = 'account_data'
+    ACCOUNT_DATA_JSON_FIELDS = ['funding_details', 'raw_data', 'last_error']
+    ACCOUNT_DATA_REPEATED_FIELDS = ['industry', 'technologies']
+    # Rows younger than this can still be in the streaming buffer, where DML cannot delete them.
+    COMPACTION_MIN_ROW_AGE_HOURS = 2
+
     async def insert_account_data(
             self,
             account_id: str,
@@ -54,12 +177,8 @@ class BigQueryService:
             is_partial: bool = False,
             error_info: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Store enriched account data using insert-only approach."""
+        """Append enriched account data as a partial row and return its record ID. Existing rows are never read."""
         try:
-            # Get existing data first
-            existing_data = await self._get_existing_account_data(account_id)
-
-            # Generate new record
             record_id = str(uuid.uuid4())
             current_time = datetime.utcnow()
 
@@ -81,85 +200,215 @@ class BigQueryService:
                 'last_attempt': current_time.isoformat()
             })
 
-            # Merge with existing data if available
-            if existing_data:
-                final_row = self._merge_account_data(existing_data, new_row)
-            else:
-                final_row = new_row
-
-            # Always insert as new row
-            errors = await self._insert_row('account_data', final_row)
+            errors = await self._insert_row(self.ACCOUNT_DATA_TABLE, self._to_partial_account_row(new_row))
             if errors:
                 error_messages = '; '.join(str(error) for error in errors)
                 raise Exception(f"BigQuery insert errors: {error_messages}")
 
+            return record_id
+
         except Exception as e:
             logger.error(f"Error storing enrichment data in BigQuery: {str(e)}")
             raise
 
-    @to_thread
-    def _insert_row(self, table_name: str, row: Dict[str, Any]) -> List[Any]:
-        """Insert a row into a BigQuery table in a separate thread"""
-        table = self.client.get_table(self._get_table_ref(table_name))
-        return self.client.insert_rows_json(table, [row])
-
-    async def _get_existing_account_data(self, account_id: str) -> Dict[str, Any]:
-        """Retrieve existing account data if it exists."""
+    def _to_partial_account_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop fields without a value so that they do not overwrite values from earlier rows on read."""
+        partial_row = {}
+        for field, value in row.items():
+            if value is None or value == 'null':
+                continue
+            if field in self.ACCOUNT_DATA_REPEATED_FIELDS and not value:
+                continue
+            partial_row[field] = value
+        return partial_row
+
+    async def get_account_data(self, account_id: str) -> Dict[str, Any]:
+        """Get current account data merged from all rows of the account, empty dict if there is none."""
         try:
-            query = """
-            WITH RankedData AS (
-                SELECT *,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY account_id 
-                        ORDER BY fetched_at DESC, record_id DESC
-                    ) as rn
-                FROM `{}.{}.account_data`
-                WHERE account_id = @account_id
-            )
-            SELECT * EXCEPT (rn)
-            FROM RankedData
-            WHERE rn = 1
-            """.format(self.project, self.dataset)
-
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("account_id", "STRING", account_id)
-                ]
-            )
-
-            # Execute query in a separate thread
-            results = await self._execute_query(query, job_config)
-
-            if not results:
+            rows = await self._get_account_data_rows(account_id)
+            if not rows:
                 logger.debug(f"No existing data found for account_id: {account_id}")
                 return {}
 
-            # Convert BigQuery Row to dict and handle array/JSON fields
-            row_dict = dict(results[0])
-
-            # Handle repeated string fields
-            if 'industry' in row_dict:
-                row_dict['industry'] = list(row_dict['industry']) if row_dict['industry'] else []
-            if 'technologies' in row_dict:
-                row_dict['technologies'] = list(row_dict['technologies']) if row_dict['technologies'] else []
-
-            # Handle JSON fields
-            json_fields = ['funding_details', 'raw_data', 'last_error']
-            for field in json_fields:
-                if field in row_dict and row_dict[field]:
-                    try:
-                        if isinstance(row_dict[field], str):
-                            row_dict[field] = json.loads(row_dict[field])
-                    except json.JSONDecodeError:
-                        logger.warning(f"Could not parse {field} as JSON for account_id: {account_id}")
-                        row_dict[field] = None
-
-            return row_dict
+            return self._merge_account_rows(rows)
 
         except Exception as e:
             logger.error(f"Error retrieving account data from BigQuery: {str(e)}")
             return {}
 
+    async def _get_account_data_rows(
+            self,
+            account_id: str,
+            fetched_before: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all rows of given account, oldest first."""
+        query = """
+        SELECT *
+        FROM `{}.{}.{}`
+        WHERE account_id = @account_id
+        {}
+        ORDER BY fetched_at ASC, record_id ASC
+        """.format(
+            self.project,
+            self.dataset,
+            self.ACCOUNT_DATA_TABLE,
+            "AND fetched_at < @fetched_before" if fetched_before else ""
+        )
+
+        query_parameters = [bigquery.ScalarQueryParameter("account_id", "STRING", account_id)]
+        if fetched_before:
+            query_parameters.append(bigquery.ScalarQueryParameter("fetched_before", "TIMESTAMP", fetched_before))
+
+        results = await self._execute_query(query, bigquery.QueryJobConfig(query_parameters=query_parameters))
+        return [self._parse_account_row(dict(row)) for row in results]
+
+    def _parse_account_row(self, row_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert BigQuery Row of account data to dict with lists and parsed JSON fields."""
+        # Handle repeated string fields
+        for field in self.ACCOUNT_DATA_REPEATED_FIELDS:
+            if field in row_dict:
+                row_dict[field] = list(row_dict[field]) if row_dict[field] else []
+
+        # Handle JSON fields
+        for field in self.ACCOUNT_DATA_JSON_FIELDS:
+            if field in row_dict and row_dict[field]:
+                try:
+                    if isinstance(row_dict[field], str):
+                        row_dict[field] = json.loads(row_dict[field])
+                except json.JSONDecodeError:
+                    logger.warning(f"Could not parse {field} as JSON for account_id: {row_dict.get('account_id')}")
+                    row_dict[field] = None
+
+        # Timestamps are compared and re-inserted as ISO strings like in newly prepared rows.
+        for field in ['fetched_at', 'last_successful_update', 'last_attempt']:
+            if isinstance(row_dict.get(field), datetime):
+                row_dict[field] = row_dict[field].isoformat()
+
+        return row_dict
+
+    def _merge_account_rows(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge rows of an account ordered oldest first, preferring newer non-null values."""
+        merged = rows[0]
+        for row in rows[1:]:
+            merged = self._merge_account_data(merged, row)
+            merged['record_id'] = row['record_id']
+        return self._parse_account_row(merged)
+
+    async def get_account_ids_to_compact(self, min_rows: int = 5, limit: int = 1000) -> List[str]:
+        """Get accounts with at least min_rows rows old enough to be compacted."""
+        query = """
+        SELECT account_id
+        FROM `{}.{}.{}`
+        WHERE fetched_at < TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @min_row_age_hours HOUR)
+        GROUP BY account_id
+        HAVING COUNT(*) >= @min_rows
+        LIMIT @limit
+        """.format(self.project, self.dataset, self.ACCOUNT_DATA_TABLE)
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("min_row_age_hours", "INT64", self.COMPACTION_MIN_ROW_AGE_HOURS),
+                bigquery.ScalarQueryParameter("min_rows", "INT64", min_rows),
+                bigquery.ScalarQueryParameter("limit", "INT64", limit)
+            ]
+        )
+
+        results = await self._execute_query(query, job_config)
+        return [row['account_id'] for row in results]
+
+    async def compact_account_data(self, account_id: str) -> int:
+        """
+        Replace old rows of given account with a single merged row and return the number of rows removed.
+
+        Only rows older than COMPACTION_MIN_ROW_AGE_HOURS are compacted. The merged row keeps the latest
+        fetched_at of the rows it replaces, so rows appended later still take precedence on read. The
+        insert and delete run in one transaction so readers never see both or neither.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=self.COMPACTION_MIN_ROW_AGE_HOURS)
+        rows = await self._get_account_data_rows(account_id, fetched_before=cutoff)
+        if len(rows) < 2:
+            return 0
+
+        merged = self._to_partial_account_row(self._merge_account_rows(rows))
+        merged['record_id'] = str(uuid.uuid4())
+        columns = list(merged.keys())
+
+        query_parameters = [
+            bigquery.ArrayQueryParameter("compacted_record_ids", "STRING", [row['record_id'] for row in rows]),
+            bigquery.ScalarQueryParameter("account_id", "STRING", account_id),
+        ]
+        values = []
+        for column in columns:
+            value = merged[column]
+            if column in self.ACCOUNT_DATA_JSON_FIELDS:
+                values.append(f"PARSE_JSON(@{column})")
+                query_parameters.append(bigquery.ScalarQueryParameter(column, "STRING", safe_json_dumps(value)))
+            elif column in self.ACCOUNT_DATA_REPEATED_FIELDS:
+                values.append(f"@{column}")
+                query_parameters.append(bigquery.ArrayQueryParameter(column, "STRING", value))
+            elif column in ['fetched_at', 'last_successful_update', 'last_attempt']:
+                values.append(f"TIMESTAMP(@{column})")
+                query_parameters.append(bigquery.ScalarQueryParameter(column, "STRING", value))
+            else:
+                values.append(f"@{column}")
+                query_parameters.append(bigquery.ScalarQueryParameter(column, self._get_scalar_param_type(value), value))
+
+        table = f"`{self.project}.{self.dataset}.{self.ACCOUNT_DATA_TABLE}`"
+        query = f"""
+        BEGIN TRANSACTION;
+        DELETE FROM {table}
+        WHERE account_id = @account_id AND record_id IN UNNEST(@compacted_record_ids);
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(values)});
+        COMMIT TRANSACTION;
+        """
+
+        await self._execute_query(query, bigquery.QueryJobConfig(query_parameters=query_parameters))
+        logger.info(f"Compacted {len(rows)} account data rows for account_id: {account_id}")
+        return len(rows)
+
+    @staticmethod
+    def _get_scalar_param_type(value: Any) -> str:
+        if isinstance(value, bool):
+            return "BOOL"
+        if isinstance(value, int):
+            return "INT64"
+        if isinstance(value, float):
+            return "FLOAT64"
+        return "STRING"
+
+    async def _insert_row(self, table_name: str, row: Dict[str, Any]) -> List[Any]:
+        """Insert a row into a BigQuery table in a separate thread"""
+        return await self._insert_rows(table_name, [row])
+
+    @to_thread
+    def _insert_rows(self, table_name: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Insert rows into a BigQuery table with a single streaming insert in a separate thread"""
+        return self.client.insert_rows_json(self._get_table_reference(table_name), rows)
+
+    # Buffered Writes
+    def row_writer(self) -> BigQueryRowWriter:
+        """Create a write buffer for a single caller, so that rows of concurrent jobs are never mixed."""
+        return BigQueryRowWriter(self)
+
+    def _split_rows_for_insert(self, rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split rows into chunks within the row count and size limits of a single streaming insert."""
+        chunks = []
+        current_chunk = []
+        current_bytes = 0
+        for row in rows:
+            row_bytes = len(json.dumps(row, default=str))
+            if current_chunk and (len(current_chunk) >= self.MAX_BUFFERED_ROWS
+                                  or current_bytes + row_bytes > self.MAX_BUFFERED_BYTES):
+                chunks.append(current_chunk)
+                current_chunk = []
+                current_bytes = 0
+            current_chunk.append(row)
+            current_bytes += row_bytes
+        if current_chunk:
+            chunks.append(current_chunk)
+        return chunks
+
     @to_thread
     def _execute_query(self, query: str, job_config: bigquery.QueryJobConfig) -> List[Any]:
         """Execute a BigQuery query in a separate thread and return results"""
@@ -349,8 +598,13 @@ class BigQueryService:
             error_details: Optional[Dict[str, Any]] = None,
             attempt_number: Optional[int] = None,
             max_retries: Optional[int] = None,
+            writer: Optional[BigQueryRowWriter] = None,
     ) -> None:
-        """Insert enrichment raw data into BigQuery."""
+        """
+        Insert enrichment raw data into BigQuery.
+
+        When a writer is given the row is added to its buffer and written by a later flush of the writer.
+        """
         try:
             # Prepare error information with proper JSON handling
             error_info = None
@@ -400,6 +654,10 @@ class BigQueryService:
             if error_info is not None:
                 row['error_details'] = safe_json_dumps(error_info)
 
+            if writer:
+                await writer.add('enrichment_raw_data', row)
+                return
+
             # Insert data with proper error handling
             errors = await self._insert_row('enrichment_raw_data', row)
 
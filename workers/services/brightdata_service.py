@@ -4,6 +4,7 @@ import asyncio
 import httpx
 import json
 from typing import List
+from utils.http_client_registry import get_http_client
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from models.accounts import BrightDataAccount
 from pydantic import BaseModel, Field
@@ -41,16 +42,15 @@ class BrightDataService:
     @with_retry(retry_config=BRIGHTDATA_RETRY_CONFIG, operation_name="_brightdata_trigger_data_collection")
     async def trigger_account_data_collection(self, account_linkedin_urls: List[str]) -> str:
         """Triggers Data collection for given Account LinkedIn URLs and returns Snapshot ID that client will use to poll collection status."""
-        with httpx.Client() as client:
-            logger.debug(f"Triggering Account data collection for URLs: {account_linkedin_urls}")
-            headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.brightdata_api_key}"}
-            data = [{"url": url} for url in account_linkedin_urls]
-            json_data = json.dumps(data)
-            endpoint = f"{self.BRIGHTDATA_URL}trigger?dataset_id=gd_l1vikfnt1wgvvqz95w&include_errors=true"
-            response = client.post(url=endpoint, headers=headers, data=json_data, timeout=self.API_TIMEOUT)
-            response.raise_for_status()
-            result = TriggerDataCollectionResponse(**response.json())
-            return result.snapshot_id
+        logger.debug(f"Triggering Account data collection for URLs: {account_linkedin_urls}")
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.brightdata_api_key}"}
+        data = [{"url": url} for url in account_linkedin_urls]
+        json_data = json.dumps(data)
+        endpoint = f"{self.BRIGHTDATA_URL}trigger?dataset_id=gd_l1vikfnt1wgvvqz95w&include_errors=true"
+        response = await get_http_client(endpoint).post(url=endpoint, headers=headers, content=json_data, timeout=self.API_TIMEOUT)
+        response.raise_for_status()
+        result = TriggerDataCollectionResponse(**response.json())
+        return result.snapshot_id
 
     async def collect_account_data(self, snapshot_id: str) -> List[BrightDataAccount]:
         """
@@ -59,21 +59,21 @@ class BrightDataService:
         Reference: https://docs.brightdata.com/scraping-automation/web-scraper-api/error-list-by-endpoint#download-snapshot.
         """
         try:
-            with httpx.Client() as client:
-                headers = {"Authorization": f"Bearer {self.brightdata_api_key}"}
-                endpoint = f"{self.BRIGHTDATA_URL}snapshot/{snapshot_id}?format=json"
-                for _ in range(30):  # Loop for a maximum of 30 attempts or 300 seconds in total/
-                    response = client.get(url=endpoint, headers=headers, timeout=self.API_TIMEOUT)
-                    response.raise_for_status()
-                    if response.status_code == 202:
-                        # Collection still in progress, wait for 10 seconds and retry.
-                        await asyncio.sleep(10)
-                    else:
-                        # Successful response.
-                        results: List = response.json()
-                        if not isinstance(results, list):
-                            raise ValueError(f"Expected List response, got: {results}")
-                        return [BrightDataAccount(**res) for res in results]
+            headers = {"Authorization": f"Bearer {self.brightdata_api_key}"}
+            endpoint = f"{self.BRIGHTDATA_URL}snapshot/{snapshot_id}?format=json"
+            client = get_http_client(endpoint)
+            for _ in range(30):  # Loop for a maximum of 30 attempts or 300 seconds in total/
+                response = await client.get(url=endpoint, headers=headers, timeout=self.API_TIMEOUT)
+                response.raise_for_status()
+                if response.status_code == 202:
+                    # Collection still in progress, wait for 10 seconds and retry.
+                    await asyncio.sleep(10)
+                else:
+                    # Successful response.
+                    results: List = response.json()
+                    if not isinstance(results, list):
+                        raise ValueError(f"Expected List response, got: {results}")
+                    return [BrightDataAccount(**res) for res in results]
 
             raise ValueError(f"Failed to collect Account data for Snapshot ID: {snapshot_id}")
         except Exception as e:
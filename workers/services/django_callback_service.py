@@ -178,7 +178,7 @@ class CallbackService:
             callback_url = f"{self.django_base_url}{self.callback_path}"
             logger.info(f"Sending callback to {callback_url} for job {job_id}")
 
-            async with self.pool.acquire_connection() as client:
+            async with self.pool.acquire_connection(callback_url) as client:
                 logger.debug(f"Making POST request for job {job_id}")
                 response = await client.post(
                     callback_url,
@@ -143,7 +143,7 @@ class PaginatedCallbackService:
             id_token = await self.callback_service.get_id_token()
             callback_url = f"{self.django_base_url}{self.callback_path}"
 
-            async with self.pool.acquire_connection() as client:
+            async with self.pool.acquire_connection(callback_url) as client:
                 response = await client.post(
                     callback_url,
                     json=callback_data,
@@ -64,8 +64,8 @@ class JinaService:
         """
         authHeaders = {"Authorization": f"Bearer {self.jina_api_token}"}
         finalHeaders = {**headers, **authHeaders}
-        async with self.pool.acquire_connection() as client:
-            endpoint = f"{self.JINA_READER_API}{url}"
+        endpoint = f"{self.JINA_READER_API}{url}"
+        async with self.pool.acquire_connection(endpoint) as client:
             response = await client.get(url=endpoint, headers=finalHeaders, timeout=self.API_TIMEOUT)
             response.raise_for_status()
             return response.text
@@ -79,8 +79,8 @@ class JinaService:
         """
         authHeaders = {"Authorization": f"Bearer {self.jina_api_token}"}
         finalHeaders = {**headers, **authHeaders}
-        async with self.pool.acquire_connection() as client:
-            endpoint = f"{self.JINA_SEARCH_API}{query}"
+        endpoint = f"{self.JINA_SEARCH_API}{query}"
+        async with self.pool.acquire_connection(endpoint) as client:
             response = await client.get(url=endpoint, headers=finalHeaders, timeout=self.API_TIMEOUT)
             response.raise_for_status()
             return response.text
@@ -7,6 +7,7 @@ from typing import Optional, List, Dict, Union, Any
 
 from services.ai.api_cache_service import cached_request, APICacheService
 from services.bigquery_service import BigQueryService
+from utils.http_client_registry import get_http_client
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from utils.loguru_setup import logger
 from pydantic import BaseModel, Field
@@ -301,90 +302,126 @@ class LinkedInService:
 
             logger.debug(f"Getting fresh LinkedIn reactions for: {lead_linkedin_url}")
 
-            async with httpx.AsyncClient() as client:
-                endpoint = f"{self.APIFY_BASE_URL}acts/{self.LINKEDIN_REACTIONS_ACTOR_NAME}/runs"
-                json_data = {"username": lead_username}
-
-                response = await client.post(
-                    url=endpoint,
-                    headers=headers,
-                    json=json_data,  # Use json parameter instead of data
-                    timeout=self.API_TIMEOUT
-                )
-                response.raise_for_status()
-                run_response = StartRunResponse(**response.json())
-                run_id = run_response.data.id
-
-                # Poll for completion
-                for i in range(30):
-                    status_endpoint = f"{self.APIFY_BASE_URL}acts/{self.LINKEDIN_REACTIONS_ACTOR_NAME}/runs/{run_id}"
-                    logger.debug(f"Checking status, attempt {i+1}")
-                    response = await client.get(
-                        url=status_endpoint,
-                        headers=headers,
-                        timeout=self.API_TIMEOUT
-                    )
-                    response.raise_for_status()
-                    run_response = StartRunResponse(**response.json())
-
-                    if run_response.data.status == StartRunResponse.Status.FAILED:
-                        raise ValueError(f"Run failed: {response.json()}")
-                    if run_response.data.status == StartRunResponse.Status.SUCCEEDED:
-                        break
-                    await asyncio.sleep(10)
-
-                dataset_id = run_response.data.defaultDatasetId
-                dataset_endpoint = f"{self.APIFY_BASE_URL}datasets/{dataset_id}/items"
+            endpoint = f"{self.APIFY_BASE_URL}acts/{self.LINKEDIN_REACTIONS_ACTOR_NAME}/runs"
+            client = get_http_client(endpoint)
+            json_data = {"username": lead_username}
+
+            response = await client.post(
+                url=endpoint,
+                headers=headers,
+                json=json_data,  # Use json parameter instead of data
+                timeout=self.API_TIMEOUT
+            )
+            response.raise_for_status()
+            run_response = StartRunResponse(**response.json())
+            run_id = run_response.data.id
+
+            # Poll for completion
+            for i in range(30):
+                status_endpoint = f"{self.APIFY_BASE_URL}acts/{self.LINKEDIN_REACTIONS_ACTOR_NAME}/runs/{run_id}"
+                logger.debug(f"Checking status, attempt {i+1}")
                 response = await client.get(
-                    url=dataset_endpoint,
+                    url=status_endpoint,
                     headers=headers,
                     timeout=self.API_TIMEOUT
                 )
                 response.raise_for_status()
-                reactions_data = response.json()
-
-                await self.cache_service.cache_response(
-                    url=cache_url,
-                    params=cache_params,
-                    response_data=reactions_data,
-                    status_code=200,
-                    method="GET",
-                    headers=headers,
-                    ttl_hours=24
-                )
+                run_response = StartRunResponse(**response.json())
 
-                reactions = [LinkedInReaction(**r_dict) for r_dict in reactions_data]
-                logger.debug(f"Fetched {len(reactions)} reactions from: {lead_linkedin_url}")
-                return reactions
+                if run_response.data.status == StartRunResponse.Status.FAILED:
+                    raise ValueError(f"Run failed: {response.json()}")
+                if run_response.data.status == StartRunResponse.Status.SUCCEEDED:
+                    break
+                await asyncio.sleep(10)
+
+            dataset_id = run_response.data.defaultDatasetId
+            dataset_endpoint = f"{self.APIFY_BASE_URL}datasets/{dataset_id}/items"
+            response = await client.get(
+                url=dataset_endpoint,
+                headers=headers,
+                timeout=self.API_TIMEOUT
+            )
+            response.raise_for_status()
+            reactions_data = response.json()
+
+            await self.cache_service.cache_response(
+                url=cache_url,
+                params=cache_params,
+                response_data=reactions_data,
+                status_code=200,
+                method="GET",
+                headers=headers,
+                ttl_hours=24
+            )
+
+            reactions = [LinkedInReaction(**r_dict) for r_dict in reactions_data]
+            logger.debug(f"Fetched {len(reactions)} reactions from: {lead_linkedin_url}")
+            return reactions
 
         except Exception as e:
             raise ActorRunFailed(f"LinkedIn Reactions Run for lead URL: {lead_linkedin_url} failed with error: {str(e)}")
 
     async def fetch_recent_linkedin_activities(self, lead_linkedin_url: str) -> RapidAPILinkedInActivities:
-        """Fetches latest Posts, Comments and Reactions from given lead's profile."""
+        """Fetches latest Posts, Comments and Reactions from given lead's profile.
+
+        The three activity types are independent lookups so they are fetched concurrently.
+        """
         linkedin_activities = RapidAPILinkedInActivities(posts=[], comments=[], reactions=[])
         # Use 3 months as default cutoff.
         cutoff_timestamp: int = datetime.now(timezone.utc) - relativedelta(months=3)
-        try:
-            posts = await self.fetch_rapid_api_linkedin_posts(lead_linkedin_url=lead_linkedin_url, cutoff_timestamp=cutoff_timestamp)
+        posts, comments, reactions = await asyncio.gather(
+            self.fetch_rapid_api_linkedin_posts(lead_linkedin_url=lead_linkedin_url, cutoff_timestamp=cutoff_timestamp),
+            self.fetch_rapid_api_linkedin_comments(lead_linkedin_url=lead_linkedin_url, cutoff_timestamp=cutoff_timestamp),
+            self.fetch_rapid_api_linkedin_reactions(lead_linkedin_url=lead_linkedin_url, cutoff_timestamp=cutoff_timestamp),
+            return_exceptions=True
+        )
+
+        if isinstance(posts, Exception):
+            logger.error(f"{str(posts)}")
+        else:
             linkedin_activities.posts = posts
-        except Exception as e:
-            logger.error(f"{str(e)}")
 
-        try:
-            comments = await self.fetch_rapid_api_linkedin_comments(lead_linkedin_url=lead_linkedin_url, cutoff_timestamp=cutoff_timestamp)
+        if isinstance(comments, Exception):
+            logger.error(f"{str(comments)}")
+        else:
             linkedin_activities.comments = comments
-        except Exception as e:
-            logger.error(f"{str(e)}")
 
-        try:
-            reactions = await self.fetch_rapid_api_linkedin_reactions(lead_linkedin_url=lead_linkedin_url, cutoff_timestamp=cutoff_timestamp)
+        if isinstance(reactions, Exception):
+            logger.error(f"{str(reactions)}")
+        else:
             linkedin_activities.reactions = reactions
-        except Exception as e:
-            logger.error(f"{str(e)}")
 
         return linkedin_activities
 
+    async def fetch_recent_linkedin_activities_many(self, lead_linkedin_urls: List[str], max_concurrency: int = 5) -> Dict[str, RapidAPILinkedInActivities]:
+        """Fetches recent activities for many leads with bounded concurrency.
+
+        URLs pointing to the same profile (e.g. differing only in case or a trailing slash) are fetched once,
+        using the first of them as given since the normalized URL is only a lookup key.
+        Returns a mapping from each given URL to its activities.
+        """
+        urls_by_profile: Dict[str, List[str]] = {}
+        for url in lead_linkedin_urls:
+            if not url:
+                continue
+            urls_by_profile.setdefault(self._normalize_profile_url(url), []).append(url)
+
+        logger.debug(f"Fetching LinkedIn activities for {len(urls_by_profile)} unique profiles out of {len(lead_linkedin_urls)} URLs")
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_profile(lead_linkedin_url: str) -> RapidAPILinkedInActivities:
+            async with semaphore:
+                return await self.fetch_recent_linkedin_activities(lead_linkedin_url=lead_linkedin_url)
+
+        profile_keys = list(urls_by_profile.keys())
+        results = await asyncio.gather(*[fetch_profile(urls_by_profile[profile_key][0]) for profile_key in profile_keys])
+
+        activities_by_url: Dict[str, RapidAPILinkedInActivities] = {}
+        for profile_key, activities in zip(profile_keys, results):
+            for url in urls_by_profile[profile_key]:
+                activities_by_url[url] = activities
+        return activities_by_url
+
     async def fetch_rapid_api_linkedin_posts(self, lead_linkedin_url: str, cutoff_timestamp: Optional[datetime]) -> List[RapidAPIPost]:
         """Fetch Posts of given lead from Rapid API service after provided cutoff timestamp if any."""
         try:
@@ -502,6 +539,10 @@ class LinkedInService:
         lead_username = url_list[1]
         return lead_username
 
+    def _normalize_profile_url(self, lead_linkedin_url: str) -> str:
+        """Normalize LinkedIn profile URL so that equivalent URLs map to the same profile."""
+        return lead_linkedin_url.strip().rstrip("/").lower()
+
     def _get_datetime(self, date_str: Optional[str]) -> datetime:
         """Helper to convert date string in the format '2025-05-05 03:37:40.122 +0000 UTC' to datetime object."""
         try:
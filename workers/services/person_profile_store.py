@@ -0,0 +1,123 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from google.cloud import bigquery
+
+from utils.async_utils import to_thread
+from utils.loguru_setup import logger
+from utils.url_utils import UrlUtils
+
+
+class PersonProfileStore:
+    """
+    Person profiles (e.g. ProxyCurl LinkedIn profiles) keyed by normalized LinkedIn URL.
+
+    Profiles are shared across accounts and tenants. Every stored profile has the time it was fetched,
+    and lookups only return profiles fetched within the caller's staleness window. Lookups are done in
+    bulk, with one query for all leads of an enrichment call.
+    """
+
+    def __init__(self, bq_client: bigquery.Client, project_id: str, dataset: str, table_name: str = "person_profiles"):
+        self.client = bq_client
+        self.project_id = project_id
+        self.dataset = dataset
+        self.table_name = table_name
+        self.table_id = f"{self.project_id}.{self.dataset}.{self.table_name}"
+        self._table_ensured = False
+
+    @to_thread
+    def ensure_table(self) -> None:
+        """Create the profiles table if it doesn't exist."""
+        schema = [
+            bigquery.SchemaField("linkedin_url", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("source", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("profile", "JSON"),
+            bigquery.SchemaField("fetched_at", "TIMESTAMP", mode="REQUIRED"),
+        ]
+
+        try:
+            self.client.get_table(self.table_id)
+        except Exception:
+            table = bigquery.Table(self.table_id, schema=schema)
+            table.clustering_fields = ["source", "linkedin_url"]
+            self.client.create_table(table)
+            logger.info(f"Created table {self.table_id}")
+        self._table_ensured = True
+
+    async def get_profiles(self, linkedin_urls: List[str], source: str, max_age_hours: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns latest profiles of given LinkedIn URLs fetched within max_age_hours, keyed by normalized URL.
+        URLs without a fresh profile are missing from the result.
+        """
+        normalized_urls = sorted({url for url in map(UrlUtils.normalize_lead_linkedin_url, linkedin_urls) if url})
+        if not normalized_urls:
+            return {}
+
+        query = f"""
+        SELECT linkedin_url, profile
+        FROM `{self.table_id}`
+        WHERE source = @source
+        AND linkedin_url IN UNNEST(@linkedin_urls)
+        AND fetched_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @max_age_hours HOUR)
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY linkedin_url ORDER BY fetched_at DESC) = 1
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("source", "STRING", source),
+                bigquery.ArrayQueryParameter("linkedin_urls", "STRING", normalized_urls),
+                bigquery.ScalarQueryParameter("max_age_hours", "INT64", max_age_hours),
+            ]
+        )
+
+        try:
+            rows = await self._execute_query(query, job_config)
+        except Exception as e:
+            # Leads are enriched from the API instead.
+            logger.error(f"Error looking up {len(normalized_urls)} person profiles: {str(e)}")
+            return {}
+
+        profiles = {}
+        for row in rows:
+            profile = json.loads(row.profile) if isinstance(row.profile, str) else row.profile
+            if profile:
+                profiles[row.linkedin_url] = profile
+        logger.debug(f"Found {len(profiles)} of {len(normalized_urls)} person profiles fetched within {max_age_hours} hours")
+        return profiles
+
+    async def store_profiles(self, profiles: Dict[str, Dict[str, Any]], source: str) -> None:
+        """Store given profiles keyed by LinkedIn URL as fetched now."""
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {
+                "linkedin_url": normalized_url,
+                "source": source,
+                "profile": json.dumps(profile),
+                "fetched_at": fetched_at,
+            }
+            for normalized_url, profile in (
+                (UrlUtils.normalize_lead_linkedin_url(url), profile) for url, profile in profiles.items()
+            )
+            if normalized_url and profile
+        ]
+        if not rows:
+            return
+
+        try:
+            if not self._table_ensured:
+                await self.ensure_table()
+            errors = await self._insert_rows(rows)
+            if errors:
+                logger.error(f"Error storing person profiles: {errors}")
+        except Exception as e:
+            logger.error(f"Error storing {len(rows)} person profiles: {str(e)}")
+
+    @to_thread
+    def _execute_query(self, query: str, job_config: bigquery.QueryJobConfig) -> List[Any]:
+        """Execute a BigQuery query in a separate thread and return results"""
+        return list(self.client.query(query, job_config=job_config).result())
+
+    @to_thread
+    def _insert_rows(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Insert rows into the profiles table in a separate thread"""
+        return self.client.insert_rows_json(self.table_id, rows)
@@ -2,12 +2,14 @@ from datetime import datetime, timezone
 import os
 import asyncio
 import httpx
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable
 from difflib import SequenceMatcher
 
 from models.leads import ProxyCurlPersonProfile, ProxyCurlSearchResponse, EnrichedLead
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from services.ai.api_cache_service import APICacheService, cached_request
+from services.person_profile_store import PersonProfileStore
+from utils.url_utils import UrlUtils
 from utils.loguru_setup import logger
 
 # Configure logging
@@ -30,7 +32,11 @@ PROXYCURL_RETRY_CONFIG = RetryConfig(
 class ProxyCurlService:
     """Service for interacting with ProxyCurl APIs."""
 
-    def __init__(self, cache_service: APICacheService):
+    PROFILE_SOURCE = "proxycurl"
+    # Fetched profiles are stored in chunks of this size while leads are enriched, so an interrupted enrichment keeps them.
+    PROFILE_STORE_CHUNK_SIZE = 5
+
+    def __init__(self, cache_service: APICacheService, profile_store: Optional[PersonProfileStore] = None):
         """Initialize ProxyCurl service with configuration."""
         self.PROXYCURL_BASE_URL = "https://nubela.co/proxycurl/api"
         self.proxycurl_api_key = os.getenv('PROXYCURL_API_KEY')
@@ -40,6 +46,13 @@ class ProxyCurlService:
         self.cache_service = cache_service
         self.API_TIMEOUT = 30.0  # timeout in seconds
         self.DEFAULT_CACHE_TTL = 24 * 30  # 30 days in hours
+        # Person profiles fetched for any account or tenant within this window are reused instead of fetched again.
+        self.PROFILE_MAX_AGE_HOURS = int(os.getenv('PROXYCURL_PROFILE_MAX_AGE_HOURS', self.DEFAULT_CACHE_TTL))
+        self.profile_store = profile_store or PersonProfileStore(
+            bq_client=cache_service.client,
+            project_id=cache_service.project_id,
+            dataset=cache_service.dataset
+        )
 
     @with_retry(retry_config=PROXYCURL_RETRY_CONFIG, operation_name="get_person_profile")
     async def get_person_profile(self, linkedin_url: str) -> Optional[ProxyCurlPersonProfile]:
@@ -152,12 +165,40 @@ class ProxyCurlService:
                 raise
             return None
 
-    async def enrich_leads(self, leads: List[EnrichedLead], max_workers: int = 5) -> List[EnrichedLead | None]:
-        """Enrich multiple leads with ProxyCurl data using a worker pool."""
+    async def enrich_leads(
+            self,
+            leads: List[EnrichedLead],
+            max_workers: int = 5,
+            on_lead_enriched: Optional[Callable[[int, Optional[EnrichedLead]], Awaitable[None]]] = None
+    ) -> List[EnrichedLead | None]:
+        """
+        Enrich multiple leads with ProxyCurl data using a worker pool.
+
+        Fetched profiles are stored in chunks of PROFILE_STORE_CHUNK_SIZE as they are fetched, and on_lead_enriched
+        is called with the index and result of every lead as soon as it is enriched, so that callers can checkpoint
+        progress. Profiles and results of leads enriched before an interruption are then not paid for again.
+        """
         if not leads:
             logger.warning("No leads provided for enrichment")
             return []
 
+        # Look up stored profiles of all leads at once, only the remaining ones are fetched from ProxyCurl.
+        stored_profiles: Dict[str, Dict[str, Any]] = await self.profile_store.get_profiles(
+            [lead.linkedin_url for lead in leads if lead.linkedin_url],
+            source=self.PROFILE_SOURCE,
+            max_age_hours=self.PROFILE_MAX_AGE_HOURS
+        )
+        fetched_profiles: Dict[str, Dict[str, Any]] = {}
+        unstored_profiles: Dict[str, Dict[str, Any]] = {}
+
+        async def store_profiles(min_profiles: int) -> None:
+            """Store fetched profiles not stored yet, if there are at least min_profiles of them."""
+            if not unstored_profiles or len(unstored_profiles) < min_profiles:
+                return
+            profiles = dict(unstored_profiles)
+            unstored_profiles.clear()
+            await self.profile_store.store_profiles(profiles, source=self.PROFILE_SOURCE)
+
         # Initialize results array and queue
         results = [None] * len(leads)
         queue = asyncio.Queue()
@@ -175,8 +216,17 @@ class ProxyCurlService:
                     break
 
                 # The worker doesn't need its own try/except since _enrich_single_lead has error handling
-                enriched_lead = await self._enrich_single_lead(lead)
+                lead_profiles: Dict[str, Dict[str, Any]] = {}
+                enriched_lead = await self._enrich_single_lead(lead, stored_profiles=stored_profiles, fetched_profiles=lead_profiles)
                 results[index] = enriched_lead
+                fetched_profiles.update(lead_profiles)
+                unstored_profiles.update(lead_profiles)
+                try:
+                    await store_profiles(min_profiles=self.PROFILE_STORE_CHUNK_SIZE)
+                    if on_lead_enriched:
+                        await on_lead_enriched(index, enriched_lead)
+                except Exception as e:
+                    logger.error(f"Error saving progress of lead enrichment: {str(e)}", exc_info=True)
                 queue.task_done()
 
         # Start workers
@@ -185,13 +235,26 @@ class ProxyCurlService:
         # Wait for all tasks to complete
         await asyncio.gather(*workers, return_exceptions=True)
 
+        await store_profiles(min_profiles=1)
+
         # Log completion
-        logger.info(f"Completed ProxyCurl enrichment for {len(leads)} leads using {max_workers} workers")
+        logger.info(f"Completed ProxyCurl enrichment for {len(leads)} leads using {max_workers} workers, "
+                    f"reused {len(stored_profiles)} stored profiles and fetched {len(fetched_profiles)}")
 
         return results
 
-    async def _enrich_single_lead(self, lead: EnrichedLead) -> EnrichedLead:
-        """Process a single lead with ProxyCurl enrichment."""
+    async def _enrich_single_lead(
+            self,
+            lead: EnrichedLead,
+            stored_profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+            fetched_profiles: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> EnrichedLead:
+        """
+        Process a single lead with ProxyCurl enrichment.
+
+        Uses the lead's profile from stored_profiles (keyed by normalized LinkedIn URL) if present, otherwise
+        fetches it and adds it to fetched_profiles to be stored.
+        """
         try:
             linkedin_url = lead.linkedin_url
             if not linkedin_url:
@@ -202,7 +265,14 @@ class ProxyCurlService:
                 logger.warning(f"Skipping proxycurl enrichment, Organization or name missing for lead: {lead}")
                 return lead
 
-            proxycurl_lead: Optional[ProxyCurlPersonProfile] = await self.get_person_profile(linkedin_url)
+            normalized_linkedin_url: Optional[str] = UrlUtils.normalize_lead_linkedin_url(linkedin_url)
+            stored_profile: Optional[Dict[str, Any]] = (stored_profiles or {}).get(normalized_linkedin_url)
+            if stored_profile:
+                proxycurl_lead: Optional[ProxyCurlPersonProfile] = ProxyCurlPersonProfile(**stored_profile)
+            else:
+                proxycurl_lead = await self.get_person_profile(linkedin_url)
+                if proxycurl_lead and fetched_profiles is not None and normalized_linkedin_url:
+                    fetched_profiles[normalized_linkedin_url] = proxycurl_lead.model_dump(mode='json', exclude_none=True)
             if not proxycurl_lead:
                 logger.warning(f"ProxyCurl profile not found for: {linkedin_url}, continue to next lead.")
                 return lead
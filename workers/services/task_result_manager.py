@@ -1,8 +1,10 @@
 import asyncio
+import hashlib
 import json
 import os
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
+from utils.async_utils import run_in_thread
 from utils.json_utils import JSONUtils
 
 from google.cloud import bigquery
@@ -518,6 +520,66 @@ class TaskResultManager:
             logger.error(f"Error fetching batched data: {str(e)}", exc_info=True)
             return []
 
+    async def store_checkpoint(self, enrichment_type: str, job_id: str, account_id: str, stage: str, key: str, data: Any) -> None:
+        """
+        Public API: Store output of one unit of work (e.g. a fetched page or an evaluated batch) of given job stage.
+        Checkpoints are rows of the callbacks table that are never returned by get_result.
+        """
+        try:
+            now_ts = datetime.now(timezone.utc).isoformat()
+            row_to_insert = {
+                "account_id": account_id,
+                "lead_id": None,
+                "enrichment_type": f"{enrichment_type}_checkpoint",
+                "status": "checkpoint",
+                "callback_payload": json.dumps({"job_id": job_id, "data": data}, default=JSONUtils.serialize_datetime),
+                "created_at": now_ts,
+                "updated_at": now_ts,
+                "is_batched": False,
+                "batch_info": json.dumps({"job_id": job_id, "stage": stage, "key": key})
+            }
+
+            # Checkpoints are stored while the job's other batches are running, so the insert must not block the loop.
+            errors = await run_in_thread(self.client.insert_rows_json, self.table_id, [row_to_insert])
+            if errors:
+                logger.error(f"BigQuery insert errors for checkpoint {stage}/{key} of job {job_id}: {errors}")
+        except Exception as e:
+            # A missing checkpoint only means its work is done again on retry.
+            logger.error(f"Error storing checkpoint {stage}/{key} of job {job_id}: {str(e)}", exc_info=True)
+
+    async def get_checkpoints(self, enrichment_type: str, job_id: str, account_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Public API: Retrieve checkpoints stored by previous attempts of given job, keyed by stage and then key.
+        """
+        query = f"""
+            SELECT batch_info, callback_payload
+            FROM `{self.table_id}`
+            WHERE account_id = @account_id AND
+                  enrichment_type = @enrichment_type AND
+                  JSON_VALUE(batch_info, '$.job_id') = @job_id
+            ORDER BY updated_at
+        """
+        params = [
+            bigquery.ScalarQueryParameter("account_id", "STRING", account_id),
+            bigquery.ScalarQueryParameter("enrichment_type", "STRING", f"{enrichment_type}_checkpoint"),
+            bigquery.ScalarQueryParameter("job_id", "STRING", job_id),
+        ]
+
+        checkpoints: Dict[str, Dict[str, Any]] = {}
+        try:
+            job_config = bigquery.QueryJobConfig(query_parameters=params)
+            query_job = self.client.query(query, job_config=job_config)
+            for row in query_job.result():
+                batch_info = self._parse_json(row.batch_info)
+                payload = self._parse_json(row.callback_payload)
+                if not batch_info or not payload or "data" not in payload:
+                    continue
+                # Later checkpoints of the same key replace earlier ones.
+                checkpoints.setdefault(batch_info.get("stage"), {})[batch_info.get("key")] = payload["data"]
+        except Exception as e:
+            logger.error(f"Error fetching checkpoints of job {job_id}: {str(e)}", exc_info=True)
+        return checkpoints
+
     def _parse_json(self, json_data):
         """Helper method to safely parse JSON string or return object as is."""
         if isinstance(json_data, str):
@@ -539,4 +601,52 @@ class TaskResultManager:
         if not stored:
             raise ValueError(f"No stored callback payload for enrichment_type: {enrichment_type}, account_id: {account_id}, lead_id: {lead_id}")
 
-        await callback_service.paginated_service.send_callback(**stored)
\ No newline at end of file
+        await callback_service.paginated_service.send_callback(**stored)
+
+class JobCheckpoints:
+    """
+    Checkpoints of the stages of one job, loaded once when the job starts and stored as each unit of work completes,
+    so that a retried job only redoes the work that was missing. Without a job ID nothing is loaded or stored.
+    """
+
+    def __init__(
+            self,
+            result_manager: Optional[TaskResultManager] = None,
+            enrichment_type: Optional[str] = None,
+            job_id: Optional[str] = None,
+            account_id: Optional[str] = None,
+            checkpoints: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.result_manager = result_manager
+        self.enrichment_type = enrichment_type
+        self.job_id = job_id
+        self.account_id = account_id
+        self.checkpoints = checkpoints or {}
+
+    @classmethod
+    async def load(cls, result_manager: TaskResultManager, enrichment_type: str, job_id: Optional[str], account_id: str) -> 'JobCheckpoints':
+        """Load checkpoints stored by previous attempts of given job."""
+        if not job_id:
+            return cls()
+        checkpoints = await result_manager.get_checkpoints(enrichment_type=enrichment_type, job_id=job_id, account_id=account_id)
+        if checkpoints:
+            counts = {stage: len(stage_checkpoints) for stage, stage_checkpoints in checkpoints.items()}
+            logger.info(f"Resuming job {job_id} from checkpoints: {counts}")
+        return cls(result_manager, enrichment_type, job_id, account_id, checkpoints)
+
+    @staticmethod
+    def batch_key(ids: List[str]) -> str:
+        """Key of a batch of given item IDs, independent of their order."""
+        return hashlib.sha256(json.dumps(sorted(ids)).encode()).hexdigest()[:32]
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Returns checkpointed output of given unit of work, None if it has to be done."""
+        return self.checkpoints.get(stage, {}).get(key)
+
+    async def save(self, stage: str, key: str, data: Any) -> None:
+        """Checkpoint output of given unit of work."""
+        self.checkpoints.setdefault(stage, {})[key] = data
+        if not self.job_id:
+            return
+        await self.result_manager.store_checkpoint(
+            enrichment_type=self.enrichment_type, job_id=self.job_id, account_id=self.account_id, stage=stage, key=key, data=data)
@@ -20,6 +20,7 @@ from services.django_callback_service import CallbackService
 from services.ai_market_intel_service import AICompanyIntelService
 from utils.account_info_fetcher import AccountInfoFetcher
 from utils.connection_pool import ConnectionPool
+from utils.http_client_registry import get_http_client
 from utils.loguru_setup import logger, set_trace_context
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from utils.url_utils import UrlUtils
@@ -256,6 +257,7 @@ class AccountEnhancementTask(AccountEnrichmentTask):
             RetryableError,
             asyncio.TimeoutError,
             requests.exceptions.RequestException,
+            httpx.TransportError,
             ConnectionError
         ]
     )
@@ -704,7 +706,7 @@ class AccountEnhancementTask(AccountEnrichmentTask):
         logger.debug(f"Searching Jina AI for company profile with query: {search_query}")
 
         jina_url = f"https://s.jina.ai/{requests.utils.quote(search_query)}"  # URL encode query
-        response = requests.get(
+        response = await get_http_client(jina_url).get(
             jina_url,
             headers={
                 "Authorization": f"Bearer {self.jina_api_token}",
@@ -712,7 +714,13 @@ class AccountEnhancementTask(AccountEnrichmentTask):
             },
             timeout=45  # Increased timeout
         )
-        response.raise_for_status()
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # Rate limits and server errors are transient, other errors fail the same way when retried.
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableError(f"Jina AI returned status {response.status_code}: {str(e)}") from e
+            raise
 
         profile_text = response.text.strip()
         if not profile_text:
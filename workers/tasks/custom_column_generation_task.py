@@ -10,9 +10,11 @@ from google.api_core.exceptions import ResourceExhausted
 from models.common import UserportPydanticBaseModel
 from services.ai.ai_service import AIServiceFactory
 from services.ai.ai_service_base import ThinkingBudget, AIService
+from services.ai.batch_inference import BatchRequest
 from services.bigquery_service import BigQueryService
 from services.django_callback_service import CallbackService
 from services.linkedin_service import LinkedInService, RapidAPILinkedInActivities
+from services.task_result_manager import JobCheckpoints
 from tasks.enrichment_task import AccountEnrichmentTask
 from utils.loguru_setup import logger, set_trace_context
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
@@ -68,6 +70,9 @@ class CustomColumnTask(AccountEnrichmentTask):
 
     ENRICHMENT_TYPE = 'custom_column'
 
+    # Offline batch submitted by the job, so that a retried job collects it instead of submitting a new one.
+    CHECKPOINT_BATCH_INFERENCE = 'batch_inference'
+
     def __init__(self, callback_service):
         """Initialize the task with required services."""
         super().__init__(callback_service)
@@ -85,6 +90,7 @@ class CustomColumnTask(AccountEnrichmentTask):
             "processing_time": 0.0,
             "ai_errors": 0,
             "api_errors": 0,
+            "batch_inference_entities": 0,
             "avg_confidence_score": 0.0,
             "start_time": datetime.now(timezone.utc)
         }
@@ -189,18 +195,38 @@ class CustomColumnTask(AccountEnrichmentTask):
                 processed_data={'stage': current_stage}
             )
 
-            # Process entities in batches with concurrency control
-            current_stage = 'processing'
+            linkedin_activities: Dict[str, RapidAPILinkedInActivities] = {}
+            if ai_config and ai_config.get('use_linkedin_activity', False):
+                current_stage = 'fetching_linkedin_activities'
+                linkedin_activities = await self._prefetch_linkedin_activities(entity_ids, context_data)
+
             total_entities = len(entity_ids)
             processed_values = []
             failed_entities = []
             confidence_scores = []
 
+            # Bulk runs that do not need web search can be generated through the provider's offline batch endpoint.
+            online_entity_ids = entity_ids
+            if ai_config and ai_config.get('batch_mode', False) and not ai_config.get('use_internet', False):
+                current_stage = 'batch_inference'
+                checkpoints = await JobCheckpoints.load(self.result_manager, self.ENRICHMENT_TYPE, job_id=job_id,
+                                                        account_id=entity_ids[0] if entity_ids else None)
+                offline_values = await self._generate_values_offline(
+                    entity_ids, entity_type, column_id, column_config, context_data, ai_config, linkedin_activities, checkpoints)
+                processed_values.extend(offline_values)
+                confidence_scores.extend(v.confidence_score for v in offline_values if v.confidence_score is not None)
+                generated_entity_ids = {v.entity_id for v in offline_values}
+                online_entity_ids = [entity_id for entity_id in entity_ids if entity_id not in generated_entity_ids]
+                logger.info(f"Generated {len(offline_values)} values offline, {len(online_entity_ids)} entities left for online generation")
+
+            # Process entities in batches with concurrency control
+            current_stage = 'processing'
+
             # Create semaphore for concurrency control
             semaphore = asyncio.Semaphore(concurrent_requests)
 
             # Create batches for processing
-            batches = [entity_ids[i:i + batch_size] for i in range(0, total_entities, batch_size)]
+            batches = [online_entity_ids[i:i + batch_size] for i in range(0, len(online_entity_ids), batch_size)]
             logger.info(f"Created {len(batches)} batches for processing")
 
             async def process_batch(batch_index: int, batch: List[str]) -> Tuple[List[CustomColumnValue], List[str]]:
@@ -218,7 +244,8 @@ class CustomColumnTask(AccountEnrichmentTask):
                             column_id,
                             column_config,
                             context_data,
-                            ai_config
+                            ai_config,
+                            linkedin_activities
                         )
 
                         batch_values.extend(batch_result)
@@ -289,13 +316,13 @@ class CustomColumnTask(AccountEnrichmentTask):
                 failed_entities.extend(batch_failed)
 
             # Store results
-            # current_stage = 'storing_results'
-            # logger.info(f"Storing results for {len(processed_values)} processed values")
-            # await self._store_results(
-            #     job_id=job_id,
-            #     column_id=column_id,
-            #     values=processed_values
-            # )
+            current_stage = 'storing_results'
+            logger.info(f"Storing results for {len(processed_values)} processed values")
+            await self._store_results(
+                job_id=job_id,
+                column_id=column_id,
+                values=processed_values
+            )
 
             # Calculate success metrics
             successful_count = len([v for v in processed_values if v.status == "completed"])
@@ -370,6 +397,106 @@ class CustomColumnTask(AccountEnrichmentTask):
                 "stage": current_stage
             }
 
+    async def _prefetch_linkedin_activities(
+            self,
+            entity_ids: List[str],
+            context_data: Dict[str, Any]
+    ) -> Dict[str, RapidAPILinkedInActivities]:
+        """Fetch LinkedIn activities for all leads in the job up front, fetching each profile only once.
+
+        Returns activities keyed by lead LinkedIn URL, leads missing from it fetch their own activities.
+        """
+        lead_linkedin_urls = [
+            context_data.get(entity_id, {}).get("lead_info", {}).get("linkedin_url")
+            for entity_id in entity_ids
+        ]
+        lead_linkedin_urls = [url for url in lead_linkedin_urls if url]
+        if not lead_linkedin_urls:
+            return {}
+
+        try:
+            linkedin_activities = await self.linkedin_service.fetch_recent_linkedin_activities_many(lead_linkedin_urls)
+            logger.info(f"Prefetched LinkedIn activities for {len(linkedin_activities)} lead URLs")
+            return linkedin_activities
+        except Exception as e:
+            # Entities fall back to fetching their own activities.
+            logger.error(f"Failed to prefetch LinkedIn activities: {str(e)}", exc_info=True)
+            return {}
+
+    async def _generate_values_offline(
+            self,
+            entity_ids: List[str],
+            entity_type: str,
+            column_id: str,
+            column_config: Dict[str, Any],
+            context_data: Dict[str, Any],
+            ai_config: Dict[str, Any],
+            linkedin_activities: Optional[Dict[str, RapidAPILinkedInActivities]] = None,
+            checkpoints: Optional[JobCheckpoints] = None,
+    ) -> List[CustomColumnValue]:
+        """Generate values of given entities in a single offline batch of the AI service.
+
+        The submitted batch is checkpointed, so a retry of the job (e.g. after the dispatch deadline) collects it
+        instead of submitting and paying for the same requests again.
+        Returns values of entities with a valid response, the remaining entities are generated online by the caller.
+        """
+        checkpoints = checkpoints or JobCheckpoints()
+        unstructured_response = ai_config.get('unstructured_response', False)
+        requests: List[BatchRequest] = []
+        for entity_id in entity_ids:
+            try:
+                entity_context = await self._get_entity_context(entity_id, context_data, ai_config, linkedin_activities)
+            except Exception as e:
+                logger.warning(f"Failed to prepare context of entity {entity_id} for batch inference: {str(e)}")
+                continue
+            system_prompt, user_prompt = self._create_generation_prompt(
+                entity_id=entity_id,
+                entity_type=entity_type,
+                column_config=column_config,
+                ai_config=ai_config,
+                entity_context=entity_context,
+                unstructured_response=unstructured_response,
+            )
+            requests.append(BatchRequest(
+                custom_id=entity_id,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                is_json=not unstructured_response,
+                temperature=ai_config.get('temperature', 0.8),
+                operation_tag='custom_column'
+            ))
+
+        batch_key = JobCheckpoints.batch_key([request.custom_id for request in requests])
+        saved: Optional[Dict[str, str]] = checkpoints.get(self.CHECKPOINT_BATCH_INFERENCE, batch_key)
+
+        async def save_batch_id(batch_id: str) -> None:
+            await checkpoints.save(self.CHECKPOINT_BATCH_INFERENCE, batch_key, {'batch_id': batch_id})
+
+        try:
+            responses = await self.model.generate_content_batch(
+                requests, batch_id=saved.get('batch_id') if saved else None, on_submitted=save_batch_id)
+        except Exception as e:
+            logger.error(f"Batch inference failed, generating all values online: {str(e)}", exc_info=True)
+            self.metrics["ai_errors"] += 1
+            return []
+
+        values = []
+        for entity_id, response in responses.items():
+            try:
+                value = self._validate_response(response, column_config, unstructured_response)
+            except Exception as e:
+                logger.warning(f"Invalid batch response for entity {entity_id}, generating it online: {str(e)}")
+                continue
+            values.append(CustomColumnValue(
+                column_id=column_id,
+                entity_id=entity_id,
+                **value,
+                generated_at=datetime.utcnow(),
+                status="completed"
+            ))
+        self.metrics["batch_inference_entities"] = len(values)
+        return values
+
     async def _process_batch(
             self,
             entity_ids: List[str],
@@ -378,6 +505,7 @@ class CustomColumnTask(AccountEnrichmentTask):
             column_config: Dict[str, Any],
             context_data: Dict[str, Any],
             ai_config: Dict[str, Any],
+            linkedin_activities: Optional[Dict[str, RapidAPILinkedInActivities]] = None,
     ) -> List[CustomColumnValue]:
         """Process a batch of entities with enhanced concurrency and error handling."""
         results = []
@@ -395,6 +523,7 @@ class CustomColumnTask(AccountEnrichmentTask):
                 column_config=column_config,
                 context_data=context_data,
                 ai_config=ai_config,
+                linkedin_activities=linkedin_activities,
             )
             tasks.append(task)
 
@@ -419,7 +548,8 @@ class CustomColumnTask(AccountEnrichmentTask):
         return results
 
     async def _process_entity(self, entity_id: str, column_id: str, column_config: Dict[str, Any],
-                              context_data: Dict[str, Any], entity_type=None, ai_config=None) -> CustomColumnValue:
+                              context_data: Dict[str, Any], entity_type=None, ai_config=None,
+                              linkedin_activities: Optional[Dict[str, RapidAPILinkedInActivities]] = None) -> CustomColumnValue:
         """Process a single entity with retry logic."""
         try:
             # Generate value using AI with retry logic
@@ -429,6 +559,7 @@ class CustomColumnTask(AccountEnrichmentTask):
                 column_config=column_config,
                 context_data=context_data,
                 ai_config=ai_config,
+                linkedin_activities=linkedin_activities,
             )
 
             return CustomColumnValue(
@@ -457,20 +588,11 @@ class CustomColumnTask(AccountEnrichmentTask):
             column_config: Dict[str, Any],
             context_data: Dict[str, Any],
             ai_config: Dict[str, Any],
+            linkedin_activities: Optional[Dict[str, RapidAPILinkedInActivities]] = None,
     ) -> Dict[str, Any]:
         """Generate a single column value using AI with enhanced error handling."""
         try:
-            # Get entity context
-            entity_context = context_data.get(entity_id, {})
-
-            if not entity_context:
-                logger.warning(f"No context data found for entity {entity_id}")
-
-            lead_linkedin_url: Optional[str] = entity_context.get("lead_info", {}).get("linkedin_url")
-            if ai_config and ai_config.get('use_linkedin_activity', False) and lead_linkedin_url:
-                # Fetch LinkedIn Activities for the given lead and append it to entity context.
-                linkedin_activities: RapidAPILinkedInActivities = await self.linkedin_service.fetch_recent_linkedin_activities(lead_linkedin_url=lead_linkedin_url)
-                entity_context["enrichment_recent_linkedin_activities"] = linkedin_activities.model_dump()
+            entity_context = await self._get_entity_context(entity_id, context_data, ai_config, linkedin_activities)
 
             # Check if unstructured response is enabled
             unstructured_response = ai_config.get('unstructured_response', False)
@@ -533,6 +655,31 @@ class CustomColumnTask(AccountEnrichmentTask):
             self.metrics["ai_errors"] += 1
             raise RetryableError(f"AI generation failed: {str(e)}")
 
+    async def _get_entity_context(
+            self,
+            entity_id: str,
+            context_data: Dict[str, Any],
+            ai_config: Dict[str, Any],
+            linkedin_activities: Optional[Dict[str, RapidAPILinkedInActivities]] = None
+    ) -> Dict[str, Any]:
+        """Get context of given entity, with recent LinkedIn activities of the lead if enabled.
+
+        Activities prefetched for the job are taken from linkedin_activities, keyed by lead LinkedIn URL.
+        """
+        entity_context = context_data.get(entity_id, {})
+
+        if not entity_context:
+            logger.warning(f"No context data found for entity {entity_id}")
+
+        lead_linkedin_url: Optional[str] = entity_context.get("lead_info", {}).get("linkedin_url")
+        if ai_config and ai_config.get('use_linkedin_activity', False) and lead_linkedin_url:
+            # Fetch LinkedIn Activities for the given lead (unless prefetched for the job) and append it to entity context.
+            lead_activities: Optional[RapidAPILinkedInActivities] = (linkedin_activities or {}).get(lead_linkedin_url)
+            if lead_activities is None:
+                lead_activities = await self.linkedin_service.fetch_recent_linkedin_activities(lead_linkedin_url=lead_linkedin_url)
+            entity_context["enrichment_recent_linkedin_activities"] = lead_activities.model_dump()
+        return entity_context
+
     def _create_generation_prompt(self, entity_id: str, column_config: Dict[str, Any],
                                   ai_config: Dict[str, Any],
                                   entity_context: Dict[str, Any],
@@ -905,17 +1052,21 @@ Your goal is to analyze provided entity information and answer a specific questi
     ) -> None:
         """Store generated values in BigQuery with retry logic."""
         try:
-            for value in values:
-                await self.bq_service.insert_enrichment_raw_data(
-                    job_id=job_id,
-                    entity_id=value.entity_id,
-                    source='custom_column',
-                    raw_data={
-                        'column_id': column_id,
-                        'value': value.dict(exclude_none=True)
-                    },
-                    processed_data=value.dict(exclude={'error_details'})
-                )
+            # Rows are buffered and written with a few streaming inserts instead of one insert per value.
+            # Each attempt has its own writer, so rows left in the buffer by a failed attempt are dropped with it.
+            async with self.bq_service.row_writer() as writer:
+                for value in values:
+                    await self.bq_service.insert_enrichment_raw_data(
+                        job_id=job_id,
+                        entity_id=value.entity_id,
+                        source='custom_column',
+                        raw_data={
+                            'column_id': column_id,
+                            'value': value.dict(exclude_none=True)
+                        },
+                        processed_data=value.dict(exclude={'error_details'}),
+                        writer=writer
+                    )
 
         except Exception as e:
             logger.error(f"Error storing results: {str(e)}", exc_info=True)
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import math
 import os
 import time
 import uuid
@@ -8,7 +9,7 @@ from datetime import datetime, timezone
 
 import httpx
 from dateutil.relativedelta import relativedelta
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Callable, Awaitable, Tuple, Set
 
 from services.ai.ai_service import AIServiceFactory
 from services.ai.ai_service_base import ThinkingBudget
@@ -16,8 +17,13 @@ from services.ai.api_cache_service import APICacheService, cached_request
 from services.bigquery_service import BigQueryService
 from services.jina_service import JinaService
 from services.proxycurl_service import ProxyCurlService
+from services.task_result_manager import JobCheckpoints
 from services.builtwith_service import BuiltWithService
+from utils.batch_packing import pack_batches, split_batch
 from utils.connection_pool import ConnectionPool
+from utils.lead_prefilter import LeadPreFilter, has_matching_terms
+from utils.prompt_encoding import JSON_FORMAT, describe_format, encode_records, estimate_tokens, to_prompt_json
+from utils.role_pattern_generator import RolePatternGenerator
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from utils.url_utils import UrlUtils
 from models.leads import ApolloLead, SearchApolloLeadsResponse, EnrichedLead, EvaluateLeadsResult, EvaluatedLead
@@ -45,6 +51,23 @@ class ApolloConfig:
     min_fit_threshold: int = 50
     default_temperature: float = 0.15
     pre_eval_temperature: float = 0.0
+    # Triage leads with title/persona rules before LLM pre-evaluation.
+    pre_filter_enabled: bool = True
+    # Also match titles against a buyer title regex generated once per set of persona titles.
+    pre_filter_use_generated_role_pattern: bool = True
+    # Format of leads in evaluation prompts, one of utils.prompt_encoding.PROMPT_FORMATS. Compact formats are
+    # smaller, switch once scripts/benchmark_lead_prompt_encoding.py shows they keep evaluation results.
+    lead_prompt_format: str = JSON_FORMAT
+    # Leads are packed into evaluation calls up to a token budget of the model, instead of ai_batch_size leads per call.
+    ai_batch_token_budgets: Dict[str, int] = field(default_factory=lambda: {
+        'gemini-2.5-flash-preview-04-17': 8000,
+    })
+    default_ai_batch_token_budget: int = 4000
+    # Upper bound of leads per call, which bounds the size and latency of the response.
+    max_leads_per_pre_evaluation_batch: int = 25
+    max_leads_per_evaluation_batch: int = 10
+    # Leads are enriched with ProxyCurl and checkpointed in batches of this size, matching ProxyCurl workers.
+    enrichment_checkpoint_batch_size: int = 5
 
     # Configuration parameters for scoring
     seniority_thresholds: Dict[str, float] = field(default_factory=lambda: {
@@ -67,19 +90,6 @@ class ApolloConfig:
     })
 
 
-AI_RETRY_CONFIG = RetryConfig(
-    max_attempts=3,
-    base_delay=1.0,
-    max_delay=5.0,
-    retryable_exceptions=[
-        RetryableError,
-        asyncio.TimeoutError,
-        ConnectionError,
-        Exception  # Allow everything to be retryable here
-    ]
-)
-
-
 @dataclass
 class ProcessingMetrics:
     """Track processing metrics for monitoring."""
@@ -91,6 +101,12 @@ class ProcessingMetrics:
     ai_errors: int = 0
     enriched_leads: int = 0
     enrichment_errors: int = 0
+    pre_filter_rejected_leads: int = 0
+    pre_evaluation_llm_calls: int = 0
+    pre_evaluation_llm_calls_avoided: int = 0
+    lead_evaluation_llm_calls: int = 0
+    ai_batch_splits: int = 0
+    checkpointed_batches_resumed: int = 0
 
 
 @dataclass
@@ -163,6 +179,53 @@ class PromptTemplates:
 }}
     """
 
+    PRE_EVALUATION_PROMPT = """
+You are an experienced BDR/SDR tasked with quickly evaluating a list of potential leads based on limited information.
+Your goal is to identify leads that show strong potential and warrant deeper research/enrichment.
+
+Product Description:
+{product_description}
+
+Target Personas:
+{persona_role_titles}
+
+Evaluation Guidelines:
+1. Role Relevance:
+   - How closely does their title match our target personas?
+   - Which persona type do the match the best? Write the rationale in the 'reason' field before deciding on which persona
+   - Is their seniority level appropriate for decision-making/influence?
+   - Do their departments/functions align with our product's use case?
+
+2. Company Context:
+   - Does their company profile suggest they might need our solution?
+   - Consider company size and maturity
+
+3. Confidence Level:
+   - How certain are we about this evaluation given limited data?
+   - What factors increase/decrease our confidence?
+
+Return a JSON response with this structure:
+{{
+    "evaluated_leads": [
+        {{
+            "lead_id": string,
+            "initial_score": number (0-100),
+            "initial_persona_estimate": string (one of 'buyer', 'influencer', 'end_user' or 'null'),
+            "reason": string (specific reasons for the score),
+            "enrichment_recommended": boolean,
+            "confidence": number (0-100),
+            "key_signals": [string] (specific positive signals found),
+            "career_insights": {{
+                "relevant_past_roles": [string],
+                "years_of_relevant_experience": number,
+                "industry_alignment": string,
+                "function_alignment": string
+            }}
+        }}
+    ]
+}}
+"""
+
     LEAD_EVALUATION_PROMPT_V2 = """
 You're a highly intelligent B2B Sales Development Representative tasked with evaluating leads that are the best fit for the Product you are selling.
 
@@ -244,13 +307,45 @@ If a lead had high pre-evaluation confidence and score but you score them lower:
 - Explicitly explain the misalignment with the product in `internal_analysis` field
 - Reference specific aspects of the product that don't match
 
-Lead Profiles (with pre-evaluation insights):
+"""
+
+    # Leads part of LEAD_EVALUATION_PROMPT_V2, sent separately so that the static part can be cached by the provider.
+    LEAD_PROFILES_PROMPT_V2 = """
+Lead Profiles (with pre-evaluation insights), {lead_profiles_format}:
 {lead_profiles}
 
 \"\"\"
 """
 
 
+def _get_pre_evaluation_lead_data(lead: ApolloLead) -> Dict[str, Any]:
+    """Fields of given Apollo lead used in pre-evaluation prompt."""
+    return {
+        'id': lead.id,
+        'name': lead.name,
+        'headline': lead.headline,
+        'title': lead.title,
+        'seniority': lead.seniority,
+        'departments': lead.departments,
+        'subdepartments': lead.subdepartments,
+        'functions': lead.functions,
+        'organization': {
+            'name': lead.organization.name,
+            'founded_year': lead.organization.founded_year,
+            'website_url': lead.organization.website_url,
+            'primary_domain': lead.organization.primary_domain
+        } if lead.organization else None,
+        'employment_history': [{
+            'title': emp.title,
+            'organization_name': emp.organization_name,
+            'current': emp.current,
+            'description': emp.description,
+            'start_date': emp.start_date,
+            'end_date': emp.end_date
+        } for emp in lead.employment_history] if lead.employment_history else [],
+    }
+
+
 def _is_recent_career_change(lead: ApolloLead) -> bool:
     """
     Check if the lead has been recently promoted or changed roles.
@@ -308,6 +403,14 @@ class ApolloLeadsTask(AccountEnrichmentTask):
 
     ENRICHMENT_TYPE = 'generate_leads'
 
+    # Job stages with per batch checkpoints, so that a retried job resumes with the missing batches.
+    CHECKPOINT_FETCHED_PAGES = 'fetched_pages'
+    CHECKPOINT_PRE_EVALUATION = 'pre_evaluation'
+    # Generated role pattern decides which leads are pre-evaluated by the LLM, and so the pre-evaluation batches.
+    CHECKPOINT_ROLE_PATTERN = 'role_pattern'
+    CHECKPOINT_ENRICHED_LEADS = 'enriched_leads'
+    CHECKPOINT_EVALUATION = 'evaluation'
+
     # Retry configurations
     APOLLO_RETRY_CONFIG = RetryConfig(
         max_attempts=3,
@@ -332,6 +435,8 @@ class ApolloLeadsTask(AccountEnrichmentTask):
         self._initialize_services()
         self.prompts = PromptTemplates()
         self.jina_service = JinaService()
+        # Generated buyer title regex keyed by persona titles JSON, shared across jobs of the same product.
+        self.role_patterns: Dict[str, Optional[str]] = {}
 
     def _initialize_credentials(self) -> None:
         """Initialize and validate required API credentials."""
@@ -416,19 +521,57 @@ class ApolloLeadsTask(AccountEnrichmentTask):
         Check if any source term contains or is contained within any target term.
         This allows for partial matches while handling underscores and common variations.
         """
-        if not source_terms or not target_terms:
-            return False
-
-        source_terms = [term.lower().replace('_', ' ') for term in source_terms]
-        target_terms = [term.lower().replace('_', ' ') for term in target_terms]
-
-        for source in source_terms:
-            for target in target_terms:
-                # Check both directions of containment
-                if source in target or target in source:
-                    logger.debug(f"Term match found: {source} ⟷ {target}")
-                    return True
-        return False
+        return has_matching_terms(source_terms, target_terms)
+
+    async def _get_role_pattern(self, persona_role_titles: Dict[str, Any], checkpoints: Optional[JobCheckpoints] = None) -> Optional[str]:
+        """
+        Returns buyer title regex for given persona titles, generated once and reused across jobs.
+        The pattern is checkpointed, so a retried job triages leads into the same pre-evaluation batches and resumes them.
+        """
+        if not self.config.pre_filter_use_generated_role_pattern or not persona_role_titles:
+            return None
+
+        key = json.dumps(persona_role_titles, sort_keys=True)
+        checkpoints = checkpoints or JobCheckpoints()
+        checkpoint_key = JobCheckpoints.batch_key([key])
+        saved: Optional[Dict[str, Optional[str]]] = checkpoints.get(self.CHECKPOINT_ROLE_PATTERN, checkpoint_key)
+        if saved is not None:
+            return saved.get('role_pattern')
+
+        if key not in self.role_patterns:
+            try:
+                self.role_patterns[key] = await RolePatternGenerator(self.model).generate_pattern(persona_role_titles)
+            except Exception as e:
+                # Persona titles are still matched without the generated pattern.
+                logger.warning(f"Could not generate role pattern for pre-filter: {str(e)}")
+                self.role_patterns[key] = None
+        await checkpoints.save(self.CHECKPOINT_ROLE_PATTERN, checkpoint_key, {'role_pattern': self.role_patterns[key]})
+        return self.role_patterns[key]
+
+    async def _pre_filter_apollo_leads(
+            self,
+            apollo_leads: List[ApolloLead],
+            product_data: Dict[str, Any],
+            checkpoints: Optional[JobCheckpoints] = None
+    ) -> tuple[List[ApolloLead], List[Dict[str, Any]]]:
+        """
+        Triage leads with deterministic title and persona rules.
+
+        Returns leads that need LLM pre-evaluation and pre-evaluation results of leads decided by rules.
+        """
+        if not self.config.pre_filter_enabled:
+            return apollo_leads, []
+
+        persona_role_titles = product_data.get('persona_role_titles', {})
+        target_departments, target_functions = self._get_target_departments_and_functions(persona_role_titles)
+        pre_filter = LeadPreFilter(
+            persona_role_titles=persona_role_titles,
+            target_departments=target_departments,
+            target_functions=target_functions,
+            role_pattern=await self._get_role_pattern(persona_role_titles, checkpoints)
+        )
+        llm_leads, rejected = pre_filter.split(apollo_leads)
+        return llm_leads, [result.to_pre_evaluation() for result in rejected]
 
     def _should_enrich_lead(
             self,
@@ -505,121 +648,167 @@ class ApolloLeadsTask(AccountEnrichmentTask):
 
         return meets_thresholds
 
-    @with_retry(retry_config=AI_RETRY_CONFIG, operation_name="pre_evaluate_apollo_leads")
-    async def pre_evaluate_apollo_leads(self, apollo_leads: List[ApolloLead], product_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Pre-evaluate Apollo leads to determine which ones warrant ProxyCurl enrichment."""
-        try:
-            if not apollo_leads:
-                logger.warning("No Apollo leads provided for evaluation")
-                return []
-
-            base_prompt = f"""
-            You are an experienced BDR/SDR tasked with quickly evaluating a list of potential leads based on limited information.
-            Your goal is to identify leads that show strong potential and warrant deeper research/enrichment.
+    def _get_ai_batch_token_budget(self) -> int:
+        """Token budget of leads in one evaluation call for the configured model."""
+        return self.config.ai_batch_token_budgets.get(self.model.model, self.config.default_ai_batch_token_budget)
 
-            Product Description:
-            {product_data.get('description')}
+    async def _process_batch_with_split(
+            self,
+            batch: List[Any],
+            process_batch: Callable[[List[Any]], Awaitable[Optional[List[Any]]]]
+    ) -> List[Any]:
+        """
+        Process given batch with given function, which returns None when the response is invalid.
+        Invalid batches are split in halves that are processed separately, down to single leads,
+        so that one lead that breaks the response does not fail its neighbours. Failed requests must
+        return an empty list instead of None, since splitting does not help against them.
+        """
+        result = await process_batch(batch)
+        if result is not None:
+            return result
+        if len(batch) == 1:
+            return []
 
-            Target Personas:
-            {json.dumps(product_data.get('persona_role_titles', {}), indent=2)}
+        self.metrics.ai_batch_splits += 1
+        logger.warning(f"Splitting batch of {len(batch)} leads after invalid AI response")
+        results = await asyncio.gather(*[self._process_batch_with_split(half, process_batch) for half in split_batch(batch)])
+        return [item for result in results for item in result]
 
-            Evaluation Guidelines:
-            1. Role Relevance:
-               - How closely does their title match our target personas?
-               - Which persona type do the match the best? Write the rationale in the 'reason' field before deciding on which persona
-               - Is their seniority level appropriate for decision-making/influence?
-               - Do their departments/functions align with our product's use case?
+    async def _process_batch_with_checkpoint(
+            self,
+            batch: List[Any],
+            batch_ids: List[str],
+            stage: str,
+            checkpoints: JobCheckpoints,
+            process_batch: Callable[[List[Any]], Awaitable[Optional[List[Any]]]],
+            result_model: Optional[type] = None
+    ) -> List[Any]:
+        """
+        Process given batch with _process_batch_with_split, unless a previous attempt of the job checkpointed it.
+        Results are checkpointed as dicts and restored as result_model instances if given.
+        """
+        batch_key = JobCheckpoints.batch_key(batch_ids)
+        saved: Optional[List[Dict[str, Any]]] = checkpoints.get(stage, batch_key)
+        if saved is not None:
+            self.metrics.checkpointed_batches_resumed += 1
+            return [result_model(**item) for item in saved] if result_model else saved
+
+        result = await self._process_batch_with_split(batch, process_batch)
+        # Batches without any result are not checkpointed, so a retry tries them again.
+        if result:
+            await checkpoints.save(stage, batch_key, [item.model_dump() for item in result] if result_model else result)
+        return result
+
+    @staticmethod
+    def _get_prompt_cache_scope(tenant_id: Optional[str], product_data: Dict[str, Any]) -> str:
+        """Scope of cached prompt prefixes, prompts of a product only share instructions and product context within a tenant."""
+        return f"{tenant_id}:{product_data.get('id') or product_data.get('name')}"
+
+    @staticmethod
+    def _build_pre_evaluation_prompt(batch: List[ApolloLead], product_data: Dict[str, Any], prompt_format: str) -> Tuple[str, str]:
+        """
+        Pre-evaluation prompt for given batch of Apollo leads, with leads encoded in given prompt format.
+        Returns static system prompt shared by all batches of the product and user prompt with the leads.
+        """
+        system_prompt = PromptTemplates.PRE_EVALUATION_PROMPT.format(
+            product_description=product_data.get('description'),
+            persona_role_titles=to_prompt_json(product_data.get('persona_role_titles', {}), prompt_format)
+        )
+        batch_data = [_get_pre_evaluation_lead_data(lead) for lead in batch]
+        user_prompt = (f"The leads to evaluate, {describe_format(prompt_format, record_name='lead')}:\n"
+                       f"{encode_records(batch_data, prompt_format)}")
+        return system_prompt, user_prompt
 
-            2. Company Context:
-               - Does their company profile suggest they might need our solution?
-               - Consider company size and maturity
+    @staticmethod
+    def _build_lead_evaluation_prompt(lead_profiles: List[Dict[str, Any]], product_data: Dict[str, Any], prompt_format: str) -> Tuple[str, str]:
+        """
+        Lead evaluation prompt for given lead profiles, encoded in given prompt format.
+        Returns static system prompt shared by all batches of the product and user prompt with the lead profiles.
+        """
+        system_prompt = PromptTemplates.LEAD_EVALUATION_PROMPT_V2.format(
+            product_description=product_data.get("description", "Product description not available"),
+            persona_role_titles=to_prompt_json(product_data.get('persona_role_titles', {}), prompt_format),
+            additional_signals=product_data.get('additional_lead_signals', '')
+        )
+        user_prompt = PromptTemplates.LEAD_PROFILES_PROMPT_V2.format(
+            lead_profiles_format=describe_format(prompt_format, record_name='lead'),
+            lead_profiles=encode_records(lead_profiles, prompt_format)
+        )
+        return system_prompt, user_prompt
 
-            3. Confidence Level:
-               - How certain are we about this evaluation given limited data?
-               - What factors increase/decrease our confidence?
+    async def pre_evaluate_apollo_leads(self, apollo_leads: List[ApolloLead], product_data: Dict[str, Any],
+                                        prompt_cache_scope: Optional[str] = None,
+                                        checkpoints: Optional[JobCheckpoints] = None) -> List[Dict[str, Any]]:
+        """
+        Pre-evaluate Apollo leads to determine which ones warrant ProxyCurl enrichment.
+        Failures are handled per batch, and batches checkpointed by a previous attempt of the job are not evaluated again.
+        """
+        checkpoints = checkpoints or JobCheckpoints()
+        try:
+            if not apollo_leads:
+                logger.warning("No Apollo leads provided for evaluation")
+                return []
 
-            Return a JSON response with this structure:
-            {{
-                "evaluated_leads": [
-                    {{
-                        "lead_id": string,
-                        "initial_score": number (0-100),
-                        "initial_persona_estimate": string (one of 'buyer', 'influencer', 'end_user' or 'null'),
-                        "reason": string (specific reasons for the score),
-                        "enrichment_recommended": boolean,
-                        "confidence": number (0-100),
-                        "key_signals": [string] (specific positive signals found),
-                        "career_insights": {{
-                            "relevant_past_roles": [string],
-                            "years_of_relevant_experience": number,
-                            "industry_alignment": string,
-                            "function_alignment": string
-                        }}
-                    }}
-                ]
-            }}
-            """
+            # Decide clear non-matches with rules so that only ambiguous or promising leads cost an LLM call.
+            total_leads = len(apollo_leads)
+            apollo_leads, pre_filtered_results = await self._pre_filter_apollo_leads(apollo_leads, product_data, checkpoints)
 
             # Configure concurrency
             semaphore = asyncio.Semaphore(self.config.ai_concurrent_requests)
-
-            async def process_batch(batch: List[ApolloLead]) -> List[Dict[str, Any]]:
+            llm_calls = 0
+
+            async def process_batch(batch: List[ApolloLead]) -> Optional[List[Dict[str, Any]]]:
+                """
+                Returns pre-evaluations of given batch or None if the response was invalid.
+                Failed requests (rate limits, timeouts, network errors) return no pre-evaluations instead,
+                since a smaller batch would fail the same way.
+                """
+                nonlocal llm_calls
                 async with semaphore:
+                    llm_calls += 1
                     try:
-                        batch_data = [{
-                            'id': lead.id,
-                            'name': lead.name,
-                            'headline': lead.headline,
-                            'title': lead.title,
-                            'seniority': lead.seniority,
-                            'departments': lead.departments,
-                            'subdepartments': lead.subdepartments,
-                            'functions': lead.functions,
-                            'organization': {
-                                'name': lead.organization.name if lead.organization else None,
-                                'founded_year': lead.organization.founded_year if lead.organization else None,
-                                'website_url': lead.organization.website_url if lead.organization else None,
-                                'primary_domain': lead.organization.primary_domain if lead.organization else None
-                            } if lead.organization else None,
-                            'employment_history': [{
-                                'title': emp.title,
-                                'organization_name': emp.organization_name,
-                                'current': emp.current,
-                                'description': emp.description,
-                                'start_date': emp.start_date,
-                                'end_date': emp.end_date
-                            } for emp in lead.employment_history] if lead.employment_history else [],
-                        } for lead in batch]
-
-                        batch_prompt = f"{base_prompt}\n\nThe leads to evaluate:\n{json.dumps(batch_data, indent=2)}"
-                        response = await self.model.generate_content(batch_prompt, is_json=True, operation_tag="pre_evaluate_apollo_leads", temperature=ApolloConfig.pre_eval_temperature)
-
-                        if not response:
-                            logger.error("Empty response from AI model")
-                            self.metrics.ai_errors += 1
-                            return []
-
-                        if 'evaluated_leads' not in response:
-                            logger.error(f"Invalid response structure: {response}")
-                            self.metrics.ai_errors += 1
-                            return []
-                        return response['evaluated_leads']
-
+                        system_prompt, user_prompt = self._build_pre_evaluation_prompt(
+                            batch=batch, product_data=product_data, prompt_format=self.config.lead_prompt_format)
+                        response = await self.model.generate_content(
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            cache_scope=prompt_cache_scope,
+                            is_json=True,
+                            operation_tag="pre_evaluate_apollo_leads",
+                            temperature=ApolloConfig.pre_eval_temperature
+                        )
                     except Exception as e:
                         logger.error(f"Error processing batch: {str(e)}")
                         self.metrics.ai_errors += 1
                         return []
 
-            # Create batches and tasks
-            batches = [apollo_leads[i:i + self.config.ai_batch_size]
-                       for i in range(0, len(apollo_leads), self.config.ai_batch_size)]
-            tasks = [process_batch(batch) for batch in batches]
+                    if not response:
+                        logger.error(f"Empty response from AI model for batch of {len(batch)} leads")
+                        self.metrics.ai_errors += 1
+                        return None
+
+                    if not isinstance(response, dict) or 'evaluated_leads' not in response:
+                        logger.error(f"Invalid response structure: {response}")
+                        self.metrics.ai_errors += 1
+                        return None
+                    return response['evaluated_leads']
+
+            # Pack leads into batches by their size in the prompt and create tasks
+            token_counts = [estimate_tokens(encode_records([_get_pre_evaluation_lead_data(lead)], self.config.lead_prompt_format))
+                            for lead in apollo_leads]
+            batches = pack_batches(apollo_leads, token_counts, token_budget=self._get_ai_batch_token_budget(),
+                                   max_items=self.config.max_leads_per_pre_evaluation_batch)
+            tasks = [
+                self._process_batch_with_checkpoint(batch, [lead.id for lead in batch], self.CHECKPOINT_PRE_EVALUATION,
+                                                    checkpoints, process_batch)
+                for batch in batches
+            ]
 
             # Execute all batches concurrently and gather results
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             # Combine and filter results
-            evaluated_leads = []
+            evaluated_leads = list(pre_filtered_results)
             for batch_result in results:
                 if isinstance(batch_result, Exception):
                     logger.error(f"Batch processing failed: {str(batch_result)}")
@@ -627,6 +816,15 @@ class ApolloLeadsTask(AccountEnrichmentTask):
                 else:
                     evaluated_leads.extend(batch_result)
 
+            # Calls avoided are counted against fixed size batches of all leads, before rule based pre-filtering.
+            self.metrics.pre_filter_rejected_leads = len(pre_filtered_results)
+            self.metrics.pre_evaluation_llm_calls = llm_calls
+            self.metrics.pre_evaluation_llm_calls_avoided = math.ceil(total_leads / self.config.ai_batch_size) - llm_calls
+            logger.info(
+                f"Pre-filter sent {len(apollo_leads)} of {total_leads} leads to LLM pre-evaluation, "
+                f"rejected {len(pre_filtered_results)}, batches: {len(batches)}, LLM calls: {llm_calls}, "
+                f"LLM calls avoided: {self.metrics.pre_evaluation_llm_calls_avoided}"
+            )
             return evaluated_leads
 
         except Exception as e:
@@ -640,6 +838,7 @@ class ApolloLeadsTask(AccountEnrichmentTask):
         account_id = payload.get('account_id')
         account_data = payload.get('account_data', {})
         product_data = payload.get('product_data', {})
+        prompt_cache_scope = self._get_prompt_cache_scope(tenant_id=payload.get('tenant_id'), product_data=product_data)
         current_stage = 'initialization'
 
         name = account_data.get("name")
@@ -656,6 +855,9 @@ class ApolloLeadsTask(AccountEnrichmentTask):
         logger.info(f"Starting lead identification for job_id: {job_id}, account_id: {account_id}")
 
         try:
+            # Work checkpointed by previous attempts of this job (Cloud Tasks retries) is not done again.
+            checkpoints = await JobCheckpoints.load(self.result_manager, self.ENRICHMENT_TYPE, job_id=job_id, account_id=account_id)
+
             # Send initial processing callback
             await self.callback_svc.send_callback(
                 job_id=job_id,
@@ -675,7 +877,8 @@ class ApolloLeadsTask(AccountEnrichmentTask):
 
             # Fetch employees with concurrent processing
             current_stage = 'fetching_employees'
-            apollo_leads: List[ApolloLead] = await self._fetch_employees_concurrent(domain=domain, apollo_org_id=apollo_org_id)
+            apollo_leads: List[ApolloLead] = await self._fetch_employees_concurrent(domain=domain, apollo_org_id=apollo_org_id,
+                                                                                        checkpoints=checkpoints)
             self.metrics.total_leads_processed = len(apollo_leads)
 
             await self.callback_svc.send_callback(
@@ -693,7 +896,8 @@ class ApolloLeadsTask(AccountEnrichmentTask):
 
             # Initial evaluation of Apollo leads
             current_stage = 'initial_evaluation'
-            pre_evaluation_results = await self.pre_evaluate_apollo_leads(apollo_leads, product_data)
+            pre_evaluation_results = await self.pre_evaluate_apollo_leads(apollo_leads, product_data, prompt_cache_scope=prompt_cache_scope,
+                                                                          checkpoints=checkpoints)
 
             # Filter leads for enrichment
             leads_for_enrichment_with_scores = []
@@ -746,23 +950,11 @@ class ApolloLeadsTask(AccountEnrichmentTask):
             current_stage = 'structuring_leads'
             enriched_leads: List[EnrichedLead] = []
 
-            # Process selected leads
+            # Process selected leads and enrich promising leads with ProxyCurl
             if leads_for_enrichment:
-                enriched_leads.extend(await self._process_leads_in_batches(
-                    leads_for_enrichment,
-                    self.config.batch_size,
-                    self._transform_apollo_employee
-                ))
-
-                # Enrich promising leads with ProxyCurl
                 if self.config.enrich_leads:
                     current_stage = 'enriching_leads'
-                    try:
-                        enriched_leads = await self.proxycurl_service.enrich_leads(enriched_leads)
-                        self.metrics.enriched_leads = len(enriched_leads)
-                    except Exception as e:
-                        logger.error(f"Lead enrichment failed: {str(e)}", exc_info=True)
-                        self.metrics.enrichment_errors += 1
+                enriched_leads.extend(await self._structure_and_enrich_leads(leads_for_enrichment, checkpoints))
 
             # Process skipped leads with basic transformation
             if skipped_leads:
@@ -775,7 +967,8 @@ class ApolloLeadsTask(AccountEnrichmentTask):
 
             # Evaluate all leads
             current_stage = 'evaluating_leads'
-            evaluated_leads = await self._evaluate_leads_v2(enriched_leads, product_data, pre_evaluations=pre_evaluation_results)
+            evaluated_leads = await self._evaluate_leads_v2(enriched_leads, product_data, pre_evaluations=pre_evaluation_results,
+                                                            prompt_cache_scope=prompt_cache_scope, checkpoints=checkpoints)
 
             # Store results with enhanced metadata
             current_stage = 'storing_results'
@@ -913,12 +1106,19 @@ class ApolloLeadsTask(AccountEnrichmentTask):
             return None
 
     @with_retry(retry_config=APOLLO_RETRY_CONFIG, operation_name="fetch_employees_concurrent")
-    async def _fetch_employees_concurrent(self, domain: str, apollo_org_id: Optional[str]) -> List[ApolloLead]:
-        """Fetch employees with concurrent processing."""
+    async def _fetch_employees_concurrent(self, domain: str, apollo_org_id: Optional[str],
+                                          checkpoints: Optional[JobCheckpoints] = None) -> List[ApolloLead]:
+        """Fetch employees with concurrent processing, pages checkpointed by a previous attempt of the job are not fetched again."""
         all_employees: List[ApolloLead] = []
         semaphore = asyncio.Semaphore(self.config.concurrent_requests)
+        checkpoints = checkpoints or JobCheckpoints()
 
         async def fetch_page(page_num: int) -> Optional[SearchApolloLeadsResponse]:
+            saved_page: Optional[Dict[str, Any]] = checkpoints.get(self.CHECKPOINT_FETCHED_PAGES, str(page_num))
+            if saved_page is not None:
+                self.metrics.checkpointed_batches_resumed += 1
+                return SearchApolloLeadsResponse(**saved_page)
+
             async with semaphore:
                 try:
                     search_params = {
@@ -957,7 +1157,9 @@ class ApolloLeadsTask(AccountEnrichmentTask):
                     )
 
                     if status_code == 200:
-                        return SearchApolloLeadsResponse(**response)
+                        page = SearchApolloLeadsResponse(**response)
+                        await checkpoints.save(self.CHECKPOINT_FETCHED_PAGES, str(page_num), response)
+                        return page
                     elif status_code == 429:
                         raise RetryableError("Rate limit exceeded")
                     return []
@@ -1012,6 +1214,72 @@ class ApolloLeadsTask(AccountEnrichmentTask):
 
         return all_employees
 
+    async def _structure_and_enrich_leads(self, leads: List[ApolloLead], checkpoints: JobCheckpoints) -> List[EnrichedLead]:
+        """
+        Transform leads selected for enrichment and enrich them with ProxyCurl, checkpointing results in batches.
+        Leads of batches checkpointed by a previous attempt are not enriched again, the others are enriched
+        together in one call and every batch is checkpointed as soon as all its leads are enriched. If enrichment
+        fails, leads of batches not checkpointed yet keep their Apollo data, so a retry enriches them again.
+        """
+        enriched_leads: List[EnrichedLead] = []
+        pending_batches: List[Tuple[str, List[EnrichedLead]]] = []
+        batch_size = self.config.enrichment_checkpoint_batch_size
+        for i in range(0, len(leads), batch_size):
+            batch: List[ApolloLead] = leads[i:i + batch_size]
+            batch_key = JobCheckpoints.batch_key([lead.id for lead in batch])
+            saved: Optional[List[Dict[str, Any]]] = checkpoints.get(self.CHECKPOINT_ENRICHED_LEADS, batch_key)
+            if saved is not None:
+                self.metrics.checkpointed_batches_resumed += 1
+                enriched_leads.extend(EnrichedLead(**lead) for lead in saved)
+            else:
+                pending_batches.append((batch_key, await self._process_leads_in_batches(batch, batch_size, self._transform_apollo_employee)))
+
+        # Position of every pending lead in its batch, results of a batch are checkpointed once all of them are in.
+        lead_positions: List[Tuple[int, int]] = [
+            (batch_index, position)
+            for batch_index, (_, batch_leads) in enumerate(pending_batches)
+            for position in range(len(batch_leads))
+        ]
+        batch_results: List[List[Optional[EnrichedLead]]] = [[None] * len(batch_leads) for _, batch_leads in pending_batches]
+        remaining_leads: List[int] = [len(batch_leads) for _, batch_leads in pending_batches]
+        saved_batches: Set[int] = set()
+
+        async def save_batch(batch_index: int) -> None:
+            saved_batches.add(batch_index)
+            await checkpoints.save(self.CHECKPOINT_ENRICHED_LEADS, pending_batches[batch_index][0],
+                                   [lead.model_dump() for lead in batch_results[batch_index] if lead])
+
+        async def on_lead_enriched(index: int, lead: Optional[EnrichedLead]) -> None:
+            batch_index, position = lead_positions[index]
+            batch_results[batch_index][position] = lead
+            remaining_leads[batch_index] -= 1
+            if remaining_leads[batch_index] == 0:
+                await save_batch(batch_index)
+
+        pending_leads: List[EnrichedLead] = [lead for _, batch_leads in pending_batches for lead in batch_leads]
+        if self.config.enrich_leads and pending_leads:
+            try:
+                await self.proxycurl_service.enrich_leads(pending_leads, on_lead_enriched=on_lead_enriched)
+            except Exception as e:
+                logger.error(f"Lead enrichment failed: {str(e)}", exc_info=True)
+                self.metrics.enrichment_errors += 1
+                for batch_index, (_, batch_leads) in enumerate(pending_batches):
+                    enriched_leads.extend(
+                        [lead for lead in batch_results[batch_index] if lead] if batch_index in saved_batches else batch_leads)
+                self.metrics.enriched_leads = len(enriched_leads)
+                return enriched_leads
+        else:
+            batch_results = [list(batch_leads) for _, batch_leads in pending_batches]
+
+        # Batches without leads to enrich, or all of them if enrichment is disabled, are checkpointed as they are.
+        await asyncio.gather(*[save_batch(batch_index) for batch_index in range(len(pending_batches)) if batch_index not in saved_batches])
+        for results in batch_results:
+            enriched_leads.extend(lead for lead in results if lead)
+
+        if self.config.enrich_leads:
+            self.metrics.enriched_leads = len(enriched_leads)
+        return enriched_leads
+
     async def _process_leads_in_batches(
             self,
             leads: List[ApolloLead],
@@ -1298,11 +1566,14 @@ class ApolloLeadsTask(AccountEnrichmentTask):
         return evaluated_leads
 
     async def _evaluate_leads_v2(self, enriched_leads: List[EnrichedLead], product_data: Dict[str, Any],
-                                 pre_evaluations: List[Dict]) -> List[EvaluatedLead]:
+                                 pre_evaluations: List[Dict], prompt_cache_scope: Optional[str] = None,
+                                 checkpoints: Optional[JobCheckpoints] = None) -> List[EvaluatedLead]:
         """
         Evaluate leads in concurrent batches with enhanced error handling.
         Uses semaphore to limit concurrent AI requests while maximizing throughput.
+        Batches checkpointed by a previous attempt of the job are not evaluated again.
         """
+        checkpoints = checkpoints or JobCheckpoints()
         if not enriched_leads:
             logger.warning("No enriched leads provided for evaluation")
             return []
@@ -1317,71 +1588,83 @@ class ApolloLeadsTask(AccountEnrichmentTask):
             if eval_result.get('id') or eval_result.get('lead_id')
         }
 
+        # Prepare lead profiles with pre-evaluation insights
+        lead_profiles: List[Dict[str, Any]] = []
+        for lead in enriched_leads:
+            lead_data = lead.model_dump(include=lead.get_lead_evaluation_serialization_fields())
+            pre_eval = pre_evaluations_dict.get(lead.id)
+
+            if pre_eval:
+                lead_data['pre_evaluation_insights'] = {
+                    'initial_score': pre_eval.get('initial_score'),
+                    'key_signals': pre_eval.get('key_signals', []),
+                    'career_insights': pre_eval.get('career_insights', {}),
+                    'confidence': pre_eval.get('confidence')
+                }
+                # Add any time based signals for given lead.
+                time_based_signals: List[str] = self._get_time_based_signals(lead=lead)
+                if len(time_based_signals) > 0:
+                    # Append to key signals.
+                    lead_data['pre_evaluation_insights']['key_signals'].extend(time_based_signals)
+            else:
+                lead_data['pre_evaluation_insights'] = None
+
+            lead_profiles.append(lead_data)
+
         # Configure concurrency
         semaphore = asyncio.Semaphore(self.config.ai_concurrent_requests)
+        llm_calls = 0
 
-        async def process_batch(batch: List[EnrichedLead]) -> List[EvaluatedLead]:
-            """Process a single batch of leads with the AI model."""
+        async def process_batch(batch: List[Dict[str, Any]]) -> Optional[List[EvaluatedLead]]:
+            """
+            Process a single batch of lead profiles with the AI model, returns None if the response was invalid.
+            Failed requests (rate limits, timeouts, network errors) return no evaluations instead,
+            since a smaller batch would fail the same way.
+            """
+            nonlocal llm_calls
             async with semaphore:
+                llm_calls += 1
                 try:
-                    # Prepare lead profiles with pre-evaluation insights
-                    lead_profiles = []
-                    for lead in batch:
-                        lead_data = lead.model_dump(include=lead.get_lead_evaluation_serialization_fields())
-                        pre_eval = pre_evaluations_dict.get(lead.id)
-
-                        if pre_eval:
-                            lead_data['pre_evaluation_insights'] = {
-                                'initial_score': pre_eval.get('initial_score'),
-                                'key_signals': pre_eval.get('key_signals', []),
-                                'career_insights': pre_eval.get('career_insights', {}),
-                                'confidence': pre_eval.get('confidence')
-                            }
-                            # Add any time based signals for given lead.
-                            time_based_signals: List[str] = self._get_time_based_signals(lead=lead)
-                            if len(time_based_signals) > 0:
-                                # Append to key signals.
-                                lead_data['pre_evaluation_insights']['key_signals'].extend(time_based_signals)
-                        else:
-                            lead_data['pre_evaluation_insights'] = None
-
-                        lead_profiles.append(lead_data)
-
-                    evaluation_prompt = self.prompts.LEAD_EVALUATION_PROMPT_V2.format(
-                        product_description=product_data.get("description", "Product description not available"),
-                        persona_role_titles=json.dumps(product_data.get('persona_role_titles', {}), indent=2),
-                        additional_signals=product_data.get('additional_lead_signals', ''),
-                        lead_profiles=json.dumps(lead_profiles, indent=2)
-                    )
+                    system_prompt, user_prompt = self._build_lead_evaluation_prompt(
+                        lead_profiles=batch, product_data=product_data, prompt_format=self.config.lead_prompt_format)
 
                     response = await self.model.generate_content(
-                        prompt=evaluation_prompt,
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        cache_scope=prompt_cache_scope,
                         is_json=True,
                         operation_tag="lead_evaluation"
                     )
+                except Exception as e:
+                    logger.error(f"Error processing batch: {str(e)}", exc_info=True)
+                    self.metrics.ai_errors += 1
+                    return []
 
-                    if not response or 'evaluated_leads' not in response:
-                        logger.error(f"Invalid response from AI model for batch of {len(batch)} leads")
-                        self.metrics.ai_errors += 1
-                        return []
+                if not response or not isinstance(response, dict) or 'evaluated_leads' not in response:
+                    logger.error(f"Invalid response from AI model for batch of {len(batch)} leads")
+                    self.metrics.ai_errors += 1
+                    return None
 
+                try:
                     evaluated_leads_result = EvaluateLeadsResult(**response)
-                    self.metrics.successful_leads += len(evaluated_leads_result.evaluated_leads)
-                    return evaluated_leads_result.evaluated_leads
-
                 except Exception as e:
-                    logger.error(f"Error processing batch: {str(e)}", exc_info=True)
+                    logger.error(f"Invalid evaluations from AI model for batch of {len(batch)} leads: {str(e)}")
                     self.metrics.ai_errors += 1
-                    return []
+                    return None
+                self.metrics.successful_leads += len(evaluated_leads_result.evaluated_leads)
+                return evaluated_leads_result.evaluated_leads
 
-        # Create batches and tasks
-        batches = [
-            enriched_leads[i:i + self.config.ai_batch_size]
-            for i in range(0, len(enriched_leads), self.config.ai_batch_size)
-        ]
+        # Pack lead profiles into batches by their size in the prompt and create tasks
+        token_counts = [estimate_tokens(encode_records([lead_data], self.config.lead_prompt_format)) for lead_data in lead_profiles]
+        batches = pack_batches(lead_profiles, token_counts, token_budget=self._get_ai_batch_token_budget(),
+                               max_items=self.config.max_leads_per_evaluation_batch)
 
         logger.info(f"Processing {len(enriched_leads)} leads in {len(batches)} batches")
-        tasks = [process_batch(batch) for batch in batches]
+        tasks = [
+            self._process_batch_with_checkpoint(batch, [lead_data['id'] for lead_data in batch], self.CHECKPOINT_EVALUATION,
+                                                checkpoints, process_batch, result_model=EvaluatedLead)
+            for batch in batches
+        ]
 
         # Execute all batches concurrently and gather results
         try:
@@ -1400,11 +1683,13 @@ class ApolloLeadsTask(AccountEnrichmentTask):
             self.metrics.ai_errors += 1
 
         self.metrics.processing_time = time.time() - start_time
+        self.metrics.lead_evaluation_llm_calls = llm_calls
 
         logger.info(
             f"Lead evaluation completed. "
             f"Processed {len(enriched_leads)} leads, "
             f"successfully evaluated {len(evaluated_leads)}, "
+            f"LLM calls: {llm_calls}, "
             f"in {self.metrics.processing_time:.2f} seconds"
         )
         return evaluated_leads
@@ -236,21 +236,21 @@ class LeadLinkedInResearchTask(AccountEnrichmentTask):
         activities = []
 
         if posts_html:
-            activities.extend(LinkedInActivityParser.get_activities(
+            activities.extend(await LinkedInActivityParser.get_activities_async(
                 person_linkedin_url=person_linkedin_url,
                 page_html=posts_html,
                 activity_type=LinkedInActivity.Type.POST
             ))
 
         if comments_html:
-            activities.extend(LinkedInActivityParser.get_activities(
+            activities.extend(await LinkedInActivityParser.get_activities_async(
                 person_linkedin_url=person_linkedin_url,
                 page_html=comments_html,
                 activity_type=LinkedInActivity.Type.COMMENT
             ))
 
         if reactions_html:
-            activities.extend(LinkedInActivityParser.get_activities(
+            activities.extend(await LinkedInActivityParser.get_activities_async(
                 person_linkedin_url=person_linkedin_url,
                 page_html=reactions_html,
                 activity_type=LinkedInActivity.Type.REACTION
@@ -0,0 +1,49 @@
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.ai.api_cache_keys import (
+    CACHE_KEY_NORMALIZERS, CacheKeyNormalizer, generate_cache_key, get_cache_key_normalizer, register_cache_key_normalizer
+)
+
+APOLLO_URL = "https://api.apollo.io/api/v1/mixed_people/search"
+
+
+def test_apollo_key_ignores_api_key_and_filter_order():
+    """Test Apollo searches that differ in API key or seniority order share a key, other filters do not."""
+    key = generate_cache_key(APOLLO_URL, {'page': 1, 'person_seniorities[]': ['vp', 'c_suite']}, {'x-api-key': 'key-1'})
+
+    assert generate_cache_key(APOLLO_URL, {'page': 1, 'person_seniorities[]': ['c_suite', 'vp']}, {'X-Api-Key': 'key-2'}) == key
+    assert generate_cache_key(APOLLO_URL, {'page': 2, 'person_seniorities[]': ['vp', 'c_suite']}, {'x-api-key': 'key-1'}) != key
+
+
+def test_integration_keys_ignore_credentials_and_url_variants():
+    """Test ProxyCurl profile URLs, BuiltWith key param and RapidAPI key header do not split the cache."""
+    proxycurl_url = "https://nubela.co/proxycurl/api/v2/linkedin"
+    assert (generate_cache_key(proxycurl_url, {'url': 'https://www.linkedin.com/in/Jane/'}, {'Authorization': 'Bearer a'})
+            == generate_cache_key(proxycurl_url, {'url': 'linkedin.com/in/jane'}, {'Authorization': 'Bearer b'}))
+
+    builtwith_url = "https://api.builtwith.com/v21/api.json"
+    assert (generate_cache_key(builtwith_url, {'KEY': 'a', 'LOOKUP': 'Acme.com'}, {})
+            == generate_cache_key(builtwith_url, {'KEY': 'b', 'LOOKUP': 'acme.com'}, {}))
+
+    rapidapi_url = "https://linkedin-api8.p.rapidapi.com/get-profile-posts"
+    assert (generate_cache_key(rapidapi_url, {'username': 'Jane'}, {'x-rapidapi-key': 'a'})
+            == generate_cache_key(rapidapi_url, {'username': 'jane'}, {'x-rapidapi-key': 'b'}))
+
+    assert get_cache_key_normalizer(builtwith_url).redact_params({'KEY': 'a', 'LOOKUP': 'acme.com'}) == {'LOOKUP': 'acme.com'}
+
+
+def test_registered_normalizer_takes_precedence():
+    """Test new integrations plug in their own normalizer."""
+    class ExampleNormalizer(CacheKeyNormalizer):
+        HOSTS = ['example.com']
+
+    normalizer = ExampleNormalizer()
+    register_cache_key_normalizer(normalizer)
+    try:
+        assert get_cache_key_normalizer("https://api.example.com/v1/search") is normalizer
+    finally:
+        CACHE_KEY_NORMALIZERS.remove(normalizer)
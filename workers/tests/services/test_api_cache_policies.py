@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.ai.api_cache_service import _refresh_tasks, cached_request
+from services.ai.api_cache_policies import get_cache_policy
+
+PROXYCURL_URL = "https://nubela.co/proxycurl/api/v2/linkedin"
+
+
+def make_cache_service(cached=None, status_code=200, response_data=None):
+    """Cache service returning given cached entry, with an upstream API returning given response."""
+    response = MagicMock(status_code=status_code, content=b'{}')
+    response.json.return_value = response_data or {}
+    client = MagicMock()
+    client.request = AsyncMock(return_value=response)
+
+    @asynccontextmanager
+    async def acquire_connection(url):
+        yield client
+
+    cache_service = MagicMock()
+    cache_service.get_cached_response = AsyncMock(return_value=cached)
+    cache_service.cache_response = AsyncMock()
+    cache_service.connection_pool.acquire_connection = acquire_connection
+    cache_service._generate_cache_key.return_value = 'cache-key'
+    return cache_service, client
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshed_in_background():
+    """Test a response older than ttl_hours is returned right away and refreshed once in the background."""
+    cached = {'data': {'full_name': 'Old'}, 'status_code': 200,
+              'created_at': datetime.now(timezone.utc) - timedelta(hours=25)}
+    cache_service, client = make_cache_service(cached=cached, response_data={'full_name': 'New'})
+
+    assert await cached_request(cache_service, PROXYCURL_URL, params={'url': 'x'}, ttl_hours=24) == ({'full_name': 'Old'}, 200)
+    await asyncio.gather(*_refresh_tasks.values())
+
+    client.request.assert_awaited_once()
+    assert cache_service.cache_response.await_args.kwargs['response_data'] == {'full_name': 'New'}
+    assert cache_service.cache_response.await_args.kwargs['ttl_hours'] == 24 + get_cache_policy(PROXYCURL_URL).stale_ttl_hours
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_cached_briefly_and_server_errors_are_not_cached():
+    """Test a missing profile is cached with the negative TTL of the integration, a 500 is not cached."""
+    cache_service, _ = make_cache_service(status_code=404)
+    assert await cached_request(cache_service, PROXYCURL_URL, params={'url': 'x'}, ttl_hours=24) == ({}, 404)
+    assert cache_service.cache_response.await_args.kwargs['ttl_hours'] == get_cache_policy(PROXYCURL_URL).negative_ttl_hours
+
+    cache_service, _ = make_cache_service(status_code=500)
+    await cached_request(cache_service, PROXYCURL_URL, params={'url': 'x'}, ttl_hours=24)
+    cache_service.cache_response.assert_not_awaited()
+
+
+def test_empty_builtwith_response_is_negative():
+    """Test domains without technology data get the negative TTL."""
+    policy = get_cache_policy("https://api.builtwith.com/v21/api.json")
+    assert policy.get_ttl_hours({'Results': [], 'Errors': []}, 200, 24 * 30) == policy.negative_ttl_hours
+    assert policy.get_ttl_hours({'Results': [{'Result': {}}]}, 200, 24 * 30) == 24 * 30 + policy.stale_ttl_hours
@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.ai.batch_inference import BatchRequest, BatchStatus, LocalFileBatchProvider
+from services.ai.openai_service import OpenAIService
+
+
+def respond(body):
+    """Answers with the user prompt, except for the prompt that asks for a failure."""
+    user_prompt = body['messages'][-1]['content']
+    if user_prompt == 'fail':
+        return None
+    return json.dumps({'value': user_prompt, 'confidence_score': 0.9})
+
+
+@pytest.mark.asyncio
+async def test_generate_content_batch_with_local_provider(tmp_path, monkeypatch):
+    """Test chat completion bodies are written as JSONL and responses are parsed back by custom_id."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    service = OpenAIService(model_name='gpt-4o-mini')
+    service.batch_provider = LocalFileBatchProvider(directory=str(tmp_path), responder=respond)
+
+    results = await service.generate_content_batch([
+        BatchRequest(custom_id='entity-1', system_prompt='Answer in JSON', user_prompt='first'),
+        BatchRequest(custom_id='entity-2', system_prompt='Answer in JSON', user_prompt='fail'),
+    ], poll_interval_seconds=0)
+
+    assert results == {'entity-1': {'value': 'first', 'confidence_score': 0.9}}
+
+    [batch_dir] = list(tmp_path.iterdir())
+    with open(batch_dir / LocalFileBatchProvider.INPUT_FILE) as f:
+        lines = [json.loads(line) for line in f]
+    assert [line['custom_id'] for line in lines] == ['entity-1', 'entity-2']
+    assert lines[0]['body']['response_format'] == {'type': 'json_object'}
+
+
+@pytest.mark.asyncio
+async def test_generate_content_batch_returns_nothing_when_batch_does_not_complete(tmp_path, monkeypatch):
+    """Test callers get no responses, and generate online, when the batch is still running at the timeout."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    service = OpenAIService(model_name='gpt-4o-mini')
+    service.batch_provider = LocalFileBatchProvider(directory=str(tmp_path))
+
+    results = await service.generate_content_batch(
+        [BatchRequest(custom_id='entity-1', user_prompt='first')], poll_interval_seconds=0, timeout_seconds=0)
+
+    assert results == {}
+
+
+class PartialBatchProvider(LocalFileBatchProvider):
+    """Batch that stays in progress until cancelled, with the first request completed."""
+    cancelled = False
+
+    async def get_status(self, batch_id):
+        if self.cancelled:
+            return BatchStatus.FAILED
+        return BatchStatus.IN_PROGRESS
+
+    async def cancel(self, batch_id):
+        self.cancelled = True
+
+    async def get_results(self, batch_id):
+        return {'entity-1': json.dumps({'value': 'first'})}
+
+
+@pytest.mark.asyncio
+async def test_generate_content_batch_returns_completed_responses_of_cancelled_batch(tmp_path, monkeypatch):
+    """Test a batch still running at the timeout is cancelled and responses of its completed requests are kept."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    service = OpenAIService(model_name='gpt-4o-mini')
+    service.batch_provider = PartialBatchProvider(directory=str(tmp_path))
+
+    results = await service.generate_content_batch([
+        BatchRequest(custom_id='entity-1', user_prompt='first'),
+        BatchRequest(custom_id='entity-2', user_prompt='second'),
+    ], poll_interval_seconds=0, timeout_seconds=0)
+
+    assert service.batch_provider.cancelled
+    assert results == {'entity-1': {'value': 'first'}}
+
+
+@pytest.mark.asyncio
+async def test_generate_content_batch_resumes_persisted_batch(tmp_path, monkeypatch):
+    """Test a retried caller collects the batch submitted by the previous attempt instead of submitting a new one."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    service = OpenAIService(model_name='gpt-4o-mini')
+    service.batch_provider = LocalFileBatchProvider(directory=str(tmp_path))
+    submitted = []
+
+    async def on_submitted(batch_id):
+        submitted.append(batch_id)
+
+    requests = [BatchRequest(custom_id='entity-1', system_prompt='Answer in JSON', user_prompt='first')]
+    # The first attempt stops waiting for the batch, e.g. it is killed at the dispatch deadline.
+    await service.generate_content_batch(requests, poll_interval_seconds=0, timeout_seconds=0, on_submitted=on_submitted)
+    [batch_id] = submitted
+    with open(tmp_path / batch_id / LocalFileBatchProvider.OUTPUT_FILE, 'w') as f:
+        f.write(json.dumps({'custom_id': 'entity-1', 'content': json.dumps({'value': 'first'})}) + '\n')
+
+    results = await service.generate_content_batch(requests, poll_interval_seconds=0, batch_id=batch_id, on_submitted=on_submitted)
+
+    assert results == {'entity-1': {'value': 'first'}}
+    assert submitted == [batch_id]
+    assert len(list(tmp_path.iterdir())) == 1
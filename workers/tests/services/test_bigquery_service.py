@@ -0,0 +1,134 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.bigquery_service import BigQueryService
+
+
+@pytest.fixture
+def bq_service(monkeypatch):
+    """BigQueryService with a mocked client that accepts all rows."""
+    monkeypatch.setenv('GOOGLE_CLOUD_PROJECT', 'test-project')
+    monkeypatch.setenv('BIGQUERY_DATASET', 'test_dataset')
+    client = MagicMock()
+    client.insert_rows_json.return_value = []
+    with patch.object(BigQueryService, '_get_shared_client', return_value=client):
+        yield BigQueryService()
+
+
+@pytest.mark.asyncio
+async def test_buffered_rows_are_written_in_one_insert_on_exit(bq_service):
+    """Test buffered enrichment rows are only written when the writer exits, with a single insert and no table lookups."""
+    async with bq_service.row_writer() as writer:
+        for i in range(20):
+            await bq_service.insert_enrichment_raw_data(
+                job_id='job-1', source='custom_column', entity_id=f'entity-{i}', raw_data={'value': i}, writer=writer)
+
+        bq_service.client.insert_rows_json.assert_not_called()
+
+    bq_service.client.insert_rows_json.assert_called_once()
+    table_reference, rows = bq_service.client.insert_rows_json.call_args.args
+    assert str(table_reference) == 'test-project.test_dataset.enrichment_raw_data'
+    assert [row['entity_id'] for row in rows] == [f'entity-{i}' for i in range(20)]
+    bq_service.client.get_table.assert_not_called()
+
+    # Nothing left to write.
+    await writer.flush()
+    bq_service.client.insert_rows_json.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_flushed_when_row_limit_is_reached(bq_service):
+    """Test a full buffer is written without waiting for an explicit flush."""
+    bq_service.MAX_BUFFERED_ROWS = 5
+    writer = bq_service.row_writer()
+
+    for i in range(12):
+        await writer.add('enrichment_raw_data', {'entity_id': f'entity-{i}'})
+
+    assert [len(call.args[1]) for call in bq_service.client.insert_rows_json.call_args_list] == [5, 5]
+
+    await writer.flush('enrichment_raw_data')
+    assert [len(call.args[1]) for call in bq_service.client.insert_rows_json.call_args_list] == [5, 5, 2]
+
+
+@pytest.mark.asyncio
+async def test_writers_of_concurrent_jobs_are_separate(bq_service):
+    """Test a job flushing its writer never writes rows buffered by another job on the same service."""
+    job_1_writer, job_2_writer = bq_service.row_writer(), bq_service.row_writer()
+    await job_1_writer.add('enrichment_raw_data', {'job_id': 'job-1'})
+    await job_2_writer.add('enrichment_raw_data', {'job_id': 'job-2'})
+
+    await job_1_writer.flush()
+
+    _, rows = bq_service.client.insert_rows_json.call_args.args
+    assert rows == [{'job_id': 'job-1'}]
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_keeps_rows_for_next_flush(bq_service):
+    """Test rows are only removed from the buffer once BigQuery accepted them."""
+    writer = bq_service.row_writer()
+    rows = [{'entity_id': f'entity-{i}'} for i in range(5)]
+    for row in rows:
+        await writer.add('enrichment_raw_data', row)
+    # Write the buffer with inserts of two rows, the second of which fails.
+    bq_service.MAX_BUFFERED_ROWS = 2
+    bq_service.client.insert_rows_json.side_effect = [[], [{'index': 0, 'errors': ['backend error']}], [], []]
+
+    with pytest.raises(Exception, match='BigQuery insert errors'):
+        await writer.flush()
+
+    await writer.flush()
+
+    inserted = [call.args[1] for call in bq_service.client.insert_rows_json.call_args_list]
+    assert inserted == [rows[0:2], rows[2:4], rows[2:4], rows[4:5]]
+    await writer.flush()
+    assert bq_service.client.insert_rows_json.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_insert_account_data_appends_partial_row_without_reading(bq_service):
+    """Test account data writes are blind appends that leave out fields without a value."""
+    structured_data = {'company_name': {'legal_name': 'Acme Inc'}, 'industry': {'sectors': ['Software']}}
+
+    record_id = await bq_service.insert_account_data('account-1', structured_data, raw_profile='')
+
+    bq_service.client.query.assert_not_called()
+    table_reference, rows = bq_service.client.insert_rows_json.call_args.args
+    assert str(table_reference) == 'test-project.test_dataset.account_data'
+    row = rows[0]
+    assert row['record_id'] == record_id
+    assert row['company_name'] == 'Acme Inc'
+    assert row['industry'] == ['Software']
+    assert 'employee_count' not in row
+    assert 'technologies' not in row
+    assert 'funding_details' not in row
+
+
+@pytest.mark.asyncio
+async def test_get_account_data_merges_rows_preferring_newer_values(bq_service):
+    """Test account data read merges partial rows of the account oldest first."""
+    bq_service.client.query.return_value.result.return_value = [
+        {'record_id': 'r1', 'account_id': 'account-1', 'company_name': 'Acme', 'employee_count': 10,
+         'industry': ['Software'], 'technologies': [], 'raw_data': '{"a": 1, "b": 1}',
+         'fetched_at': '2025-01-01T00:00:00'},
+        {'record_id': 'r2', 'account_id': 'account-1', 'company_name': None, 'employee_count': 20,
+         'industry': ['SaaS'], 'technologies': ['python'], 'raw_data': '{"b": 2}',
+         'fetched_at': '2025-01-02T00:00:00'},
+    ]
+
+    account_data = await bq_service.get_account_data('account-1')
+
+    assert account_data['record_id'] == 'r2'
+    assert account_data['company_name'] == 'Acme'
+    assert account_data['employee_count'] == 20
+    assert sorted(account_data['industry']) == ['SaaS', 'Software']
+    assert account_data['technologies'] == ['python']
+    assert account_data['raw_data'] == {'a': 1, 'b': 2}
+    assert account_data['fetched_at'] == '2025-01-02T00:00:00'
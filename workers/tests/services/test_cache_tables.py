@@ -0,0 +1,54 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.ai.ai_cache_service import AICacheService
+from services.ai.cache_tables import copy_legacy_cache_table
+
+
+@pytest.mark.asyncio
+async def test_ensure_cache_table_creates_partitioned_clustered_table():
+    """Test a missing cache table is created partitioned by day of created_at with expiring partitions."""
+    client = MagicMock()
+    client.get_table.side_effect = NotFound('missing')
+    service = AICacheService(client=client, project_id='project', dataset='dataset')
+
+    await service.ensure_cache_table()
+
+    table = client.create_table.call_args.args[0]
+    assert table.table_id == 'ai_prompt_cache_v2'
+    assert table.time_partitioning.type_ == bigquery.TimePartitioningType.DAY
+    assert table.time_partitioning.field == 'created_at'
+    assert table.time_partitioning.expiration_ms == AICacheService.RETENTION_DAYS * 24 * 60 * 60 * 1000
+    assert table.clustering_fields == ['cache_key']
+
+
+def test_copy_legacy_cache_table_skips_copied_rows_and_drops_legacy_table():
+    """Test unexpired legacy rows not yet in the partitioned table are copied before the legacy table is dropped."""
+    client = MagicMock()
+    client.get_table.return_value.schema = [bigquery.SchemaField('cache_key', 'STRING'), bigquery.SchemaField('created_at', 'TIMESTAMP')]
+    client.query.return_value.num_dml_affected_rows = 3
+
+    copied_rows = copy_legacy_cache_table(client, 'p.d.legacy', 'p.d.cache_v2', 30, drop_legacy=True)
+
+    assert copied_rows == 3
+    query = client.query.call_args.args[0]
+    assert 'INSERT INTO `p.d.cache_v2` (cache_key, created_at)' in query
+    assert 'NOT EXISTS' in query
+    client.delete_table.assert_called_once_with('p.d.legacy', not_found_ok=True)
+
+
+def test_copy_legacy_cache_table_without_legacy_table():
+    """Test nothing is copied once the legacy table is gone."""
+    client = MagicMock()
+    client.get_table.side_effect = NotFound('missing')
+
+    assert copy_legacy_cache_table(client, 'p.d.legacy', 'p.d.cache_v2', 30) is None
+    client.query.assert_not_called()
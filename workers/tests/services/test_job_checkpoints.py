@@ -0,0 +1,117 @@
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.task_result_manager import JobCheckpoints
+
+
+@pytest.mark.asyncio
+async def test_retried_job_gets_checkpoints_of_previous_attempt():
+    """Test checkpoints stored by one attempt of a job are returned to the next attempt and new ones are stored."""
+    result_manager = AsyncMock()
+    result_manager.get_checkpoints.return_value = {'pre_evaluation': {'batch-1': [{'lead_id': '1', 'initial_score': 80}]}}
+
+    checkpoints = await JobCheckpoints.load(result_manager, 'generate_leads', job_id='job-1', account_id='account-1')
+    assert checkpoints.get('pre_evaluation', 'batch-1') == [{'lead_id': '1', 'initial_score': 80}]
+    assert checkpoints.get('pre_evaluation', 'batch-2') is None
+
+    await checkpoints.save('pre_evaluation', 'batch-2', [{'lead_id': '2', 'initial_score': 40}])
+    result_manager.store_checkpoint.assert_awaited_once_with(
+        enrichment_type='generate_leads', job_id='job-1', account_id='account-1', stage='pre_evaluation', key='batch-2',
+        data=[{'lead_id': '2', 'initial_score': 40}])
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_without_job_id_are_not_stored():
+    """Test a job without ID neither loads nor stores checkpoints."""
+    result_manager = AsyncMock()
+
+    checkpoints = await JobCheckpoints.load(result_manager, 'generate_leads', job_id=None, account_id='account-1')
+    await checkpoints.save('evaluation', 'batch-1', [])
+
+    result_manager.get_checkpoints.assert_not_awaited()
+    result_manager.store_checkpoint.assert_not_awaited()
+
+
+def test_batch_key_does_not_depend_on_order():
+    """Test the same leads packed in a different order resume from the same checkpoint."""
+    assert JobCheckpoints.batch_key(['a', 'b']) == JobCheckpoints.batch_key(['b', 'a'])
+    assert JobCheckpoints.batch_key(['a', 'b']) != JobCheckpoints.batch_key(['a', 'c'])
+
+
+@pytest.mark.asyncio
+async def test_leads_are_enriched_in_one_call_and_checkpointed_per_batch():
+    """Test leads not checkpointed by a previous attempt are enriched together and every batch is checkpointed as soon as it is enriched."""
+    from models.leads import EnrichedLead
+    from tasks.generate_leads_apollo import ApolloConfig, ApolloLeadsTask, ProcessingMetrics
+
+    task = ApolloLeadsTask.__new__(ApolloLeadsTask)
+    task.config = ApolloConfig(enrichment_checkpoint_batch_size=2)
+    task.metrics = ProcessingMetrics()
+    task._transform_apollo_employee = AsyncMock(side_effect=lambda lead: EnrichedLead(id=lead.id))
+    task.proxycurl_service = AsyncMock()
+
+    async def enrich_leads(leads, on_lead_enriched):
+        results = []
+        for index, lead in enumerate(leads):
+            if lead.id == '5':
+                raise RuntimeError('dispatch deadline')
+            results.append(None if lead.id == '4' else lead)
+            await on_lead_enriched(index, results[-1])
+        return results
+
+    task.proxycurl_service.enrich_leads.side_effect = enrich_leads
+    leads = [SimpleNamespace(id=lead_id) for lead_id in ['1', '2', '3', '4', '5']]
+    checkpoints = JobCheckpoints(AsyncMock(), 'generate_leads', job_id='job-1', account_id='account-1', checkpoints={
+        ApolloLeadsTask.CHECKPOINT_ENRICHED_LEADS: {JobCheckpoints.batch_key(['1', '2']): [{'id': '1'}, {'id': '2'}]}
+    })
+
+    enriched_leads = await task._structure_and_enrich_leads(leads, checkpoints)
+
+    # Enrichment was interrupted after the batch of leads 3 and 4, the batch of lead 5 keeps its Apollo data.
+    assert [lead.id for lead in enriched_leads] == ['1', '2', '3', '5']
+    [call] = task.proxycurl_service.enrich_leads.await_args_list
+    assert [lead.id for lead in call.args[0]] == ['3', '4', '5']
+    assert [lead['id'] for lead in checkpoints.get(ApolloLeadsTask.CHECKPOINT_ENRICHED_LEADS, JobCheckpoints.batch_key(['3', '4']))] == ['3']
+    assert checkpoints.get(ApolloLeadsTask.CHECKPOINT_ENRICHED_LEADS, JobCheckpoints.batch_key(['5'])) is None
+    assert task.metrics.checkpointed_batches_resumed == 1
+
+
+@pytest.mark.asyncio
+async def test_only_invalid_responses_split_batches():
+    """Test batches are split when the response is invalid but not when the request failed."""
+    from tasks.generate_leads_apollo import ApolloLeadsTask, ProcessingMetrics
+
+    task = ApolloLeadsTask.__new__(ApolloLeadsTask)
+    task.metrics = ProcessingMetrics()
+    failed_request = AsyncMock(return_value=[])
+    invalid_response = AsyncMock(side_effect=lambda batch: None if len(batch) > 1 else batch)
+
+    assert await task._process_batch_with_split(['1', '2', '3', '4'], failed_request) == []
+    assert failed_request.await_count == 1
+    assert await task._process_batch_with_split(['1', '2', '3', '4'], invalid_response) == ['1', '2', '3', '4']
+    assert task.metrics.ai_batch_splits == 3
+
+
+@pytest.mark.asyncio
+async def test_retried_job_reuses_checkpointed_role_pattern():
+    """Test the role pattern of a previous attempt is reused, so the retry packs the same pre-evaluation batches."""
+    from tasks.generate_leads_apollo import ApolloConfig, ApolloLeadsTask
+
+    task = ApolloLeadsTask.__new__(ApolloLeadsTask)
+    task.config = ApolloConfig()
+    task.role_patterns = {'{"titles": ["CTO"]}': r'\bcto\b'}
+    first_attempt = JobCheckpoints(AsyncMock(), 'generate_leads', job_id='job-1', account_id='account-1')
+
+    assert await task._get_role_pattern({'titles': ['CTO']}, first_attempt) == r'\bcto\b'
+
+    # The retry runs on another instance, where the pattern would be generated again and can differ.
+    task.role_patterns = {'{"titles": ["CTO"]}': r'\bchief technology\b'}
+    retry = JobCheckpoints(AsyncMock(), 'generate_leads', job_id='job-1', account_id='account-1', checkpoints=first_attempt.checkpoints)
+    assert await task._get_role_pattern({'titles': ['CTO']}, retry) == r'\bcto\b'
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.linkedin_service import LinkedInService, RapidAPILinkedInActivities, RapidAPIPost
+from tasks.custom_column_generation_task import CustomColumnTask
+
+
+def activities_with_post(text):
+    return RapidAPILinkedInActivities(posts=[RapidAPIPost(text=text)])
+
+
+def create_task(linkedin_service):
+    task = CustomColumnTask.__new__(CustomColumnTask)
+    task.linkedin_service = linkedin_service
+    return task
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_dedupes_profiles_and_fetches_with_original_url():
+    """Test URLs of the same profile are fetched once, with the URL as given instead of its lowercased lookup key."""
+    linkedin_service = LinkedInService.__new__(LinkedInService)
+    linkedin_service.fetch_recent_linkedin_activities = AsyncMock(
+        side_effect=lambda lead_linkedin_url: activities_with_post(lead_linkedin_url))
+
+    activities_by_url = await linkedin_service.fetch_recent_linkedin_activities_many([
+        'https://www.linkedin.com/in/Jane-Doe-1A2B/',
+        'https://www.linkedin.com/in/jane-doe-1a2b',
+        'https://www.linkedin.com/in/John-Roe',
+    ])
+
+    fetched_urls = [call.kwargs['lead_linkedin_url'] for call in linkedin_service.fetch_recent_linkedin_activities.await_args_list]
+    assert sorted(fetched_urls) == ['https://www.linkedin.com/in/Jane-Doe-1A2B/', 'https://www.linkedin.com/in/John-Roe']
+    assert activities_by_url['https://www.linkedin.com/in/jane-doe-1a2b'] is activities_by_url['https://www.linkedin.com/in/Jane-Doe-1A2B/']
+
+
+@pytest.mark.asyncio
+async def test_prefetched_activities_reach_lead_of_their_job():
+    """Test concurrent jobs sharing the LinkedIn service each add their own prefetched activities to their leads."""
+    linkedin_service = LinkedInService.__new__(LinkedInService)
+    linkedin_service.fetch_recent_linkedin_activities = AsyncMock(
+        side_effect=lambda lead_linkedin_url: activities_with_post(f'post of {lead_linkedin_url}'))
+    ai_config = {'use_linkedin_activity': True}
+    jobs = {
+        'job-1': {'lead-1': {'lead_info': {'linkedin_url': 'https://www.linkedin.com/in/Jane-Doe'}}},
+        'job-2': {'lead-2': {'lead_info': {'linkedin_url': 'https://www.linkedin.com/in/John-Roe'}}},
+    }
+    tasks = {job_id: create_task(linkedin_service) for job_id in jobs}
+
+    prefetched = await asyncio.gather(*[
+        tasks[job_id]._prefetch_linkedin_activities(list(context_data.keys()), context_data)
+        for job_id, context_data in jobs.items()
+    ])
+    contexts = await asyncio.gather(
+        tasks['job-1']._get_entity_context('lead-1', jobs['job-1'], ai_config, prefetched[0]),
+        tasks['job-2']._get_entity_context('lead-2', jobs['job-2'], ai_config, prefetched[1]),
+    )
+
+    posts = [context['enrichment_recent_linkedin_activities']['posts'][0]['text'] for context in contexts]
+    assert posts == ['post of https://www.linkedin.com/in/Jane-Doe', 'post of https://www.linkedin.com/in/John-Roe']
+    # Leads were prefetched, so building their context fetched nothing more.
+    assert linkedin_service.fetch_recent_linkedin_activities.await_count == 2
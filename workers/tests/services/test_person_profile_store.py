@@ -0,0 +1,67 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from models.leads import EnrichedLead, ProxyCurlPersonProfile
+from services.proxycurl_service import ProxyCurlService
+from utils.url_utils import UrlUtils
+
+
+def make_lead(lead_id: str, linkedin_url: str) -> EnrichedLead:
+    return EnrichedLead(id=lead_id, linkedin_url=linkedin_url, organization=EnrichedLead.Organization(name='Acme'))
+
+
+def test_normalize_lead_linkedin_url():
+    """Test equivalent profile URLs map to one key and non profile URLs to none."""
+    for url in ['https://www.linkedin.com/in/John-Doe/', 'http://in.linkedin.com/in/john-doe?trk=abc', 'linkedin.com/in/john-doe']:
+        assert UrlUtils.normalize_lead_linkedin_url(url) == 'linkedin.com/in/john-doe'
+    assert UrlUtils.normalize_lead_linkedin_url('https://www.linkedin.com/company/acme') is None
+
+
+@pytest.mark.asyncio
+async def test_enrich_leads_reuses_stored_profiles_and_stores_fetched_ones(monkeypatch):
+    """Test stored profiles are looked up once for all leads and only missing profiles are fetched and stored."""
+    monkeypatch.setenv('PROXYCURL_API_KEY', 'test-key')
+    profile_store = MagicMock()
+    profile_store.get_profiles = AsyncMock(return_value={'linkedin.com/in/jane': {'full_name': 'Jane', 'headline': 'Stored'}})
+    profile_store.store_profiles = AsyncMock()
+    service = ProxyCurlService(cache_service=MagicMock(), profile_store=profile_store)
+    service.get_person_profile = AsyncMock(return_value=ProxyCurlPersonProfile(full_name='John', headline='Fetched'))
+
+    await service.enrich_leads([
+        make_lead('1', 'https://www.linkedin.com/in/Jane/'),
+        make_lead('2', 'https://www.linkedin.com/in/john'),
+    ])
+
+    profile_store.get_profiles.assert_awaited_once()
+    service.get_person_profile.assert_awaited_once_with('https://www.linkedin.com/in/john')
+    stored_profiles = profile_store.store_profiles.await_args.args[0]
+    assert list(stored_profiles) == ['linkedin.com/in/john']
+    assert stored_profiles['linkedin.com/in/john']['headline'] == 'Fetched'
+
+
+@pytest.mark.asyncio
+async def test_enrich_leads_stores_profiles_in_chunks_and_reports_progress(monkeypatch):
+    """Test fetched profiles are stored while enriching and every enriched lead is reported as it completes."""
+    monkeypatch.setenv('PROXYCURL_API_KEY', 'test-key')
+    profile_store = MagicMock()
+    profile_store.get_profiles = AsyncMock(return_value={})
+    profile_store.store_profiles = AsyncMock()
+    service = ProxyCurlService(cache_service=MagicMock(), profile_store=profile_store)
+    service.PROFILE_STORE_CHUNK_SIZE = 2
+    service.get_person_profile = AsyncMock(return_value=ProxyCurlPersonProfile(full_name='John', headline='Fetched'))
+    enriched = []
+
+    async def on_lead_enriched(index, lead):
+        enriched.append((index, lead.id))
+
+    await service.enrich_leads([make_lead(str(i), f'https://www.linkedin.com/in/lead-{i}') for i in range(5)],
+                               max_workers=1, on_lead_enriched=on_lead_enriched)
+
+    assert enriched == [(i, str(i)) for i in range(5)]
+    assert [len(call.args[0]) for call in profile_store.store_profiles.await_args_list] == [2, 2, 1]
@@ -0,0 +1,73 @@
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from services.ai.prompt_prefix_cache import PromptPrefixCache
+
+KEY = ('tenant-1:product-1', 'gemini-2.5-flash-preview-04-17', 'lead_evaluation')
+
+
+@pytest.mark.asyncio
+async def test_handle_is_reused_and_replaced_when_prefix_changes():
+    """Test one cache is created per prefix and the old one is deleted after the product changes."""
+    prefix_cache = PromptPrefixCache()
+    create = AsyncMock(side_effect=['cache-1', 'cache-2'])
+    delete = AsyncMock()
+
+    handles = [await prefix_cache.get_handle(KEY, 'product v1', 3600, create, delete) for _ in range(3)]
+    assert handles == ['cache-1'] * 3
+    create.assert_awaited_once_with('product v1')
+
+    assert await prefix_cache.get_handle(KEY, 'product v2', 3600, create, delete) == 'cache-2'
+    delete.assert_awaited_once_with('cache-1')
+
+
+@pytest.mark.asyncio
+async def test_failed_creation_is_not_retried_until_expiry_and_invalidate_deletes_scope():
+    """Test a prefix the provider cannot cache is sent in full without asking again, and invalidation drops the scope."""
+    prefix_cache = PromptPrefixCache()
+    create = AsyncMock(side_effect=[Exception('too small'), 'cache-1'])
+    delete = AsyncMock()
+
+    assert await prefix_cache.get_handle(KEY, 'product', 3600, create, delete) is None
+    assert await prefix_cache.get_handle(KEY, 'product', 3600, create, delete) is None
+    assert create.await_count == 1
+
+    await prefix_cache.invalidate(KEY[0], delete)
+    assert await prefix_cache.get_handle(KEY, 'product', 3600, create, delete) == 'cache-1'
+    await prefix_cache.invalidate(KEY[0], delete)
+    delete.assert_awaited_once_with('cache-1')
+
+
+@pytest.mark.asyncio
+async def test_gemini_keeps_cached_prompt_on_unrelated_errors(monkeypatch):
+    """Test cached system prompt is only dropped when Gemini reports the cached content is gone."""
+    monkeypatch.setenv('GEMINI_API_TOKEN', 'test-token')
+    from services.ai.gemini_service import GeminiService
+    service = GeminiService()
+    monkeypatch.setattr(service, '_get_cached_system_prompt', AsyncMock(return_value='cache-1'))
+    invalidate = AsyncMock()
+    monkeypatch.setattr(service._prefix_cache, 'invalidate', invalidate)
+    response = type('Response', (), {'text': 'ok', 'usage_metadata': None})()
+    cached_configs = []
+
+    async def generate(prompt, config_params, thinking_budget=None, _override_model=None):
+        cached_configs.append(config_params.get('cached_content'))
+        if len(cached_configs) == 1:
+            raise ValueError('Deadline exceeded')
+        if len(cached_configs) == 2:
+            raise ValueError('403 PERMISSION_DENIED. CachedContent not found (or permission denied)')
+        return response
+
+    monkeypatch.setattr(service, '_generate_content_in_thread', generate)
+
+    await service._generate_content_without_cache(
+        'static\n\ndynamic', is_json=False, system_prompt='static', user_prompt='dynamic', cache_scope='tenant-1:product-1')
+
+    assert cached_configs == ['cache-1', 'cache-1', None]
+    invalidate.assert_awaited_once()
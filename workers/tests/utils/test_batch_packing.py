@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from utils.batch_packing import pack_batches, split_batch
+
+
+def test_pack_batches_fills_token_budget_in_order():
+    """Test small items share a batch, large ones get fewer neighbours and oversized ones are alone."""
+    items = ['a', 'b', 'c', 'd', 'e', 'f']
+    token_counts = [100, 100, 700, 900, 1500, 50]
+
+    assert pack_batches(items, token_counts, token_budget=1000, max_items=10) == [['a', 'b', 'c'], ['d'], ['e'], ['f']]
+
+
+def test_pack_batches_respects_max_items():
+    """Test batches of tiny items are capped by item count."""
+    assert pack_batches(list(range(7)), [1] * 7, token_budget=1000, max_items=3) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_split_batch():
+    """Test invalid batches are split in two halves that cover all items."""
+    assert split_batch([1, 2, 3]) == [[1, 2], [3]]
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from utils.connection_pool import ConnectionPool
+from utils.http_client_registry import HttpClientRegistry
+from utils.retry_utils import RetryableError
+
+
+def make_pool(max_connections: int, acquire_timeout=None) -> ConnectionPool:
+    return ConnectionPool(
+        limits=httpx.Limits(max_keepalive_connections=max_connections, max_connections=max_connections),
+        timeout=5.0,
+        acquire_timeout=acquire_timeout
+    )
+
+
+@pytest.mark.asyncio
+async def test_acquire_within_limit_does_not_wait():
+    """Test acquiring below the limit succeeds immediately."""
+    pool = make_pool(max_connections=2)
+
+    async with pool.acquire_connection("https://api.apollo.io/api/v1/test") as client:
+        assert isinstance(client, httpx.AsyncClient)
+        assert pool.active_connections == 1
+        assert pool.get_stats()["active_by_host"] == {"api.apollo.io": 1}
+
+    stats = pool.get_stats()
+    assert pool.active_connections == 0
+    assert stats["total_acquired"] == 1
+    assert stats["total_waited"] == 0
+    assert stats["active_by_host"] == {}
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_queues_acquirers_in_fifo_order():
+    """Test that acquirers wait for a slot instead of failing, and are served in arrival order."""
+    pool = make_pool(max_connections=1)
+    order = []
+    release_first = asyncio.Event()
+
+    async def hold_first():
+        async with pool.acquire_connection():
+            order.append("first")
+            await release_first.wait()
+
+    async def acquire(name: str):
+        async with pool.acquire_connection():
+            order.append(name)
+
+    first = asyncio.create_task(hold_first())
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(acquire(name)) for name in ("second", "third", "fourth")]
+    await asyncio.sleep(0)
+
+    assert pool.waiting_count == 3
+    assert pool.get_stats()["utilization"] == 1.0
+
+    release_first.set()
+    await asyncio.gather(first, *waiters)
+
+    assert order == ["first", "second", "third", "fourth"]
+    stats = pool.get_stats()
+    assert stats["total_acquired"] == 4
+    assert stats["total_waited"] == 3
+    assert stats["peak_waiting"] == 3
+    assert pool.active_connections == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_timeout_raises_retryable_error():
+    """Test that waiting longer than the acquire timeout raises RetryableError and leaves the queue clean."""
+    pool = make_pool(max_connections=1, acquire_timeout=0.01)
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.acquire_connection():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(RetryableError):
+        async with pool.acquire_connection():
+            pass
+
+    assert pool.waiting_count == 0
+    assert pool.get_stats()["total_timeouts"] == 1
+
+    release.set()
+    await holder
+    assert pool.active_connections == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    """Test that cancelling a queued acquirer does not consume a slot."""
+    pool = make_pool(max_connections=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with pool.acquire_connection():
+            await release.wait()
+
+    async def wait_for_slot():
+        async with pool.acquire_connection():
+            pass
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(wait_for_slot())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    release.set()
+    await holder
+
+    assert pool.active_connections == 0
+    async with pool.acquire_connection():
+        assert pool.active_connections == 1
+
+
+def test_registry_closes_client_replaced_for_another_event_loop():
+    """Test a shared client created on a finished event loop is closed when replaced on a new loop."""
+    registry = HttpClientRegistry()
+
+    async def get_client():
+        return registry.get_client("https://s.jina.ai/query")
+
+    old_client = asyncio.run(get_client())
+
+    async def replace_client():
+        client = registry.get_client("https://s.jina.ai/query")
+        await asyncio.gather(*registry._closing)
+        return client
+
+    new_client = asyncio.run(replace_client())
+    assert new_client is not old_client
+    assert old_client.is_closed
+    assert not new_client.is_closed
@@ -0,0 +1,79 @@
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from models.leads import ApolloLead
+from utils.lead_prefilter import LeadPreFilter, normalize_title
+
+PERSONA_ROLE_TITLES = {
+    'buyers': ['VP of Sales', 'Chief Revenue Officer'],
+    'influencers': ['Sales Operations Manager'],
+    'end_users': ['Account Executive'],
+}
+
+
+def make_pre_filter(**kwargs) -> LeadPreFilter:
+    return LeadPreFilter(
+        persona_role_titles=kwargs.get('persona_role_titles', PERSONA_ROLE_TITLES),
+        target_departments=kwargs.get('target_departments', []),
+        target_functions=kwargs.get('target_functions', []),
+        role_pattern=kwargs.get('role_pattern')
+    )
+
+
+def test_normalize_title_expands_abbreviations():
+    """Test titles are normalized before matching."""
+    assert normalize_title('Sr. VP, Sales & Ops') == 'senior vice president sales and operations'
+
+
+def test_title_variants_match_persona():
+    """Test persona titles match common variants of the same title."""
+    pre_filter = make_pre_filter()
+
+    for title, persona in [('Vice President, Sales', 'buyer'), ('VP Sales - EMEA', 'buyer'),
+                           ('Senior Sales Operations Manager', 'influencer'), ('Enterprise Account Executive', 'end_user')]:
+        result = pre_filter.evaluate(ApolloLead(id='1', title=title))
+        assert result.needs_llm, title
+        assert result.persona_estimate == persona, title
+
+
+def test_clear_non_match_is_decided_without_llm():
+    """Test leads with an unrelated title, department, function and seniority are rejected by rules."""
+    pre_filter = make_pre_filter(target_departments=['master_sales'])
+    leads = [
+        ApolloLead(id='1', title='Software Engineer', departments=['master_engineering_technical'], seniority='senior'),
+        ApolloLead(id='2', title='Regional Sales Lead', departments=['master_sales']),
+        ApolloLead(id='3', title='Chief Executive Officer', seniority='c_suite'),
+        ApolloLead(id='4', title=None),
+    ]
+
+    llm_leads, rejected = pre_filter.split(leads)
+
+    assert [lead.id for lead in llm_leads] == ['2', '3', '4']
+    assert [result.lead_id for result in rejected] == ['1']
+    pre_evaluation = rejected[0].to_pre_evaluation()
+    assert pre_evaluation['lead_id'] == '1'
+    assert pre_evaluation['initial_score'] == 0
+    assert pre_evaluation['enrichment_recommended'] is False
+
+
+def test_filter_is_disabled_without_targets():
+    """Test every lead goes to the LLM when there is nothing to match against."""
+    pre_filter = make_pre_filter(persona_role_titles={})
+
+    llm_leads, rejected = pre_filter.split([ApolloLead(id='1', title='Software Engineer')])
+
+    assert len(llm_leads) == 1
+    assert rejected == []
+
+
+def test_generated_role_pattern_matches_raw_title():
+    """Test buyer regex from RolePatternGenerator is used in addition to persona titles."""
+    pre_filter = make_pre_filter(persona_role_titles={}, role_pattern=r"GTM\s?Leader")
+
+    result = pre_filter.evaluate(ApolloLead(id='1', title='Global GTM Leader'))
+
+    assert result.needs_llm
+    assert result.persona_estimate == 'buyer'
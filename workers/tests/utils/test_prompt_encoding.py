@@ -0,0 +1,40 @@
+import json
+import os
+import sys
+
+# Add the root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from utils.prompt_encoding import COMPACT_JSON_FORMAT, JSON_FORMAT, TABLE_FORMAT, encode_records
+
+RECORDS = [
+    {'id': '1', 'name': 'Jane', 'headline': None, 'departments': [], 'organization': {'name': 'Acme', 'founded_year': None},
+     'employment_history': [{'title': 'AE', 'current': False, 'description': ''}]},
+    {'id': '2', 'name': 'John', 'headline': 'VP Sales', 'departments': ['sales'], 'organization': None,
+     'employment_history': []},
+]
+
+
+def test_table_format_names_fields_once_and_drops_empty_values():
+    """Test table rows follow the header, nested dicts are flattened and empty values are left out."""
+    lines = encode_records(RECORDS, TABLE_FORMAT).split('\n')
+
+    assert json.loads(lines[0]) == ['id', 'name', 'headline', 'departments', 'organization.name', 'employment_history']
+    assert json.loads(lines[1]) == ['1', 'Jane', None, None, 'Acme', [{'title': 'AE', 'current': False}]]
+    assert json.loads(lines[2]) == ['2', 'John', 'VP Sales', ['sales'], None, None]
+
+
+def test_table_columns_do_not_depend_on_record_order():
+    """Test the header follows the schema order of fields, not which record first has a value."""
+    header = json.loads(encode_records(list(reversed(RECORDS)), TABLE_FORMAT).split('\n')[0])
+
+    assert header == ['id', 'name', 'headline', 'departments', 'organization.name', 'employment_history']
+
+
+def test_compact_formats_are_smaller_than_json():
+    """Test compact formats keep the same records in fewer characters."""
+    json_size = len(encode_records(RECORDS, JSON_FORMAT))
+
+    assert len(encode_records(RECORDS, COMPACT_JSON_FORMAT)) < json_size
+    assert len(encode_records(RECORDS, TABLE_FORMAT)) < json_size
+    assert [json.loads(line)['id'] for line in encode_records(RECORDS, COMPACT_JSON_FORMAT).split('\n')] == ['1', '2']
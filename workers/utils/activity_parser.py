@@ -1,18 +1,30 @@
 import json
 import re
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 
 from bs4 import BeautifulSoup
 from dateutil.relativedelta import relativedelta
 from google.api_core.exceptions import ResourceExhausted
-from markdownify import markdownify
+from markdownify import MarkdownConverter
 
 from models.lead_activities import LinkedInActivity, ContentDetails, OpenAITokenUsage
 from services.ai.ai_service import AIServiceFactory
+from utils.async_utils import run_in_thread
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from utils.loguru_setup import logger
 
+# lxml is considerably faster than the pure-Python parser on multi-megabyte
+# activity pages; fall back to the stdlib parser if it is not installed.
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER_BACKEND = "lxml"
+except ImportError:
+    HTML_PARSER_BACKEND = "html.parser"
+
+# Marker LinkedIn renders before every activity in the feed.
+ACTIVITY_SPLIT_PATTERN = re.compile(r'Feed post number \d*')
+
 GEMINI_RETRY_CONFIG = RetryConfig(
     max_attempts=3,
     base_delay=2.0,
@@ -67,7 +79,10 @@ Analyze the content to extract:
 
     @staticmethod
     def get_activities(person_linkedin_url: str, page_html: str, activity_type: LinkedInActivity.Type) -> List[LinkedInActivity]:
-        """Extract activities from LinkedIn page HTML."""
+        """Extract activities from LinkedIn page HTML.
+
+        This is CPU-bound; from async code use get_activities_async instead.
+        """
         logger.info(f"Extracting activities for {person_linkedin_url} of type {activity_type}")
 
         if not page_html.strip():
@@ -75,33 +90,20 @@ Analyze the content to extract:
             return []
 
         try:
-            # Remove member tags containing logged in user info
-            soup = BeautifulSoup(page_html, "html.parser")
-            member_tags = soup.find_all("div", class_="member")
-            logger.debug(f"Found {len(member_tags)} member tags to remove")
-            for tag in member_tags:
-                tag.clear()
-
-            # Convert to markdown
-            page_md = markdownify(str(soup))
+            page_md = LinkedInActivityParser._page_html_to_markdown(page_html)
             logger.debug(f"Converted HTML to markdown, length: {len(page_md)}")
 
-            # Split into individual activities
-            content_list: List[str] = re.split(r'Feed post number \d*', page_md)
-            logger.info(f"Found {len(content_list) - 1} potential activities")
+            activity_url = LinkedInActivityParser._get_activity_url(
+                person_linkedin_url=person_linkedin_url,
+                activity_type=activity_type
+            )
 
             activities = []
-            for i, content in enumerate(content_list):
-                if i == 0:  # Skip header
-                    continue
-
+            for i, content in enumerate(LinkedInActivityParser.iter_activity_contents(page_md), start=1):
                 try:
                     activity = LinkedInActivity(
                         person_linkedin_url=person_linkedin_url,
-                        activity_url=LinkedInActivityParser._get_activity_url(
-                            person_linkedin_url=person_linkedin_url,
-                            activity_type=activity_type
-                        ),
+                        activity_url=activity_url,
                         type=activity_type,
                         content_md=content
                     )
@@ -117,6 +119,43 @@ Analyze the content to extract:
             logger.error(f"Error in get_activities: {str(e)}", exc_info=True)
             return []
 
+    @staticmethod
+    async def get_activities_async(person_linkedin_url: str, page_html: str, activity_type: LinkedInActivity.Type) -> List[LinkedInActivity]:
+        """Extract activities in the CPU thread pool so parsing does not block the event loop."""
+        return await run_in_thread(
+            LinkedInActivityParser.get_activities,
+            person_linkedin_url,
+            page_html,
+            activity_type,
+            pool_type="cpu"
+        )
+
+    @staticmethod
+    def _page_html_to_markdown(page_html: str) -> str:
+        """Convert activity page HTML to markdown after removing logged in member info."""
+        soup = BeautifulSoup(page_html, HTML_PARSER_BACKEND)
+
+        # Remove member tags containing logged in user info
+        member_tags = soup.find_all("div", class_="member")
+        logger.debug(f"Found {len(member_tags)} member tags to remove")
+        for tag in member_tags:
+            tag.clear()
+
+        # Hand the tree straight to markdownify instead of re-serializing and re-parsing it.
+        return MarkdownConverter().convert_soup(soup)
+
+    @staticmethod
+    def iter_activity_contents(page_md: str) -> Iterator[str]:
+        """Lazily yield the markdown of each activity, skipping the page header before the first one."""
+        start = None
+        for match in ACTIVITY_SPLIT_PATTERN.finditer(page_md):
+            if start is not None:
+                yield page_md[start:match.start()]
+            start = match.end()
+
+        if start is not None:
+            yield page_md[start:]
+
     @staticmethod
     def _get_activity_url(person_linkedin_url: str, activity_type: LinkedInActivity.Type) -> str:
         """Get URL for activity type."""
@@ -0,0 +1,34 @@
+from typing import List, Sequence, TypeVar
+
+T = TypeVar('T')
+
+
+def pack_batches(items: Sequence[T], token_counts: Sequence[int], token_budget: int, max_items: int) -> List[List[T]]:
+    """
+    Pack items into batches of at most token_budget tokens and max_items items, keeping the order of items.
+
+    Items are added to the current batch until the next one does not fit, so small items share a call and
+    large ones get fewer neighbours. An item that alone exceeds the budget gets a batch of its own.
+    """
+    if len(items) != len(token_counts):
+        raise ValueError(f"Got {len(token_counts)} token counts for {len(items)} items")
+
+    batches: List[List[T]] = []
+    batch: List[T] = []
+    batch_tokens = 0
+    for item, tokens in zip(items, token_counts):
+        if batch and (batch_tokens + tokens > token_budget or len(batch) >= max_items):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def split_batch(batch: Sequence[T]) -> List[List[T]]:
+    """Split given batch in two halves, used to retry a batch whose response was invalid."""
+    middle = (len(batch) + 1) // 2
+    return [list(batch[:middle]), list(batch[middle:])]
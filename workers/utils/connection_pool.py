@@ -1,5 +1,11 @@
 import httpx
 import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.http_client_registry import http_client_registry
 from utils.retry_utils import RetryableError
 from contextlib import asynccontextmanager
 from utils.loguru_setup import logger
@@ -7,48 +13,160 @@ from utils.loguru_setup import logger
 
 
 class ConnectionPool:
-    def __init__(self, limits=None, timeout=None):
-        self._client = None
-        self._lock = asyncio.Lock()
+    """Bounds concurrent requests made by a service.
+
+    When all slots are in use, acquirers wait in FIFO order for a slot to be
+    released instead of failing immediately. The underlying HTTP clients are the
+    process-wide shared clients from the http client registry, which also apply
+    the per-host connection limits.
+    """
+
+    def __init__(self, limits=None, timeout=None, acquire_timeout: Optional[float] = None):
+        """
+        Args:
+            limits: Limits for the pool, max_connections bounds concurrent acquirers.
+            timeout: Request timeout in seconds.
+            acquire_timeout: Default seconds to wait for a free slot, None waits indefinitely.
+        """
         self._active_connections = 0
+        self._waiters: Deque[asyncio.Future] = deque()
         self.limits = limits or httpx.Limits(
             max_keepalive_connections=10,
             max_connections=20
         )
         self.timeout = timeout or 300.0
+        self.acquire_timeout = acquire_timeout
+        self._active_by_host: Dict[str, int] = {}
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._total_acquired = 0
+        self._total_waited = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._total_timeouts = 0
+        self._peak_active = 0
+        self._peak_waiting = 0
 
     @asynccontextmanager
-    async def acquire_connection(self):
-        """Acquire a connection from the pool."""
-        async with self._lock:
-            if self._active_connections >= self.limits.max_connections:
-                logger.warning(f"Connection pool full ({self._active_connections}/{self.limits.max_connections})")
-                raise RetryableError("Connection pool exhausted")
-
-            if self._client is None or self._client.is_closed:
-                self._client = httpx.AsyncClient(
-                    limits=self.limits,
-                    timeout=self.timeout
-                )
+    async def acquire_connection(self, url: Optional[str] = None, acquire_timeout: Optional[float] = None):
+        """Acquire a connection from the pool, waiting for a free slot if needed.
 
-            self._active_connections += 1
-            logger.debug(f"Connection acquired. Active: {self._active_connections}")
+        Args:
+            url: Optional URL being requested, used to pick the shared client for its host.
+            acquire_timeout: Seconds to wait for a free slot, defaults to the pool's acquire_timeout.
+
+        Raises:
+            RetryableError: If no slot became free within the timeout.
+        """
+        await self._acquire_slot(acquire_timeout if acquire_timeout is not None else self.acquire_timeout)
+        host = urlsplit(url).hostname if url else None
+        try:
+            client = http_client_registry.get_client(url)
+        except Exception:
+            self._release_slot()
+            raise
+
+        self._active_by_host[host] = self._active_by_host.get(host, 0) + 1
+        logger.debug(f"Connection acquired. Active: {self._active_connections}, waiting: {len(self._waiters)}")
 
         try:
-            yield self._client
+            yield client
         finally:
-            async with self._lock:
-                self._active_connections -= 1
-                logger.debug(f"Connection released. Active: {self._active_connections}")
+            remaining = self._active_by_host.get(host, 0) - 1
+            if remaining > 0:
+                self._active_by_host[host] = remaining
+            else:
+                self._active_by_host.pop(host, None)
+            self._release_slot()
+            logger.debug(f"Connection released. Active: {self._active_connections}, waiting: {len(self._waiters)}")
+
+    async def _acquire_slot(self, acquire_timeout: Optional[float]) -> None:
+        """Take a free slot or queue behind earlier acquirers until one is handed over."""
+        if self._active_connections < self.limits.max_connections and not self._waiters:
+            self._active_connections += 1
+            self._record_acquired(wait_time=None)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._peak_waiting = max(self._peak_waiting, len(self._waiters))
+        logger.debug(f"Connection pool full ({self._active_connections}/{self.limits.max_connections}), waiting in position {len(self._waiters)}")
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=acquire_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over as we gave up, pass it on to the next waiter.
+                self._release_slot()
+            else:
+                self._remove_waiter(waiter)
+
+            if isinstance(e, asyncio.TimeoutError):
+                self._total_timeouts += 1
+                logger.warning(f"Timed out after {acquire_timeout}s waiting for connection ({self._active_connections}/{self.limits.max_connections})")
+                raise RetryableError("Timed out waiting for a free connection in the pool") from e
+            raise
+
+        # The releasing acquirer handed its slot over, so the active count is already correct.
+        self._record_acquired(wait_time=time.monotonic() - start)
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the oldest waiter, or free it if nobody is waiting."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active_connections = max(0, self._active_connections - 1)
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _record_acquired(self, wait_time: Optional[float]) -> None:
+        self._total_acquired += 1
+        self._peak_active = max(self._peak_active, self._active_connections)
+        if wait_time is not None:
+            self._total_waited += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return wait-time and utilization stats for the pool."""
+        max_connections = self.limits.max_connections
+        return {
+            "max_connections": max_connections,
+            "active_connections": self._active_connections,
+            "waiting": len(self._waiters),
+            "utilization": self._active_connections / max_connections if max_connections else 0.0,
+            "active_by_host": dict(self._active_by_host),
+            "total_acquired": self._total_acquired,
+            "total_waited": self._total_waited,
+            "total_timeouts": self._total_timeouts,
+            "avg_wait_time": self._total_wait_time / self._total_waited if self._total_waited else 0.0,
+            "max_wait_time": self._max_wait_time,
+            "peak_active": self._peak_active,
+            "peak_waiting": self._peak_waiting,
+        }
 
     async def close(self):
-        """Close all connections in the pool."""
-        async with self._lock:
-            if self._client and not self._client.is_closed:
-                await self._client.aclose()
-                self._client = None
-            self._active_connections = 0
+        """Reset the pool. Shared clients are closed by the registry on shutdown."""
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.cancel()
+        self._waiters.clear()
+        self._active_connections = 0
+        self._active_by_host.clear()
+        self._reset_stats()
 
     @property
     def active_connections(self):
-        return self._active_connections
\ No newline at end of file
+        return self._active_connections
+
+    @property
+    def waiting_count(self) -> int:
+        return len(self._waiters)
@@ -0,0 +1,154 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from utils.loguru_setup import logger
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1 without it.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Key used for clients that are not bound to a specific upstream host.
+DEFAULT_HOST = "*"
+
+
+@dataclass(frozen=True)
+class HostClientConfig:
+    """Connection settings for clients talking to a single upstream host."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 150.0
+    timeout: float = 300.0
+    http2: bool = False
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+# Per-host tuning for the upstreams the workers talk to. Hosts not listed here use the default config.
+HOST_CLIENT_CONFIGS: Dict[str, HostClientConfig] = {
+    "api.apollo.io": HostClientConfig(max_connections=20, max_keepalive_connections=15, http2=True),
+    "nubela.co": HostClientConfig(max_connections=20, max_keepalive_connections=15, http2=True),
+    "api.builtwith.com": HostClientConfig(max_connections=10, max_keepalive_connections=5, timeout=60.0),
+    "linkedin-api8.p.rapidapi.com": HostClientConfig(max_connections=20, max_keepalive_connections=10, timeout=60.0, http2=True),
+    "api.apify.com": HostClientConfig(max_connections=10, max_keepalive_connections=5, timeout=60.0, http2=True),
+    "api.brightdata.com": HostClientConfig(max_connections=10, max_keepalive_connections=5, timeout=60.0, http2=True),
+    "r.jina.ai": HostClientConfig(max_connections=15, max_keepalive_connections=10, http2=True),
+    "s.jina.ai": HostClientConfig(max_connections=15, max_keepalive_connections=10, http2=True),
+}
+
+
+@dataclass
+class _RegisteredClient:
+    client: httpx.AsyncClient
+    loop: asyncio.AbstractEventLoop
+    config: HostClientConfig = field(default_factory=HostClientConfig)
+
+
+class HttpClientRegistry:
+    """Process-wide registry of pooled httpx.AsyncClient instances keyed by upstream host.
+
+    Sharing one client per host keeps connections (and TLS sessions) alive across
+    services and requests instead of paying a handshake on every call.
+    """
+
+    def __init__(self, host_configs: Optional[Dict[str, HostClientConfig]] = None):
+        self._host_configs: Dict[str, HostClientConfig] = dict(host_configs or {})
+        self._clients: Dict[str, _RegisteredClient] = {}
+        # Closes of replaced clients scheduled on the current loop, referenced until they finish.
+        self._closing: Set[asyncio.Task] = set()
+
+    def configure_host(self, host: str, config: HostClientConfig) -> None:
+        """Set connection settings for a host. Takes effect the next time a client is created for it."""
+        self._host_configs[host.lower()] = config
+
+    def get_config(self, host: str) -> HostClientConfig:
+        """Get connection settings for given host."""
+        return self._host_configs.get(host, self._host_configs.get(DEFAULT_HOST, HostClientConfig()))
+
+    def get_client(self, url: Optional[str] = None) -> httpx.AsyncClient:
+        """Get the shared client for the host of given URL, creating it if needed.
+
+        Clients are bound to the event loop they were created on, so a new one is
+        created if the caller runs on a different loop and the old one is closed.
+        """
+        host = self._get_host(url)
+        loop = asyncio.get_running_loop()
+
+        registered = self._clients.get(host)
+        if registered is not None and not registered.client.is_closed and registered.loop is loop:
+            return registered.client
+        if registered is not None:
+            self._close_replaced(registered, loop)
+
+        config = self.get_config(host)
+        http2 = config.http2 and HTTP2_AVAILABLE
+        client = httpx.AsyncClient(
+            limits=config.limits,
+            timeout=config.timeout,
+            http2=http2
+        )
+        self._clients[host] = _RegisteredClient(client=client, loop=loop, config=config)
+        logger.debug(f"Created shared HTTP client for host: {host}, http2: {http2}, max_connections: {config.max_connections}")
+        return client
+
+    def _close_replaced(self, registered: _RegisteredClient, loop: asyncio.AbstractEventLoop) -> None:
+        """Close a client replaced by one for another event loop, on its own loop if that is still open."""
+        if registered.client.is_closed:
+            return
+        if not registered.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(registered.client.aclose(), registered.loop)
+            return
+
+        async def close():
+            try:
+                await registered.client.aclose()
+            except Exception as e:
+                # Connections of a closed loop can't be shut down cleanly, the client is released anyway.
+                logger.debug(f"Failed to close HTTP client of a closed event loop: {str(e)}")
+
+        task = loop.create_task(close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def get_limits(self, url: Optional[str] = None) -> httpx.Limits:
+        """Get connection limits used for the host of given URL."""
+        return self.get_config(self._get_host(url)).limits
+
+    async def close_all(self) -> None:
+        """Close all registered clients."""
+        clients: Tuple[_RegisteredClient, ...] = tuple(self._clients.values())
+        self._clients.clear()
+        for registered in clients:
+            if registered.client.is_closed:
+                continue
+            try:
+                await registered.client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP client: {str(e)}")
+        logger.info(f"Closed {len(clients)} shared HTTP clients")
+
+    @staticmethod
+    def _get_host(url: Optional[str]) -> str:
+        if not url:
+            return DEFAULT_HOST
+        return (urlsplit(url).hostname or DEFAULT_HOST).lower()
+
+
+http_client_registry = HttpClientRegistry(host_configs=HOST_CLIENT_CONFIGS)
+
+
+def get_http_client(url: Optional[str] = None) -> httpx.AsyncClient:
+    """Get the process-wide shared client for the host of given URL."""
+    return http_client_registry.get_client(url)
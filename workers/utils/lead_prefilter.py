@@ -0,0 +1,219 @@
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Pattern, Tuple
+
+from models.leads import ApolloLead
+from utils.loguru_setup import logger
+
+
+# Persona types as used in pre-evaluation results, keyed by the names used in persona_role_titles.
+PERSONA_TYPES = {
+    'buyer': 'buyer', 'buyers': 'buyer',
+    'influencer': 'influencer', 'influencers': 'influencer',
+    'end_user': 'end_user', 'end_users': 'end_user',
+}
+
+# Apollo seniorities that can own a purchase decision even when their title does not match a persona.
+DECISION_MAKER_SENIORITIES = {'c_suite', 'founder', 'owner', 'partner', 'vp'}
+
+# Abbreviations expanded before matching so that "VP Sales" matches "Vice President of Sales".
+TITLE_ABBREVIATIONS = {
+    'vp': 'vice president',
+    'svp': 'senior vice president',
+    'evp': 'executive vice president',
+    'sr': 'senior',
+    'jr': 'junior',
+    'dir': 'director',
+    'mgr': 'manager',
+    'mgmt': 'management',
+    'ops': 'operations',
+    'eng': 'engineering',
+    'mktg': 'marketing',
+}
+
+# Words that may be present or missing between the words of a title.
+TITLE_STOP_WORDS = {'of', 'the', 'and', 'for', 'in', 'at', 'to'}
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase title, replace '&' with 'and', drop punctuation and expand common abbreviations."""
+    words = _NON_WORD_RE.sub(' ', title.lower().replace('&', ' and ')).split()
+    return ' '.join(TITLE_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def _title_to_pattern(title: str) -> Optional[str]:
+    """Regex matching given persona title as a phrase, allowing stop words between its words."""
+    words = [word for word in normalize_title(title).split() if word not in TITLE_STOP_WORDS]
+    if not words:
+        return None
+    separator = r"(?:\s+(?:" + '|'.join(sorted(TITLE_STOP_WORDS)) + r"))*\s+"
+    return r"\b" + separator.join(re.escape(word) for word in words) + r"\b"
+
+
+def has_matching_terms(source_terms: Optional[List[str]], target_terms: Optional[List[str]]) -> bool:
+    """
+    Check if any source term contains or is contained within any target term.
+    This allows for partial matches while handling underscores and common variations.
+    """
+    if not source_terms or not target_terms:
+        return False
+
+    source_terms = [term.lower().replace('_', ' ') for term in source_terms]
+    target_terms = [term.lower().replace('_', ' ') for term in target_terms]
+
+    for source in source_terms:
+        for target in target_terms:
+            # Check both directions of containment
+            if source in target or target in source:
+                return True
+    return False
+
+
+@dataclass
+class PreFilterResult:
+    """Rule based assessment of a single lead."""
+    lead_id: str
+    needs_llm: bool
+    reason: str
+    persona_estimate: Optional[str] = None
+    signals: List[str] = field(default_factory=list)
+
+    def to_pre_evaluation(self) -> Dict[str, Any]:
+        """Pre-evaluation result in the same shape as returned by the LLM, for leads that are not sent to it."""
+        return {
+            'lead_id': self.lead_id,
+            'initial_score': 0,
+            'initial_persona_estimate': self.persona_estimate or 'null',
+            'reason': self.reason,
+            'enrichment_recommended': False,
+            'confidence': 90,
+            'key_signals': self.signals,
+            'career_insights': {},
+            'pre_filtered': True,
+        }
+
+
+class LeadPreFilter:
+    """
+    Deterministic title and persona matcher that triages leads before LLM pre-evaluation.
+
+    Leads whose title matches a target persona, whose departments or functions match the target
+    personas, or who are senior enough to own a decision are sent to the LLM. So are leads we know
+    too little about. Only leads with a title that clearly matches none of the above are decided
+    here, and they get a low score so that they follow the same path as leads the LLM scores low.
+    """
+
+    def __init__(
+            self,
+            persona_role_titles: Dict[str, Any],
+            target_departments: List[str],
+            target_functions: List[str],
+            role_pattern: Optional[str] = None
+    ):
+        """
+        Args:
+            persona_role_titles: Persona type to role titles, as in product data
+            target_departments: Departments of target personas
+            target_functions: Functions of target personas
+            role_pattern: Optional regex of buyer titles from RolePatternGenerator
+        """
+        self.target_departments = target_departments
+        self.target_functions = target_functions
+        self.persona_patterns: List[Tuple[str, Pattern]] = _compile_persona_patterns(
+            json.dumps(persona_role_titles or {}, sort_keys=True))
+        # Generated buyer title regex is written against titles as they appear, so it is matched on the raw title.
+        self.role_pattern: Optional[Pattern] = _compile_role_pattern(role_pattern) if role_pattern else None
+
+    @property
+    def enabled(self) -> bool:
+        """Filter only rejects leads when there are persona titles or departments/functions to match against."""
+        return bool(self.persona_patterns or self.role_pattern or self.target_departments or self.target_functions)
+
+    def evaluate(self, lead: ApolloLead) -> PreFilterResult:
+        """Assess given lead and decide if it needs LLM pre-evaluation."""
+        title = lead.title or lead.headline
+        if not self.enabled or not title:
+            return PreFilterResult(lead_id=lead.id, needs_llm=True, reason="Not enough information for rule based evaluation")
+
+        normalized_title = normalize_title(title)
+        persona_estimate = next(
+            (persona for persona, pattern in self.persona_patterns if pattern.search(normalized_title)), None)
+        if not persona_estimate and self.role_pattern and self.role_pattern.search(title):
+            persona_estimate = 'buyer'
+        department_match = has_matching_terms(lead.departments, self.target_departments)
+        function_match = has_matching_terms(lead.functions, self.target_functions)
+
+        signals = []
+        if persona_estimate:
+            signals.append(f"Title '{title}' matches {persona_estimate} persona")
+        if department_match:
+            signals.append("Departments match target personas")
+        if function_match:
+            signals.append("Functions match target personas")
+        if lead.seniority in DECISION_MAKER_SENIORITIES:
+            signals.append(f"Decision maker seniority: {lead.seniority}")
+
+        if signals:
+            return PreFilterResult(lead_id=lead.id, needs_llm=True, reason="; ".join(signals),
+                                   persona_estimate=persona_estimate, signals=signals)
+
+        return PreFilterResult(
+            lead_id=lead.id,
+            needs_llm=False,
+            reason=f"Rule based pre-filter: title '{title}', departments and functions do not match any target persona"
+        )
+
+    def split(self, leads: List[ApolloLead]) -> Tuple[List[ApolloLead], List[PreFilterResult]]:
+        """Returns leads that need LLM pre-evaluation and results of leads that were decided by rules."""
+        llm_leads = []
+        rejected = []
+        for lead in leads:
+            result = self.evaluate(lead)
+            if result.needs_llm:
+                llm_leads.append(lead)
+            else:
+                rejected.append(result)
+        return llm_leads, rejected
+
+
+@lru_cache(maxsize=128)
+def _compile_persona_patterns(persona_role_titles_json: str) -> List[Tuple[str, Pattern]]:
+    """Compile one regex per persona type, cached per product across jobs."""
+    persona_role_titles = json.loads(persona_role_titles_json)
+    patterns_by_persona: Dict[str, List[str]] = {}
+    for role_type, titles in persona_role_titles.items():
+        persona = PERSONA_TYPES.get(role_type.lower())
+        if not persona:
+            continue
+        if isinstance(titles, str):
+            titles = [titles]
+        for title in titles or []:
+            # Personas can also be objects with departments and functions, only titles are matched here.
+            title = title.get('title') if isinstance(title, dict) else title
+            pattern = _title_to_pattern(title) if isinstance(title, str) else None
+            if pattern:
+                patterns_by_persona.setdefault(persona, []).append(pattern)
+
+    compiled = []
+    # Buyers first so that a title matching several personas gets the most valuable one.
+    for persona in ['buyer', 'influencer', 'end_user']:
+        if persona not in patterns_by_persona:
+            continue
+        try:
+            compiled.append((persona, re.compile('|'.join(f"(?:{p})" for p in patterns_by_persona[persona]), re.IGNORECASE)))
+        except re.error as e:
+            logger.warning(f"Could not compile title patterns for persona {persona}: {e}")
+    return compiled
+
+
+@lru_cache(maxsize=128)
+def _compile_role_pattern(role_pattern: str) -> Optional[Pattern]:
+    try:
+        return re.compile(role_pattern, re.IGNORECASE)
+    except re.error as e:
+        logger.warning(f"Could not compile generated role pattern: {e}")
+        return None
@@ -0,0 +1,113 @@
+import json
+from typing import Dict, Any, List
+
+
+# Formats in which lists of records (e.g. lead profiles) are embedded in prompts.
+JSON_FORMAT = 'json'  # Pretty printed JSON array, as prompts used to embed records before compact formats.
+COMPACT_JSON_FORMAT = 'compact_json'  # One minified JSON object per line, without empty fields.
+TABLE_FORMAT = 'table'  # Header row of field names followed by one row of values per record.
+
+PROMPT_FORMATS = (JSON_FORMAT, COMPACT_JSON_FORMAT, TABLE_FORMAT)
+
+# Rough number of characters per token of JSON heavy English text, used when no tokenizer is at hand.
+CHARS_PER_TOKEN = 4
+
+
+def prune_empty(value: Any) -> Any:
+    """Recursively drop None, empty strings, empty lists and empty dicts. Zero and False are kept."""
+    if isinstance(value, dict):
+        pruned = {key: prune_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if not _is_empty(item)}
+    if isinstance(value, list):
+        pruned = [prune_empty(item) for item in value]
+        return [item for item in pruned if not _is_empty(item)]
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == '' or value == [] or value == {}
+
+
+def to_compact_json(value: Any) -> str:
+    """Minified JSON of given value without empty fields. Key order of dicts is kept as is."""
+    return json.dumps(prune_empty(value), separators=(',', ':'), ensure_ascii=False)
+
+
+def to_prompt_json(value: Any, prompt_format: str) -> str:
+    """JSON of a single value (e.g. persona titles) matching given records format."""
+    if prompt_format == JSON_FORMAT:
+        return json.dumps(value, indent=2)
+    return to_compact_json(value)
+
+
+def flatten_record(record: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """Flatten nested dicts into 'parent.child' keys. Lists are kept as values."""
+    flattened: Dict[str, Any] = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flattened.update(flatten_record(value, prefix=f"{name}."))
+        else:
+            flattened[name] = value
+    return flattened
+
+
+def encode_records(records: List[Dict[str, Any]], prompt_format: str = JSON_FORMAT) -> str:
+    """
+    Encode given records for a prompt.
+
+    Compact formats drop empty fields and keep fields in the order they appear in the records, so the
+    same records always encode to the same text. The table format also names every field only once:
+    the first row lists field names and every following row is a JSON array of one record's values.
+    Table columns are in the order of the record schema, regardless of which records have a value,
+    and columns without a value in any record are left out.
+    """
+    if prompt_format == JSON_FORMAT:
+        return json.dumps(records, indent=2)
+    if prompt_format == COMPACT_JSON_FORMAT:
+        return '\n'.join(to_compact_json(record) for record in records)
+    if prompt_format != TABLE_FORMAT:
+        raise ValueError(f"Unknown prompt format: {prompt_format}")
+
+    rows = [flatten_record(prune_empty(record)) for record in records]
+    columns = [column for column in _schema_columns(records) if any(column in row for row in rows)]
+    lines = [json.dumps(columns, separators=(',', ':'), ensure_ascii=False)]
+    lines.extend(
+        json.dumps([row.get(column) for column in columns], separators=(',', ':'), ensure_ascii=False)
+        for row in rows
+    )
+    return '\n'.join(lines)
+
+
+def _schema_columns(records: List[Dict[str, Any]]) -> List[str]:
+    """Flattened field names of given records in schema order, i.e. the order fields are declared in the records.
+
+    Fields of a nested record that is None in some records take the place of the nested record.
+    """
+    columns: List[str] = []
+    for record in records:
+        for column in flatten_record(record):
+            if column in columns or any(existing.startswith(f"{column}.") for existing in columns):
+                continue
+            # Insert after the nested record (or its fields seen so far) that the column belongs to.
+            parents = [i for i, existing in enumerate(columns) if column.startswith(f"{existing}.")
+                       or existing.startswith(f"{column.rsplit('.', 1)[0]}.")]
+            columns.insert(parents[-1] + 1 if parents else len(columns), column)
+    return columns
+
+
+def describe_format(prompt_format: str, record_name: str = 'record') -> str:
+    """Short explanation of given format for the prompt, so that the model reads the records correctly."""
+    if prompt_format == JSON_FORMAT:
+        return "as a JSON array"
+    if prompt_format == COMPACT_JSON_FORMAT:
+        return "one JSON object per line, fields that are not available are left out"
+    if prompt_format == TABLE_FORMAT:
+        return (f"as a table: the first row lists the field names and every following row lists the values of one {record_name} "
+                "in the same order, nested fields are named 'parent.child' and null means not available")
+    raise ValueError(f"Unknown prompt format: {prompt_format}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate number of tokens in given text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
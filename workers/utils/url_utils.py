@@ -33,3 +33,21 @@ class UrlUtils:
         suffix_1 = account_url_1.split(substr)[1].split("/")
         suffix_2 = account_url_2.split(substr)[1].split("/")
         return suffix_1 == suffix_2
+
+    @staticmethod
+    def normalize_lead_linkedin_url(lead_linkedin_url: Optional[str]) -> Optional[str]:
+        """Returns canonical form of given lead LinkedIn profile URL or None if it is not a profile URL.
+
+        For example: https://www.linkedin.com/in/John-Doe/, http://in.linkedin.com/in/john-doe?trk=abc
+        and linkedin.com/in/john-doe all return linkedin.com/in/john-doe.
+        """
+        if not lead_linkedin_url:
+            return None
+        substr = "linkedin.com/in/"
+        url = lead_linkedin_url.strip().lower()
+        if substr not in url:
+            return None
+        username = url.split(substr, 1)[1].split("?")[0].split("#")[0].split("/")[0]
+        if not username:
+            return None
+        return f"{substr}{username}"
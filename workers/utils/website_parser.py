@@ -4,6 +4,7 @@ import httpx
 from typing import List, Dict, Any
 from services.ai.ai_service import AIServiceFactory
 from google.api_core.exceptions import ResourceExhausted
+from utils.http_client_registry import get_http_client
 from utils.retry_utils import RetryableError, RetryConfig, with_retry
 from utils.loguru_setup import logger
 
@@ -189,10 +190,9 @@ class WebsiteParser:
     @with_retry(retry_config=JINA_RETRY_CONFIG, operation_name="_website_parser_call_jina_reader_api")
     async def _call_jina_api(self, endpoint: str, headers: Dict) -> str:
         """Calls Jina API (with retries) and returns response text."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url=endpoint, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.text
+        response = await get_http_client(endpoint).get(url=endpoint, headers=headers, timeout=30.0)
+        response.raise_for_status()
+        return response.text
 
     @with_retry(retry_config=GEMINI_RETRY_CONFIG, operation_name="_website_parser_call_ai_api")
     async def _call_ai_api(self, prompt: str) -> Dict[str, Any] | str: